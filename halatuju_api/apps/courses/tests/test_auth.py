@@ -213,3 +213,78 @@ class TestPublicEndpointsRemainOpen(TestCase):
     def test_institutions_no_auth_required(self):
         response = self.client.get('/api/v1/institutions/')
         self.assertEqual(response.status_code, 200)
+
+
+class TestVerifiedTokenCache(TestCase):
+    """The middleware verifies a token once and serves its claims from memory until the cache
+    TTL or the token's exp, whichever comes first."""
+
+    def setUp(self):
+        from django.test import RequestFactory
+        from halatuju.middleware import supabase_auth
+        self.auth = supabase_auth
+        self.rf = RequestFactory()
+        supabase_auth.clear_token_cache()
+        with override_settings(SUPABASE_JWT_SECRET=TEST_JWT_SECRET):
+            self.mw = supabase_auth.SupabaseAuthMiddleware(lambda request: request)
+
+    def _token(self, exp_in=3600, user_id=TEST_USER_ID):
+        import time
+        return jwt.encode({'sub': user_id, 'aud': 'authenticated', 'role': 'authenticated',
+                           'exp': int(time.time()) + exp_in}, TEST_JWT_SECRET, algorithm='HS256')
+
+    def _call(self, token):
+        return self.mw(self.rf.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    def test_a_token_is_verified_once(self):
+        token = self._token()
+        self.assertEqual(self._call(token).user_id, TEST_USER_ID)
+        with patch('halatuju.middleware.supabase_auth.jwt.decode',
+                   side_effect=AssertionError('verified again')):
+            self.assertEqual(self._call(token).user_id, TEST_USER_ID)
+        st = self.auth.token_cache_stats()
+        self.assertEqual((st['hits'], st['misses'], st['verified']), (1, 1, 1))
+        self.assertEqual(st['hit_rate'], 0.5)
+
+    def test_the_cache_never_outlives_exp_or_the_ttl(self):
+        import time
+        token = self._token(exp_in=30)
+        self._call(token)
+        with patch('halatuju.middleware.supabase_auth.time.time', return_value=time.time() + 31):
+            self._call(token)
+        self.assertEqual(self.auth.token_cache_stats()['verified'], 2)   # past exp: re-verified
+        with override_settings(SUPABASE_JWT_CACHE_TTL=0):
+            other = self._token()
+            self._call(other)
+            self._call(other)
+        self.assertEqual(self.auth.token_cache_stats()['entries'], 0)
+
+    def test_failures_and_tokens_without_exp_are_not_cached(self):
+        self._call('not-a-token')
+        self._call(_make_token())                                # no exp claim
+        self._call(_make_token())
+        self.assertEqual(self.auth.token_cache_stats()['entries'], 0)
+        self.assertEqual(self.auth.token_cache_stats()['verified'], 3)
+
+    def test_the_cache_is_bounded(self):
+        with override_settings(SUPABASE_JWT_CACHE_MAX_ENTRIES=2):
+            for uid in ('a', 'b', 'c'):
+                self._call(self._token(user_id=uid))
+        self.assertEqual(self.auth.token_cache_stats()['entries'], 2)
+
+    def test_the_jwks_refresher_prefetches_and_survives_a_failed_fetch(self):
+        from unittest.mock import Mock
+
+        class _Stop(Exception):
+            pass
+
+        client = Mock()
+        client.get_jwk_set.side_effect = [None, OSError('jwks down'), None]
+        with patch('halatuju.middleware.supabase_auth.time.sleep',
+                   side_effect=[None, None, _Stop()]), \
+                self.assertLogs('halatuju.middleware.supabase_auth', 'WARNING') as logs:
+            with self.assertRaises(_Stop):
+                self.auth._refresh_jwks(client, 600)
+        self.assertEqual(client.get_jwk_set.call_count, 3)
+        client.get_jwk_set.assert_called_with(refresh=True)
+        self.assertIn('JWKS refresh failed', logs.output[0])
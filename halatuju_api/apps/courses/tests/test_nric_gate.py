@@ -1,8 +1,11 @@
 from django.http import HttpResponse
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.test import APIRequestFactory
 
+from halatuju.middleware import profile_loader
 from halatuju.middleware.supabase_auth import NricGateMiddleware
 from apps.courses.models import StudentProfile
+from apps.courses.views import NricClaimView
 
 
 class NricGateMiddlewareTest(TestCase):
@@ -78,3 +81,73 @@ class NricGateMiddlewareTest(TestCase):
         request.supabase_user = {'is_anonymous': False}
         response = self.middleware(request)
         self.assertEqual(response.status_code, 403)
+
+
+class NricGateCachingTest(TestCase):
+    """The gate's profile read is the view's, and a pass is remembered until the profile
+    changes (halatuju/middleware/profile_loader.py)."""
+
+    def setUp(self):
+        profile_loader.clear_nric_gate_cache()
+        self.factory = RequestFactory()
+        self.seen = []
+
+        def view(request):
+            self.seen.append(profile_loader.get_profile(request))
+            return HttpResponse(status=200)
+        self.middleware = NricGateMiddleware(view)
+
+    def _request(self, user_id):
+        request = self.factory.post('/api/v1/saved-courses/')
+        request.user_id = user_id
+        request.supabase_user = {'is_anonymous': False}
+        profile_loader.attach(request, user_id)
+        return request
+
+    def test_the_gate_and_the_view_share_one_profile_read(self):
+        StudentProfile.objects.create(supabase_user_id='u1', nric='010101-01-1234')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.middleware(self._request('u1')).status_code, 200)
+        self.assertEqual(self.seen[0].nric, '010101-01-1234')    # the full row, not only('nric')
+
+    def test_a_pass_is_remembered_until_the_profile_changes(self):
+        profile = StudentProfile.objects.create(supabase_user_id='u2', nric='010101-01-1234')
+        self.middleware(self._request('u2'))
+        with self.assertNumQueries(0):
+            self.assertTrue(profile_loader.nric_gate_passes(self._request('u2')))
+        profile.nric = ''
+        profile.save()
+        self.assertEqual(self.middleware(self._request('u2')).status_code, 403)
+
+    def test_a_claimed_profile_no_longer_passes_its_old_account(self):
+        StudentProfile.objects.create(supabase_user_id='old', nric='040815-01-2022')
+        self.assertEqual(self.middleware(self._request('old')).status_code, 200)
+        request = APIRequestFactory().post('/api/v1/profile/claim-nric/',
+                                           {'nric': '040815-01-2022', 'confirm': True},
+                                           format='json')
+        request.user_id = 'new'
+        request.supabase_user = {'id': 'new', 'email': 'new@test.com'}
+        self.assertEqual(NricClaimView.as_view()(request).data['status'], 'claimed')
+        self.assertEqual(self.middleware(self._request('old')).status_code, 403)
+        self.assertEqual(self.middleware(self._request('new')).status_code, 200)
+
+    def test_a_refusal_is_not_remembered(self):
+        self.assertEqual(self.middleware(self._request('u3')).status_code, 403)
+        StudentProfile.objects.create(supabase_user_id='u3', nric='010101-01-1234')
+        self.assertEqual(self.middleware(self._request('u3')).status_code, 200)
+
+    @override_settings(NRIC_GATE_CACHE_SECONDS=0)
+    def test_the_cache_can_be_turned_off(self):
+        StudentProfile.objects.create(supabase_user_id='u4', nric='010101-01-1234')
+        self.middleware(self._request('u4'))
+        with self.assertNumQueries(1):
+            self.assertTrue(profile_loader.nric_gate_passes(self._request('u4')))
+
+    def test_a_request_without_the_middleware_still_gets_its_profile(self):
+        StudentProfile.objects.create(supabase_user_id='u5', nric='010101-01-1234')
+        request = self.factory.get('/')
+        request.user_id = 'u5'
+        self.assertEqual(profile_loader.get_profile(request).supabase_user_id, 'u5')
+        request.user_id = 'nobody'
+        with self.assertRaises(StudentProfile.DoesNotExist):
+            profile_loader.get_profile(request)
@@ -21,7 +21,7 @@ class TestProfileNewFields:
         # truthfulness-declaration signature; submit_application promotes the signature to
         # profile.name VERBATIM, so the stray space became the canonical name behind emails,
         # the payments CSV and the partner exports. Her MyKad reads 'A/P'. Nothing flagged it
-        # because vision._NAME_NOISE tolerates the spaced marker when COMPARING — a tolerance
+        # because matching._NAME_NOISE tolerates the spaced marker when COMPARING — a tolerance
         # added for this very student. Tolerating a variant on read is not storing one form.
         # ⚠ This asserts the WIRING (save() calls the helper); tidy_parentage_marker's own
         # behaviour is unit-tested in test_stpm_data_loading.TestTidyParentageMarker.
@@ -107,7 +107,7 @@ class TestProperCaseName:
 class TestTidyParentageMarker:
     """`tidy_parentage_marker` — the WRITE-boundary half of the spaced-marker problem.
 
-    `vision._NAME_NOISE` tolerates 'A/ P' when COMPARING names (added for application #20 so a
+    `matching._NAME_NOISE` tolerates 'A/ P' when COMPARING names (added for application #20 so a
     typed space would stop reading as a false Name mismatch against the student's own IC). That
     tolerance is why nothing ever flagged #20's stored name — she typed 'SHARVANI A/ P
     KANAGEVELLU' on the truthfulness declaration, `submit_application` promoted the signature to
@@ -16,9 +16,9 @@ import re
 # ⚠ THIS IS A MARKER FIX, NOT A NAME FIX. It only ever removes whitespace INSIDE the marker;
 # it cannot touch a single letter of anyone's name, reorder tokens, or alter spacing between
 # name words. A '/' never legitimately occurs inside a Malaysian personal name, which is what
-# makes the rewrite safe — the same property `vision._split_glued_markers` relies on.
+# makes the rewrite safe — the same property `matching.split_glued_markers` relies on.
 #
-# Why it belongs at the WRITE boundary: `apps.scholarship.vision` already tolerates the spaced
+# Why it belongs at the WRITE boundary: `apps.scholarship.matching` already tolerates the spaced
 # forms when COMPARING names (`_NAME_NOISE`), a tolerance added for application #20 precisely
 # so a typed "A/ P" would stop reading as a false Name mismatch against the student's own IC.
 # That was right, and it is why nothing ever flagged the typo — but tolerating a variant on read
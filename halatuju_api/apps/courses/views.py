@@ -67,6 +67,8 @@ from .stpm_quiz_engine import (
 )
 from .stpm_quiz_data import SUPPORTED_LANGUAGES as STPM_SUPPORTED_LANGUAGES
 from rest_framework.permissions import AllowAny
+from halatuju import ratelimit
+from halatuju.middleware.profile_loader import get_or_create_profile, get_profile
 from halatuju.middleware.supabase_auth import SupabaseIsAuthenticated
 
 logger = logging.getLogger(__name__)
@@ -693,7 +695,7 @@ def _persist_quiz_signals(request, student_signals):
     if supabase_user.get('is_anonymous', False):
         return
     try:
-        profile = StudentProfile.objects.get(supabase_user_id=user_id)
+        profile = get_profile(request)
         profile.student_signals = student_signals
         profile.save(update_fields=['student_signals'])
     except StudentProfile.DoesNotExist:
@@ -931,9 +933,7 @@ class SavedCoursesView(APIView):
         if not course_id:
             return Response({'error': 'course_id required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        profile = StudentProfile.objects.get(
-            supabase_user_id=request.user_id
-        )
+        profile = get_profile(request)
 
         # Try SPM table first, then STPM — no prefix-guessing needed
         try:
@@ -999,9 +999,7 @@ class ProfileView(APIView):
 
     def get(self, request):
         from django.conf import settings
-        profile, created = StudentProfile.objects.get_or_create(
-            supabase_user_id=request.user_id
-        )
+        profile, created = get_or_create_profile(request)
 
         # Email comes from Supabase Auth JWT, not the profile model
         email = getattr(request, 'supabase_user', {}).get('email', '')
@@ -1154,9 +1152,7 @@ class ProfileView(APIView):
         })
 
     def put(self, request):
-        profile = StudentProfile.objects.get(
-            supabase_user_id=request.user_id
-        )
+        profile = get_profile(request)
 
         serializer = ProfileUpdateSerializer(profile, data=request.data, partial=True)
         if not serializer.is_valid():
@@ -1234,9 +1230,7 @@ class ProfileSyncView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        profile, created = StudentProfile.objects.get_or_create(
-            supabase_user_id=request.user_id
-        )
+        profile, created = get_or_create_profile(request)
 
         # Seed-only name. This browser sync pre-fills the name from the Google sign-in
         # display name (which can be a handle like "Sharmila 1204"). It may SEED a blank
@@ -1390,6 +1384,10 @@ class NricClaimView(APIView):
                     ' WHERE supabase_user_id = %s',
                     [request.user_id, old_pk],
                 )
+        # The raw SQL sends no post_save: drop both accounts' remembered NRIC gate passes, or
+        # the old one would keep passing the gate on a profile it no longer has.
+        from halatuju.middleware.profile_loader import forget_nric_gate_passes
+        forget_nric_gate_passes(old_pk, request.user_id)
         return Response({'status': 'claimed'})
 
 
@@ -1431,7 +1429,7 @@ class SendVerificationView(APIView):
             lang = 'en'
 
         try:
-            profile = StudentProfile.objects.get(supabase_user_id=request.user_id)
+            profile = get_profile(request)
         except StudentProfile.DoesNotExist:
             return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1519,7 +1517,6 @@ class PhoneVerifyStartView(APIView):
 
     def post(self, request):
         from django.conf import settings
-        from django.core.cache import cache
         from apps.scholarship import whatsapp  # local import: avoids app-load order issues
 
         # Student phone verification is paused (see settings.PHONE_VERIFY_ENABLED). Refuse
@@ -1529,7 +1526,7 @@ class PhoneVerifyStartView(APIView):
             return Response({'error': 'phone_verify_paused'}, status=status.HTTP_403_FORBIDDEN)
 
         try:
-            profile = StudentProfile.objects.get(supabase_user_id=request.user_id)
+            profile = get_profile(request)
         except StudentProfile.DoesNotExist:
             return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1538,19 +1535,19 @@ class PhoneVerifyStartView(APIView):
             return Response({'error': 'phone_required'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Soft rate limit: 5 sends/hour per profile (best-effort; Twilio Verify is the backstop).
-        rl_key = f'phoneverify:send:{profile.pk}'
-        sent = cache.get(rl_key, 0)
-        if sent >= 5:
+        # Only a code that was sent counts.
+        limit = ratelimit.hit('phone_verify', profile.pk, limit=5, period=3600)
+        if not limit.allowed:
             return Response({'error': 'rate_limited'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
         channel = getattr(settings, 'PHONE_VERIFY_CHANNEL', 'sms')
         ok, vstatus, _err = whatsapp.start_phone_verification(phone, channel=channel)
         if not ok:
+            limit.refund()
             http = {'unconfigured': status.HTTP_503_SERVICE_UNAVAILABLE,
                     'invalid_number': status.HTTP_400_BAD_REQUEST}.get(vstatus, status.HTTP_502_BAD_GATEWAY)
             return Response({'error': vstatus or 'failed'}, status=http)
 
-        cache.set(rl_key, sent + 1, 3600)
         return Response({'status': 'sent'})
 
 
@@ -1571,7 +1568,7 @@ class PhoneVerifyCheckView(APIView):
                             status=status.HTTP_403_FORBIDDEN)
 
         try:
-            profile = StudentProfile.objects.get(supabase_user_id=request.user_id)
+            profile = get_profile(request)
         except StudentProfile.DoesNotExist:
             return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1647,9 +1644,7 @@ class OutcomeListView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        profile = StudentProfile.objects.get(
-            supabase_user_id=request.user_id
-        )
+        profile = get_profile(request)
 
         institution = None
         institution_id = request.data.get('institution_id')
@@ -292,12 +292,13 @@ def generate_report(grades, eligible_courses, insights,
         return {'error': 'AI service not configured (missing API key)'}
 
     try:
-        from google import genai
+        from google import genai  # noqa: F401
     except ImportError:
         logger.error('google-genai not installed')
         return {'error': 'AI module not installed'}
 
-    client = genai.Client(api_key=api_key)
+    # The shared Gemini broker: one client, the process budgets, 429 backoff and the meter.
+    from apps.scholarship import llm
 
     # Format data for prompt
     if exam_type == 'stpm':
@@ -328,17 +329,12 @@ def generate_report(grades, eligible_courses, insights,
 
         try:
             start_ms = time.time()
-            response = client.models.generate_content(
-                model=model_name, contents=full_prompt
-            )
+            # Course-selector report = platform-base work (org=NULL); metered as 'report'.
+            response = llm.generate(model_name, full_prompt, source='report',
+                                    api_key=api_key)
             elapsed_ms = int((time.time() - start_ms) * 1000)
 
             text = response.text
-            # Course-selector report = platform-base work (org=NULL); billable Gemini call.
-            from apps.scholarship import usage
-            _it, _ot = usage.gemini_tokens(response)
-            usage.record_usage(usage.GEMINI, model=model_name, source='report',
-                               input_tokens=_it, output_tokens=_ot, organisation_id=None)
             logger.info(
                 f'Report generated with {model_name} in {elapsed_ms}ms '
                 f'({len(text)} chars)'
@@ -203,3 +203,19 @@ class TestReportViews(TestCase):
         self.assertIsNone(call_kwargs['stpm_grades'])
         self.assertIsNone(call_kwargs['stpm_cgpa'])
         self.assertIsNone(call_kwargs['muet_band'])
+
+    @patch('apps.reports.views.generate_report')
+    def test_daily_limit_counts_only_generated_reports(self, mock_gen):
+        """Failed generations hand their slot back; the 4th report in a day is refused."""
+        body = {'eligible_courses': [{'course_id': 'C001'}], 'insights': {}}
+        mock_gen.return_value = {'error': 'AI service unavailable'}
+        for _ in range(4):
+            resp = self.client.post('/api/v1/reports/generate/', body, format='json')
+            self.assertEqual(resp.status_code, 503)
+        mock_gen.return_value = {'markdown': '# Report', 'model_used': 'gemini-2.5-flash',
+                                 'generation_time_ms': 100}
+        for _ in range(3):
+            resp = self.client.post('/api/v1/reports/generate/', body, format='json')
+            self.assertEqual(resp.status_code, 201)
+        resp = self.client.post('/api/v1/reports/generate/', body, format='json')
+        self.assertEqual(resp.status_code, 429)
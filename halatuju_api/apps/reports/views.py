@@ -8,12 +8,12 @@ Endpoints:
 """
 import logging
 
-from django.core.cache import cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from apps.courses.models import StudentProfile
+from halatuju import ratelimit
+from halatuju.middleware.profile_loader import get_or_create_profile
 from halatuju.middleware.supabase_auth import SupabaseIsAuthenticated
 from .models import GeneratedReport
 from .report_engine import generate_report
@@ -48,10 +48,11 @@ class GenerateReportView(APIView):
     permission_classes = [SupabaseIsAuthenticated]
 
     def post(self, request):
-        # Rate limit: max 3 reports per user per day
-        cache_key = f'report_limit:{request.user_id}'
-        count = cache.get(cache_key, 0)
-        if count >= REPORT_DAILY_LIMIT:
+        # Rate limit: max 3 reports per user per day. Only a report that generated counts —
+        # every other way out hands the slot back.
+        limit = ratelimit.hit('report', request.user_id,
+                              limit=REPORT_DAILY_LIMIT, period=REPORT_RATE_LIMIT_TTL)
+        if not limit.allowed:
             return Response(
                 {'error': 'Daily report limit reached (max 3 per day). Please try again tomorrow.'},
                 status=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -60,6 +61,7 @@ class GenerateReportView(APIView):
         # Validate required fields
         eligible_courses = request.data.get('eligible_courses')
         if not eligible_courses or not isinstance(eligible_courses, list):
+            limit.refund()
             return Response(
                 {'error': 'eligible_courses is required (list)'},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -71,9 +73,7 @@ class GenerateReportView(APIView):
             lang = 'bm'
 
         # Load student profile for grades and signals
-        profile, _ = StudentProfile.objects.get_or_create(
-            supabase_user_id=request.user_id
-        )
+        profile, _ = get_or_create_profile(request)
         grades = profile.grades or {}
         student_signals = profile.student_signals or {}
 
@@ -108,6 +108,7 @@ class GenerateReportView(APIView):
         )
 
         if 'error' in result:
+            limit.refund()
             return Response(
                 {'error': result['error']},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -140,9 +141,6 @@ class GenerateReportView(APIView):
             generation_time_ms=result.get('generation_time_ms'),
         )
 
-        # Increment rate limit counter
-        cache.set(cache_key, count + 1, REPORT_RATE_LIMIT_TTL)
-
         logger.info(
             f'Report {report.id} generated for {request.user_id} '
             f'({result["model_used"]}, {result.get("generation_time_ms")}ms)'
@@ -22,8 +22,15 @@ silent 'verified'.
 """
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import math
 import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
 
 # grade key → Bahasa-Melayu subject name (mirror of subjects.ts SUBJECT_NAMES).
 _SUBJECT_BM = {
@@ -143,9 +150,12 @@ def _band_to_grade(phrase: str) -> str:
     return _BAND_TO_GRADE.get(' '.join((phrase or '').lower().split()), '')
 
 
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
 def _norm(name: str) -> str:
     """Lowercase, collapse runs of non-alphanumerics to single spaces, strip."""
-    return re.sub(r'[^a-z0-9]+', ' ', (name or '').lower()).strip()
+    return _NON_ALNUM.sub(' ', (name or '').lower()).strip()
 
 
 def _norm_grade(g: str) -> str:
@@ -182,8 +192,17 @@ _KNOWN_SUBJECTS = sorted(
     ((name, frozenset(_norm(name).split())) for name in set(_SUBJECT_BM.values())),
     key=lambda t: -len(t[1]),
 )
+# token → the positions in _KNOWN_SUBJECTS of every subject containing it. A row can only
+# contain a subject it shares a token with, so a row checks those few candidates (in the same
+# longest-first order) instead of all of them.
+_SUBJECT_INDEX = {}
+for _i, (_name, _kt) in enumerate(_KNOWN_SUBJECTS):
+    for _tok in _kt:
+        _SUBJECT_INDEX.setdefault(_tok, []).append(_i)
+del _i, _name, _kt, _tok
 
 
+@lru_cache(maxsize=2048)
 def _match_known_subject(raw: str) -> str:
     """Resolve an OCR'd slip row to the canonical SPM subject it CONTAINS — instead of
     matching word-for-word. A row reads e.g. "1103 BAHASA MELAYU" or "4541 KIMIA
@@ -194,8 +213,9 @@ def _match_known_subject(raw: str) -> str:
     tokens = set(_norm(raw).split())
     if not tokens:
         return ''
-    for name, kt in _KNOWN_SUBJECTS:
-        if kt and kt <= tokens:
+    for i in sorted({i for t in tokens for i in _SUBJECT_INDEX.get(t, ())}):
+        name, kt = _KNOWN_SUBJECTS[i]
+        if kt <= tokens:
             return name
     return ''
 
@@ -246,16 +266,26 @@ def _group_rows(words, *, y_tol_frac=0.6):
         heights = sorted((w.get('h') or 0) for w in usable)
         med_h = heights[len(heights) // 2] or 12
         tol = max(med_h * y_tol_frac, 6)
-        rows: list[dict] = []
+        # A word joins the FIRST row whose anchor (its first word's cy) is within tol. Words
+        # arrive in cy order, so the anchors are created ascending and none is ever above the
+        # word: "first row within tol" is the first anchor >= cy - tol — one bisect per word
+        # instead of a scan of every row so far (a dense multi-column slip is hundreds of rows).
+        anchors: list[float] = []
+        rows: list[list] = []
         for w in sorted(usable, key=lambda w: w['cy']):
-            for row in rows:
-                if abs(w['cy'] - row['cy']) <= tol:
-                    row['ws'].append(w)
-                    break
+            cy = w['cy']
+            i = bisect_left(anchors, cy - tol)
+            # Settle the float edge on the original predicate (monotone in the anchor).
+            while i > 0 and cy - anchors[i - 1] <= tol:
+                i -= 1
+            while i < len(anchors) and cy - anchors[i] > tol:
+                i += 1
+            if i < len(rows):
+                rows[i].append(w)
             else:
-                rows.append({'cy': w['cy'], 'ws': [w]})
-        rows.sort(key=lambda r: r['cy'])
-        return [sorted(r['ws'], key=lambda w: w['cx']) for r in rows]
+                anchors.append(cy)
+                rows.append([w])
+        return [sorted(ws, key=lambda w: w['cx']) for ws in rows]
     # Rotated: de-rotate every centroid by the dominant angle, cluster on the row axis,
     # read along the text axis. Single-linkage along the sorted row axis tolerates a
     # row's internal spread (a keystone leaves the subject and its grade slightly offset)
@@ -397,11 +427,57 @@ def _declared_subject_count(full_upper: str):
     return None
 
 
+# Parsed slips, kept per process and keyed by CONTENT — the word geometry for
+# ``parse_spm_slip``, the document + its stored fields for ``read_slip`` — so an entry can never
+# go stale: a re-OCR or a re-extraction changes the key. The verdict, gap, promotion and
+# student-check paths all re-read the same slip within one request (and a batch job re-reads it
+# per engine); after the first read they are a digest and a dict copy. Bounded, oldest first.
+_SLIP_MEMO_SIZE = 256
+_parsed_slips: OrderedDict = OrderedDict()
+_read_slips: OrderedDict = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _digest(obj) -> str:
+    blob = json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def _memoised(cache, key, compute):
+    with _memo_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    value = compute()
+    with _memo_lock:
+        cache[key] = value
+        while len(cache) > _SLIP_MEMO_SIZE:
+            cache.popitem(last=False)
+    return value
+
+
+def clear_caches():
+    """Drop the memoised slip parses (tests; the eval bench's cold runs)."""
+    with _memo_lock:
+        _parsed_slips.clear()
+        _read_slips.clear()
+    _match_known_subject.cache_clear()
+
+
 def parse_spm_slip(words):
     """Deterministic positional parse of SPM-slip OCR words →
     ``{candidate_name, exam, results: [{subject, grade, band}]}``, or **None** to fall
     back to Gemini (not an SPM slip, fewer than 3 subject rows recognised, or fewer rows
-    than the slip's own declared subject total — an under-read)."""
+    than the slip's own declared subject total — an under-read).
+
+    Memoised on the geometry it reads (text, centre, height, angle of every word); each
+    caller gets its own copy."""
+    key = _digest([(w.get('text'), w.get('cx'), w.get('cy'), w.get('h'), w.get('angle'))
+                   for w in (words or [])])
+    return copy.deepcopy(_memoised(_parsed_slips, key, lambda: _parse_spm_slip(words)))
+
+
+def _parse_spm_slip(words):
     rows = _group_rows(words)
     if not rows:
         return None
@@ -525,10 +601,19 @@ def read_slip(doc) -> dict:
     Returns ``{names: [str], grades: {normname: grade}}``. Supports the new
     ``results: [{subject, grade}]`` shape (S2) AND the legacy ``subjects: [name]``
     shape (names only, no grades) — so completeness works on already-extracted
-    docs without re-OCR; accuracy needs the new shape."""
+    docs without re-OCR; accuracy needs the new shape.
+
+    Memoised per (document, stored fields) — see ``_read_slips``; each caller gets its
+    own lists and dicts."""
     vf = doc.vision_fields if isinstance(doc.vision_fields, dict) else {}
     fields = vf.get('fields', {})
     fields = fields if isinstance(fields, dict) else {}
+    key = (getattr(doc, 'pk', None), _digest(fields))
+    data = _memoised(_read_slips, key, lambda: _read_slip(fields))
+    return {k: (list(v) if isinstance(v, list) else dict(v)) for k, v in data.items()}
+
+
+def _read_slip(fields: dict) -> dict:
     names: list[str] = []
     grades: dict[str, str] = {}
     bands: dict[str, str] = {}    # normname → grade implied by the slip's band phrase
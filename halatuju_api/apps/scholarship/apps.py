@@ -6,3 +6,7 @@ class ScholarshipConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scholarship'
     verbose_name = 'B40 Assistance Programme'
+
+    def ready(self):
+        from . import llm
+        llm.connect_request_signals()
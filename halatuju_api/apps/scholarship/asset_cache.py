@@ -0,0 +1,182 @@
+"""Process-level cache for the binary assets mail carries — attachments, bundled files.
+
+The Vircle installation guide (``emails.vircle_guide_attachment``) was cached through the Django
+cache, and in production that is ``DatabaseCache``: every award or install email in a batch
+pulled a 1.5 MB PDF out of Postgres (and every refresh wrote one back). The bundled fallback
+copy was re-read from disk per email. This keeps the bytes in the worker's own memory instead:
+
+- **Size-bounded LRU.** ``ASSET_CACHE_MAX_BYTES`` (default 32 MB) caps the total; the least
+  recently used entry goes first, and an asset bigger than the whole budget is served but not
+  kept.
+- **TTL, then revalidation.** A fetched entry is served as-is for its ``ttl``. After that it is
+  revalidated, not refetched: the caller's ``version()`` returns the source's current ETag (for
+  Drive, ``sheets.drive_pdf_file`` — the file's checksum, from a metadata call), and only a
+  changed ETag downloads the bytes again. A version check that cannot reach the source keeps the
+  copy it has for another ``ttl`` — a slightly stale guide beats no guide, the same trade the
+  bundled fallback makes.
+- **Files on disk** (``file_bytes``) are keyed by path and revalidated by ``stat`` — mtime and
+  size — on every read, which costs nothing next to the read it saves.
+- **Counters.** ``stats()`` has the entries, bytes held and the hits / misses / revalidations /
+  refetches / evictions since start, for the ops readout and the tests.
+
+Per process on purpose: each worker fetches a changed asset once, which for a handful of files
+is cheaper than a shared store that moves the bytes on every read. Thread-safe (the mail
+dispatch pool renders from several threads); a fetch runs outside the lock, so two threads
+missing at once may both fetch — the second result simply replaces the first.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# The default budget when ``ASSET_CACHE_MAX_BYTES`` is unset.
+_MAX_BYTES = 32 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ('content', 'etag', 'checked', 'ttl')
+
+    def __init__(self, content, etag, ttl):
+        self.content = content
+        self.etag = etag
+        self.checked = time.monotonic()
+        self.ttl = ttl
+
+
+class AssetCache:
+    """An LRU of ``key → bytes`` with a per-entry TTL and ETag revalidation."""
+
+    def __init__(self, max_bytes=None):
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'revalidated': 0, 'refetched': 0, 'evictions': 0}
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        try:
+            return int(getattr(settings, 'ASSET_CACHE_MAX_BYTES', _MAX_BYTES))
+        except (TypeError, ValueError):
+            return _MAX_BYTES
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, content, etag, ttl):
+        size = len(content)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(content, etag, ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _key, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped.content)
+                self.counts['evictions'] += 1
+
+    def get(self, key, fetch, *, ttl, version=None):
+        """The bytes for ``key``. ``fetch()`` → ``(content, etag)`` loads them (content None =
+        unavailable: nothing is cached and None is returned). Within ``ttl`` seconds of the last
+        fetch or check, the cached copy is served. After that ``version()`` → the source's current
+        etag decides: the same → served again for another ``ttl``; different → fetched; None
+        (couldn't tell) → the cached copy is kept. Without ``version`` an expired entry is
+        fetched."""
+        entry = self._lookup(key)
+        if entry is not None:
+            if time.monotonic() - entry.checked < entry.ttl:
+                self._count('hits')
+                return entry.content
+            current = version() if version is not None else None
+            if version is not None and (current is None or current == entry.etag):
+                entry.checked = time.monotonic()
+                self._count('revalidated')
+                return entry.content
+            self._count('refetched')
+        else:
+            self._count('misses')
+        content, etag = fetch()
+        if content is None:
+            # The source is unavailable now; a copy we already hold is better than nothing, and
+            # is kept for another ``ttl`` rather than re-asking the source on every call.
+            if entry is None:
+                return None
+            entry.checked = time.monotonic()
+            return entry.content
+        self._store(key, content, etag, ttl)
+        return content
+
+    def file_bytes(self, path):
+        """The contents of the file at ``path``, re-read only when its mtime or size changes.
+        None (logged) when it can't be read."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            logger.warning('asset missing at %s', path)
+            return None
+        etag = f'{st.st_mtime_ns}:{st.st_size}'
+        key = f'file:{path}'
+        entry = self._lookup(key)
+        if entry is not None and entry.etag == etag:
+            self._count('hits')
+            return entry.content
+        self._count('refetched' if entry is not None else 'misses')
+        try:
+            with open(path, 'rb') as fh:
+                content = fh.read()
+        except OSError:
+            logger.warning('asset unreadable at %s', path, exc_info=True)
+            return None
+        self._store(key, content, etag, ttl=0)
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for name in self.counts:
+                self.counts[name] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, **self.counts}
+
+
+_cache = AssetCache()
+
+
+def get(key, fetch, *, ttl, version=None):
+    """``AssetCache.get`` on the process cache."""
+    return _cache.get(key, fetch, ttl=ttl, version=version)
+
+
+def file_bytes(path):
+    """``AssetCache.file_bytes`` on the process cache."""
+    return _cache.file_bytes(path)
+
+
+def clear():
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
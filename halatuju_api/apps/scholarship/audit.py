@@ -17,6 +17,11 @@ disagrees with whether the AI asserted it:
 
 Facts the officer left undecided (no pass/fail) are not counted — you can't
 override a decision you didn't make.
+
+Each fact's comparison is also written down as an OUTCOME code on the application
+(``verdict_outcome_<fact>``, derived on save from the two JSON fields), so the roll-up is
+a GROUP BY over four short columns instead of a pass over every decided record's JSON:
+``metrics_from_counts`` turns those counts into the same shape ``override_metrics`` returns.
 """
 from __future__ import annotations
 
@@ -27,6 +32,12 @@ _AI_ASSERTS = {'verified'}
 # Officer per-fact decisions that count as a made decision.
 _OFFICER_DECISIONS = {'pass', 'fail'}
 
+# Per-fact outcome codes (the ``verdict_outcome_<fact>`` columns). '' = the officer didn't decide.
+OUTCOME_AGREED = 'agreed'        # officer's pass/fail matches whether the AI asserted it
+OUTCOME_GENEROUS = 'generous'    # AI asserted (verified), officer FAILED it — an override
+OUTCOME_CAUTIOUS = 'cautious'    # AI did not assert, officer PASSED it — an override
+OVERRIDE_OUTCOMES = (OUTCOME_GENEROUS, OUTCOME_CAUTIOUS)
+
 
 def ai_fact_pass(status) -> bool:
     """True iff the AI asserted this fact green (``verified``)."""
@@ -74,6 +85,33 @@ def compute_overrides(ai_verdict_snapshot, officer_verdict) -> dict:
             'decided_count': decided_count}
 
 
+def fact_outcomes(ai_verdict_snapshot, officer_verdict) -> dict:
+    """``{fact: outcome code}`` for the four facts — what ``verdict_outcome_<fact>`` stores."""
+    out = {}
+    for row in compute_overrides(ai_verdict_snapshot, officer_verdict)['facts']:
+        if not row['decided']:
+            out[row['fact']] = ''
+        elif not row['overridden']:
+            out[row['fact']] = OUTCOME_AGREED
+        else:
+            out[row['fact']] = OUTCOME_GENEROUS if row['ai_pass'] else OUTCOME_CAUTIOUS
+    return out
+
+
+def metrics_from_counts(applications, per_fact) -> dict:
+    """``override_metrics``' result from pre-aggregated counts: ``applications`` decided and
+    ``per_fact = {fact: {'decided': n, 'overrides': n}}`` (a GROUP BY over the outcome
+    columns). Same keys, same rate rounding."""
+    per_fact = {f: {'decided': int((per_fact.get(f) or {}).get('decided') or 0),
+                    'overrides': int((per_fact.get(f) or {}).get('overrides') or 0)}
+                for f in FACTS}
+    fact_decisions = sum(v['decided'] for v in per_fact.values())
+    overrides = sum(v['overrides'] for v in per_fact.values())
+    rate = round(overrides / fact_decisions, 4) if fact_decisions else 0.0
+    return {'applications': applications, 'fact_decisions': fact_decisions,
+            'overrides': overrides, 'override_rate': rate, 'per_fact': per_fact}
+
+
 def override_metrics(decided_records) -> dict:
     """Aggregate override stats across decided applications. ``decided_records`` is
     an iterable of ``(ai_verdict_snapshot, officer_verdict)`` pairs (already
@@ -84,17 +122,12 @@ def override_metrics(decided_records) -> dict:
     (overrides / fact_decisions), 0.0 when nothing has been decided yet.
     """
     per_fact = {f: {'decided': 0, 'overrides': 0} for f in FACTS}
-    applications = fact_decisions = overrides = 0
+    applications = 0
     for ai_snapshot, officer_verdict in decided_records:
         applications += 1
-        result = compute_overrides(ai_snapshot, officer_verdict)
-        fact_decisions += result['decided_count']
-        overrides += result['override_count']
-        for row in result['facts']:
+        for row in compute_overrides(ai_snapshot, officer_verdict)['facts']:
             if row['decided']:
                 per_fact[row['fact']]['decided'] += 1
             if row['overridden']:
                 per_fact[row['fact']]['overrides'] += 1
-    rate = round(overrides / fact_decisions, 4) if fact_decisions else 0.0
-    return {'applications': applications, 'fact_decisions': fact_decisions,
-            'overrides': overrides, 'override_rate': rate, 'per_fact': per_fact}
+    return metrics_from_counts(applications, per_fact)
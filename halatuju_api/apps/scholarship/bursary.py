@@ -27,6 +27,7 @@ from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
+from .doc_context import documents_of
 from .vision import name_match, nric_match
 
 logger = logging.getLogger(__name__)
@@ -291,7 +292,7 @@ def guarantor_identity_check(application, name, nric):
       'parent_ic_nric_mismatch'    — typed NRIC doesn't match the IC
       'parent_ic_name_mismatch'    — typed name doesn't match the IC
     """
-    present_qs = application.documents.filter(superseded_at__isnull=True)
+    present_qs = documents_of(application).filter(superseded_at__isnull=True)
     parent_ic = next(
         (d for d in present_qs
          if d.doc_type == 'parent_ic' and d.vision_run_at and not d.vision_error),
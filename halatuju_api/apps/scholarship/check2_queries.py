@@ -501,8 +501,8 @@ def _sync_pathway_confirm(application, existing, now):
     verdict_params = {code: None for code in _PATHWAY_QUERY_KINDS}
     if ApplicantDocument.objects.filter(
             application=application, doc_type='offer_letter', superseded_at__isnull=True).exists():
-        from .verdict_engine import build_verdict
-        for fact in build_verdict(application):
+        from . import snapshots
+        for fact in snapshots.verdict(application):
             if fact['fact'] != 'pathway':
                 continue
             for it in fact['unresolved']:
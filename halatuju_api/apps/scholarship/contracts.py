@@ -446,21 +446,17 @@ def _gemini_generate(prompt, model, images=None):
     if not api_key:
         raise ContractsError('quiz_ai_unconfigured')
     try:
-        from google import genai
+        from google import genai  # noqa: F401
         from google.genai import types
     except ImportError:
         raise ContractsError('quiz_ai_unavailable')
-    client = genai.Client(api_key=api_key)
+    from . import llm   # shared client, budgets, 429 backoff and the meter
     if images:
         contents = [types.Part.from_bytes(data=data, mime_type=mime) for data, mime in images]
         contents.append(prompt)
     else:
         contents = prompt
-    response = client.models.generate_content(model=model, contents=contents)
-    from . import usage   # billable Gemini call — best-effort meter
-    _it, _ot = usage.gemini_tokens(response)
-    usage.record_usage(usage.GEMINI, model=model, input_tokens=_it, output_tokens=_ot)
-    return response.text
+    return llm.generate(model, contents).text
 
 
 def _clause_and_descendants(clause):
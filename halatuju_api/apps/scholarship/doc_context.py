@@ -0,0 +1,259 @@
+"""One application's documents, fetched once and read from memory by every engine.
+
+The verdict, income and anomaly engines (and the completeness/consent gates in services.py)
+each read the documents they need straight off ``application.documents`` — "the latest live
+IC", "the father's payslips", "which doc types are present" — and each helper is called many
+times per build. Opening one record on the officer cockpit ran ``build_verdict`` +
+``detect_anomalies`` + ``application_completeness`` + the resolution sync + the per-document
+checks, and that came to roughly 500 near-identical ``applicant_documents`` queries for a
+family with a dozen uploads.
+
+``loaded(application)`` fetches EVERY row of the application once (live AND superseded — the
+admin payload shows the history, and a read that asks for superseded rows gets them from the
+same fetch) into an ``ApplicationDocumentContext``, indexed by doc_type and by the slot key
+(doc_type, household_member, request_code). For the rest of the block ``documents_of(app)``
+hands the engines that context instead of the related manager.
+
+The context answers the SAME queryset calls the engines already make — ``filter`` /
+``exclude`` on plain fields with ``__in`` / ``__isnull``, ``order_by``, ``first``,
+``exists``, ``values_list``, iteration — so each read site changes ``application.documents``
+to ``documents_of(application)`` and nothing else. Anything it doesn't model (a JSON lookup,
+``select_related``, an ``update``) is replayed on the real manager, so an unmodelled read is
+at worst a query, never a wrong answer.
+
+It is a READ snapshot: open it around a read path (the cockpit detail GET), never around the
+upload / re-read / dedupe paths that write documents. A write made through the context
+(``update`` / ``delete``) still reaches the DB and drops the snapshot so the next read
+re-fetches. Outside a ``loaded`` block — or for a different application, or a test double
+without ``.documents`` — ``documents_of`` is exactly ``getattr(application, 'documents',
+None)``.
+"""
+import contextvars
+import operator
+from contextlib import contextmanager
+
+_active: 'contextvars.ContextVar[ApplicationDocumentContext | None]' = contextvars.ContextVar(
+    'doc_context', default=None)
+
+# Queryset methods that write: replayed on the DB, and they invalidate the snapshot.
+_WRITES = frozenset({'update', 'delete'})
+
+
+class _Unmodelled(Exception):
+    """A lookup the in-memory filter doesn't model — the caller replays the read on the DB."""
+
+
+def _field(doc, name):
+    if name == 'pk':
+        name = 'id'
+    try:
+        return getattr(doc, name)
+    except AttributeError:
+        raise _Unmodelled(name)
+
+
+def _predicate(lookup, value):
+    """``doc -> bool`` for one filter kwarg (``field``, ``field__exact``, ``field__in``,
+    ``field__isnull``). Relation spans and every other lookup are unmodelled."""
+    field, _, op = lookup.partition('__')
+    if '__' in op:
+        raise _Unmodelled(lookup)
+    if op in ('', 'exact'):
+        return lambda d: _field(d, field) == value
+    if op == 'in':
+        allowed = list(value)
+        return lambda d: _field(d, field) in allowed
+    if op == 'isnull':
+        return lambda d: (_field(d, field) is None) == bool(value)
+    raise _Unmodelled(lookup)
+
+
+class DocumentSet:
+    """A lazily-narrowed view over a context's rows, answering the queryset calls the engines
+    make. ``_ops`` keeps the chain so an unmodelled step can be replayed on the real manager."""
+
+    def __init__(self, ctx, docs, ops=()):
+        self._ctx = ctx
+        self._docs = docs
+        self._ops = tuple(ops)
+
+    # ── replay ────────────────────────────────────────────────────────────────
+    def _queryset(self):
+        qs = self._ctx.application.documents.all()
+        for name, args, kwargs in self._ops:
+            qs = getattr(qs, name)(*args, **kwargs)
+        return qs
+
+    def _step(self, name, args, kwargs, docs):
+        return DocumentSet(self._ctx, docs, self._ops + ((name, args, kwargs),))
+
+    def _fallback(self, name, args, kwargs):
+        # Off the modelled path: the same chain as a real queryset, which stays on the DB.
+        return getattr(self._queryset(), name)(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(self._queryset(), name)
+        if name in _WRITES:
+            ctx = self._ctx
+
+            def write(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    ctx.invalidate()
+            return write
+        return attr
+
+    # ── narrowing ─────────────────────────────────────────────────────────────
+    def _matching(self, kwargs):
+        preds = [_predicate(k, v) for k, v in kwargs.items()]
+        docs = self._docs
+        if self._docs is self._ctx.rows and 'doc_type' in kwargs and not self._ops:
+            docs = self._ctx.of_type(kwargs['doc_type'])     # the doc_type index
+        return [d for d in docs if all(p(d) for p in preds)]
+
+    def filter(self, *args, **kwargs):
+        if args:
+            return self._fallback('filter', args, kwargs)
+        try:
+            kept = self._matching(kwargs)
+        except _Unmodelled:
+            return self._fallback('filter', args, kwargs)
+        return self._step('filter', args, kwargs, kept)
+
+    def exclude(self, *args, **kwargs):
+        if args:
+            return self._fallback('exclude', args, kwargs)
+        try:
+            preds = [_predicate(k, v) for k, v in kwargs.items()]
+            kept = [d for d in self._docs if not all(p(d) for p in preds)]
+        except _Unmodelled:
+            return self._fallback('exclude', args, kwargs)
+        return self._step('exclude', args, kwargs, kept)
+
+    def all(self):
+        return self
+
+    def order_by(self, *keys):
+        # In memory only when every sort value is present: the DB's NULL placement is not
+        # something to re-derive here (``superseded_at`` is NULL on every live row).
+        names = ['id' if k.lstrip('-') == 'pk' else k.lstrip('-') for k in keys]
+        try:
+            if any(_field(d, n) is None for d in self._docs for n in names):
+                raise _Unmodelled(keys)
+        except _Unmodelled:
+            return self._fallback('order_by', keys, {})
+        docs = list(self._docs)
+        for key, name in reversed(list(zip(keys, names))):     # stable sorts, last key first
+            docs.sort(key=operator.attrgetter(name), reverse=key.startswith('-'))
+        return self._step('order_by', keys, {}, docs)
+
+    # ── evaluation ────────────────────────────────────────────────────────────
+    def __iter__(self):
+        return iter(self._docs)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __bool__(self):
+        return bool(self._docs)
+
+    def __getitem__(self, index):
+        return self._docs[index]
+
+    def first(self):
+        return self._docs[0] if self._docs else None
+
+    def last(self):
+        return self._docs[-1] if self._docs else None
+
+    def exists(self):
+        return bool(self._docs)
+
+    def count(self):
+        return len(self._docs)
+
+    def values_list(self, *fields, flat=False):
+        try:
+            rows = [tuple(_field(d, f) for f in fields) for d in self._docs]
+        except _Unmodelled:
+            return self._fallback('values_list', fields, {'flat': flat})
+        return [r[0] for r in rows] if flat else rows
+
+
+class ApplicationDocumentContext:
+    """Every document row of ONE application, fetched in one query (newest upload first — the
+    model's default order) and indexed for the engines' reads."""
+
+    def __init__(self, application):
+        self.application = application
+        self.application_id = application.pk
+        self._rows = None
+        # Values derived from this snapshot for the rest of the block (snapshots.py keeps the
+        # verdict here); dropped with the rows on a write.
+        self.memo = {}
+
+    def _load(self):
+        rows = list(self.application.documents.order_by('-uploaded_at', '-id'))
+        by_type, by_slot = {}, {}
+        for doc in rows:
+            by_type.setdefault(doc.doc_type, []).append(doc)
+            by_slot.setdefault((doc.doc_type, doc.household_member, doc.request_code),
+                               []).append(doc)
+        self._rows, self._by_type, self._by_slot = rows, by_type, by_slot
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._load()
+        return self._rows
+
+    def of_type(self, doc_type):
+        self.rows
+        return self._by_type.get(doc_type, [])
+
+    def slot(self, doc_type, household_member='', request_code='', *, live=True):
+        """The rows in one (doc_type, household_member, request_code) slot, newest first —
+        live only unless ``live=False``."""
+        self.rows
+        docs = self._by_slot.get((doc_type, household_member, request_code), [])
+        return [d for d in docs if d.superseded_at is None] if live else list(docs)
+
+    def invalidate(self):
+        self._rows = None
+        self.memo.clear()
+
+    def all(self):
+        return DocumentSet(self, self.rows)
+
+    def __getattr__(self, name):
+        # ``ctx.filter(...)`` / ``ctx.exclude(...)`` read like ``application.documents.…``.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.all(), name)
+
+
+@contextmanager
+def loaded(application):
+    """Serve every ``documents_of(application)`` read in the block from one fetch (and
+    memoise the engines' name / NRIC pair comparisons for it — see ``matching``)."""
+    from . import matching
+    ctx = ApplicationDocumentContext(application)
+    token = _active.set(ctx)
+    try:
+        with matching.memoised():
+            yield ctx
+    finally:
+        _active.reset(token)
+
+
+def documents_of(application):
+    """What the engines read documents through: the open context for this application, else
+    its related manager (None for a test double without one)."""
+    ctx = _active.get()
+    if ctx is not None and ctx.application_id is not None \
+            and getattr(application, 'pk', None) == ctx.application_id:
+        return ctx
+    return getattr(application, 'documents', None)
@@ -19,16 +19,61 @@ Contract for every parser:
 """
 from __future__ import annotations
 
+import bisect
 import re
+from functools import lru_cache
 from typing import Callable, Optional
 
 # ── text + label helpers ──────────────────────────────────────────────────────
+# One OCR text is read by many lookups: a parser asks for half a dozen labels and markers,
+# the dispatcher is tried per doc type, and the eval bench replays the same text N times.
+# So the text is split into lines ONCE (``_index`` — the lines plus each line's offset in the
+# normalised text, cached per text), every label / marker pattern is compiled ONCE per
+# process (``_rx`` / ``_any``, keyed by the pattern text), and ``has`` checks any number of
+# markers in a single combined scan.
 
 
-def _lines(text: str) -> list:
-    """OCR text → trimmed lines (newline-normalised)."""
-    norm = (text or '').replace('\r\n', '\n').replace('\r', '\n')
-    return [ln.strip() for ln in norm.split('\n')]
+@lru_cache(maxsize=None)
+def _rx(pattern: str) -> re.Pattern:
+    """``pattern`` compiled case-insensitive — once per process."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _any(patterns: tuple) -> re.Pattern:
+    """One case-insensitive pattern matching wherever ANY of ``patterns`` would — the
+    combined scan ``has`` runs instead of one search per marker."""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+class _Index:
+    """An OCR text tokenised once: ``norm`` (newline-normalised), ``lines`` (trimmed) and
+    ``starts`` (each line's offset in ``norm``, for jumping from a match to its line)."""
+    __slots__ = ('norm', 'lines', 'starts')
+
+    def __init__(self, text: str):
+        self.norm = (text or '').replace('\r\n', '\n').replace('\r', '\n')
+        raw = self.norm.split('\n')
+        self.lines = tuple(ln.strip() for ln in raw)
+        starts, at = [], 0
+        for ln in raw:
+            starts.append(at)
+            at += len(ln) + 1
+        self.starts = starts
+
+    def line_at(self, offset: int) -> int:
+        """The index of the line containing ``offset`` in ``norm``."""
+        return bisect.bisect_right(self.starts, offset) - 1
+
+
+@lru_cache(maxsize=32)
+def _index(text: str) -> _Index:
+    return _Index(text)
+
+
+def _lines(text: str) -> tuple:
+    """OCR text → trimmed lines (newline-normalised). Shared per text — don't mutate."""
+    return _index(text).lines
 
 
 def find_value(text: str, label: str) -> str:
@@ -38,9 +83,19 @@ def find_value(text: str, label: str) -> str:
 
     Label-anchored, not position-anchored, so it survives a label sitting on its own line
     (mobile screenshots) or inline with its value (desktop/PDF)."""
-    pat = re.compile(label, re.IGNORECASE)
-    lines = _lines(text)
-    for i, ln in enumerate(lines):
+    pat = _rx(label)
+    idx = _index(text)
+    lines = idx.lines
+    start = 0
+    if '^' not in label and '$' not in label:
+        # A label that matches on a line also matches the whole text at the same offset, so
+        # one C-level search over the text either rules it out or says where to start.
+        first = pat.search(idx.norm)
+        if first is None:
+            return ''
+        start = idx.line_at(first.start())
+    for i in range(start, len(lines)):
+        ln = lines[i]
         m = pat.search(ln)
         if not m:
             continue
@@ -56,8 +111,7 @@ def find_value(text: str, label: str) -> str:
 
 def has(text: str, *patterns: str) -> bool:
     """True iff any regex pattern is present (case-insensitive). Used for surface markers."""
-    blob = text or ''
-    return any(re.search(p, blob, re.IGNORECASE) for p in patterns)
+    return bool(patterns) and _any(patterns).search(text or '') is not None
 
 
 _NRIC_RE = re.compile(r'\b(\d{6})[-\s]?(\d{2})[-\s]?(\d{4})\b')
@@ -74,6 +128,13 @@ def first_nric(text: str) -> str:
 _RM_RE = re.compile(r'RM\s*\)?\s*([\d,]+(?:\.\d{2})?)', re.IGNORECASE)
 
 
+# Line-shape patterns the parsers test line by line (case-sensitive, unlike labels).
+_POSTCODE_RE = re.compile(r'\b\d{5}\b')
+_ACCOUNT_RE = re.compile(r'\d{10,12}')
+_CAPS_NAME_RE = re.compile(r'^[A-Z][A-Z .@/]*$')
+_FIGURE_RE = re.compile(r'([\d,]+(?:\.\d{2})?)')
+
+
 def first_amount(text: str) -> str:
     """The first ``RM…`` amount in the text (digits + optional decimals), normalised to
     ``RM<n>``. '' if none."""
@@ -237,7 +298,7 @@ def _parse_str(text: str) -> Optional[dict]:
 
 def _money(v: str) -> str:
     """First currency figure in ``v`` → ``RM<n>`` (commas stripped). '' if none."""
-    m = re.search(r'([\d,]+(?:\.\d{2})?)', v or '')
+    m = _FIGURE_RE.search(v or '')
     return f'RM{m.group(1).replace(",", "")}' if m else ''
 
 
@@ -248,10 +309,10 @@ def _parse_electricity(text: str) -> Optional[dict]:
         lines = _lines(text)
         name, address_lines = '', []
         # The ALAMAT POS block: first line is the account holder, the rest the address, to TARIKH BIL.
-        idx = next((k for k, ln in enumerate(lines) if re.search(r'alamat\s+pos', ln, re.IGNORECASE)), -1)
+        idx = next((k for k, ln in enumerate(lines) if _rx(r'alamat\s+pos').search(ln)), -1)
         if idx >= 0:
             end = next((k for k in range(idx + 1, len(lines))
-                        if re.search(r'tarikh\s+bil', lines[k], re.IGNORECASE)), len(lines))
+                        if _rx(r'tarikh\s+bil').search(lines[k])), len(lines))
             block = [ln for ln in lines[idx + 1:end] if ln]
             if block:
                 name, address_lines = block[0], block[1:]
@@ -272,8 +333,8 @@ def _parse_electricity(text: str) -> Optional[dict]:
         if not amount:
             return None
         lines = _lines(text)
-        acct = next((i for i, l in enumerate(lines) if re.fullmatch(r'\d{10,12}', l)), -1)
-        end = next((i for i, l in enumerate(lines) if re.search(r'amount\s+due', l, re.IGNORECASE)), len(lines))
+        acct = next((i for i, l in enumerate(lines) if _ACCOUNT_RE.fullmatch(l)), -1)
+        end = next((i for i, l in enumerate(lines) if _rx(r'amount\s+due').search(l)), len(lines))
         address = ', '.join(l.rstrip(',') for l in lines[acct + 1:end] if l) if acct >= 0 else ''
         return {'name': '', 'address': address, 'amount': amount,
                 'unpaid_balance': '', 'billing_period': ''}
@@ -316,7 +377,7 @@ def _epf_address(text: str) -> str:
     the address matcher + officer eyeball decide; never a gate."""
     lines = [ln for ln in _lines(text) if ln]
     for i, ln in enumerate(lines):
-        if re.search(r'\b\d{5}\b', ln):
+        if _POSTCODE_RE.search(ln):
             prev = lines[i - 1] if i > 0 else ''
             return ' '.join(p for p in (prev, ln) if p).strip()
     return ''
@@ -328,7 +389,7 @@ def _parse_epf(text: str) -> Optional[dict]:
         return None                          # not a KWSP Penyata Ahli (e.g. a Borang EC) → Gemini
     lines = _lines(text)
     si = next((k for k, ln in enumerate(lines)
-               if re.search(r'sulit\s+dan\s+persendirian', ln, re.IGNORECASE)), -1)
+               if _rx(r'sulit\s+dan\s+persendirian').search(ln)), -1)
     name = next((ln for ln in lines[si + 1:] if ln), '') if si >= 0 else ''
     nric = first_nric(find_value(text, r'no\.?\s*kad\s+pengenalan')) or first_nric(text)
     # The KWSP employer number is a digit code — extract the digit-run so a label/value
@@ -382,7 +443,7 @@ def _bc_nric(s: str) -> str:
 def _bc_name(line: str) -> str:
     """A name off a BC line: 'Nama[Penuh] <NAME>' → NAME, or a bare patronymic name line.
     '' for label/section/place lines."""
-    m = re.match(r'^nama(?:\s+penuh)?\s+(.+)$', line, re.IGNORECASE)
+    m = _rx(r'^nama(?:\s+penuh)?\s+(.+)$').match(line)
     cand = (m.group(1) if m else line).strip()
     return cand if _NAME_LINE.match(cand) else ''
 
@@ -404,7 +465,7 @@ def _is_bc_person(s: str) -> bool:
     s = (s or '').strip()
     if not (3 <= len(s) <= 50) or any(c.isdigit() for c in s):
         return False
-    if s.lower() in _BC_STOP or not re.match(r'^[A-Z][A-Z .@/]*$', s):
+    if s.lower() in _BC_STOP or not _CAPS_NAME_RE.match(s):
         return False
     if any(w in s.upper() for w in _BC_INSTITUTIONAL):
         return False
@@ -415,9 +476,9 @@ def _bc_child(lines: list) -> str:
     """Child name: anchor on the first Nama/Nama Penuh, then the first following all-caps
     person line (skipping the English 'Name'/'Full Name' labels). Accepts a mononym."""
     for i, ln in enumerate(lines):
-        if not re.match(r'^nama(\s+penuh)?\b', ln.strip(), re.IGNORECASE):
+        if not _rx(r'^nama(\s+penuh)?\b').match(ln.strip()):
             continue
-        m = re.match(r'^nama(?:\s+penuh)?\s+(.+)$', ln.strip(), re.IGNORECASE)
+        m = _rx(r'^nama(?:\s+penuh)?\s+(.+)$').match(ln.strip())
         if m and _is_bc_person(m.group(1)):
             return m.group(1).strip()
         nxt = next((x.strip() for x in lines[i + 1:i + 5] if _is_bc_person(x)), '')
@@ -439,7 +500,7 @@ def _parse_bc(text: str) -> Optional[dict]:
     # parents: each "No. Kad Pengenalan" NRIC + the nearest preceding name (≠ child).
     parents = []
     for i, ln in enumerate(lines):
-        if not re.search(r'kad\s+pengenalan', ln, re.IGNORECASE):
+        if not _rx(r'kad\s+pengenalan').search(ln):
             continue
         nric = next((_bc_nric(lines[j]) for j in range(i, min(i + 3, len(lines))) if _bc_nric(lines[j])), '')
         if not nric:
@@ -474,7 +535,7 @@ def _parse_bc(text: str) -> Optional[dict]:
 def _labelled_rm(text: str, label: str) -> str:
     """The first ``RM <amount>`` on the same line as ``label`` (the value may sit after an
     inline "(Bayar Sebelum dd/mm/yyyy)" clause). '' if not found."""
-    m = re.search(label + r'.*?RM\s*([\d,]+(?:\.\d{2})?)', text or '', re.IGNORECASE)
+    m = _rx(label + r'.*?RM\s*([\d,]+(?:\.\d{2})?)').search(text or '')
     return f'RM{m.group(1).replace(",", "")}' if m else ''
 
 
@@ -502,7 +563,7 @@ def _water_address(text: str) -> str:
     the fast path widely — see docs/plans/2026-07-14-check2-117-gaps.md, Fix 1."""
     lines = [ln for ln in _lines(text) if ln]
     for i, ln in enumerate(lines):
-        if re.search(r'\b\d{5}\b', ln):
+        if _POSTCODE_RE.search(ln):
             prev = lines[i - 1] if i > 0 else ''
             return ' '.join(p for p in (prev, ln) if p).strip()
     return ''
@@ -594,7 +655,7 @@ def _leaver_activities(text: str) -> str:
     roles: list = []
     lines = _lines(text)
     for i, ln in enumerate(lines):
-        m = re.search(r'jawatan', ln, re.IGNORECASE)
+        m = _rx(r'jawatan').search(ln)
         if not m:
             continue
         v = ln[m.end():].lstrip(' \t:=-.').strip()
@@ -13,10 +13,19 @@ own ``scalars`` (plain `{token}` → value) and ``blocks`` (`{token}` → the pr
 FAMILIES own their vocabulary, this module owns the mechanics, and there is one implementation
 of the mechanics rather than one per family drifting apart.
 
+Compiled once, rendered many times. A stored template is parsed — split into blocks, each block
+into its literal runs and its tokens, the literals HTML-escaped — by `compile_template`, and the
+compiled form is kept (`_COMPILED`, an LRU) keyed by the subject and body TEXT. Rendering for a
+recipient is then only the substitution of their values. Keying by the text rather than the row
+means an edited template is a new version that compiles on first use, and a stale copy can never
+be served; the old one simply ages out. A digest run that renders the same template for 250
+sponsors parses it once.
+
 Import direction: this module imports nothing from the project. `partner_comms` and
 `sponsor_comms` import it, never the reverse.
 """
 import re
+from functools import lru_cache
 from html import escape as html_escape
 
 # A placeholder token: lowercase + underscores only, so prose containing a brace cannot be
@@ -26,6 +35,10 @@ TOKEN_RE = re.compile(r'\{([a-z_]+)\}')
 # How far a structural token is allowed to expand when it appears in a SUBJECT line.
 SUBJECT_TOKEN_CHARS = 120
 
+# Compiled templates kept per process. Each distinct (subject, body) is one entry; a family has a
+# few dozen kinds, and an edit adds a version.
+_COMPILED = 256
+
 
 def esc(value):
     """HTML-escape an interpolated value. Names come from the database, so this is what stops a
@@ -100,6 +113,91 @@ def fill(text, scalars, escape):
     return out
 
 
+def _split(text):
+    """`text` → a tuple of literal runs and tokens: `(True, 'name')` for a token, `(False, '...')`
+    for the text between."""
+    parts, at = [], 0
+    for m in TOKEN_RE.finditer(text):
+        if m.start() > at:
+            parts.append((False, text[at:m.start()]))
+        parts.append((True, m.group(1)))
+        at = m.end()
+    if at < len(text):
+        parts.append((False, text[at:]))
+    return tuple(parts)
+
+
+class CompiledTemplate:
+    """One stored template, parsed. `render` substitutes one recipient's values; nothing else
+    about the template is looked at again.
+
+    Each body block is either a candidate structural token (a block that is *exactly* `{token}`:
+    it becomes the block when the caller supplies one, a paragraph otherwise) or a paragraph kept
+    twice — as raw runs for the text part and with its literal runs already HTML-escaped for the
+    HTML part. A token the caller supplies no value for stays literal, as it always did.
+    """
+    __slots__ = ('subject', 'blocks')
+
+    def __init__(self, subject, body):
+        self.subject = _split(subject or '')
+        blocks = []
+        for raw in re.split(r'\n\s*\n', body or ''):
+            block = raw.strip()
+            if not block:
+                continue
+            token = block[1:-1] if block.startswith('{') and block.endswith('}') else ''
+            text = _split(block)
+            html = tuple((is_token, part if is_token else html_escape(part, quote=False))
+                         for is_token, part in text)
+            blocks.append((token, text, html))
+        self.blocks = tuple(blocks)
+
+    def render(self, scalars, blocks):
+        """One recipient's values → `(subject, text_body, html_body)`; see `render`."""
+        subject = []
+        for is_token, part in self.subject:
+            if not is_token:
+                subject.append(part)
+            elif part in scalars:
+                subject.append(str(scalars[part]))
+            elif part in blocks:
+                # A structural token in a SUBJECT is flattened to a one-line summary.
+                subject.append(' '.join(blocks[part][1].split())[:SUBJECT_TOKEN_CHARS])
+            else:
+                subject.append('{' + part + '}')
+
+        html_parts, text_parts = [], []
+        for token, text, html in self.blocks:
+            if token in blocks:
+                html_form, text_form = blocks[token]
+                html_parts.append(html_form)
+                text_parts.append(text_form)
+                continue
+            filled = ''.join(
+                (str(scalars[part]) if part in scalars else '{' + part + '}') if is_token else part
+                for is_token, part in text)
+            # A block that fills to nothing is DROPPED, not rendered as an empty paragraph. This
+            # is what lets a template carry an optional token on its own line — the invite's
+            # personal note, say, which most inviters leave blank — without a stray gap in the
+            # layout for everyone who omits it.
+            if not filled.strip():
+                continue
+            text_parts.append(filled)
+            safe = ''.join(
+                (esc(scalars[part]) if part in scalars else '{' + part + '}') if is_token else part
+                for is_token, part in html)
+            html_parts.append('<p style="margin:0 0 14px;">' + safe.replace('\n', '<br>') + '</p>')
+
+        return ''.join(subject), '\n\n'.join(text_parts), ''.join(html_parts)
+
+
+@lru_cache(maxsize=_COMPILED)
+def compile_template(subject, body):
+    """The compiled form of a stored template — parsed on first use, then served from the cache
+    for as long as its text is unchanged. `compile_template.cache_info()` has the hit rate."""
+    return CompiledTemplate(subject, body)
+
+
 def render(subject, body, scalars, blocks):
     """A stored template + one recipient's resolved values → `(subject, text_body, html_body)`.
 
@@ -108,32 +206,8 @@ def render(subject, body, scalars, blocks):
 
     A structural token appearing in the SUBJECT is flattened to a one-line summary rather than
     rendered or left raw — nobody should receive a subject line reading `{student_cards}`.
+
+    Each value is substituted once, where its token stands: a value that itself contains a
+    `{token}` is not filled again.
     """
-    out_subject = fill(subject or '', scalars, escape=False)
-    for token, (_html, text_form) in blocks.items():
-        out_subject = out_subject.replace(
-            '{' + token + '}', ' '.join(text_form.split())[:SUBJECT_TOKEN_CHARS])
-
-    html_parts, text_parts = [], []
-    for raw in re.split(r'\n\s*\n', body or ''):
-        block = raw.strip()
-        if not block:
-            continue
-        token = block[1:-1] if block.startswith('{') and block.endswith('}') else ''
-        if token in blocks:
-            html_form, text_form = blocks[token]
-            html_parts.append(html_form)
-            text_parts.append(text_form)
-            continue
-        filled = fill(block, scalars, escape=False)
-        # A block that fills to nothing is DROPPED, not rendered as an empty paragraph. This is
-        # what lets a template carry an optional token on its own line — the invite's personal
-        # note, say, which most inviters leave blank — without a stray gap in the layout for
-        # everyone who omits it.
-        if not filled.strip():
-            continue
-        text_parts.append(filled)
-        safe = fill(html_escape(block, quote=False), scalars, escape=True)
-        html_parts.append('<p style="margin:0 0 14px;">' + safe.replace('\n', '<br>') + '</p>')
-
-    return out_subject, '\n\n'.join(text_parts), ''.join(html_parts)
+    return compile_template(subject or '', body or '').render(scalars, blocks)
@@ -3,6 +3,10 @@ Trilingual emails for the BrightPath Bursary Programme.
 
 Phase 1 uses email (every HalaTuju account has a verified Google address).
 WhatsApp is a Phase 2 enhancement.
+
+Every send here passes ``connection=mail_dispatch.connection()``: None outside a dispatch run
+(Django opens a connection per message, as it always did), the run's pooled connection inside a
+``mail_dispatch.batch`` — which is how the cron sweeps send a whole batch over one session.
 """
 import logging
 import os
@@ -12,6 +16,7 @@ from django.conf import settings
 from django.core.mail import EmailMessage, EmailMultiAlternatives, send_mail
 
 from . import branding as _branding
+from . import mail_dispatch
 
 
 def _meter_email():
@@ -400,6 +405,7 @@ def _send(to_email, subjects, bodies, applicant_name, programme_name, lang, extr
             message=bodies[lang].format(**fmt),
             from_email=b.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -929,8 +935,8 @@ def vircle_guide_attachment():
     """The installation guide as a ``(filename, content, mimetype)`` triple, or None.
 
     Source of truth is the LIVE copy in the owner's Drive (``VIRCLE_GUIDE_FOLDER``) so an edit to
-    the guide reflects in the next award email without a redeploy; the fetched bytes are cached
-    briefly (``VIRCLE_GUIDE_CACHE_SECONDS``) so a batch send doesn't re-download per email. Falls
+    the guide reflects in the next award email without a redeploy; the fetched bytes are held in
+    the process asset cache (``asset_cache``) so a batch send doesn't re-download per email. Falls
     back to the bundled repo asset when Drive is disabled/unreachable — a slightly-stale guide
     beats no guide, and no attachment still beats no email at all."""
     filename = getattr(settings, 'VIRCLE_GUIDE_FILENAME', '') or _VIRCLE_GUIDE_FILENAME
@@ -941,39 +947,50 @@ def vircle_guide_attachment():
 
 
 def _vircle_guide_bytes_from_drive():
-    """The live guide bytes from Drive, cached for ``VIRCLE_GUIDE_CACHE_SECONDS``. None when the
-    folder is unset, Drive is disabled, or the fetch fails (all handled in ``sheets``)."""
+    """The live guide bytes from Drive. None when the folder is unset, Drive is disabled, or the
+    fetch fails (all handled in ``sheets``).
+
+    Kept in this worker's memory (``asset_cache``), never the Django cache — in production that is
+    the database, and a 1.5 MB blob through Postgres per email is the cost this avoids. Served
+    as-is for ``VIRCLE_GUIDE_CACHE_SECONDS``, then revalidated against the file's Drive checksum
+    (a metadata call) and downloaded again only when the owner has changed it. 0 disables the
+    cache (always fetch fresh)."""
     folder = getattr(settings, 'VIRCLE_GUIDE_FOLDER', '')
     if not folder:
         return None
     filename = getattr(settings, 'VIRCLE_GUIDE_FILENAME', '') or _VIRCLE_GUIDE_FILENAME
     ttl = int(getattr(settings, 'VIRCLE_GUIDE_CACHE_SECONDS', 0) or 0)
-    # Hash the folder+filename into the key so it's cache-backend-safe (no spaces/slashes) and a
-    # config change naturally lands on a fresh key instead of serving a stale cached copy.
-    import hashlib
-    digest = hashlib.sha1(f'{folder}\n{filename}'.encode('utf-8')).hexdigest()
-    cache_key = f'vircle_guide_pdf:{digest}'
-    if ttl > 0:
-        from django.core.cache import cache
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
     from . import sheets
-    content = sheets.fetch_drive_pdf(folder, filename)
-    if content and ttl > 0:
-        from django.core.cache import cache
-        cache.set(cache_key, content, ttl)
-    return content
+    if ttl <= 0:
+        return sheets.fetch_drive_pdf(folder, filename)
+
+    from . import asset_cache
+
+    looked_up = {}
+
+    def version():
+        looked_up['file'] = sheets.drive_pdf_file(folder, filename)
+        return looked_up['file'][1] if looked_up['file'] else None
+
+    def fetch():
+        # One folder walk per fetch: the revalidation's lookup when it just ran, else one now.
+        # Version first: if the file changes before the download, the copy is kept under the
+        # OLD version and the next revalidation fetches again — never the reverse.
+        found = looked_up['file'] if 'file' in looked_up else sheets.drive_pdf_file(folder, filename)
+        if found is None:
+            return None, None
+        file_id, etag = found
+        return sheets.fetch_drive_pdf(folder, filename, file_id=file_id), etag
+
+    # A config change (folder or filename) lands on a fresh key instead of a stale copy.
+    return asset_cache.get(f'drive:{folder}\n{filename}', fetch, ttl=ttl, version=version)
 
 
 def _vircle_guide_bytes_from_asset():
-    """The bundled repo copy — the fallback when Drive is unavailable."""
-    try:
-        with open(_VIRCLE_GUIDE_PATH, 'rb') as fh:
-            return fh.read()
-    except OSError:
-        logger.warning('Vircle installation guide missing at %s', _VIRCLE_GUIDE_PATH)
-        return None
+    """The bundled repo copy — the fallback when Drive is unavailable. Read once per process (and
+    again only if the file changes on disk)."""
+    from . import asset_cache
+    return asset_cache.file_bytes(_VIRCLE_GUIDE_PATH)
 
 
 def _vircle_install_html(text_body, lang, branding=None):
@@ -1549,14 +1566,50 @@ def _sponsor_email_max_cards():
     return int(getattr(settings, 'SPONSOR_EMAIL_MAX_CARDS', 5) or 5)
 
 
-def _send_sponsor_notify(to_email, subjects, cards, freq, lang, intro_map, name=''):
-    if not to_email or not cards:
-        return False
+def _sponsor_cards(cards, lang, frontend):
+    """The mini-cards for ``cards`` as ``(html, text)``. Inside a ``mail_dispatch`` run each card —
+    and the field-name map the cards read — is built once and shared by every email in the batch
+    that shows it: a weekly digest to 250 sponsors draws on a few dozen students. A card is keyed
+    by its whole content, so the trusted and untrusted forms of one student stay apart."""
+    import json
+    tax = mail_dispatch.fragment(('tax_names',), _tax_name_map)
+    built = [mail_dispatch.fragment(
+        ('sponsor_card', lang, frontend, json.dumps(c, sort_keys=True, default=str)),
+        lambda c=c: (_sponsor_card_html(c, lang, frontend, tax),
+                     _sponsor_card_text(c, lang, frontend, tax)))
+        for c in cards]
+    return ''.join(h for h, _t in built), '\n\n'.join(t for _h, t in built)
+
+
+def _sponsor_notify_tail(freq, lang, frontend):
+    """The part of a sponsor alert after the cards — button, footer, sign-off — as ``(html,
+    text)``. The same for every recipient of a frequency and language, so built once a batch."""
+    def build():
+        import html as _h
+        freq_word = _SPONSOR_FREQ_WORD.get(freq, {}).get(lang, freq)
+        signoff = _SPONSOR_SIGNOFF[lang]
+        cta_url = f'{frontend}/sponsor/students'          # the pool itself, not the portal landing
+        account_url = f'{frontend}/sponsor/account'
+        # Footer: 'sponsor account' is a link in HTML, a bare URL in plain text.
+        account = _SPONSOR_ACCOUNT[lang]
+        footer_text = _SPONSOR_FOOTER[lang].format(freq=freq_word, account=f'{account} ({account_url})')
+        footer_html = _h.escape(_SPONSOR_FOOTER[lang]).format(
+            freq=_h.escape(freq_word),
+            account=f'<a href="{account_url}" style="color:#2563eb;">{_h.escape(account)}</a>')
+        html = (f'<p style="margin:18px 0 0;">{_email_button(cta_url, _SPONSOR_CTA[lang])}</p>'
+                f'<p style="margin:18px 0 0;color:#6b7280;font-size:12px;">{footer_html}</p>'
+                f'<p style="margin:12px 0 0;color:#6b7280;font-size:12px;">'
+                f'{_h.escape(signoff).replace(chr(10), "<br>")}</p>')
+        text = f'{_SPONSOR_CTA[lang]}: {cta_url}\n\n{footer_text}\n\n{signoff}'
+        return html, text
+    return mail_dispatch.fragment(('sponsor_notify_tail', freq, lang, frontend), build)
+
+
+def _render_sponsor_notify(subjects, cards, freq, lang, intro_map, name=''):
+    """The sponsor alert for one recipient → ``(subject, text_body, html_body)``."""
     import html as _h
     lang = normalise_lang(lang)
     frontend = _P.frontend_url
-    freq_word = _SPONSOR_FREQ_WORD.get(freq, {}).get(lang, freq)
-    tax = _tax_name_map()
     all_cards = list(cards)
     full_n = len(all_cards)                            # the whole batch — drives the subject/intro count
     cards = all_cards[:_sponsor_email_max_cards()]     # cap the BODY to 5; the button shows the rest
@@ -1564,31 +1617,23 @@ def _send_sponsor_notify(to_email, subjects, cards, freq, lang, intro_map, name=
                 if (name or '').strip() else _SPONSOR_GREETING_GENERIC[lang])
     intro = intro_map[lang]['one' if full_n == 1 else 'many']
     subject = _sponsor_subject(subjects, cards, lang, count=full_n)
-    signoff = _SPONSOR_SIGNOFF[lang]
-    cta_url = f'{frontend}/sponsor/students'          # the pool itself, not the portal landing
-    account_url = f'{frontend}/sponsor/account'
-
-    # Footer: 'sponsor account' is a link in HTML, a bare URL in plain text.
-    account = _SPONSOR_ACCOUNT[lang]
-    footer_text = _SPONSOR_FOOTER[lang].format(freq=freq_word, account=f'{account} ({account_url})')
-    footer_html = _h.escape(_SPONSOR_FOOTER[lang]).format(
-        freq=_h.escape(freq_word),
-        account=f'<a href="{account_url}" style="color:#2563eb;">{_h.escape(account)}</a>')
-
-    text_cards = '\n\n'.join(_sponsor_card_text(c, lang, frontend, tax) for c in cards)
-    text_body = (f'{greeting}\n\n{intro}\n\n{text_cards}\n\n'
-                 f'{_SPONSOR_CTA[lang]}: {cta_url}\n\n{footer_text}\n\n{signoff}')
-
-    html_cards = ''.join(_sponsor_card_html(c, lang, frontend, tax) for c in cards)
+    html_cards, text_cards = _sponsor_cards(cards, lang, frontend)
+    tail_html, tail_text = _sponsor_notify_tail(freq, lang, frontend)
+
+    text_body = f'{greeting}\n\n{intro}\n\n{text_cards}\n\n{tail_text}'
     html_body = _html_email_shell(
         f'<p style="margin:0 0 12px;">{_h.escape(greeting)}</p>'
         f'<p style="margin:0 0 16px;">{_h.escape(intro)}</p>'
-        + html_cards +
-        f'<p style="margin:18px 0 0;">{_email_button(cta_url, _SPONSOR_CTA[lang])}</p>'
-        f'<p style="margin:18px 0 0;color:#6b7280;font-size:12px;">{footer_html}</p>'
-        f'<p style="margin:12px 0 0;color:#6b7280;font-size:12px;">'
-        f'{_h.escape(signoff).replace(chr(10), "<br>")}</p>'
+        + html_cards + tail_html
     )
+    return subject, text_body, html_body
+
+
+def _send_sponsor_notify(to_email, subjects, cards, freq, lang, intro_map, name=''):
+    if not to_email or not cards:
+        return False
+    subject, text_body, html_body = _render_sponsor_notify(
+        subjects, cards, freq, lang, intro_map, name=name)
     return _send_html(
         to_email, subject, text_body, html_body,
         from_email=_P.email_from,
@@ -1863,6 +1908,7 @@ def send_request_info_email(to_email, applicant_name, programme_name, note, lang
                 name=name, programme=programme_name, note=note, link=link),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -1911,6 +1957,7 @@ def send_query_reminder_email(to_email, applicant_name, programme_name, n_querie
                 name=name, programme=programme_name, n=n_queries, days=days_left, link=link),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -1958,6 +2005,7 @@ def send_query_raised_email(to_email, applicant_name, programme_name, n_queries,
                 name=name, programme=programme_name, n=n_queries, link=link),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -1981,6 +2029,7 @@ def send_sponsor_interest_admin_email(name, email, organisation, message):
             ),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2025,6 +2074,7 @@ def send_org_request_submitted_email(req):
             ),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2052,6 +2102,7 @@ def send_org_request_questions_email(req, questions):
             ),
             from_email=_P.email_from,
             to=[to_email],
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -2073,6 +2124,7 @@ def send_org_request_answered_email(req):
             ),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2105,6 +2157,7 @@ def send_org_request_quote_email(req):
             ),
             from_email=_P.email_from,
             to=[to_email],
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -2127,6 +2180,7 @@ def send_org_request_accepted_email(req):
             ),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2179,6 +2233,7 @@ def send_sponsor_referral_invite(to_email, inviter_name, note, code, lang='en'):
             from_email=_P.email_from,
             to=[to_email],
             reply_to=[_P.sponsor_reply_to],
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -2208,6 +2263,7 @@ def send_vision_outage_alert_email(stats):
             ).format(**stats),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2235,6 +2291,7 @@ def send_profile_complete_admin_email(application_id, applicant_name, programme_
             ),
             from_email=_P.email_from,
             recipient_list=[to_email],
+            connection=mail_dispatch.connection(),
         )
         return True
     except Exception:
@@ -2543,6 +2600,7 @@ def send_partner_welcome_email(to_email, name, role, temp_password=None, google=
             from_email=_P.email_from,
             to=[to_email],
             reply_to=[_P.email_support],
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -2910,6 +2968,7 @@ def send_contact_submission_admin_email(*, to_email, name, contact, category, me
             from_email=_P.email_from,
             to=[to_email],
             reply_to=reply_to,
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -2984,6 +3043,7 @@ def _send_bilingual(to_email, subject, en, bm):
             to=[to_email],
             reply_to=[_P.interview_reply_to],
             headers=_interview_unsub_headers(),
+            connection=mail_dispatch.connection(),
         ).send()
         return True
     except Exception:
@@ -3026,6 +3086,7 @@ def _send_html(to_email, subject, text_body, html_body, reply_to=None, ics=None,
             to=[to_email],
             reply_to=reply_to or [_P.interview_reply_to],
             headers=_interview_unsub_headers(),
+            connection=mail_dispatch.connection(),
         )
         msg.attach_alternative(html_body, 'text/html')
         if ics:
@@ -3564,7 +3625,8 @@ def _send_plain(to_email, subject, body):
         EmailMessage(subject=subject, body=body,
                      from_email=_P.interview_from,
                      to=[to_email], reply_to=[_P.interview_reply_to],
-                     headers=_interview_unsub_headers()).send()
+                     headers=_interview_unsub_headers(),
+                     connection=mail_dispatch.connection()).send()
         return True
     except Exception:
         logger.warning('Failed to send reviewer interview email to %s', to_email, exc_info=True)
@@ -3845,7 +3907,8 @@ def send_payment_countersign_email(run):
         try:
             EmailMessage(subject=subject, body=body,
                          from_email=settings.DEFAULT_FROM_EMAIL,
-                         to=[approver.email]).send()
+                         to=[approver.email],
+                         connection=mail_dispatch.connection()).send()
             sent = True
         except Exception:
             logger.warning('Failed to send countersign notification for run %s to %s',
@@ -3892,7 +3955,8 @@ def send_payment_finance_check_email(run):
         try:
             EmailMessage(subject=subject, body=body,
                          from_email=settings.DEFAULT_FROM_EMAIL,
-                         to=[checker.email]).send()
+                         to=[checker.email],
+                         connection=mail_dispatch.connection()).send()
             sent = True
         except Exception:
             logger.warning('Failed to send finance-check notification for run %s to %s',
@@ -3944,7 +4008,8 @@ def send_vircle_activation_email(rows, csv_text=None):
         msg = EmailMessage(
             subject=(f'' + _PROG_EN + ' — eWallet activation & ID confirmation '
                      f'({n} account{"" if n == 1 else "s"}) — {today:%d %B %Y}'),
-            body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient], bcc=bcc)
+            body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient], bcc=bcc,
+            connection=mail_dispatch.connection())
         msg.attach(f'vircle-activation-{today:%Y-%m-%d}.csv', csv_text, 'text/csv')
         msg.send()
         return True
@@ -3985,7 +4050,8 @@ def send_payment_run_email(run):
     try:
         msg = EmailMessage(
             subject=f'{_PROG_EN} — payment instruction {run.reference} ({month})',
-            body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient], cc=cc)
+            body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient], cc=cc,
+            connection=mail_dispatch.connection())
         msg.attach(f'{run.reference}.csv', sheets.payment_csv_text(run), 'text/csv')
         msg.send()
         return True
@@ -4098,7 +4164,8 @@ def send_sponsor_invitation_email(to_email, *, org_name='', note='', code='', in
         # helps students with their applications. (`_P.email_support` was inherited here, never
         # decided — the same shape as the interview-alias default that mis-sent request #3's mail.)
         EmailMessage(subject=subject, body=body, from_email=_P.email_from,
-                     to=[to_email], reply_to=[_P.sponsor_reply_to]).send()
+                     to=[to_email], reply_to=[_P.sponsor_reply_to],
+                     connection=mail_dispatch.connection()).send()
         return True, ''
     except Exception as e:      # noqa: BLE001
         logger.warning('Failed to send sponsor invitation to %s', to_email, exc_info=True)
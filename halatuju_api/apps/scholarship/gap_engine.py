@@ -142,8 +142,8 @@ def _academic_summary(application):
 def _verdict_summary(application):
     """Render the deterministic four-fact verdict: status + unresolved codes."""
     try:
-        from .verdict_engine import build_verdict
-        facts = build_verdict(application)
+        from . import snapshots
+        facts = snapshots.verdict(application)
     except Exception:
         return '(unavailable)'
     lines = []
@@ -159,8 +159,8 @@ def _verdict_summary(application):
 def _flags_summary(application):
     """Render the deterministic pre-interview flags (anomaly codes + key params)."""
     try:
-        from .anomaly_engine import detect_anomalies
-        flags = detect_anomalies(application)
+        from . import snapshots
+        flags = snapshots.anomalies(application)
     except Exception:
         return '(unavailable)'
     lines = []
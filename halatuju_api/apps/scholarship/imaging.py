@@ -1,17 +1,33 @@
-"""HEIC → JPEG conversion.
+"""Image handling for uploaded documents: HEIC → JPEG conversion, and the OCR copy.
 
-iPhone photos upload as ``image/heic``, which no browser can render inline (the officer's "View"
-silently downloads them) and Cloud Vision can't OCR. We convert them to JPEG server-side at upload
-(and via the ``convert_heic_documents`` command for any already stored), replacing the stored
-object in place so the cockpit viewer, Vision OCR, and the download URL all see a JPEG.
+**HEIC → JPEG.** iPhone photos upload as ``image/heic``, which no browser can render inline (the
+officer's "View" silently downloads them) and Cloud Vision can't OCR. We convert them to JPEG
+server-side at upload (and via the ``convert_heic_documents`` command for any already stored),
+replacing the stored object in place so the cockpit viewer, Vision OCR, and the download URL all
+see a JPEG.
 
-Soft by construction: any failure (library missing, fetch/decode error) leaves the original
-untouched — the viewer still offers "open the original" and nothing breaks.
+**The OCR copy.** Phone photos arrive at full camera resolution (12 MP, 3–5 MB) and a scanned
+PDF page is rasterised to a lossless PNG — and those bytes went to Cloud Vision and Gemini as-is,
+paying for the size in upload time, request latency and Gemini image tokens without reading any
+better. ``prepare_for_ocr`` is the one stage every image passes through before a read: EXIF
+orientation applied, the long edge brought down to ``OCR_MAX_EDGE`` (≈200 DPI on A4 — the same
+density ``vision._RASTER_DPI`` rasterises a PDF at, so a photo and a scan read alike), re-encoded
+as a plain JPEG, and — when the word boxes of a previous read say the page is on its side —
+turned upright. The result is stored NEXT TO the original (``ocr_copy_key``) and its key recorded
+on the row, so every later read (cockpit Re-run, a bulk re-extraction pass) downloads the small
+copy and skips the work. The original is never touched: the viewer and the download keep it.
+
+Soft by construction: any failure (library missing, fetch/decode error, a storage write refused)
+leaves the original untouched and the read proceeds on it — nothing breaks.
 """
 import io
 import logging
 import re
 
+from django.conf import settings
+
+from . import timing
+
 logger = logging.getLogger(__name__)
 
 _HEIC_TYPES = ('image/heic', 'image/heif')
@@ -46,9 +62,10 @@ def convert_heic_to_jpeg(doc) -> bool:
     if raw is None:
         return False
     try:
-        out = io.BytesIO()
-        Image.open(io.BytesIO(raw)).convert('RGB').save(out, format='JPEG', quality=90)
-        jpeg = out.getvalue()
+        with timing.span('imaging.heic_convert'):
+            out = io.BytesIO()
+            Image.open(io.BytesIO(raw)).convert('RGB').save(out, format='JPEG', quality=90)
+            jpeg = out.getvalue()
     except Exception:
         logger.warning('HEIC decode/convert failed for %s', doc.storage_path, exc_info=True)
         return False
@@ -62,6 +79,133 @@ def convert_heic_to_jpeg(doc) -> bool:
         doc.original_filename = re.sub(r'\.(heic|heif)$', '.jpg', fn, flags=re.IGNORECASE)
         if not doc.original_filename.lower().endswith(('.jpg', '.jpeg')):
             doc.original_filename = doc.original_filename + '.jpg'
-    doc.save(update_fields=['content_type', 'original_filename'])
+    update_fields = ['content_type', 'original_filename']
+    if getattr(doc, 'ocr_copy_path', ''):
+        doc.ocr_copy_path = ''     # derived from the HEIC bytes that were just replaced
+        update_fields.append('ocr_copy_path')
+    doc.save(update_fields=update_fields)
     logger.info('Converted HEIC → JPEG for document %s', getattr(doc, 'id', '?'))
     return True
+
+
+# ── The OCR copy ───────────────────────────────────────────────────────────────
+OCR_MAX_EDGE = 2400          # px, long edge — ≈200 DPI on an A4 page
+OCR_JPEG_QUALITY = 85
+# Versioned: changing the recipe above means bumping this, and every stored copy with the old
+# suffix is then ignored (and rebuilt on its next read) rather than silently reused.
+_OCR_COPY_SUFFIX = '.ocr-v1.jpg'
+_JPEG_MAGIC = b'\xff\xd8\xff'
+_PNG_MAGIC = b'\x89PNG'
+_EXIF_ORIENTATION = 0x0112
+
+
+def _enabled() -> bool:
+    return getattr(settings, 'OCR_PREPROCESS_ENABLED', True)
+
+
+def sniff_image_mime(data: bytes) -> str:
+    """'image/jpeg' / 'image/png' from the magic bytes, or '' — the OCR copy is a JPEG whatever
+    the row's ``content_type`` says, so a caller handing bytes to Gemini asks the bytes."""
+    if data[:3] == _JPEG_MAGIC:
+        return 'image/jpeg'
+    if data[:4] == _PNG_MAGIC:
+        return 'image/png'
+    return ''
+
+
+def upright_rotation(words) -> int:
+    """Degrees (a multiple of 90, counter-clockwise as ``PIL.Image.rotate`` takes it) that turn a
+    page upright, from the word boxes of a Vision read; 0 when it already is. Built on
+    ``academic_engine._dominant_angle`` — the same gate the results-slip parser de-rotates by —
+    so only a clearly sideways/upside-down page turns, never an upright one on angle noise.
+    Snapped to a right angle: a phone photo a few degrees off reads fine, and resampling it to
+    "fix" that would only soften the text."""
+    from .academic_engine import _dominant_angle
+    theta = _dominant_angle(words or [])
+    if not theta:
+        return 0
+    return int(round(theta / 90.0)) * 90 % 360
+
+
+@timing.timed('imaging.prepare')
+def prepare_for_ocr(data: bytes, *, rotate: int = 0):
+    """``(bytes, mime)`` ready for a read — or ``(data, '')`` unchanged when the bytes aren't a
+    decodable image (a PDF, a test fixture) or the stage is switched off. An image already within
+    budget, upright and a plain JPEG is returned as-is (no needless re-encode)."""
+    if not data or not _enabled():
+        return data, ''
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return data, ''
+    try:
+        img = Image.open(io.BytesIO(data))
+        orientation = (img.getexif() or {}).get(_EXIF_ORIENTATION, 1)
+        if (img.format == 'JPEG' and orientation in (0, 1) and not rotate
+                and max(img.size) <= OCR_MAX_EDGE):
+            return data, 'image/jpeg'
+        img = ImageOps.exif_transpose(img)
+        if rotate:
+            img = img.rotate(rotate, expand=True)
+        if max(img.size) > OCR_MAX_EDGE:
+            img.thumbnail((OCR_MAX_EDGE, OCR_MAX_EDGE), Image.LANCZOS)
+        out = io.BytesIO()
+        img.convert('RGB').save(out, format='JPEG', quality=OCR_JPEG_QUALITY, optimize=True)
+        return out.getvalue(), 'image/jpeg'
+    except Exception:  # noqa: BLE001 — not an image we can decode → read the original
+        logger.debug('OCR pre-processing skipped (undecodable bytes)', exc_info=True)
+        return data, ''
+
+
+def ocr_copy_key(storage_path: str) -> str:
+    """Where a document's OCR copy lives — beside the original, same org-prefixed folder."""
+    return f'{storage_path}{_OCR_COPY_SUFFIX}' if storage_path else ''
+
+
+def store_ocr_copy(doc, data: bytes) -> bool:
+    """Upload ``data`` as ``doc``'s OCR copy and record its key on the row. Best-effort: False
+    (and the row untouched) on any failure."""
+    key = ocr_copy_key(getattr(doc, 'storage_path', ''))
+    if not key or not getattr(doc, 'pk', None):
+        return False
+    from .storage import upload_object
+    if not upload_object(key, data, 'image/jpeg'):
+        return False
+    doc.ocr_copy_path = key
+    type(doc).objects.filter(pk=doc.pk).update(ocr_copy_path=key)
+    return True
+
+
+def ocr_image(doc):
+    """The bytes a read of ``doc`` should use, fetched once: the stored OCR copy when there is a
+    current one, else the original — prepared on the way through, with the copy stored for next
+    time. A PDF is returned untouched (its text layer must survive; the rasterised page is
+    prepared where it is made). None when nothing could be fetched."""
+    from . import vision
+    key = getattr(doc, 'ocr_copy_path', '')
+    if _enabled() and isinstance(key, str) and key.endswith(_OCR_COPY_SUFFIX):
+        copy = vision._fetch_image_bytes(key)
+        if copy is not None:
+            return copy
+    raw = vision._fetch_image_bytes(doc.storage_path)
+    if raw is None or vision._is_pdf(getattr(doc, 'content_type', ''), raw):
+        return raw
+    prepared, mime = prepare_for_ocr(raw)
+    if mime and prepared is not raw:
+        store_ocr_copy(doc, prepared)
+    return prepared
+
+
+def deskew_ocr_copy(doc, image: bytes, words):
+    """After a word-box read: if the page is on its side, store an UPRIGHT OCR copy so every
+    later read — and the Gemini image fallback of this one — sees it the right way up (Gemini
+    transposes a sideways table; the positional parsers de-rotate on their own). Returns the
+    bytes the rest of this read should use."""
+    turn = upright_rotation(words)
+    if not turn or image is None:
+        return image
+    upright, mime = prepare_for_ocr(image, rotate=turn)
+    if not mime:
+        return image
+    store_ocr_copy(doc, upright)
+    return upright
@@ -25,6 +25,8 @@ from __future__ import annotations
 import datetime
 import re
 
+from .doc_context import documents_of
+
 # Every name comparison in this module is the SAME real person across TWO documents
 # (relationships, earner-IC ↔ income-proof, STR-recipient ↔ IC, BC names) — never the student's
 # own identity — so they all use the transliteration-tolerant matcher (#2, Sarawanan A/L case).
@@ -68,7 +70,7 @@ def student_name_for_link(application) -> str:
     profile_name = (getattr(getattr(application, 'profile', None), 'name', '') or '').strip()
     if father_name_from_ic(profile_name):
         return profile_name
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return profile_name
     ic = (docs.filter(doc_type='ic', superseded_at__isnull=True)
@@ -222,7 +224,7 @@ def effective_working_members(application, any_route: bool = False) -> list:
         return []
     # (1) Members the uploaded income docs are tagged to — what the student actually did.
     found: set = set()
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is not None:
         try:
             tagged = (docs.filter(doc_type__in=('parent_ic', 'salary_slip', 'epf'),
@@ -266,7 +268,7 @@ def _relationship_inputs(application, member, member_ic_name):
     guardianship letter for a guardian)."""
     bc_child = bc_mother = bc_father = letter_name = ''
     if member in ('mother', 'father', 'brother', 'sister'):
-        bc = (application.documents.filter(doc_type='birth_certificate', superseded_at__isnull=True)
+        bc = (documents_of(application).filter(doc_type='birth_certificate', superseded_at__isnull=True)
               .order_by('-uploaded_at').first())
         vf = (getattr(bc, 'vision_fields', None) if bc else None) or {}
         f = vf.get('fields', {}) if isinstance(vf, dict) else {}
@@ -275,7 +277,7 @@ def _relationship_inputs(application, member, member_ic_name):
             bc_mother = f.get('bc_mother_name', '')
             bc_father = f.get('bc_father_name', '')
     elif member == 'guardian':
-        g = (application.documents.filter(doc_type='guardianship_letter', superseded_at__isnull=True)
+        g = (documents_of(application).filter(doc_type='guardianship_letter', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
         letter_name = (getattr(g, 'vision_name', '') or '') if g else ''
     return bc_child, bc_mother, bc_father, letter_name
@@ -288,7 +290,7 @@ def _cluster_proof_identity(application, member):
     income proof is present yet to compare against."""
     route = (getattr(application, 'income_route', '') or '').strip()
     if route == 'str':
-        p = (application.documents.filter(doc_type='str', superseded_at__isnull=True)
+        p = (documents_of(application).filter(doc_type='str', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
         if p:
             f = _doc_fields(p)
@@ -312,7 +314,7 @@ def _cluster_proof_identity(application, member):
 # red into a verified green; it never asserts a mismatch.
 
 def _bc_doc(application):
-    return (application.documents.filter(doc_type='birth_certificate', superseded_at__isnull=True)
+    return (documents_of(application).filter(doc_type='birth_certificate', superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
 
 
@@ -443,7 +445,7 @@ def _cluster_docs(application, member, doc_type):
     # replaced income doc can never re-enter the cluster verdict.
     route = (getattr(application, 'income_route', '') or '').strip()
     if route == 'salary':
-        qs = application.documents.filter(
+        qs = documents_of(application).filter(
             doc_type=doc_type, household_member=member, superseded_at__isnull=True)
     else:
         # STR route (single earner) or blank wizard: the earner's docs — tagged OR legacy-blank.
@@ -457,7 +459,7 @@ def _cluster_docs(application, member, doc_type):
             allowed = [member]
         else:
             allowed = [member, '']
-        qs = application.documents.filter(
+        qs = documents_of(application).filter(
             doc_type=doc_type, household_member__in=allowed, superseded_at__isnull=True)
     return qs.order_by('-uploaded_at')
 
@@ -951,7 +953,7 @@ def has_valid_str(application):
     is the household's own means-test, so it lets a working member's DECLARED informal income
     be ACCEPTED without a payslip (the STR already establishes B40 need — P5b). Reads the STR
     *document* via ``student_str_check``, never the ``receives_str`` self-tick."""
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return False
     str_doc = docs.filter(doc_type='str', superseded_at__isnull=True).order_by('-uploaded_at').first()
@@ -975,7 +977,7 @@ def household_str_status(application):
     LAST resort reached only when all matching attempts fail — not a first read off the declared
     earner. The CALLER still confirms the matched member's relationship to the student before it
     greens (so a matched-but-unrelated recipient can't settle B40)."""
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return None, None
     str_doc = docs.filter(doc_type='str', superseded_at__isnull=True).order_by('-uploaded_at').first()
@@ -1002,7 +1004,7 @@ def str_not_breached(application):
     docs needed"). BROADER than ``has_valid_str`` (currency-only current/unconfirmed): a stale-but-
     genuine STR is also 'not breached'. Keeps the consent gate + the student's wizard checklist in step
     with what the student is SHOWN — otherwise the docs box says "not required" while the gate blocks."""
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return False
     str_doc = docs.filter(doc_type='str', superseded_at__isnull=True).order_by('-uploaded_at').first()
@@ -1023,7 +1025,7 @@ def str_confirmed_current(application):
     student to satisfy ("confirm it's approved AND being paid"). An 'unconfirmed' (Lulus but no
     payment date), 'unreadable', 'stale' or rejected STR is NOT current — so re-uploading one must not
     silence that ask (the SUBMISSION gate still accepts it as Probable; only the request stays open)."""
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return False
     str_doc = docs.filter(doc_type='str', superseded_at__isnull=True).order_by('-uploaded_at').first()
@@ -1115,7 +1117,7 @@ def member_cluster_complete(application, member):
         if pc and 'mismatch' in (pc.get('name_status'), pc.get('nric_status')):
             return False
     rel = relationship_doc_for(member)
-    if rel and not application.documents.filter(
+    if rel and not documents_of(application).filter(
             doc_type=rel, superseded_at__isnull=True).exists():
         return False
     return True
@@ -1195,7 +1197,7 @@ def has_income_support_doc(application, member):
     (from the field-extraction on upload) is ``'ok'`` (a real support document with at least
     one field). A doc that read nothing (``'wrong_doc'``) or was never scanned does NOT clear
     the gap, so Check 2 keeps asking for real evidence."""
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return False
     for d in docs.filter(doc_type='income_support_doc', household_member__in=[member, ''],
@@ -1655,7 +1657,7 @@ def _utility_name_unrelated(application, bill_name):
     for _member, nm in _roster_candidates(application):   # declared father/mother/guardian/siblings
         if nm.strip():
             candidates.append(nm)
-    for ic in application.documents.filter(doc_type='parent_ic', superseded_at__isnull=True):
+    for ic in documents_of(application).filter(doc_type='parent_ic', superseded_at__isnull=True):
         nm = (getattr(ic, 'vision_name', '') or '').strip()
         if nm:
             candidates.append(nm)
@@ -1669,7 +1671,7 @@ def _utility_holder_names(application):
     bills (latest first)."""
     names = []
     for dt in ('water_bill', 'electricity_bill'):
-        for doc in application.documents.filter(
+        for doc in documents_of(application).filter(
                 doc_type=dt, superseded_at__isnull=True).order_by('-uploaded_at'):
             nm = (_doc_fields(doc).get('name', '') or '').strip()
             if nm:
@@ -1755,7 +1757,7 @@ def utility_holder_unknown(application):
     the first such bill, or None. Bills routinely sit in a parent's name (fine — that
     matches the IC); this fires only when the holder is a stranger to the documents."""
     for dt in ('water_bill', 'electricity_bill'):
-        for doc in application.documents.filter(
+        for doc in documents_of(application).filter(
                 doc_type=dt, superseded_at__isnull=True).order_by('-uploaded_at'):
             facts = utility_check(doc)
             if facts and facts.get('name_note') == 'unrelated' and facts.get('name'):
@@ -1769,14 +1771,14 @@ def utility_address_mismatch(application):
     a 'partial' (a missing postcode or a shortened/abbreviated street) deliberately stays
     silent, so only a genuinely different address raises the query. Soft, never a gate."""
     for dt in ('water_bill', 'electricity_bill'):
-        for doc in application.documents.filter(doc_type=dt, superseded_at__isnull=True):
+        for doc in documents_of(application).filter(doc_type=dt, superseded_at__isnull=True):
             if (getattr(doc, 'vision_address_match', '') or '') == 'mismatch':
                 return True
     return False
 
 
 def _latest_doc(application, doc_type):
-    return (application.documents.filter(doc_type=doc_type, superseded_at__isnull=True)
+    return (documents_of(application).filter(doc_type=doc_type, superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
 
 
@@ -1843,7 +1845,7 @@ def income_cluster_advice(application, member):
     if not member:
         return ''
     route = (getattr(application, 'income_route', '') or '').strip()
-    str_doc = (application.documents.filter(doc_type='str', superseded_at__isnull=True)
+    str_doc = (documents_of(application).filter(doc_type='str', superseded_at__isnull=True)
                .order_by('-uploaded_at').first()
                if route == 'str' else None)
     proofs = [p for dt in ('salary_slip', 'epf') for p in _cluster_docs(application, member, dt)]
@@ -1891,7 +1893,7 @@ def income_cluster_advice(application, member):
     # the shared patronymic on the IC proves it).
     rel_doc = relationship_doc_for(member)
     if rel_doc:
-        rel_obj = (application.documents.filter(doc_type=rel_doc, superseded_at__isnull=True)
+        rel_obj = (documents_of(application).filter(doc_type=rel_doc, superseded_at__isnull=True)
                    .order_by('-uploaded_at').first())
         if rel_obj is None:
             return 'income_rel_doc_needed'             # not uploaded yet → nudge for it
@@ -2022,7 +2024,7 @@ def _parent_has_income_evidence(application, member):
     route = (getattr(application, 'income_route', '') or '').strip()
     if (route == 'str'
             and (getattr(application, 'income_earner', '') or '').strip() == member
-            and application.documents.filter(doc_type='str', superseded_at__isnull=True).exists()):
+            and documents_of(application).filter(doc_type='str', superseded_at__isnull=True).exists()):
         return True
     return False
 
@@ -2172,7 +2174,7 @@ def _income_earning_members(application):
     payslip on file quantifies that member's pay regardless of route."""
     members = list(effective_working_members(application))
     try:
-        doc_members = (application.documents
+        doc_members = (documents_of(application)
                        .filter(doc_type__in=('salary_slip', 'epf'), superseded_at__isnull=True)
                        .exclude(household_member='')
                        .values_list('household_member', flat=True))
@@ -2302,7 +2304,7 @@ def stale_income_proof(application, today=None):
     unreadable date). Pure; tolerant of a test double without `.documents`."""
     if today is None:
         today = datetime.date.today()
-    docs = getattr(application, 'documents', None)
+    docs = documents_of(application)
     if docs is None:
         return False
     slips = list(docs.filter(doc_type='salary_slip', superseded_at__isnull=True))
@@ -2540,7 +2542,7 @@ _NON_EARNING_OCC = frozenset({'unemployed', 'homemaker', 'deceased', 'no_contact
 
 
 def _docs_or_none(application):
-    return getattr(application, 'documents', None)
+    return documents_of(application)
 
 
 def _has_read_doc(docs, doc_type):
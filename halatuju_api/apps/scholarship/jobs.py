@@ -0,0 +1,227 @@
+"""Durable background jobs — the cron endpoint enqueues, a worker runs.
+
+``CronRunView`` used to run its whitelisted management command inside the scheduler's HTTP
+request: a weekly digest or a backup held a gunicorn worker for minutes, a re-extraction batch
+could be cut off by the Cloud Run request timeout mid-document, an overlapping scheduler retry
+started a second copy of a job still running, and the only record of a run was the truncated
+stdout in the scheduler's log.
+
+Now the endpoint calls ``enqueue`` and returns at once, and a worker (``manage.py run_jobs``)
+does the running:
+
+- **Enqueue is deduplicated.** ``BackgroundJob`` allows one queued-or-running row per job
+  name (a partial unique constraint, so two racing requests can't both insert); a second
+  enqueue while one is live returns the live row.
+- **A worker leases a job** by flipping it ``queued → running`` with a compare-and-set
+  ``UPDATE`` (portable: no ``SELECT … FOR UPDATE SKIP LOCKED``, so SQLite works locally) and
+  stamping ``lease_expires_at``. While the command runs, a heartbeat thread pushes the lease
+  forward every ``JOB_HEARTBEAT_SECONDS`` and copies the command's latest output line into
+  ``progress``.
+- **A dead worker's job comes back.** The next lease finds a running row whose lease lapsed
+  and re-queues it (``attempts`` counts the leases) — or fails it once ``max_attempts`` is
+  spent. A command that RAISES is failed at once and not retried: the commands are not all
+  idempotent, and a repeatable failure would only repeat.
+- **The outcome is a row** — status, attempts, worker, duration, the output tail and the
+  error — read by a super admin at ``admin/scholarship/ops/jobs/``.
+
+Only the database is needed (SQLite or Postgres) — no broker. The queue is opt-in
+(``JOB_QUEUE_ENABLED=1``) because it needs that worker deployed: without one, a queued job never
+runs and the dedupe keeps its name stuck on the queued row. Off, the endpoint runs the command
+inline.
+"""
+import io
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import mail_dispatch
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Characters of a command's output kept on the row (the tail — where the summary line is).
+_OUTPUT_LIMIT = 12000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enabled() -> bool:
+    return bool(_setting('JOB_QUEUE_ENABLED', False))
+
+
+def worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'[:120]
+
+
+def enqueue(name, command, *, source='cron'):
+    """Queue ``command`` under the job key ``name`` → ``(job, created)``. When a run of ``name``
+    is already queued or running, that row is returned and nothing is added."""
+    for _ in range(2):
+        live = BackgroundJob.objects.filter(name=name, status__in=BackgroundJob.ACTIVE).first()
+        if live is not None:
+            return live, False
+        try:
+            with transaction.atomic():
+                job = BackgroundJob.objects.create(
+                    name=name, command=command, source=source,
+                    max_attempts=max(int(_setting('JOB_MAX_ATTEMPTS', 3)), 1))
+            return job, True
+        except IntegrityError:
+            continue        # a concurrent enqueue won the insert — return its row
+    live = BackgroundJob.objects.filter(name=name, status__in=BackgroundJob.ACTIVE).first()
+    if live is None:
+        raise RuntimeError(f'could not enqueue {name}')
+    return live, False
+
+
+def _lease_for():
+    return timedelta(seconds=max(int(_setting('JOB_LEASE_SECONDS', 300)), 1))
+
+
+def reap(now=None) -> int:
+    """Running jobs whose lease lapsed (their worker died): back to the queue, or failed once
+    their attempts are spent. Returns how many were touched."""
+    now = now or timezone.now()
+    touched = 0
+    for job in BackgroundJob.objects.filter(status=BackgroundJob.RUNNING, lease_expires_at__lt=now):
+        guard = BackgroundJob.objects.filter(pk=job.pk, status=BackgroundJob.RUNNING,
+                                             lease_expires_at=job.lease_expires_at)
+        note = f'lease expired on {job.worker or "?"} (attempt {job.attempts}/{job.max_attempts})'
+        if job.attempts >= job.max_attempts:
+            touched += guard.update(status=BackgroundJob.FAILED, finished_at=now,
+                                    lease_expires_at=None, error=note)
+        else:
+            touched += guard.update(status=BackgroundJob.QUEUED, lease_expires_at=None, error=note)
+        logger.warning('background job %s #%s: %s', job.name, job.pk, note)
+    return touched
+
+
+def lease(worker, now=None):
+    """Claim the oldest queued job for ``worker`` (reaping lapsed leases first) → the job, or
+    None when the queue is empty."""
+    now = now or timezone.now()
+    reap(now)
+    for pk in (BackgroundJob.objects.filter(status=BackgroundJob.QUEUED)
+               .order_by('created_at', 'id').values_list('pk', flat=True)[:20]):
+        claimed = BackgroundJob.objects.filter(pk=pk, status=BackgroundJob.QUEUED).update(
+            status=BackgroundJob.RUNNING, worker=worker, attempts=F('attempts') + 1,
+            started_at=now, heartbeat_at=now, lease_expires_at=now + _lease_for(), progress='')
+        if claimed:
+            return BackgroundJob.objects.get(pk=pk)
+    return None
+
+
+class _Output(io.StringIO):
+    """The command's stdout/stderr, remembering its latest non-blank line for ``progress``."""
+
+    last_line = ''
+
+    def write(self, s):
+        for line in reversed(s.splitlines()):
+            if line.strip():
+                self.last_line = line.strip()[:300]
+                break
+        return super().write(s)
+
+
+def beat(job_id, worker, progress='', now=None) -> bool:
+    """Extend the lease of a job ``worker`` still holds. False when it no longer holds it (the
+    lease lapsed and the job was re-queued or failed)."""
+    now = now or timezone.now()
+    return bool(BackgroundJob.objects.filter(
+        pk=job_id, worker=worker, status=BackgroundJob.RUNNING,
+    ).update(heartbeat_at=now, lease_expires_at=now + _lease_for(), progress=progress[:300]))
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, job_id, worker, out, every):
+        super().__init__(daemon=True, name=f'job-heartbeat-{job_id}')
+        self.job_id, self.worker, self.out, self.every = job_id, worker, out, every
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            while not self.done.wait(self.every):
+                try:
+                    if not beat(self.job_id, self.worker, self.out.last_line):
+                        logger.warning('background job #%s: lease lost by %s', self.job_id, self.worker)
+                except Exception:  # noqa: BLE001 — a missed beat must not kill the job
+                    logger.warning('background job #%s heartbeat failed', self.job_id, exc_info=True)
+        finally:
+            connection.close()
+
+
+def run(job, worker):
+    """Run a leased job's command and record the outcome on its row."""
+    out = _Output()
+    every = float(_setting('JOB_HEARTBEAT_SECONDS', 30))
+    heart = _Heartbeat(job.pk, worker, out, every) if every > 0 else None
+    if heart is not None:
+        heart.start()
+    start = time.perf_counter()
+    status, error = BackgroundJob.SUCCEEDED, ''
+    try:
+        # Every email the command sends shares one SMTP session (mail_dispatch).
+        with mail_dispatch.batch(job.name):
+            call_command(job.command, stdout=out, stderr=out)
+    except Exception as e:  # noqa: BLE001 — recorded on the row; the worker moves on
+        status, error = BackgroundJob.FAILED, str(e)[:2000]
+        logger.warning('background job %s #%s failed: %s', job.name, job.pk, e, exc_info=True)
+    finally:
+        if heart is not None:
+            heart.done.set()
+            heart.join()
+    ms = int((time.perf_counter() - start) * 1000)
+    recorded = BackgroundJob.objects.filter(
+        pk=job.pk, worker=worker, status=BackgroundJob.RUNNING,
+    ).update(status=status, error=error, finished_at=timezone.now(), duration_ms=ms,
+             output=out.getvalue()[-_OUTPUT_LIMIT:], progress=out.last_line,
+             lease_expires_at=None)
+    if not recorded:
+        logger.warning('background job %s #%s finished on %s after its lease was lost',
+                       job.name, job.pk, worker)
+    return status
+
+
+def work(worker=None, *, once=False, poll=5.0, max_jobs=0, sleep=time.sleep):
+    """The worker loop: lease, run, repeat. ``once`` stops when the queue is empty (a drain);
+    otherwise it polls every ``poll`` seconds. Returns how many jobs it ran."""
+    worker = worker or worker_id()
+    done = 0
+    while True:
+        close_old_connections()
+        job = lease(worker)
+        if job is None:
+            if once:
+                return done
+            sleep(poll)
+            continue
+        run(job, worker)
+        done += 1
+        if max_jobs and done >= max_jobs:
+            return done
+
+
+def as_dict(job, *, output=False) -> dict:
+    row = {
+        'id': job.id, 'name': job.name, 'command': job.command, 'status': job.status,
+        'source': job.source, 'attempts': job.attempts, 'max_attempts': job.max_attempts,
+        'worker': job.worker, 'progress': job.progress, 'error': job.error,
+        'duration_ms': job.duration_ms,
+        'created_at': job.created_at, 'started_at': job.started_at,
+        'heartbeat_at': job.heartbeat_at, 'finished_at': job.finished_at,
+    }
+    if output:
+        row['output'] = job.output
+    return row
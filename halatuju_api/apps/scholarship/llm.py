@@ -0,0 +1,333 @@
+"""One broker for every Gemini call — shared clients, shared budgets, one retry policy.
+
+Gemini is reached from half a dozen seams: ``vision._call_gemini_json`` (document extraction,
+the IC second opinion, the genuineness checks, the gap and help engines),
+``profile_engine._call_gemini_text`` (sponsor profiles, the help coach, the verdict narrative,
+the anon blurb), the contract and sponsor-terms quiz generators and the course-selector
+report. Each built its own ``genai.Client`` per call and walked its model cascade with nothing
+shared between them: a burst of uploads, a profile batch and a report could all hit the quota
+at once, a 429 simply fell through to the next (weaker) model, and nothing recorded how long a
+model took to answer.
+
+The seams keep their cascades, prompts, error shapes and test patch points. What changed is
+the one line that called the provider — it is now ``llm.generate(model, contents, ...)``,
+which:
+
+- **reuses the client** — one ``genai.Client`` per API key per process (keyed on the client
+  class too, so a test that patches ``google.genai.Client`` gets its own);
+- **holds a concurrency slot** — ``GEMINI_MAX_CONCURRENCY`` calls in flight per process, and
+  at most ``GEMINI_SOURCE_CONCURRENCY[source]`` of them for one call-path tag (the
+  ``usage_context`` source, e.g. ``doc_extract`` or ``profile_draft``), so a batch job can't
+  starve the upload path;
+- **spends from a token budget** — ``GEMINI_TOKENS_PER_MINUTE`` (0 = off) across the process.
+  The prompt is estimated up front (≈4 characters a token, a flat charge per image); what the
+  response reports beyond that is debited afterwards. A call waits for its tokens (and its
+  ``pacing`` turn) BEFORE it takes a slot, so a throttled call never blocks one with budget;
+- **backs off on a 429** — ``GEMINI_RETRY_ON_429`` more attempts on the SAME model, waiting
+  ``GEMINI_BACKOFF_BASE_S · 2^attempt`` (jittered, capped at ``GEMINI_BACKOFF_MAX_S``) with its
+  slot released, before the error goes back to the seam and its cascade moves on. Inside an
+  HTTP request a person is waiting, so the request path gets ``GEMINI_REQUEST_RETRY_ON_429``
+  (default 0 — straight to the next model, as before the broker); cron, the job worker and
+  management commands keep the full retries. Any other error is raised at once, as before;
+- **meters the call** — the ``usage`` row it always wrote, now with ``latency_ms``, and a
+  ``timing`` span (``gemini``) for the ops p50/p95 readout. ``pacing.pace`` is still consulted
+  first, so a ``paced_run`` (the re-extraction pass) keeps its own rate and call ceiling.
+
+``run_concurrently(fn, items, workers=n)`` runs independent prompts side by side (the anon
+blurb backfill uses it); the budgets above bound it, and every worker runs in a copy of the
+caller's context so usage attribution and a paced run follow the work onto the thread.
+
+**The fake backend.** ``use_fake(responder)`` swaps every seam's client for ``FakeClient`` for
+the block, and ``LLM_BACKEND=fake`` does it process-wide (local development with no key — set
+any ``GEMINI_API_KEY`` so the seams get past their key check). The responder gets
+``(model, contents, config)`` and returns the response text, or an exception to raise — which
+is how the tests drive the 429 path without a network.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from . import pacing, timing, usage
+
+logger = logging.getLogger(__name__)
+
+# Tokens charged up front per image part (Gemini bills an image at a flat 258) and characters
+# per token for text — an estimate only; the response's own counts settle the difference.
+_IMAGE_TOKENS = 258
+_CHARS_PER_TOKEN = 4
+
+# Distinct (client class, key) pairs kept. Production has one; tests patch the class per case.
+_CLIENTS_KEPT = 4
+
+_clients: OrderedDict = OrderedDict()
+_clients_lock = threading.Lock()
+_fake = None                  # the FakeClient installed by use_fake() / LLM_BACKEND=fake
+_budget = None                # the _Budget for the current settings
+_budget_lock = threading.Lock()
+
+# The wait between 429 retries. Module-level so the tests can record instead of sleeping.
+_sleep = time.sleep
+
+# True while this thread serves an HTTP request (set from request_started / request_finished —
+# ``connect_request_signals``, called from the app's ready()); picks the 429 retry allowance.
+_in_request = contextvars.ContextVar('llm_in_request', default=False)
+
+
+# ── the fake backend ───────────────────────────────────────────────────────────────────────
+
+class FakeClient:
+    """A stand-in for ``genai.Client``: ``client.models.generate_content(model=, contents=,
+    config=)`` answers from ``responder`` and records every call in ``calls``. Thread-safe."""
+
+    def __init__(self, responder=None, *, latency=0.0):
+        self.responder = responder or (lambda model, contents, config: '{}')
+        self.latency = latency
+        self.calls = []
+        self.models = self
+        self._lock = threading.Lock()
+
+    def generate_content(self, *, model, contents, config=None):
+        with self._lock:
+            self.calls.append({'model': model, 'contents': contents, 'config': config})
+        if self.latency:
+            time.sleep(self.latency)
+        out = self.responder(model, contents, config)
+        if isinstance(out, BaseException):
+            raise out
+        text = out if isinstance(out, str) else str(out)
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(
+            prompt_token_count=estimate_tokens(contents),
+            candidates_token_count=max(len(text) // _CHARS_PER_TOKEN, 1)))
+
+
+class RateLimitError(Exception):
+    """What a fake responder returns to play a provider 429."""
+    code = 429
+
+
+@contextmanager
+def use_fake(responder=None, *, latency=0.0):
+    """Answer every Gemini call in the block from a ``FakeClient`` (yielded, for its ``calls``).
+    Process-wide, so pool threads started inside the block see it too."""
+    global _fake
+    saved, _fake = _fake, FakeClient(responder, latency=latency)
+    try:
+        yield _fake
+    finally:
+        _fake = saved
+
+
+def _fake_client():
+    global _fake
+    if _fake is None and getattr(settings, 'LLM_BACKEND', '') == 'fake':
+        _fake = FakeClient()
+    return _fake
+
+
+# ── clients ────────────────────────────────────────────────────────────────────────────────
+
+def client(api_key):
+    """The shared client for ``api_key`` (the fake one inside ``use_fake``). Raises
+    ``ImportError`` when google-genai isn't installed — the seams already handle that."""
+    fake = _fake_client()
+    if fake is not None:
+        return fake
+    from google import genai
+    key = (genai.Client, api_key)
+    with _clients_lock:
+        if key in _clients:
+            _clients.move_to_end(key)
+            return _clients[key]
+    made = genai.Client(api_key=api_key)
+    with _clients_lock:
+        made = _clients.setdefault(key, made)
+        while len(_clients) > _CLIENTS_KEPT:
+            _clients.popitem(last=False)
+    return made
+
+
+# ── budgets ────────────────────────────────────────────────────────────────────────────────
+
+class _Budget:
+    """The process's Gemini budget: a global slot pool, one per capped source, and the token
+    bucket. Rebuilt when the settings it was built from change."""
+
+    def __init__(self, config):
+        self.config = config
+        max_concurrency, per_source, tokens_per_minute = config
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self.source_slots = {src: threading.BoundedSemaphore(n)
+                             for src, n in per_source if n > 0}
+        self.tokens = (pacing.TokenBucket(tokens_per_minute, burst=tokens_per_minute)
+                       if tokens_per_minute > 0 else None)
+
+    @contextmanager
+    def slot(self, source):
+        held = [s for s in (self.slots, self.source_slots.get(source)) if s is not None]
+        for s in held:
+            s.acquire()
+        try:
+            yield
+        finally:
+            for s in reversed(held):
+                s.release()
+
+
+def _config():
+    per_source = getattr(settings, 'GEMINI_SOURCE_CONCURRENCY', None) or {}
+    return (int(getattr(settings, 'GEMINI_MAX_CONCURRENCY', 8) or 0),
+            tuple(sorted((str(k), int(v)) for k, v in per_source.items())),
+            int(getattr(settings, 'GEMINI_TOKENS_PER_MINUTE', 0) or 0))
+
+
+def budget():
+    global _budget
+    config = _config()
+    with _budget_lock:
+        if _budget is None or _budget.config != config:
+            _budget = _Budget(config)
+        return _budget
+
+
+def estimate_tokens(contents) -> int:
+    """A rough prompt size: text at ≈4 characters a token, a flat charge per image part."""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    total = 0
+    for part in parts:
+        if isinstance(part, str):
+            total += len(part) // _CHARS_PER_TOKEN
+        else:
+            total += _IMAGE_TOKENS
+    return max(total, 1)
+
+
+def is_rate_limited(error) -> bool:
+    """True for a provider 429 / RESOURCE_EXHAUSTED, however the client surfaced it."""
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if code == 429:
+        return True
+    text = str(error)
+    return 'RESOURCE_EXHAUSTED' in text or text.startswith('429')
+
+
+def _request_started(**kwargs):
+    _in_request.set(True)
+
+
+def _request_finished(**kwargs):
+    _in_request.set(False)
+
+
+def connect_request_signals():
+    from django.core.signals import request_finished, request_started
+    request_started.connect(_request_started, dispatch_uid='llm.request_started')
+    request_finished.connect(_request_finished, dispatch_uid='llm.request_finished')
+
+
+@contextmanager
+def background():
+    """Give the calls in the block the background retry allowance even inside a request — the
+    inline cron endpoint, where the scheduler is waiting, not a person."""
+    token = _in_request.set(False)
+    try:
+        yield
+    finally:
+        _in_request.reset(token)
+
+
+def _retries():
+    if _in_request.get():
+        return max(int(getattr(settings, 'GEMINI_REQUEST_RETRY_ON_429', 0) or 0), 0)
+    return max(int(getattr(settings, 'GEMINI_RETRY_ON_429', 3) or 0), 0)
+
+
+def _backoff(attempt):
+    base = float(getattr(settings, 'GEMINI_BACKOFF_BASE_S', 1.0))
+    cap = float(getattr(settings, 'GEMINI_BACKOFF_MAX_S', 30.0))
+    return min(cap, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+# ── the call ───────────────────────────────────────────────────────────────────────────────
+
+def generate(model, contents, *, config=None, source=None, api_key=None):
+    """One prompt to one model → the provider's response. Raises whatever the provider raised
+    (after the 429 retries) so the calling seam's cascade / error handling is unchanged.
+
+    ``source`` overrides the ``usage_context`` source for the meter and the per-source slot
+    (the course-selector report tags itself ``report``); ``api_key`` defaults to
+    ``GEMINI_API_KEY``."""
+    c = client(api_key if api_key is not None else getattr(settings, 'GEMINI_API_KEY', '') or '')
+    tag = source if source is not None else usage.current_context().get('source', '')
+    kwargs = {'model': model, 'contents': contents}
+    if config is not None:
+        kwargs['config'] = config
+    b = budget()
+    estimate = estimate_tokens(contents)
+    retries = _retries()
+    for attempt in range(retries + 1):
+        # Waited for before the slot is taken: a call short of budget holds nothing.
+        if b.tokens is not None:
+            b.tokens.acquire(estimate)
+        pacing.pace(usage.GEMINI)       # each attempt is its own billable request
+        with b.slot(tag):
+            start = time.perf_counter()
+            try:
+                with timing.span('gemini'):
+                    resp = c.models.generate_content(**kwargs)
+            except Exception as e:  # noqa: BLE001 — re-raised below unless it's a retryable 429
+                if not is_rate_limited(e) or attempt == retries:
+                    raise
+                wait = _backoff(attempt)
+                logger.warning('Gemini 429 on %s (attempt %d/%d), retrying in %.1fs',
+                               model, attempt + 1, retries + 1, wait)
+            else:
+                latency = int((time.perf_counter() - start) * 1000)
+                break
+        _sleep(wait)                    # outside the slot — a backing-off call holds nothing
+    it, ot = usage.gemini_tokens(resp)
+    if b.tokens is not None and it is not None:
+        extra = it + (ot or 0) - estimate
+        if extra > 0:
+            b.tokens.debit(extra)
+    meter = {'source': source} if source is not None else {}
+    usage.record_usage(usage.GEMINI, model=model, input_tokens=it, output_tokens=ot,
+                       latency_ms=latency, **meter)
+    return resp
+
+
+def _in_worker(fn, item):
+    from django.db import connection
+    try:
+        return fn(item)
+    finally:
+        connection.close()
+
+
+def run_concurrently(fn, items, *, workers=4):
+    """``[fn(item) for item in items]``, up to ``workers`` at a time, results in input order.
+    Each call runs in a copy of the caller's context (usage attribution, a paced run) and
+    closes its thread's DB connection after. ``workers <= 1`` runs them inline."""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _in_worker, fn, item)
+                   for item in items]
+        return [f.result() for f in futures]
+
+
+def reset():
+    """Drop the shared clients and the budget (tests; a settings change is picked up anyway)."""
+    global _budget
+    with _clients_lock:
+        _clients.clear()
+    with _budget_lock:
+        _budget = None
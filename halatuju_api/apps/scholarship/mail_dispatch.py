@@ -0,0 +1,243 @@
+"""Batched mail dispatch — one reused SMTP connection per sweep, optionally a few in parallel.
+
+Every helper in ``emails.py`` ended in ``send_mail(...)`` or ``EmailMessage(...).send()``, and
+Django opens a NEW connection for each of those: connect, STARTTLS, AUTH, one message, QUIT. For
+a single transactional email that is fine. For the cron sweeps — the completion reminders, the
+query emails, the interview reminders, the partner milestones, the sponsor digests — it is a
+full TLS handshake and login per recipient, and the sweep walks its recipients one at a time.
+
+``batch(name)`` opens a dispatch run for a block:
+
+- **One connection, reused.** Inside the block ``connection()`` hands every ``emails.py`` send a
+  pooled connection: the first message opens the real backend connection (``get_connection`` —
+  whatever ``EMAIL_BACKEND`` says) and the rest go over it with ``send_messages``. A connection
+  the server dropped (an idle timeout, a per-connection message cap) is reopened once and the
+  message retried on the fresh one. Outside a block ``connection()`` is None and every send
+  opens its own connection exactly as before.
+- **A small pool, opt-in.** ``run.each(fn, items)`` calls ``fn`` per item — inline, or across
+  ``EMAIL_DISPATCH_WORKERS`` threads (default 1). Each thread gets its own connection (an SMTP
+  session is not shared between threads), runs in a copy of the caller's context (usage
+  attribution follows the work) and closes its DB connection after. The sweeps pass their
+  per-recipient step through it, so raising the setting parallelises them without code changes.
+- **Best-effort is unchanged.** A failed send still raises into the ``emails.py`` helper, which
+  logs and returns False as it always did; the run only counts it.
+- **Per-run metrics.** Each run counts messages sent and failed, connections opened and
+  reconnects, and logs one INFO line on exit (``mail batch reminders: sent=40 failed=0
+  connections=1 reconnects=0 elapsed_ms=812 per_s=49.3``). Each ``send_messages`` is also a
+  ``timing`` span (``smtp``), so the ops readout shows the per-message p50/p95, and the last
+  ``_RECENT`` run summaries are kept in-process (``recent()``).
+
+- **Shared fragments, built once.** ``fragment(key, build)`` memoises a piece of rendered mail for
+  the life of the run: a sponsor card is the same HTML in every sponsor's digest that shows that
+  student, and the field-name map the cards read is the same query for every recipient. Outside
+  a run it just calls ``build``.
+
+Runs nest: an inner ``batch`` inside an open one joins it rather than opening more connections.
+``smtp_local.LocalSMTPServer`` is the stand-in SMTP server the tests run against.
+"""
+import contextvars
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+# Run summaries kept for ``recent()`` (per process, newest last).
+_RECENT = 20
+
+# What a connection the server closed under us raises — worth one reconnect. Any other SMTP error
+# (a refused recipient, a rejected message) is the message's own failure and is not retried.
+_DROPPED = (smtplib.SMTPServerDisconnected, ConnectionResetError, BrokenPipeError)
+
+_run: 'contextvars.ContextVar[_Run | None]' = contextvars.ContextVar('mail_dispatch_run', default=None)
+_recent = deque(maxlen=_RECENT)
+
+
+def _workers():
+    try:
+        return max(int(getattr(settings, 'EMAIL_DISPATCH_WORKERS', 1) or 1), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+class _PooledConnection:
+    """What a send inside a run is handed as its ``connection``. Forwards ``send_messages`` to
+    the calling thread's real backend connection, opening it on first use and reopening it once
+    when the server has dropped it. ``open``/``close`` are no-ops: the run owns the lifetime."""
+
+    def __init__(self, run):
+        self.run = run
+
+    def open(self):
+        return False
+
+    def close(self):
+        pass
+
+    # A message carries its connection, and the locmem backend deep-copies each message into
+    # the outbox: the copy keeps pointing at this run rather than cloning its threads and sockets.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def send_messages(self, messages):
+        messages = list(messages)
+        try:
+            with timing.span('smtp'):
+                try:
+                    sent = self.run._backend().send_messages(messages)
+                except _DROPPED:
+                    self.run._reconnect()
+                    sent = self.run._backend().send_messages(messages)
+        except Exception:
+            self.run._count(failed=len(messages))
+            raise
+        self.run._count(sent=sent or 0, failed=len(messages) - (sent or 0))
+        return sent
+
+
+class _Run:
+    """One dispatch run: the per-thread backend connections and the counters."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.sent = self.failed = self.opened = self.reconnects = 0
+        self.started = time.perf_counter()
+        self.elapsed_ms = None
+        self.connection = _PooledConnection(self)
+        self.fragments = {}
+        self._local = threading.local()
+        self._backends = []
+        self._lock = threading.Lock()
+
+    def _backend(self):
+        backend = getattr(self._local, 'backend', None)
+        if backend is None:
+            backend = get_connection()
+            backend.open()
+            self._local.backend = backend
+            with self._lock:
+                self._backends.append(backend)
+                self.opened += 1
+        return backend
+
+    def _reconnect(self):
+        backend = getattr(self._local, 'backend', None)
+        if backend is not None:
+            try:
+                backend.close()
+            except Exception:  # noqa: BLE001 — it is already gone
+                pass
+            with self._lock:
+                if backend in self._backends:
+                    self._backends.remove(backend)
+            self._local.backend = None
+        with self._lock:
+            self.reconnects += 1
+
+    def _count(self, sent=0, failed=0):
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+
+    def each(self, fn, items):
+        """``[fn(item) for item in items]``, results in input order — inline, or across the
+        run's worker threads, each with its own connection."""
+        items = list(items)
+        if self.workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items)),
+                                thread_name_prefix=f'mail-{self.name}') as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._in_worker, fn, item)
+                       for item in items]
+            return [f.result() for f in futures]
+
+    def _in_worker(self, fn, item):
+        from django.db import connection as db
+        try:
+            return fn(item)
+        finally:
+            db.close()
+
+    def close(self):
+        with self._lock:
+            backends, self._backends = self._backends, []
+        for backend in backends:
+            try:
+                backend.close()
+            except Exception:  # noqa: BLE001 — a QUIT that fails doesn't undo the sends
+                logger.debug('mail batch %s: close failed', self.name, exc_info=True)
+        self.elapsed_ms = int((time.perf_counter() - self.started) * 1000)
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed_ms if self.elapsed_ms is not None else \
+            int((time.perf_counter() - self.started) * 1000)
+        return {
+            'name': self.name, 'sent': self.sent, 'failed': self.failed,
+            'connections': self.opened, 'reconnects': self.reconnects, 'workers': self.workers,
+            'elapsed_ms': elapsed,
+            'per_s': round(self.sent / (elapsed / 1000), 1) if elapsed else float(self.sent),
+        }
+
+
+@contextmanager
+def batch(name='', *, workers=None):
+    """Reuse connections for every ``emails.py`` send in the block → the run (``each``,
+    ``summary()``). Nested inside an open run, joins it."""
+    outer = _run.get()
+    if outer is not None:
+        yield outer
+        return
+    run = _Run(name or 'mail', workers if workers is not None else _workers())
+    token = _run.set(run)
+    try:
+        yield run
+    finally:
+        _run.reset(token)
+        run.close()
+        stats = run.summary()
+        _recent.append(stats)
+        if stats['sent'] or stats['failed']:
+            logger.info('mail batch %(name)s: sent=%(sent)d failed=%(failed)d '
+                        'connections=%(connections)d reconnects=%(reconnects)d '
+                        'elapsed_ms=%(elapsed_ms)d per_s=%(per_s)s', stats)
+
+
+def connection():
+    """The open run's pooled connection, or None (Django then opens one per message)."""
+    run = _run.get()
+    return run.connection if run is not None else None
+
+
+def each(fn, items):
+    """``run.each`` on the open run; a plain loop outside one."""
+    run = _run.get()
+    return run.each(fn, items) if run is not None else [fn(item) for item in items]
+
+
+def fragment(key, build):
+    """``build()``, memoised under ``key`` for the open run (the same value for every message in
+    the batch); called afresh outside one. ``key`` must name everything the value depends on."""
+    run = _run.get()
+    if run is None:
+        return build()
+    try:
+        return run.fragments[key]
+    except KeyError:
+        return run.fragments.setdefault(key, build())
+
+
+def recent():
+    return list(_recent)
@@ -7,10 +7,13 @@ command generates + identifier-scans a blurb for each published profile still mi
 BILLABLE — one Gemini call per profile. Must run ON the service (needs the prod DB +
 Gemini): the cron endpoint job ``backfill-anon-blurbs`` or ``manage.py backfill_anon_blurbs``.
 Idempotent: only fills blanks unless ``--force``.
+
+``--workers N`` drafts N blurbs at once through the shared Gemini broker (``llm``), whose
+process budgets still bound the run; the identifier scan and the save stay one at a time.
 """
 from django.core.management.base import BaseCommand
 
-from apps.scholarship import pool
+from apps.scholarship import llm, pool
 from apps.scholarship.models import SponsorProfile
 from apps.scholarship.profile_engine import generate_anon_blurb
 
@@ -23,6 +26,8 @@ class Command(BaseCommand):
                             help='Max profiles to process in one run.')
         parser.add_argument('--force', action='store_true',
                             help='Regenerate even when a blurb already exists.')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Blurbs drafted concurrently (default 1).')
 
     def handle(self, *args, **opts):
         qs = SponsorProfile.objects.filter(anon_published=True).select_related(
@@ -30,9 +35,12 @@ class Command(BaseCommand):
         if not opts['force']:
             qs = qs.filter(anon_blurb='')
         done = skipped = 0
-        for sp in qs.order_by('id')[:opts['limit']]:
+        profiles = list(qs.order_by('id')[:opts['limit']])
+        blurbs = llm.run_concurrently(
+            lambda sp: generate_anon_blurb(sp.application, sp.anon_markdown),
+            profiles, workers=opts['workers'])
+        for sp, blurb in zip(profiles, blurbs):
             app = sp.application
-            blurb = generate_anon_blurb(app, sp.anon_markdown)
             if blurb and not pool.scan_anon_for_identifiers(blurb, getattr(app, 'profile', None)):
                 sp.anon_blurb = blurb
                 sp.save(update_fields=['anon_blurb'])
@@ -0,0 +1,150 @@
+"""Micro-benchmark for the name / NRIC matching kernels (matching.py).
+
+Builds synthetic households the size the engines actually see — a student, both parents,
+a guardian and a sibling on the roster, a dozen documents each carrying a printed name
+(romanisation variants, a split token, a one-letter OCR slip) and an NRIC — and runs the
+comparisons a verdict makes: every document name against every roster name, identity-exact
+and relationship-tolerant, every document NRIC against every member's. ``--passes`` is how
+many times one request walks that grid (the verdict, anomaly, gap and pathway engines each
+do, so 4 by default).
+
+Two modes over the same workload:
+
+- **uncached** — every normalisation cache emptied before every comparison and no pair
+  memo: each call re-normalises both strings, which is what the code did before.
+- **cached** — one ``matching.memoised()`` scope per household (one request), normalisation
+  caches warm across households (one worker process).
+
+The answers of the two must be identical; the command says ``parity ok`` or fails.
+
+    python manage.py bench_name_matching
+    python manage.py bench_name_matching --households 200 --passes 4 --repeat 5
+
+No database access; nothing is written.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scholarship import matching
+
+_GIVEN = ['SARAVANAN', 'RUSHAINDRA', 'THEEPICAA', 'LAKSMITHAA', 'KALAIARASI', 'VIJAYAN',
+          'SUPRAMANIAM', 'MUTHUSAMY', 'PILAAPPARAO', 'KUMARESAN', 'DEVAKI', 'MEENATCHI',
+          'NUR AISYAH', 'AHMAD FAUZI', 'TAN MEI LING', 'SIVANESAN', 'PARAMESWARI']
+
+
+def _slip(rng, name):
+    """One plausible misreading of ``name`` (or the name itself)."""
+    roll = rng.random()
+    if roll < 0.3 or len(name) < 7:
+        return name
+    if roll < 0.5:
+        return name.replace('V', 'W', 1)
+    if roll < 0.7:
+        cut = rng.randrange(3, len(name) - 2)
+        return name[:cut] + ' ' + name[cut:]
+    pos = rng.randrange(len(name))
+    return name[:pos] + rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') + name[pos + 1:]
+
+
+def _nric(rng):
+    digits = ''.join(rng.choice('0123456789') for _ in range(12))
+    return f'{digits[:6]}-{digits[6:8]}-{digits[8:]}'
+
+
+def _household(rng, documents):
+    father, mother, guardian = rng.sample(_GIVEN, 3)
+    surname = rng.choice(_GIVEN)
+    roster = [
+        (f'{rng.choice(_GIVEN)} A/L {father}', _nric(rng)),
+        (f'{father} A/L {surname}', _nric(rng)),
+        (f'{mother} A/P {rng.choice(_GIVEN)}', _nric(rng)),
+        (f'{guardian} BIN {rng.choice(_GIVEN)}', _nric(rng)),
+        (f'{rng.choice(_GIVEN)} A/P {father}', _nric(rng)),
+    ]
+    docs = []
+    for _ in range(documents):
+        name, nric = rng.choice(roster)
+        digits = nric.replace('-', '')
+        if rng.random() < 0.3:
+            pos = rng.randrange(12)
+            digits = digits[:pos] + rng.choice('0123456789') + digits[pos + 1:]
+        docs.append((_slip(rng, name), digits))
+    return roster, docs
+
+
+def _walk(roster, docs, passes, cold):
+    out = []
+    for _ in range(passes):
+        for doc_name, doc_nric in docs:
+            for name, nric in roster:
+                if cold:
+                    matching.clear_caches()
+                out.append((matching.name_match(doc_name, name),
+                            matching.relationship_name_match(doc_name, name),
+                            matching.nric_close(doc_nric, nric)))
+    return out
+
+
+class Command(BaseCommand):
+    help = 'Time the name / NRIC matching kernels, uncached vs cached, on synthetic households.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--households', type=int, default=100)
+        parser.add_argument('--documents', type=int, default=12,
+                            help='Documents per household (default 12).')
+        parser.add_argument('--passes', type=int, default=4,
+                            help='Times one request walks the grid (default 4 engines).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per mode; the best is reported.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _run(self, households, passes, cold):
+        start = time.perf_counter()
+        answers = []
+        for roster, docs in households:
+            if cold:
+                answers += _walk(roster, docs, passes, cold=True)
+            else:
+                with matching.memoised():
+                    answers += _walk(roster, docs, passes, cold=False)
+        return time.perf_counter() - start, answers
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        households = [_household(rng, opts['documents']) for _ in range(opts['households'])]
+        comparisons = opts['households'] * opts['documents'] * 5 * opts['passes']
+
+        timings = {}
+        answers = {}
+        for mode, cold in (('uncached', True), ('cached', False)):
+            best = None
+            for _ in range(max(opts['repeat'], 1)):
+                matching.clear_caches()
+                elapsed, answers[mode] = self._run(households, opts['passes'], cold)
+                best = elapsed if best is None else min(best, elapsed)
+            timings[mode] = best
+
+        for mode in ('uncached', 'cached'):
+            per = timings[mode] / comparisons * 1e6 if comparisons else 0.0
+            self.stdout.write(f'{mode:>9}: {timings[mode] * 1000:8.1f} ms  '
+                              f'({comparisons} comparisons, {per:.1f} µs each)')
+        speedup = timings['uncached'] / timings['cached'] if timings['cached'] else 0.0
+        self.stdout.write(f'speedup: {speedup:.1f}x')
+
+        tokens = sorted({t for roster, _ in households for n, _ in roster
+                         for t in matching.name_tokens(n)})
+        pairs = [(x, y) for x in tokens for y in tokens]
+        start = time.perf_counter()
+        full = [matching.levenshtein(x, y) <= 1 for x, y in pairs]
+        t_full = time.perf_counter() - start
+        start = time.perf_counter()
+        bounded = [matching.within_distance(x, y, 1) for x, y in pairs]
+        t_bounded = time.perf_counter() - start
+        self.stdout.write(f'edit distance <= 1 over {len(pairs)} token pairs: full '
+                          f'{t_full * 1000:.1f} ms, bounded {t_bounded * 1000:.1f} ms')
+
+        if answers['uncached'] != answers['cached'] or full != bounded:
+            raise CommandError('parity FAILED: the cached kernels disagree with the uncached run')
+        self.stdout.write(self.style.SUCCESS('parity ok'))
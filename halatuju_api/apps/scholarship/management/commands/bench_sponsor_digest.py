@@ -0,0 +1,140 @@
+"""Benchmark for rendering the weekly sponsor digest to many sponsors at once.
+
+Builds a synthetic week: ``--students`` published students, each as the card a sponsor is sent
+(trusted and untrusted forms), and ``--sponsors`` sponsors who are each shown ``--cards`` of them.
+It then renders every sponsor's digest both ways it can be sent:
+
+- **legacy** — the hardcoded digest (``emails._render_sponsor_notify``), the path in use until
+  the sponsor-comms switch is on;
+- **template** — the editable ``weekly_digest`` template (``sponsor_comms.render``), with the
+  seeded wording.
+
+Each is timed in two modes over the same workload:
+
+- **per-recipient** — the compiled-template cache emptied before every render and no dispatch
+  run, so each digest parses its template, re-reads the field-name map and rebuilds every card.
+  That is what the code did before.
+- **batched** — one ``mail_dispatch.batch`` around the whole run (as the outbox drain has),
+  templates compiled once, each card and the shared tail built once.
+
+The output of the two modes must be identical; the command says ``parity ok`` or fails.
+
+    python manage.py bench_sponsor_digest
+    python manage.py bench_sponsor_digest --sponsors 250 --students 40 --repeat 5
+
+Reads the field taxonomy; nothing is written and nothing is sent.
+"""
+import random
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.scholarship import email_templates, emails, mail_dispatch, sponsor_comms
+from apps.scholarship.management.commands.seed_sponsor_email_templates import SEEDS
+
+_COURSES = ['Diploma Kejuruteraan Mekanikal', 'Diploma Perakaunan', 'Asasi Sains',
+            'Diploma Sains Komputer', 'Ijazah Sarjana Muda Kejururawatan', 'Diploma Seni Bina']
+_PLACES = ['Politeknik Ungku Omar', 'Universiti Malaya', 'Politeknik Kota Bharu',
+           'Universiti Teknologi MARA', 'Kolej Matrikulasi Perak']
+_STATES = ['Perak', 'Selangor', 'Kedah', 'Sabah', 'Johor', 'Pahang']
+_FIELDS = ['engineering', 'accounting', 'computing', 'nursing', 'architecture']
+
+
+def _card(rng, i, trusted):
+    """A sponsor card shaped like ``SponsorPoolDetailSerializer`` output (the institution is for
+    trusted sponsors only)."""
+    starts = timezone.localdate() + timedelta(days=rng.randrange(5, 90))
+    return {
+        'id': 1000 + i, 'ref': f'BP-{1000 + i:05d}', 'state': rng.choice(_STATES),
+        'field': rng.choice(_FIELDS), 'course': rng.choice(_COURSES),
+        'academic': f'SPM · {rng.randrange(3, 10)} As',
+        'institution': rng.choice(_PLACES) if trusted else '',
+        'blurb': 'Top of the class in additional maths; the first in the family to study on.',
+        'funding_categories': ['fees', 'laptop'], 'programme_months': 30,
+        'award_amount': f'{rng.randrange(20, 60) * 100}.00', 'funded_amount': '0',
+        'funded': False, 'field_image_slug': rng.choice(_FIELDS),
+        'reporting_date': starts.isoformat(), 'anon_profile': 'Determined.',
+    }
+
+
+def _week(rng, sponsors, students, per_sponsor):
+    trusted = [_card(rng, i, True) for i in range(students)]
+    untrusted = [dict(c, institution='') for c in trusted]
+    recipients = []
+    for n in range(sponsors):
+        is_trusted = rng.random() < 0.7
+        picks = rng.sample(range(students), min(per_sponsor, students))
+        cards = [(trusted if is_trusted else untrusted)[i] for i in sorted(picks)]
+        recipients.append((f'Sponsor {n}', cards))
+    return recipients
+
+
+def _legacy(recipients):
+    return [emails._render_sponsor_notify(emails.SPONSOR_DIGEST_SUBJECTS, cards, 'weekly', 'en',
+                                          emails._SPONSOR_DIGEST_INTRO, name=name)
+            for name, cards in recipients]
+
+
+def _template(recipients):
+    seed = SEEDS['weekly_digest']
+    template = SimpleNamespace(subject=seed['subject'], body=seed['body'])
+    return [sponsor_comms.render('weekly_digest', template,
+                                 {'sponsor_name': name, 'cards': cards, 'count': len(cards)})
+            for name, cards in recipients]
+
+
+class Command(BaseCommand):
+    help = 'Time the weekly sponsor digest render, per recipient vs batched, for many sponsors.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sponsors', type=int, default=250)
+        parser.add_argument('--students', type=int, default=40,
+                            help='Students published this week (default 40).')
+        parser.add_argument('--cards', type=int, default=5,
+                            help='Students in each digest (default 5, the email cap).')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs per mode; the best is reported.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _run(self, render, recipients, batched):
+        email_templates.compile_template.cache_clear()
+        start = time.perf_counter()
+        if batched:
+            with mail_dispatch.batch('bench'):
+                out = render(recipients)
+        else:
+            out = []
+            for one in recipients:
+                email_templates.compile_template.cache_clear()
+                out += render([one])
+        return time.perf_counter() - start, out
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts['seed'])
+        recipients = _week(rng, opts['sponsors'], max(opts['students'], 1), opts['cards'])
+        n = len(recipients)
+
+        failed = []
+        for path, render in (('legacy', _legacy), ('template', _template)):
+            timings, outputs = {}, {}
+            for mode, batched in (('per-recipient', False), ('batched', True)):
+                best = None
+                for _ in range(max(opts['repeat'], 1)):
+                    elapsed, outputs[mode] = self._run(render, recipients, batched)
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[mode] = best
+            for mode in ('per-recipient', 'batched'):
+                per = timings[mode] / n * 1000 if n else 0.0
+                self.stdout.write(f'{path:>8} {mode:>13}: {timings[mode] * 1000:8.1f} ms  '
+                                  f'({n} sponsors, {per:.2f} ms each)')
+            speedup = timings['per-recipient'] / timings['batched'] if timings['batched'] else 0.0
+            self.stdout.write(f'{path:>8} speedup: {speedup:.1f}x')
+            if outputs['per-recipient'] != outputs['batched']:
+                failed.append(path)
+
+        if failed:
+            raise CommandError(f'parity FAILED: the batched render differs ({", ".join(failed)})')
+        self.stdout.write(self.style.SUCCESS('parity ok'))
@@ -0,0 +1,75 @@
+"""Recompute the verdict + anomalies live and diff them against the stored snapshots.
+
+`snapshots.py` serves `build_verdict` / `detect_anomalies` from a `VerdictSnapshot` row while the
+application's inputs stamp is unchanged. That is only right if the stamp covers every input the
+engines read AND `ENGINE_VERSION` is bumped with every logic change. This is the check on both:
+
+- **ok**      — same inputs, same answer.
+- **stale**   — the inputs have changed since the row was written. Not a fault: the next read
+                recomputes it. Counted, not listed.
+- **missing** — no row yet (never read since the snapshot table shipped). Not a fault either.
+- **drift**   — SAME inputs, DIFFERENT answer. Either the engine changed without a version bump
+                or the engines read something the stamp doesn't hash. Listed with the facts /
+                flags that differ; fix the cause, then `--repair`.
+
+Read-only unless `--repair`, which rewrites the drifted and missing rows from the live answer.
+
+    python manage.py check_verdict_snapshots                 # live applications
+    python manage.py check_verdict_snapshots --all           # closed ones too
+    python manage.py check_verdict_snapshots --app 412 --app 415
+    python manage.py check_verdict_snapshots --limit 200 --repair
+"""
+from django.core.management.base import BaseCommand
+
+from apps.scholarship import doc_context, snapshots
+from apps.scholarship.models import ScholarshipApplication, VerdictSnapshot
+
+#: Rejected/withdrawn/expired records are not read on the cockpit.
+_ENDED = ('rejected', 'withdrawn', 'expired')
+
+
+class Command(BaseCommand):
+    help = 'Diff stored verdict/anomaly snapshots against a live recompute (read-only by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--app', type=int, action='append', default=[],
+                            help='Only this application id (repeatable).')
+        parser.add_argument('--all', action='store_true',
+                            help='Include rejected / withdrawn / expired applications.')
+        parser.add_argument('--limit', type=int, default=0,
+                            help='Check at most N applications (0 = no limit).')
+        parser.add_argument('--repair', action='store_true',
+                            help='Rewrite drifted and missing snapshots from the live answer.')
+
+    def handle(self, *args, **opts):
+        qs = ScholarshipApplication.objects.select_related('profile').order_by('id')
+        if opts['app']:
+            qs = qs.filter(id__in=opts['app'])
+        elif not opts['all']:
+            qs = qs.exclude(status__in=_ENDED)
+        if opts['limit']:
+            qs = qs[:opts['limit']]
+
+        stored = {s.application_id: s for s in VerdictSnapshot.objects.filter(
+            application_id__in=[a.id for a in qs])}
+        counts = {'ok': 0, 'stale': 0, 'missing': 0, 'drift': 0}
+        repaired = 0
+        for app in qs:
+            snap = stored.get(app.id)
+            with doc_context.loaded(app):
+                state, detail = snapshots.diff(app, snap) if snap else ('missing', '')
+                if state == 'drift':
+                    self.stdout.write(self.style.WARNING(f'  app {app.id} ({app.status}): {detail}'))
+                if opts['repair'] and state in ('drift', 'missing'):
+                    if snap is not None:
+                        snap.delete()
+                    snapshots.current(app)
+                    repaired += 1
+            counts[state] += 1
+
+        summary = (f'verdict snapshots: {counts["ok"]} ok, {counts["drift"]} drift, '
+                   f'{counts["stale"]} stale, {counts["missing"]} missing')
+        if opts['repair']:
+            summary += f'; {repaired} rewritten'
+        style = self.style.ERROR if counts['drift'] and not opts['repair'] else self.style.SUCCESS
+        self.stdout.write(style(summary + '.'))
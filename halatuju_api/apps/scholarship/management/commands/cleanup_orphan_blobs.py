@@ -66,6 +66,12 @@ class Command(BaseCommand):
             .exclude(storage_path='')
             .values_list('storage_path', flat=True)
         )
+        # A document's OCR copy (imaging.py) lives beside it and is as live as the original.
+        known |= set(
+            ApplicantDocument.objects
+            .exclude(ocr_copy_path='')
+            .values_list('ocr_copy_path', flat=True)
+        )
         self.stdout.write(f'DB references {len(known)} document blob(s).')
 
         all_paths = list(_walk_bucket())
@@ -0,0 +1,29 @@
+"""Deliver the due rows of the email outbox (see outbox.py) — the retries.
+
+    python manage.py drain_outbox              # every due row, up to EMAIL_OUTBOX_BATCH
+    python manage.py drain_outbox --limit 50
+
+A sender delivers its own rows the moment it queues them; this picks up the ones that failed
+(after their backoff) and anything a crashed run left behind. Scheduled as the cron job
+'email-outbox' every few minutes. Safe to overlap: each row is claimed before it is sent.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.scholarship import outbox
+
+
+class Command(BaseCommand):
+    help = 'Send due email-outbox rows (retries with backoff).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=0,
+                            help='At most this many rows (default EMAIL_OUTBOX_BATCH).')
+
+    def handle(self, *args, **opts):
+        r = outbox.drain(limit=opts['limit'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"outbox: sent {r['sent']}, skipped {r['skipped']}, retry {r['retry']}, "
+            f"dead {r['dead']}, busy {r['busy']} ({r['elapsed_ms']} ms, {r['per_s']}/s)"))
+        st = outbox.stats()
+        self.stdout.write(f"pending {st['counts']['pending']}, dead {st['counts']['dead']}, "
+                          f"oldest pending {st['oldest_pending_s']}s")
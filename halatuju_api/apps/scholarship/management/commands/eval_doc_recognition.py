@@ -29,9 +29,27 @@ Usage:
   python manage.py eval_doc_recognition --rerun-vision   # Layer A — (re)capture Gemini reads (costs $)
   python manage.py eval_doc_recognition --json           # machine-readable scorecard
   python manage.py eval_doc_recognition --eval-dir PATH  # point at a different eval set (used by tests)
+  python manage.py eval_doc_recognition --bench 20       # Layer B speed: replay the corpus 20 times
+
+THE BENCH (`--bench N`, offline + free, like the scorecard): parser and matcher changes are
+judged on speed as well as accuracy. It replays, N times over the whole snapshot corpus:
+  • the verdict — `doc_match_verdict` on every labelled document that has a Layer-A snapshot
+    (the fixture is built once per document, then re-scored N times; only the scoring is timed);
+  • the text parsers + genuineness scorers — `doc_parse.parse_by_labels` and the doc type's
+    signature scorer on every cached OCR text (`snapshots/<doc_type>__<key>.ocr.txt`, written
+    by `eval/capture_ocr.py`);
+  • the slip parser — `parse_spm_slip` on every captured word geometry: the `capture` a
+    fallen-back slip keeps in `vision_fields._slip_ocr_diag`, and any `slips/*.json` in the
+    eval set (the `tests/fixtures/slips` shape).
+It reports docs/second per (stage, doc_type) — with the verdicts' pass count against
+labels.json, so a faster parser that reads worse shows up in the same table — and inclusive
+time per function (each is timed wherever it is called from, nested calls included).
 """
 import json
 import os
+import sys
+import time
+from collections import defaultdict
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
@@ -45,6 +63,77 @@ _VISION_TYPES = {'ic', 'parent_ic', 'results_slip', 'salary_slip', 'epf', 'str',
                  'offer_letter', 'birth_certificate', 'guardianship_letter',
                  'water_bill', 'electricity_bill', 'statement_of_intent'}
 
+# The functions `--bench` times, as (module, name). Every module-level binding of each one in
+# apps.scholarship is swapped for the timed wrapper, so `from .x import f` callers count too.
+_BENCH_FUNCTIONS = [
+    ('apps.scholarship.resolution', 'doc_match_verdict'),
+    ('apps.scholarship.academic_engine', 'parse_spm_slip'),
+    ('apps.scholarship.doc_parse', 'parse_by_labels'),
+    ('apps.scholarship.genuineness.results_doc', 'signature_genuineness'),
+    ('apps.scholarship.genuineness.results_doc', 'score_signatures'),
+    ('apps.scholarship.genuineness.salary_doc', 'salary_genuineness'),
+    ('apps.scholarship.genuineness.electricity_doc', 'electricity_genuineness'),
+    ('apps.scholarship.genuineness.water_doc', 'water_genuineness'),
+    ('apps.scholarship.genuineness.school_leaving_doc', 'school_leaving_genuineness'),
+]
+
+
+def _text_scorer(doc_type):
+    """The OCR-text-only genuineness scorer for ``doc_type`` (None when the type is judged from
+    the image — those need Gemini and are not benched)."""
+    from apps.scholarship import genuineness as g
+    return {
+        'results_slip': g.signature_genuineness,
+        'certificate': g.signature_genuineness,
+        'offer_letter': lambda t: g.signature_genuineness(t, doc_type='offer_letter'),
+        'str': lambda t: g.signature_genuineness(t, doc_type='str'),
+        'birth_certificate': lambda t: g.signature_genuineness(t, doc_type='birth_certificate'),
+        'salary_slip': g.salary_genuineness,
+        'electricity_bill': g.electricity_genuineness,
+        'water_bill': g.water_genuineness,
+        'school_leaving_cert': g.school_leaving_genuineness,
+    }.get(doc_type)
+
+
+class _Stopwatch:
+    """Inclusive wall time + call count per function in ``_BENCH_FUNCTIONS`` for the block."""
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+        self._swapped = []
+
+    def _timed(self, label, fn):
+        stats = self.stats[label]
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats['seconds'] += time.perf_counter() - start
+                stats['calls'] += 1
+        return wrapper
+
+    def __enter__(self):
+        import importlib
+        for module_name, name in _BENCH_FUNCTIONS:
+            fn = getattr(importlib.import_module(module_name), name)
+            wrapper = self._timed(name, fn)
+            for mod in list(sys.modules.values()):
+                if not getattr(mod, '__name__', '').startswith('apps.scholarship'):
+                    continue
+                for attr, value in list(vars(mod).items()):
+                    if value is fn:
+                        self._swapped.append((mod, attr, fn))
+                        setattr(mod, attr, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for mod, attr, fn in reversed(self._swapped):
+            setattr(mod, attr, fn)
+        self._swapped = []
+        return False
+
 
 class Command(BaseCommand):
     help = 'Evaluate the document-recognition pipeline against a labelled golden set.'
@@ -58,6 +147,8 @@ class Command(BaseCommand):
                             help='Score every surviving fixture as expected "ok" (genuine corpus), '
                                  'grouped per application. Uses context.json + snapshots; no labels.json.')
         parser.add_argument('--json', action='store_true', help='Emit a machine-readable scorecard.')
+        parser.add_argument('--bench', type=int, default=0, metavar='N',
+                            help='Replay Layer B + the text/slip parsers N times and report speed.')
 
     # ── paths ────────────────────────────────────────────────────────────────
     def _dirs(self, eval_dir):
@@ -71,6 +162,7 @@ class Command(BaseCommand):
             'snapshots': os.path.join(base, 'snapshots'),
             'fixtures': os.path.join(base, 'fixtures'),
             'counter': os.path.join(base, 'counter_examples'),
+            'slips': os.path.join(base, 'slips'),
         }
 
     def handle(self, *args, **opts):
@@ -78,11 +170,13 @@ class Command(BaseCommand):
         if opts.get('auto_ok'):
             self._auto_ok(d, opts['json'])
             return
-        if not os.path.exists(d['labels']):
+        if not os.path.exists(d['labels']) and not opts['bench']:
             self.stderr.write(f"No labels.json at {d['labels']} — nothing to evaluate.")
             return
-        with open(d['labels'], encoding='utf-8') as f:
-            labels = (json.load(f) or {}).get('docs', {})
+        labels = {}
+        if os.path.exists(d['labels']):     # the bench can run on OCR texts / slips alone
+            with open(d['labels'], encoding='utf-8') as f:
+                labels = (json.load(f) or {}).get('docs', {})
         context = {}
         if os.path.exists(d['context']):
             with open(d['context'], encoding='utf-8') as f:
@@ -91,6 +185,9 @@ class Command(BaseCommand):
         if opts['rerun_vision']:
             self._rerun_vision(labels, context, d)
             return
+        if opts['bench']:
+            self._bench(labels, context, d, opts['bench'], opts['json'])
+            return
 
         results = [self._score_one(key, label, context.get(key, {}), d) for key, label in labels.items()]
         self._report(results, opts['json'])
@@ -201,6 +298,105 @@ class Command(BaseCommand):
         if missing:
             self.stdout.write(self.style.WARNING(f"\n  {len(missing)} fixtures had no context entry (skipped)."))
 
+    # ── Bench: Layer B + parser speed over the snapshot corpus (free, deterministic) ──
+    def _bench_corpus(self, labels, d):
+        """``(verdict_items, text_items, slip_items)`` found in the eval set."""
+        snaps = d['snapshots']
+        verdicts, texts, slips = [], [], []
+        for key, label in labels.items():
+            sp = os.path.join(snaps, f'{key}.json')
+            if not os.path.exists(sp):
+                continue
+            with open(sp, encoding='utf-8') as f:
+                snap = json.load(f)
+            verdicts.append((key, label, snap))
+            diag = (snap.get('vision_fields') or {}).get('_slip_ocr_diag') or {}
+            if diag.get('capture'):
+                slips.append((key, diag['capture']))
+        if os.path.isdir(snaps):
+            for fn in sorted(os.listdir(snaps)):
+                if fn.endswith('.ocr.txt') and '__' in fn:
+                    with open(os.path.join(snaps, fn), encoding='utf-8') as f:
+                        texts.append((fn.split('__', 1)[0], fn[:-len('.ocr.txt')], f.read()))
+        if os.path.isdir(d['slips']):
+            for fn in sorted(os.listdir(d['slips'])):
+                if fn.endswith('.json'):
+                    with open(os.path.join(d['slips'], fn), encoding='utf-8') as f:
+                        fx = json.load(f)
+                    slips.append((fn[:-5], [{'text': w['t'], 'cx': w['cx'], 'cy': w['cy'],
+                                             'h': w['h'], 'angle': w.get('a')}
+                                            for w in fx.get('words', [])]))
+        return verdicts, texts, slips
+
+    def _bench(self, labels, context, d, runs, as_json):
+        from apps.scholarship._test_fixtures import build_doc_fixture, rolled_back
+        from apps.scholarship import academic_engine, doc_parse, resolution
+        verdicts, texts, slips = self._bench_corpus(labels, d)
+        rows = defaultdict(lambda: {'docs': 0, 'seconds': 0.0, 'correct': 0, 'labelled': 0})
+
+        with _Stopwatch() as watch:
+            for key, label, snap in verdicts:
+                row = rows[('verdict', label['doc_type'])]
+                row['docs'] += 1
+                with rolled_back():
+                    doc = build_doc_fixture(label['doc_type'], snap, context.get(key, {}))
+                    start = time.perf_counter()
+                    for i in range(runs):
+                        academic_engine.clear_caches()  # each run re-reads the slip
+                        got = resolution.doc_match_verdict(doc)
+                        if i == 0 and label.get('expect_verdict') is not None:
+                            row['labelled'] += 1
+                            row['correct'] += got == label['expect_verdict']
+                    row['seconds'] += time.perf_counter() - start
+            for doc_type, key, text in texts:
+                row = rows[('parse', doc_type)]
+                row['docs'] += 1
+                scorer = _text_scorer(doc_type)
+                start = time.perf_counter()
+                for _ in range(runs):
+                    doc_parse._index.cache_clear()      # each run re-splits the text
+                    doc_parse.parse_by_labels(doc_type, text)
+                    if scorer is not None:
+                        scorer(text)
+                row['seconds'] += time.perf_counter() - start
+            for key, words in slips:
+                row = rows[('parse', 'results_slip (words)')]
+                row['docs'] += 1
+                start = time.perf_counter()
+                for _ in range(runs):
+                    academic_engine.clear_caches()      # time the parse, not the memo
+                    academic_engine.parse_spm_slip(words)
+                row['seconds'] += time.perf_counter() - start
+
+        table = [{'stage': stage, 'doc_type': dt, 'docs': r['docs'],
+                  'docs_per_s': round(r['docs'] * runs / r['seconds'], 1) if r['seconds'] else None,
+                  'ms_per_doc': round(r['seconds'] * 1000 / (r['docs'] * runs), 3),
+                  'correct': r['correct'] if r['labelled'] else None, 'labelled': r['labelled']}
+                 for (stage, dt), r in sorted(rows.items())]
+        functions = [{'function': name, 'calls': s['calls'],
+                      'total_ms': round(s['seconds'] * 1000, 1),
+                      'ms_per_call': round(s['seconds'] * 1000 / s['calls'], 3)}
+                     for name, s in sorted(watch.stats.items(), key=lambda kv: -kv[1]['seconds'])
+                     if s['calls']]
+        if as_json:
+            self.stdout.write(json.dumps({'runs': runs, 'by_doc_type': table, 'functions': functions},
+                                         indent=2))
+            return
+        self.stdout.write(f'\nLayer-B bench x{runs}: {len(verdicts)} verdict docs, {len(texts)} OCR '
+                          f'texts, {len(slips)} slip geometries')
+        if not table:
+            self.stdout.write(self.style.WARNING('  nothing to replay — no snapshots in this eval set.'))
+            return
+        self.stdout.write(f"  {'stage':8} {'doc_type':22} {'docs':>5} {'docs/s':>10} {'ms/doc':>9}  correct")
+        for r in table:
+            correct = f"{r['correct']}/{r['labelled']}" if r['labelled'] else '-'
+            self.stdout.write(f"  {r['stage']:8} {r['doc_type']:22} {r['docs']:>5} "
+                              f"{r['docs_per_s'] or 0:>10.1f} {r['ms_per_doc']:>9.3f}  {correct}")
+        self.stdout.write(f"\n  {'function (inclusive)':30} {'calls':>7} {'total ms':>10} {'ms/call':>9}")
+        for f in functions:
+            self.stdout.write(f"  {f['function']:30} {f['calls']:>7} {f['total_ms']:>10.1f} "
+                              f"{f['ms_per_call']:>9.3f}")
+
     # ── Layer A re-capture (billable Gemini) ────────────────────────────────────
     def _rerun_vision(self, labels, context, d):
         from unittest.mock import patch
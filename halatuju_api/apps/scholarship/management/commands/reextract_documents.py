@@ -5,15 +5,26 @@ Most supporting docs were read by Gemini before the deterministic capture layer
 captured). This re-reads them with the current deterministic + Gemini parsers.
 
 Self-batching: each run processes the NEXT `--limit` (default 20) docs that this pass
-hasn't touched yet — marked by a flag written into ``vision_fields`` — so it can be
-called repeatedly (cron-driven) and observed batch by batch. FORCES billable reads, so
-it's run deliberately. Scope = the supporting + text doc types (ic/parent_ic already
-store their read in dedicated columns; photos aren't OCR'd).
+hasn't touched yet — marked on the row's indexed `reextract_pass` / `reextract_state`
+columns — so it can be called repeatedly (cron-driven) and observed batch by batch.
+`--all` instead walks the whole remaining corpus in one invocation, stopping early at the
+`--max-calls` billable-call ceiling. Every doc is checkpointed the moment it finishes, so an
+interrupted run (or one stopped by the ceiling) resumes exactly where it left off.
+
+`--workers` > 1 fans the reads out over a bounded pool; the Vision and Gemini seams are paced
+by ONE shared per-service rate limit however wide the pool is (`pacing`). The docs are OCR'd
+`--vision-batch` at a time in one batched Cloud Vision request (`vision.batched_reads`) before
+their reads run, instead of one request per doc. FORCES billable
+reads, so it's run deliberately. Scope = the supporting + text doc types (ic/parent_ic
+already store their read in dedicated columns; photos aren't OCR'd).
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from apps.scholarship.models import ApplicantDocument
-from apps.scholarship.reextract import reextract_document
+from apps.scholarship import pacing, usage, vision
+from apps.scholarship.reextract import (
+    iter_in_chunks, pass_counts, pending_documents, reextract_document, run_pass,
+)
 
 # Bump this for a future re-extraction pass (e.g. after another parser change).
 PASS_MARKER = 'reextract_2026_06'
@@ -47,6 +58,9 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--limit', type=int, default=20, help='Docs to process this run.')
+        parser.add_argument('--all', action='store_true',
+                            help='Walk EVERY remaining doc in one invocation (ignores --limit); '
+                                 'bound the spend with --max-calls.')
         parser.add_argument('--doc-type', default='',
                             help='Restrict the pass to ONE doc type (e.g. school_leaving_cert) — a '
                                  'targeted, cheap re-extraction (calibration / a single-type rollout) '
@@ -54,6 +68,25 @@ class Command(BaseCommand):
         parser.add_argument('--retry-errors', action='store_true',
                             help="Also re-attempt docs whose last run FAILED (marked 'error'). "
                                  "Default runs skip them so one broken doc can't wedge the pass.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Docs read concurrently (default REEXTRACT_WORKERS). 1 = serial.')
+        parser.add_argument('--max-calls', type=int, default=None,
+                            help='Ceiling on billable Vision + Gemini calls this run; dispatch stops '
+                                 'once spent (default REEXTRACT_MAX_CALLS; 0 = no ceiling).')
+        parser.add_argument('--vision-per-min', type=int, default=None,
+                            help='Vision call rate across all workers (default REEXTRACT_VISION_PER_MIN).')
+        parser.add_argument('--gemini-per-min', type=int, default=None,
+                            help='Gemini call rate across all workers (default REEXTRACT_GEMINI_PER_MIN).')
+        parser.add_argument('--vision-batch', type=int, default=None,
+                            help='Docs OCR\'d per batched Vision request (default REEXTRACT_VISION_BATCH, '
+                                 f'max {vision.VISION_BATCH_LIMIT}; 1 = one request per doc).')
+        parser.add_argument('--checkpoint-every', type=int, default=50,
+                            help='Print a progress checkpoint every N docs (0 = off).')
+
+    @staticmethod
+    def _opt(opts, name, setting, default):
+        value = opts.get(name)
+        return value if value is not None else getattr(settings, setting, default)
 
     def handle(self, *args, **opts):
         from apps.scholarship.views import SUPPORTING_NAME_CHECK_TYPES, TEXT_READ_DOC_TYPES
@@ -75,66 +108,43 @@ class Command(BaseCommand):
                                   f"({', '.join(sorted(set(types) | targeted_only))}).")
                 return
             types = [only]
-        limit = max(1, opts['limit'])
-        retry_errors = opts['retry_errors']
-
-        # Filter "not yet processed this pass" in Python — a JSON-key `.exclude()` mishandles
-        # rows where the key (or the whole vision_fields) is absent (SQL NULL semantics).
-        # Code-health S2 #5b: an errored doc is marked 'error' (not True) — the pass advances
-        # past it (no wedge), but it stays visibly failed and a --retry-errors run picks it
-        # back up, instead of being silently stuck on the weak read forever.
-        def unprocessed(doc):
-            mark = (doc.vision_fields or {}).get(PASS_MARKER)
-            return not mark or (retry_errors and mark == 'error')
-
-        all_docs = ApplicantDocument.objects.filter(doc_type__in=types).order_by('id')
-        batch = []
-        for doc in all_docs.iterator():
-            if unprocessed(doc):
-                batch.append(doc)
-            if len(batch) >= limit:
-                break
-        if not batch:
-            self.stdout.write('reextract: nothing left — every supporting doc is on the current pass.')
-            return
+        workers = max(1, int(self._opt(opts, 'workers', 'REEXTRACT_WORKERS', 1)))
+        vision_batch = min(int(self._opt(opts, 'vision_batch', 'REEXTRACT_VISION_BATCH', 1)),
+                           vision.VISION_BATCH_LIMIT)
+        budget = pacing.RunBudget(
+            per_minute={
+                usage.VISION_OCR: self._opt(opts, 'vision_per_min', 'REEXTRACT_VISION_PER_MIN', 0),
+                usage.GEMINI: self._opt(opts, 'gemini_per_min', 'REEXTRACT_GEMINI_PER_MIN', 0),
+            },
+            max_calls=self._opt(opts, 'max_calls', 'REEXTRACT_MAX_CALLS', 0))
+
+        # "Not yet processed this pass" is one indexed filter on the pass columns. Code-health
+        # S2 #5b still holds: an errored doc is marked 'error' (not done) — the pass advances
+        # past it, and a --retry-errors run picks it back up instead of it sitting on the weak
+        # read forever.
+        pending = pending_documents(types, PASS_MARKER, retry_errors=opts['retry_errors'])
+        docs = iter_in_chunks(pending) if opts['all'] else list(pending[:max(1, opts['limit'])])
 
-        done = errors = 0
-        for doc in batch:
-            before = _summary(doc)   # snapshot the prior read BEFORE we overwrite it
-            stamps_before = (doc.vision_fields_run_at, doc.vision_run_at)
-            ok = True
-            try:
-                reextract_document(doc)
-                doc.refresh_from_db()
-                after = _summary(doc)
-                # The clobber guard keeps a stored read (and skips the save) when the
-                # re-run itself failed — no timestamp advances. Treat that as an ERROR
-                # of THIS run (old data safely kept), not a completed re-extraction.
-                if (doc.vision_fields_run_at, doc.vision_run_at) == stamps_before:
-                    ok = False
-                    after = f'STALE-KEPT [{after}] (re-run failed; stored read preserved)'
-            except Exception as e:  # noqa: BLE001 — mark + report so a broken doc never wedges the pass
-                ok = False
-                after = f'ERROR {str(e)[:55]}'
-                doc.refresh_from_db()
-            # Mark the doc so the next run advances: True = re-extracted on this pass;
-            # 'error' = attempted + failed (skipped by default, re-attempted with
-            # --retry-errors). Never stamp a failure as done (#5b).
-            vf = doc.vision_fields or {}
-            vf[PASS_MARKER] = True if ok else 'error'
-            doc.vision_fields = vf
-            doc.save(update_fields=['vision_fields'])
-            done += 1
-            if not ok:
-                errors += 1
+        def report(doc, ok, before, after):
             self.stdout.write(f'app#{doc.application_id} doc{doc.id} {doc.doc_type}: [{before}] -> [{after}]')
 
-        remaining = sum(
-            1 for d in ApplicantDocument.objects.filter(doc_type__in=types).only('vision_fields', 'doc_type')
-            if unprocessed(d))
-        error_total = sum(
-            1 for d in ApplicantDocument.objects.filter(doc_type__in=types).only('vision_fields', 'doc_type')
-            if (d.vision_fields or {}).get(PASS_MARKER) == 'error')
+        def checkpoint(stats):
+            self.stdout.write(f"reextract: checkpoint — {stats['processed']} done "
+                              f"({stats['errors']} errors), {stats['calls']} billable calls so far.")
+
+        stats = run_pass(docs, pass_marker=PASS_MARKER, read=reextract_document, summary=_summary,
+                         workers=workers, budget=budget, on_result=report,
+                         checkpoint_every=max(0, opts['checkpoint_every']), on_checkpoint=checkpoint,
+                         prefetch=vision.batched_reads if vision_batch > 1 else None,
+                         group_size=vision_batch)
+        if not stats['processed'] and not stats['stopped']:
+            self.stdout.write('reextract: nothing left — every supporting doc is on the current pass.')
+            return
+
+        counts = pass_counts(types, PASS_MARKER)
+        ceiling = (f' STOPPED at the {budget.max_calls}-call ceiling — re-run to continue.'
+                   if stats['stopped'] == 'budget' else '')
         self.stdout.write(
-            f'reextract: processed {done} ({errors} errors this run), {remaining} remaining, '
-            f'{error_total} marked error total — re-attempt those with --retry-errors.')
+            f"reextract: processed {stats['processed']} ({stats['errors']} errors this run), "
+            f"{counts['remaining']} remaining, {counts['error_total']} marked error total — "
+            f"re-attempt those with --retry-errors. {stats['calls']} billable calls.{ceiling}")
@@ -0,0 +1,29 @@
+"""The background-job worker: lease the queued cron jobs and run them (see jobs.py).
+
+    python manage.py run_jobs               # poll forever (a worker service)
+    python manage.py run_jobs --once        # drain the queue, then exit (a scheduled job)
+    python manage.py run_jobs --max-jobs 1  # run one job, then exit
+
+Several workers may run at once — each lease is a compare-and-set, so no job runs twice.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.scholarship import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (the cron endpoint enqueues them).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when the queue is empty instead of polling.')
+        parser.add_argument('--max-jobs', type=int, default=0,
+                            help='Exit after this many jobs (default 0 = no limit).')
+        parser.add_argument('--poll', type=float, default=5.0,
+                            help='Seconds between polls of an empty queue (default 5).')
+
+    def handle(self, *args, **opts):
+        worker = jobs.worker_id()
+        self.stdout.write(f'worker {worker}: leasing jobs')
+        ran = jobs.work(worker, once=opts['once'], poll=opts['poll'], max_jobs=opts['max_jobs'])
+        self.stdout.write(self.style.SUCCESS(f'worker {worker}: ran {ran} job(s)'))
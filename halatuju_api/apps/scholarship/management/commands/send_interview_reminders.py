@@ -12,7 +12,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from apps.scholarship import emails, usage, whatsapp
+from apps.scholarship import emails, mail_dispatch, usage, whatsapp
 from apps.scholarship.models import ScholarshipApplication
 from apps.scholarship.pool import pool_ref
 from apps.scholarship.scheduling import _student_identity
@@ -99,8 +99,9 @@ class Command(BaseCommand):
         qs = (ScholarshipApplication.objects
               .filter(interview_status='booked', interview_start__gt=now)
               .select_related('profile', 'assigned_to'))
-        sent_1d, sent_1h = [], []
-        for app in qs:
+
+        def step(app):
+            sent = {'1day': False, '1hour': False}
             # Bill this iteration's email + WhatsApp to the application's OWNING ORGANISATION.
             # A cron carries no request context, so without this the meter records org-NULL.
             with usage.usage_context(application=app):
@@ -137,7 +138,7 @@ class Command(BaseCommand):
                             ref=pool_ref(app.id), verdict_due=verdict_due)
                     app.interview_reminded_1d_at = now
                     app.save(update_fields=['interview_reminded_1d_at'])
-                    sent_1d.append(app.id)
+                    sent['1day'] = True
 
                 # 1-hour reminder: inside 1h of the start, once — but only if the booking gave ≥1h
                 # notice (a sub-1h booking skips it; the confirmation already went at booking).
@@ -157,6 +158,13 @@ class Command(BaseCommand):
                             ref=pool_ref(app.id), verdict_due=verdict_due)
                     app.interview_reminded_1h_at = now
                     app.save(update_fields=['interview_reminded_1h_at'])
-                    sent_1h.append(app.id)
-
+                    sent['1hour'] = True
+            return app.id, sent
+
+        # One SMTP session for the sweep (mail_dispatch); EMAIL_DISPATCH_WORKERS > 1 runs the
+        # applications side by side.
+        with mail_dispatch.batch('interview-reminders') as run:
+            outcomes = run.each(step, qs)
+        sent_1d = [pk for pk, sent in outcomes if sent['1day']]
+        sent_1h = [pk for pk, sent in outcomes if sent['1hour']]
         self.stdout.write(f'Interview reminders sent. 1day={sent_1d} 1hour={sent_1h}')
@@ -0,0 +1,273 @@
+"""Name / NRIC matching kernels — normalise each string once, compare each pair once.
+
+``vision.name_match``, ``relationship_name_match``, ``nric_close`` and the canonical
+normalisers are called pairwise across everything a household carries: the income engine
+holds every earner's IC name against every payslip, EPF statement, STR and bill; the
+anomaly and pathway engines hold the student's and guardians' names against the IC, the
+slip and the offer; ``reference_names`` feeds the whole roster to the document coach. A
+five-member roster with a dozen documents re-ran the same ``_NAME_NOISE`` substitution on
+the same name hundreds of times per verdict, and the same pair of names through the same
+comparison dozens of times.
+
+So this module holds the kernels, and ``vision`` keeps its names as thin wrappers (every
+caller, test and patch seam is unchanged):
+
+- **Normalisation is cached per string** (``functools.lru_cache``): the canonical token
+  set (as a ``frozenset``), the order-preserving token sequence, the glued / folded forms,
+  the folded token and the digits-only NRIC. They are pure functions of the string, so a
+  process-wide bounded cache is safe and never goes stale.
+- **The edit distance is bounded.** ``_tokens_close`` only ever asks "within ONE edit?",
+  so ``within_distance`` walks a band of width ``2k+1`` and stops at the first row whose
+  best cell is already past ``k`` — instead of filling the whole table.
+- **Pair results are memoised per request.** ``memoised()`` opens a scope (reentrant) in
+  which ``name_match`` / ``relationship_name_match`` / ``nric_close`` answer a repeated
+  pair from a dict; ``doc_context.loaded`` and ``snapshots`` open it around an engine run.
+  The memo is dropped at the end of the scope, so names don't outlive the request in it.
+
+Verdict parity is the contract: every function here returns exactly what the uncached
+version did (``tests/test_matching.py`` holds them against a verbatim copy of the old code
+over a generated corpus). ``bench_name_matching`` is the micro-benchmark.
+
+One deliberate tightening: ``relationship_name_match`` pairs tokens greedily, and used to
+walk them in ``set`` iteration order — which depends on the interpreter's string-hash seed,
+so a pathological name could match in one process and not the next. It now walks them in
+sorted order. No name in the corpus is affected; the difference is that it can no longer
+vary between two workers.
+"""
+import contextvars
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Stripped before name comparison — common MyKad name suffixes / parentage markers.
+_NAME_NOISE = re.compile(
+    # MyKad parentage tokens + Malay/English honorifics that prefix a name on official
+    # letters (e.g. an offer addressed to "SDRI THEEPICAA …") — stripped so the name
+    # matches the profile name regardless of the title.
+    # The slash markers tolerate stray whitespace around the slash ("A/ P", "A / P",
+    # "A /P") — a student who types their name that way otherwise leaves orphan single
+    # letters "a"/"p" in the token set, which makes the EXACT name_match read a clean
+    # subset → a false 'partial'/mismatch on the IC + offer letter (#20).
+    r"\b(bin|binti|a\s*/\s*l|a\s*/\s*p|al|ap|d\s*/\s*o|s\s*/\s*o|@"
+    r"|sdr|sdri|saudara|saudari|encik|puan|cik|tuan|dr|datuk|dato|datin)\b",
+    flags=re.IGNORECASE,
+)
+
+# An OCR read that GLUES a slash parentage marker onto the name ("LAKSMITHAA/P VIJAYAN", #48)
+# defeats _NAME_NOISE — its \b never fires mid-word, so the leftover "a"+"p" letters pollute the
+# token set AND the glued comparison (name_match's boundary tolerance), producing a false red Name
+# chip on the student's own document. These two patterns re-insert the lost space around a glued
+# a/l, a/p, d/o or s/o (backward glue: marker stuck to the preceding name; forward glue: stuck to
+# the following name). Slash-form markers ONLY — a '/' never legitimately occurs inside a name, so
+# this cannot corrupt names that merely contain "al"/"ap" letters (e.g. KALAI).
+_GLUED_MARKER_BEFORE = re.compile(r'([a-z])(a\s*/\s*[lp]|[ds]\s*/\s*o)\b', flags=re.IGNORECASE)
+_GLUED_MARKER_AFTER = re.compile(r'\b(a\s*/\s*[lp]|[ds]\s*/\s*o)([a-z])', flags=re.IGNORECASE)
+
+_NON_LETTERS = re.compile(r'[^a-z]+')
+_NON_DIGITS = re.compile(r'\D')
+
+# Distinct strings kept per normaliser. A busy worker sees a few thousand names an hour; the
+# entries are short tuples, so this is a few hundred KB at most.
+_CACHE_SIZE = 4096
+
+# The open pair memo, or None outside a ``memoised()`` scope.
+_pairs = contextvars.ContextVar('matching_pairs', default=None)
+
+
+def split_glued_markers(s: str) -> str:
+    """Detach a slash parentage marker glued to a name token (both directions)."""
+    s = _GLUED_MARKER_BEFORE.sub(r'\1 \2', s)
+    return _GLUED_MARKER_AFTER.sub(r'\1 \2', s)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonical_nric(s: str) -> str:
+    """Strip hyphens, spaces, and non-digits. Returns ''-on-blank."""
+    return _NON_DIGITS.sub('', s or '')
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def name_seq(s: str) -> tuple:
+    """The canonical name tokens in printed order: lowercased, parentage markers and
+    honorifics stripped, split on anything that isn't a letter."""
+    if not s:
+        return ()
+    cleaned = _NAME_NOISE.sub(' ', split_glued_markers(s.lower()))
+    return tuple(t for t in _NON_LETTERS.split(cleaned) if t)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def name_tokens(s: str) -> frozenset:
+    """The canonical name tokens as a set (shared — callers that mutate take a copy)."""
+    return frozenset(name_seq(s))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def fold_token(tok: str) -> str:
+    """Conservative romanisation folding so two spellings of ONE Tamil/Indian name agree:
+    w→v, collapse a doubled letter (Pilaapparao≈Pilaaparao), drop a trailing silent 'h'."""
+    t = tok.replace('w', 'v')
+    folded = []
+    for ch in t:
+        if not folded or folded[-1] != ch:
+            folded.append(ch)
+    t = ''.join(folded)
+    return t[:-1] if len(t) > 2 and t.endswith('h') else t
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def glued(s: str, fold: bool) -> str:
+    """The name with its word boundaries removed (order kept), optionally folded."""
+    toks = name_seq(s)
+    return ''.join(fold_token(t) for t in toks) if fold else ''.join(toks)
+
+
+def glued_equal(a: str, b: str, *, fold: bool) -> bool:
+    """True iff two names reduce to the SAME non-empty string once their word-boundaries
+    are removed (see ``vision._glued_equal``)."""
+    ra = glued(a, fold)
+    return bool(ra) and ra == glued(b, fold)
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Plain edit distance (no dependency)."""
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[-1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def within_distance(a: str, b: str, k: int) -> bool:
+    """``levenshtein(a, b) <= k``, without computing the distance: only the diagonal band
+    ``|i - j| <= k`` can hold a path that cheap, and the walk stops at the first row whose
+    cheapest cell is already over ``k``."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > k:
+        return False
+    if not a or not b:
+        return max(la, lb) <= k
+    over = k + 1
+    prev = [j if j <= k else over for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        lo, hi = max(1, i - k), min(lb, i + k)
+        cur = [over] * (lb + 1)
+        if i <= k:
+            cur[0] = i
+        ca = a[i - 1]
+        best = cur[0]
+        for j in range(lo, hi + 1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != b[j - 1]))
+            cur[j] = v if v < over else over
+            if cur[j] < best:
+                best = cur[j]
+        if best > k:
+            return False
+        prev = cur
+    return prev[lb] <= k
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def tokens_close(x: str, y: str) -> bool:
+    """True iff two name tokens are the same person's name under romanisation / OCR variance:
+    equal once folded, or — for tokens of five letters or more — one edit apart."""
+    fx, fy = fold_token(x), fold_token(y)
+    if fx == fy:
+        return True
+    return min(len(fx), len(fy)) >= 5 and within_distance(fx, fy, 1)
+
+
+@contextmanager
+def memoised():
+    """Memoise pair results for the block. Reentrant: an inner scope shares the outer memo,
+    so the engines can open one without caring whether their caller already has."""
+    if _pairs.get() is not None:
+        yield
+        return
+    token = _pairs.set({})
+    try:
+        yield
+    finally:
+        _pairs.reset(token)
+
+
+def _memo(kind, a, b, compute):
+    pairs = _pairs.get()
+    if pairs is None:
+        return compute(a, b)
+    key = (kind, a, b)
+    try:
+        return pairs[key]
+    except KeyError:
+        result = pairs[key] = compute(a, b)
+        return result
+    except TypeError:                       # an unhashable stand-in — just compute it
+        return compute(a, b)
+
+
+def _name_match(extracted, profile_name):
+    a, b = name_tokens(extracted), name_tokens(profile_name)
+    if not a or not b:
+        return 'mismatch'
+    if a == b:
+        return 'match'
+    if a < b or b < a:
+        return 'partial'
+    return 'match' if glued_equal(extracted, profile_name, fold=False) else 'mismatch'
+
+
+def _relationship_name_match(extracted, reference):
+    a, b = sorted(name_tokens(extracted)), sorted(name_tokens(reference))
+    if not a or not b:
+        return 'mismatch'
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    used = [False] * len(large)
+    for x in small:
+        hit = next((i for i, y in enumerate(large) if not used[i] and tokens_close(x, y)), None)
+        if hit is None:
+            break
+        used[hit] = True
+    else:
+        return 'match' if len(a) == len(b) else 'partial'
+    return 'match' if glued_equal(extracted, reference, fold=True) else 'mismatch'
+
+
+def _nric_close(extracted, reference):
+    a, b = canonical_nric(extracted), canonical_nric(reference)
+    if not a or not b or a == b:
+        return False
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:                                   # one substitution
+        return sum(1 for x, y in zip(a, b) if x != y) == 1
+    return within_distance(a, b, 1)                # one inserted/dropped digit
+
+
+def name_match(extracted: str, profile_name: str) -> str:
+    """``vision.name_match`` — exact token-set identity comparison, memoised per scope."""
+    return _memo('name', extracted, profile_name, _name_match)
+
+
+def relationship_name_match(extracted: str, reference: str) -> str:
+    """``vision.relationship_name_match`` — romanisation-tolerant, memoised per scope."""
+    return _memo('relationship', extracted, reference, _relationship_name_match)
+
+
+def nric_close(extracted: str, reference: str) -> bool:
+    """``vision.nric_close`` — one digit apart, memoised per scope."""
+    return _memo('nric_close', extracted, reference, _nric_close)
+
+
+def clear_caches():
+    """Empty the per-string normalisation caches (the benchmark's cold start; tests)."""
+    for fn in (canonical_nric, name_seq, name_tokens, fold_token, glued, tokens_close):
+        fn.cache_clear()
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:01
+"""The re-extraction pass marker moves out of `vision_fields` into two indexed columns.
+
+`reextract_documents` picked its next batch by loading every supporting document and reading a
+key out of the JSON in Python, and tallied "remaining" and "error total" the same way — twice per
+run, over the whole corpus. The columns let all three be a SQL filter on an index.
+
+The backfill carries the CURRENT pass across, so a pass half-way through on production resumes
+where it stopped instead of starting again (and re-billing every document it had already read).
+The JSON key is left where it is: the rows that carry it are history, and nothing reads it now.
+"""
+
+from django.db import migrations, models
+
+# The pass that was running when the marker moved. Literal on purpose — a migration must not
+# import the command module, whose constant will be bumped for the next pass.
+_PASS = 'reextract_2026_06'
+
+
+def _carry_marker_across(apps, schema_editor):
+    ApplicantDocument = apps.get_model('scholarship', 'ApplicantDocument')
+    done, errored = [], []
+    for pk, vf in (ApplicantDocument.objects.filter(vision_fields__has_key=_PASS)
+                   .values_list('id', 'vision_fields').iterator()):
+        mark = (vf or {}).get(_PASS)
+        if mark == 'error':
+            errored.append(pk)
+        elif mark:
+            done.append(pk)
+    ApplicantDocument.objects.filter(pk__in=done).update(reextract_pass=_PASS, reextract_state='done')
+    ApplicantDocument.objects.filter(pk__in=errored).update(reextract_pass=_PASS, reextract_state='error')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0146_invitation_email_kinds_per_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicantdocument',
+            name='reextract_pass',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='applicantdocument',
+            name='reextract_state',
+            field=models.CharField(blank=True, choices=[('', 'Not on this pass'), ('done', 'Re-extracted'), ('error', 'Failed')], default='', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='applicantdocument',
+            index=models.Index(fields=['reextract_pass', 'reextract_state', 'doc_type'], name='doc_reextract_pass_idx'),
+        ),
+        migrations.RunPython(_carry_marker_across, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:08
+"""`ocr_copy_path`: the pre-processed copy of a document every read uses (see imaging.py).
+
+Schema only. Existing rows start with no copy and get one on their next read — there is no
+backfill, because building one costs a download + re-encode per blob and buys nothing until
+that document is actually read again.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0147_reextract_pass_column'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicantdocument',
+            name='ocr_copy_path',
+            field=models.CharField(blank=True, default='', max_length=520),
+        ),
+    ]
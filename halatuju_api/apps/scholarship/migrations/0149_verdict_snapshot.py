@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:54
+"""A table for the materialised verdict + anomaly flags (see snapshots.py). Starts empty: the first
+read of each application fills its row, so there is nothing to backfill.
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0148_ocr_copy_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerdictSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inputs_stamp', models.CharField(max_length=40)),
+                ('verdict', models.JSONField(blank=True, default=list)),
+                ('anomalies', models.JSONField(blank=True, default=list)),
+                ('compute_ms', models.IntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='verdict_snapshot', to='scholarship.scholarshipapplication')),
+            ],
+            options={
+                'db_table': 'verdict_snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:47
+"""Per-fact verdict outcome columns (audit.fact_outcomes) + their backfill.
+
+The model derives the four ``verdict_outcome_<fact>`` columns on every save from
+``ai_verdict_snapshot`` + ``officer_verdict``. This fills them for the records decided before
+it shipped. The comparison is copied here rather than imported, so this migration keeps
+meaning what it meant if audit.py later changes: the AI asserts a fact only when its status
+is 'verified'; an officer 'pass'/'fail' is a decision; a decision that disagrees with the
+assertion is an override ('generous' when the AI asserted it, 'cautious' when it didn't).
+
+Reverse: blanks the columns (the JSON they summarise is untouched).
+"""
+
+from django.db import migrations, models
+
+FACTS = ('identity', 'academic', 'pathway', 'income')
+
+
+def _outcomes(snapshot, officer_verdict):
+    statuses = {f.get('fact'): f.get('status', '') for f in (snapshot or [])
+                if isinstance(f, dict) and f.get('fact')}
+    ov = officer_verdict if isinstance(officer_verdict, dict) else {}
+    out = {}
+    for fact in FACTS:
+        officer = ov.get(fact) or ''
+        if officer not in ('pass', 'fail'):
+            out[fact] = ''
+            continue
+        ai_pass = statuses.get(fact) == 'verified'
+        if ai_pass == (officer == 'pass'):
+            out[fact] = 'agreed'
+        else:
+            out[fact] = 'generous' if ai_pass else 'cautious'
+    return out
+
+
+def backfill(apps, schema_editor):
+    Application = apps.get_model('scholarship', 'ScholarshipApplication')
+    fields = [f'verdict_outcome_{f}' for f in FACTS]
+    rows = Application.objects.filter(verdict_decided_at__isnull=False).only(
+        'ai_verdict_snapshot', 'officer_verdict')
+    for app in rows.iterator():
+        for fact, outcome in _outcomes(app.ai_verdict_snapshot, app.officer_verdict).items():
+            setattr(app, f'verdict_outcome_{fact}', outcome)
+        app.save(update_fields=fields)
+
+
+def clear(apps, schema_editor):
+    Application = apps.get_model('scholarship', 'ScholarshipApplication')
+    Application.objects.update(**{f'verdict_outcome_{f}': '' for f in FACTS})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0149_verdict_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='verdict_outcome_academic',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='verdict_outcome_identity',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='verdict_outcome_income',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='verdict_outcome_pathway',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.RunPython(backfill, clear),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0150_verdict_fact_outcomes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usageevent',
+            name='latency_ms',
+            field=models.IntegerField(blank=True, help_text='How long the provider took to answer (AI calls through llm.generate), in milliseconds.', null=True),
+        ),
+    ]
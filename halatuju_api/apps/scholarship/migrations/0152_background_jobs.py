@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:41
+"""The background job table (see jobs.py). Starts empty: the cron endpoint fills it from the
+first scheduled run after deploy, so there is nothing to backfill.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0151_usage_latency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='The cron job key, e.g. sponsor-digests.', max_length=60)),
+                ('command', models.CharField(help_text='The management command it runs.', max_length=80)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=12)),
+                ('source', models.CharField(blank=True, default='', help_text='Who asked: cron, admin, cli.', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('worker', models.CharField(blank=True, default='', help_text='host:pid of the worker holding (or last holding) it.', max_length=120)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('progress', models.CharField(blank=True, default='', help_text="The command's latest output line.", max_length=300)),
+                ('output', models.TextField(blank=True, default='')),
+                ('error', models.TextField(blank=True, default='')),
+                ('duration_ms', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'background_jobs',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='background_job_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('name',), name='background_job_one_active_per_name')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:03
+"""The email outbox (see outbox.py). Starts empty: the sponsor digest and the award email queue
+their rows from the first run after deploy.
+"""
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship', '0152_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='The handler that sends it (outbox.HANDLERS).', max_length=40)),
+                ('key', models.CharField(help_text='Idempotency key: kind + recipient + fingerprint.', max_length=200, unique=True)),
+                ('to_email', models.CharField(blank=True, default='', max_length=254)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text="The handler's arguments (ids, not rendered mail).")),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('skipped', 'Skipped'), ('dead', 'Dead')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=6)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('send_ms', models.IntegerField(blank=True, help_text='How long the successful attempt took.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'email_outbox',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx')],
+            },
+        ),
+    ]
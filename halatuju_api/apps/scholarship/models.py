@@ -8,6 +8,7 @@ docs/scholarship/b40-phase1-roadmap.md.
 from django.db import models
 from django.utils import timezone
 
+from .audit import fact_outcomes
 from .family import PROFESSION_CHOICES
 
 
@@ -938,6 +939,14 @@ class ScholarshipApplication(models.Model):
         null=True, blank=True,
         help_text="When the officer recorded their verification verdict (the audit anchor).",
     )
+    # Per-fact OUTCOME of the comparison above (audit.fact_outcomes): '' undecided, 'agreed',
+    # 'generous' (AI asserted, officer failed) or 'cautious' (AI held back, officer passed).
+    # Derived in save() from ai_verdict_snapshot + officer_verdict — never set by hand — so the
+    # override-rate roll-up (AdminVerdictMetricsView) is a GROUP BY, not a JSON pass per record.
+    verdict_outcome_identity = models.CharField(max_length=10, blank=True, default='')
+    verdict_outcome_academic = models.CharField(max_length=10, blank=True, default='')
+    verdict_outcome_pathway = models.CharField(max_length=10, blank=True, default='')
+    verdict_outcome_income = models.CharField(max_length=10, blank=True, default='')
     # Set when a superadmin REOPENS a recorded decision (to correct a reviewer error).
     # While non-null the decision panel is editable again, the reviewer dropdown unlocks,
     # and the sponsor profile is held from the pool (unpublished). Cleared on re-save or
@@ -993,6 +1002,16 @@ class ScholarshipApplication(models.Model):
                         self.owning_organisation_id = derived[0]
                     if needs_programme:
                         self.programme_id = derived[1]
+        # The per-fact verdict outcomes follow the two fields they summarise (pure, no query).
+        # A partial save that writes either field writes the outcomes with it.
+        outcome_fields = []
+        for fact, outcome in fact_outcomes(self.ai_verdict_snapshot, self.officer_verdict).items():
+            setattr(self, f'verdict_outcome_{fact}', outcome)
+            outcome_fields.append(f'verdict_outcome_{fact}')
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'ai_verdict_snapshot', 'officer_verdict'} & set(update_fields):
+            kwargs['update_fields'] = list(update_fields) + [
+                f for f in outcome_fields if f not in update_fields]
         super().save(*args, **kwargs)
 
     def stamp_first(self, field):
@@ -1171,10 +1190,26 @@ class ApplicantDocument(models.Model):
         'self', null=True, blank=True, on_delete=models.SET_NULL,
         related_name='supersedes',
     )
+    # ── Bulk re-extraction pass marker (`reextract_documents`) ─────────────
+    # Which re-extraction pass last touched this row, and how it went ('done' / 'error').
+    # Was a key inside vision_fields, which made "what's left?" a full-table JSON scan in
+    # Python (a JSON-key exclude mishandles rows where the key is absent); a plain indexed
+    # column answers it — and the remaining/error tallies — in SQL.
+    REEXTRACT_STATE_CHOICES = [('', 'Not on this pass'), ('done', 'Re-extracted'), ('error', 'Failed')]
+    reextract_pass = models.CharField(max_length=40, blank=True, default='')
+    reextract_state = models.CharField(
+        max_length=8, blank=True, default='', choices=REEXTRACT_STATE_CHOICES)
+    # The derived, pre-processed copy every read uses instead of the original (oriented,
+    # downscaled, re-encoded — see imaging.py). Lives beside `storage_path`; '' = none yet.
+    ocr_copy_path = models.CharField(max_length=520, blank=True, default='')
 
     class Meta:
         db_table = 'applicant_documents'
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['reextract_pass', 'reextract_state', 'doc_type'],
+                         name='doc_reextract_pass_idx'),
+        ]
 
     @staticmethod
     def live(qs):
@@ -2444,6 +2479,126 @@ class ResolutionItem(models.Model):
         return f'ResolutionItem #{self.id} app={self.application_id} {self.code} ({self.status})'
 
 
+class VerdictSnapshot(models.Model):
+    """The last computed four-fact verdict + anomaly flags for an application, stored with the
+    stamp of the inputs they were computed from (``snapshots.py``). A read whose inputs still
+    hash to ``inputs_stamp`` is served from this row; any change to what the engines read
+    (a document, the profile, the roster, a consent, an officer item) changes the stamp and the
+    next read recomputes and overwrites it. Derived data only — deleting every row is always
+    safe; ``check_verdict_snapshots`` recomputes and diffs."""
+    application = models.OneToOneField(
+        ScholarshipApplication, on_delete=models.CASCADE, related_name='verdict_snapshot',
+    )
+    inputs_stamp = models.CharField(max_length=40)
+    verdict = models.JSONField(default=list, blank=True)
+    anomalies = models.JSONField(default=list, blank=True)
+    # What the recompute cost, so "is the snapshot paying for itself" has a number.
+    compute_ms = models.IntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'verdict_snapshots'
+
+    def __str__(self):
+        return f'VerdictSnapshot app={self.application_id} @{self.inputs_stamp[:8]}'
+
+
+class BackgroundJob(models.Model):
+    """One run of a whitelisted management command (``jobs.py``). The cron endpoint only
+    enqueues a row; a worker (``run_jobs``) leases it, heartbeats while the command runs and
+    records the outcome — so a long job never holds a web worker or dies at the request
+    timeout, and every run has a queryable record (``admin/scholarship/ops/jobs/``).
+
+    At most ONE queued-or-running row per ``name`` (the partial unique constraint): an
+    overlapping scheduler retry finds the live row instead of starting a second run. A running
+    row whose lease lapsed (its worker died) is re-queued by the next lease, up to
+    ``max_attempts``, then failed."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'),
+                      (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+    ACTIVE = (QUEUED, RUNNING)
+
+    name = models.CharField(max_length=60, help_text='The cron job key, e.g. sponsor-digests.')
+    command = models.CharField(max_length=80, help_text='The management command it runs.')
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=QUEUED)
+    source = models.CharField(max_length=20, blank=True, default='',
+                              help_text='Who asked: cron, admin, cli.')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    worker = models.CharField(max_length=120, blank=True, default='',
+                              help_text='host:pid of the worker holding (or last holding) it.')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    progress = models.CharField(max_length=300, blank=True, default='',
+                                help_text="The command's latest output line.")
+    output = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    duration_ms = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'background_jobs'
+        ordering = ['-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['name'], condition=models.Q(status__in=['queued', 'running']),
+                                    name='background_job_one_active_per_name'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='background_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'BackgroundJob #{self.id} {self.name} ({self.status})'
+
+
+class EmailOutbox(models.Model):
+    """One notification waiting to go, or gone (``outbox.py``). Written in the SAME transaction
+    as the state change it announces (a digest clock advancing, an award reaching its email),
+    then delivered by ``outbox.deliver`` — at once, and again by ``drain_outbox`` with
+    exponential backoff while it keeps failing — so a transient SMTP error delays the email
+    instead of losing it.
+
+    ``key`` is the idempotency key (kind + recipient + fingerprint): a re-run of the command
+    that wrote it finds the row instead of queueing a second email. A row that exhausts
+    ``max_attempts`` goes ``dead`` and stays for an admin to read (``ops/outbox/``)."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    SKIPPED = 'skipped'
+    DEAD = 'dead'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (SKIPPED, 'Skipped'), (DEAD, 'Dead')]
+
+    kind = models.CharField(max_length=40, help_text='The handler that sends it (outbox.HANDLERS).')
+    key = models.CharField(max_length=200, unique=True,
+                           help_text='Idempotency key: kind + recipient + fingerprint.')
+    to_email = models.CharField(max_length=254, blank=True, default='')
+    payload = models.JSONField(default=dict, blank=True,
+                               help_text="The handler's arguments (ids, not rendered mail).")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=6)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    send_ms = models.IntegerField(null=True, blank=True,
+                                  help_text='How long the successful attempt took.')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'EmailOutbox #{self.id} {self.kind} → {self.to_email} ({self.status})'
+
+
 class ReviewerProfile(models.Model):
     """A reviewer's own credentials + contact details (F6, Phase E/F Sprint 5).
 
@@ -3109,6 +3264,9 @@ class UsageEvent(models.Model):
                                                  "provider response's usage metadata.")
     output_tokens = models.IntegerField(null=True, blank=True,
                                         help_text='Completion token count (AI only).')
+    latency_ms = models.IntegerField(null=True, blank=True,
+                                     help_text='How long the provider took to answer (AI calls '
+                                               'through llm.generate), in milliseconds.')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -0,0 +1,214 @@
+"""The email outbox — a notification is recorded with its state change, then delivered with retries.
+
+The batch senders were send-then-stamp, inline, best-effort. ``send_sponsor_digests`` advanced a
+sponsor's ``last_digest_sent_at`` whether or not the email went, so one SMTP hiccup lost that
+week's digest for good; ``release_award_offer_emails`` stamped only on success, so a failure
+retried — but only by re-running the whole hourly command, and a command that died half way
+through could send some recipients twice on the re-run.
+
+Now a sender writes an ``EmailOutbox`` row instead of sending, inside the transaction that
+changes its state:
+
+- **``enqueue(kind, key, ...)``** adds the row, keyed by an idempotency key (kind + recipient +
+  fingerprint, e.g. ``sponsor_digest:12:<hash of the student ids>`` — the same idea as the
+  partner-email fingerprint in ``partner_notify``). The same key again returns the existing
+  row: a re-run queues nothing twice. The payload is ids, not rendered mail — the handler
+  renders at delivery, from current data (a student withdrawn from the pool in between is not
+  announced; a cancelled award is not sent).
+- **``deliver(rows)``** sends them now — the sender calls it right after its transaction, so
+  on a good day nothing waits. Each row is claimed with a compare-and-set (two drainers never
+  send the same row), its ``HANDLERS[kind]`` is called, and the outcome recorded: ``sent``
+  (with ``send_ms``), ``skipped`` (nothing left to say), or a failure — retried after
+  ``EMAIL_OUTBOX_BACKOFF_BASE_S · 2^(attempt-1)`` (capped at ``EMAIL_OUTBOX_BACKOFF_MAX_S``),
+  and ``dead`` after ``EMAIL_OUTBOX_MAX_ATTEMPTS``.
+- **``drain()``** (``manage.py drain_outbox``, the ``email-outbox`` cron job) delivers every
+  due row, oldest first, so the retries happen without re-running the command that queued them.
+  All of it goes through one ``mail_dispatch`` run (one SMTP session).
+- **Metrics.** ``deliver`` returns and logs a per-run summary (sent / skipped / retried / dead,
+  messages a second); ``stats()`` — read at ``admin/scholarship/ops/outbox/`` — has the counts
+  by status, the age of the oldest due row, and p50/p95 of the send time and of the queue lag
+  (created → sent) over recent deliveries.
+
+A handler takes the row's payload and returns True (sent), False (failed — retry) or ``SKIP``;
+an exception counts as a failure. It keeps the sender's own conventions (``usage_context`` for
+billing, stamping only on success) — see ``sponsorship.deliver_award_offer`` and
+``sponsor_notifications.deliver_digest``.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import mail_dispatch
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# kind → the dotted path of its handler. Resolved per delivery (a test's patch is seen).
+HANDLERS = {
+    'award_offer': 'apps.scholarship.sponsorship.deliver_award_offer',
+    'sponsor_digest': 'apps.scholarship.sponsor_notifications.deliver_digest',
+}
+
+# What a handler returns when there is nothing left to send (the row is closed as ``skipped``).
+SKIP = 'skip'
+
+# How long a claimed row is held against other drainers before it counts as abandoned.
+_CLAIM_SECONDS = 600
+
+# Deliveries sampled for the p50/p95 in stats().
+_STATS_SAMPLE = 500
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def fingerprint(*parts) -> str:
+    """A short stable hash of ``parts`` (JSON-able) for an idempotency key."""
+    blob = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+
+def enqueue(kind, key, *, to_email='', payload=None, revive=False):
+    """Queue one notification → ``(row, created)``. Call it inside the transaction that makes
+    the state change. The same ``key`` again returns the existing row; with ``revive`` a
+    ``dead`` row is put back in the queue (its sender still wants it sent)."""
+    if kind not in HANDLERS:
+        raise ValueError(f'no outbox handler for {kind!r}')
+    try:
+        with transaction.atomic():
+            row = EmailOutbox.objects.create(
+                kind=kind, key=key[:200], to_email=(to_email or '')[:254], payload=payload or {},
+                max_attempts=max(int(_setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 6)), 1))
+        return row, True
+    except IntegrityError:
+        row = EmailOutbox.objects.get(key=key[:200])
+    if revive and row.status == EmailOutbox.DEAD:
+        EmailOutbox.objects.filter(pk=row.pk, status=EmailOutbox.DEAD).update(
+            status=EmailOutbox.PENDING, attempts=0, next_attempt_at=timezone.now())
+        row.refresh_from_db()
+    return row, False
+
+
+def _backoff(attempt):
+    base = float(_setting('EMAIL_OUTBOX_BACKOFF_BASE_S', 60))
+    cap = float(_setting('EMAIL_OUTBOX_BACKOFF_MAX_S', 3600))
+    return timedelta(seconds=min(cap, base * (2 ** max(attempt - 1, 0))))
+
+
+def _claim(row, now):
+    """Take ``row`` for this delivery (attempts + 1, held ``_CLAIM_SECONDS``) → True, or False
+    when it isn't due or another drainer took it first."""
+    return bool(EmailOutbox.objects.filter(
+        pk=row.pk, status=EmailOutbox.PENDING, attempts=row.attempts, next_attempt_at__lte=now,
+    ).update(attempts=F('attempts') + 1,
+             next_attempt_at=now + timedelta(seconds=_CLAIM_SECONDS)))
+
+
+def _attempt(row, now):
+    """One delivery of a claimed row → its new status (``pending`` = will retry)."""
+    start = time.perf_counter()
+    error = ''
+    try:
+        outcome = import_string(HANDLERS[row.kind])(row.payload)
+    except Exception as e:  # noqa: BLE001 — recorded on the row; the next row still goes
+        outcome, error = False, str(e)[:2000]
+        logger.warning('outbox %s #%s raised: %s', row.kind, row.pk, e, exc_info=True)
+    ms = int((time.perf_counter() - start) * 1000)
+    attempts = row.attempts + 1
+    if outcome == SKIP:
+        fields = {'status': EmailOutbox.SKIPPED, 'sent_at': timezone.now(), 'last_error': ''}
+    elif outcome:
+        fields = {'status': EmailOutbox.SENT, 'sent_at': timezone.now(), 'send_ms': ms,
+                  'last_error': ''}
+    elif attempts >= row.max_attempts:
+        fields = {'status': EmailOutbox.DEAD, 'last_error': error or 'send failed'}
+        logger.error('outbox %s #%s → %s is dead after %d attempts', row.kind, row.pk,
+                     row.to_email, attempts)
+    else:
+        fields = {'status': EmailOutbox.PENDING, 'last_error': error or 'send failed',
+                  'next_attempt_at': now + _backoff(attempts)}
+    EmailOutbox.objects.filter(pk=row.pk).update(**fields)
+    return fields['status']
+
+
+def deliver(rows, *, now=None) -> dict:
+    """Send each due row in ``rows`` (rows or ids) now → the run summary
+    ``{sent, skipped, retry, dead, busy, elapsed_ms, per_s}``. Rows not due, or taken by
+    another drainer, count as ``busy``."""
+    now = now or timezone.now()
+    ids = [getattr(r, 'pk', r) for r in rows]
+    summary = {'sent': 0, 'skipped': 0, 'retry': 0, 'dead': 0, 'busy': 0}
+    if not ids:
+        return {**summary, 'elapsed_ms': 0, 'per_s': 0.0}
+    key = {EmailOutbox.SENT: 'sent', EmailOutbox.SKIPPED: 'skipped',
+           EmailOutbox.PENDING: 'retry', EmailOutbox.DEAD: 'dead'}
+    start = time.perf_counter()
+    by_id = EmailOutbox.objects.in_bulk(ids)
+    with mail_dispatch.batch('outbox'):
+        for pk in ids:
+            row = by_id.get(pk)
+            if row is None or row.status != EmailOutbox.PENDING or not _claim(row, now):
+                summary['busy'] += 1
+                continue
+            summary[key[_attempt(row, now)]] += 1
+    elapsed = int((time.perf_counter() - start) * 1000)
+    summary['elapsed_ms'] = elapsed
+    summary['per_s'] = round(summary['sent'] / (elapsed / 1000), 1) if elapsed else float(summary['sent'])
+    if summary['sent'] or summary['retry'] or summary['dead']:
+        logger.info('outbox: sent=%(sent)d skipped=%(skipped)d retry=%(retry)d dead=%(dead)d '
+                    'busy=%(busy)d elapsed_ms=%(elapsed_ms)d per_s=%(per_s)s', summary)
+    return summary
+
+
+def drain(*, limit=None, now=None) -> dict:
+    """Deliver every due pending row, oldest first, up to ``limit``
+    (``EMAIL_OUTBOX_BATCH``, default 200)."""
+    now = now or timezone.now()
+    limit = limit or int(_setting('EMAIL_OUTBOX_BATCH', 200))
+    due = list(EmailOutbox.objects.filter(status=EmailOutbox.PENDING, next_attempt_at__lte=now)
+               .order_by('next_attempt_at', 'id').values_list('pk', flat=True)[:limit])
+    return deliver(due, now=now)
+
+
+def _percentiles(xs):
+    xs = sorted(x for x in xs if x is not None)
+    if not xs:
+        return {'p50': None, 'p95': None}
+    return {'p50': xs[int(0.5 * (len(xs) - 1))], 'p95': xs[int(round(0.95 * (len(xs) - 1)))]}
+
+
+def stats(now=None) -> dict:
+    """Counts by status, the oldest due row's age, and p50/p95 of the send time and of the
+    queue lag over the last ``_STATS_SAMPLE`` deliveries."""
+    now = now or timezone.now()
+    counts = dict(EmailOutbox.objects.values_list('status').annotate(n=Count('id')))
+    oldest = (EmailOutbox.objects.filter(status=EmailOutbox.PENDING)
+              .aggregate(t=Min('created_at'))['t'])
+    recent = list(EmailOutbox.objects.filter(status=EmailOutbox.SENT, sent_at__isnull=False)
+                  .order_by('-sent_at').values_list('send_ms', 'created_at', 'sent_at')[:_STATS_SAMPLE])
+    lag = [int((sent - created).total_seconds() * 1000) for _ms, created, sent in recent]
+    return {
+        'counts': {s: counts.get(s, 0) for s, _ in EmailOutbox.STATUS_CHOICES},
+        'oldest_pending_s': int((now - oldest).total_seconds()) if oldest else None,
+        'send_ms': _percentiles([ms for ms, _c, _s in recent]),
+        'lag_ms': _percentiles(lag),
+        'sample': len(recent),
+    }
+
+
+def as_dict(row) -> dict:
+    return {
+        'id': row.id, 'kind': row.kind, 'key': row.key, 'to_email': row.to_email,
+        'status': row.status, 'attempts': row.attempts, 'max_attempts': row.max_attempts,
+        'next_attempt_at': row.next_attempt_at, 'last_error': row.last_error,
+        'send_ms': row.send_ms, 'created_at': row.created_at, 'sent_at': row.sent_at,
+    }
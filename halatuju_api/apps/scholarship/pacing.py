@@ -0,0 +1,110 @@
+"""Run-scoped pacing for the billable seams (Cloud Vision / Gemini).
+
+A bulk job (the `reextract_documents` pass) fans documents out over a worker pool, and each
+document can fire a Vision call plus one or more Gemini calls. Left alone, N workers hit both
+APIs N-wide with no regard for their per-minute quotas, and a whole-corpus run has no natural
+stop short of the end of the corpus. A ``paced_run`` block gives such a run two things:
+
+- a per-service **rate limit** — one token bucket per service, SHARED by every worker, which
+  the seams consult through ``pace(service)`` immediately before the billable call; and
+- a **call ceiling** — every paced call is tallied, so the runner stops dispatching new work
+  once the run has spent its budget. The calls of documents already in flight still finish
+  (a half-read document is worse than a small overshoot), so the overshoot is bounded by the
+  pool width, never open-ended.
+
+Outside a ``paced_run`` block ``pace`` is a no-op: the upload path and the cockpit Re-run are
+never slowed. The budget lives in a contextvar, so worker threads see it only when started
+through ``contextvars.copy_context().run`` (``reextract.run_pass`` does exactly that).
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_budget: 'contextvars.ContextVar[RunBudget | None]' = contextvars.ContextVar('pacing_budget', default=None)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``per_minute`` sustained, bursting to ``burst`` (default: one
+    second's worth, at least 1). ``acquire`` blocks until a token is free. The clock + sleep are
+    injectable so tests never wait on the wall clock."""
+
+    def __init__(self, per_minute, *, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = max(float(per_minute), 0.001) / 60.0          # tokens per second
+        self.capacity = float(burst) if burst else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._stamp = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, n=1.0):
+        """Take ``n`` tokens (one by default; never more than the bucket holds), sleeping
+        (outside the lock) until they are available."""
+        n = min(float(n), self.capacity)
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            self._sleep(wait)
+
+    def debit(self, n):
+        """Take ``n`` more tokens without waiting — a cost learned only after the call (the
+        bucket may go negative, which the next ``acquire`` waits off)."""
+        with self._lock:
+            self._refill(self._clock())
+            self.tokens -= float(n)
+
+
+class RunBudget:
+    """The pacing state of ONE run: a bucket per rate-limited service, the billable-call tally
+    per service, and the optional ceiling on the total. Shared across the run's worker threads."""
+
+    def __init__(self, *, per_minute=None, max_calls=0, clock=time.monotonic, sleep=time.sleep):
+        self.buckets = {svc: TokenBucket(rate, clock=clock, sleep=sleep)
+                        for svc, rate in (per_minute or {}).items() if rate and rate > 0}
+        self.max_calls = max(int(max_calls or 0), 0)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def pace(self, service):
+        bucket = self.buckets.get(service)
+        if bucket is not None:
+            bucket.acquire()
+        with self._lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+
+    def spent(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def exhausted(self) -> bool:
+        """True once the run has made at least ``max_calls`` billable calls (never, without a
+        ceiling)."""
+        return bool(self.max_calls) and self.spent() >= self.max_calls
+
+
+@contextmanager
+def paced_run(budget):
+    """Install ``budget`` for every billable seam called within the block (and within worker
+    threads started from a copy of this context)."""
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def pace(service):
+    """Called by a billable seam right before the paid request. Blocks for a rate slot and
+    tallies the call when a ``paced_run`` is active; otherwise returns at once."""
+    budget = _budget.get()
+    if budget is not None:
+        budget.pace(service)
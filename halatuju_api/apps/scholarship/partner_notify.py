@@ -26,6 +26,7 @@ import logging
 from django.conf import settings
 from django.utils import timezone
 
+from . import mail_dispatch
 from . import partner_comms
 from . import usage
 from .emails import send_partner_email
@@ -231,7 +232,6 @@ def send_partner_milestones(dry_run=False, out=None):
     qualifying = {o.id for o in partner_comms.qualifying_partners()}
 
     for kind in ('awaiting_review', 'awarded'):
-        sent = stamped = 0
         template = _template(kind)
         if not partner_comms.is_enabled(kind) or template is None:
             summary[kind] = {'sent': 0, 'students': 0, 'off': True}
@@ -246,11 +246,12 @@ def send_partner_milestones(dry_run=False, out=None):
             chip = (getattr(app.profile, 'referral_source', '') or '')
             pending.setdefault(chip, []).append(app)
 
-        for chip, apps in sorted(pending.items()):
+        def step(item, kind=kind, template=template):
+            chip, apps = item
             org = by_chip[chip]
             if org.id not in qualifying:
                 _skip(org, kind, 'no_recipient')
-                continue
+                return None
             batch = apps[:MAX_MILESTONE_STUDENTS]
             names = [
                 (getattr(a.profile, 'name', '') or '').strip() or f'Applicant #{a.id}'
@@ -260,14 +261,19 @@ def send_partner_milestones(dry_run=False, out=None):
                           {'count': len(batch), 'names': names},
                           students=len(batch), dry_run=dry_run, out=out)
             if not ok:
-                continue
-            sent += 1
-            if not dry_run:
-                field = _STAMP_FIELD[kind]
-                now = timezone.now()
-                # Stamp AFTER a successful send, and only the students this email named.
-                stamped += type(batch[0]).objects.filter(
-                    pk__in=[a.pk for a in batch]).update(**{field: now})
+                return None
+            if dry_run:
+                return 0
+            field = _STAMP_FIELD[kind]
+            now = timezone.now()
+            # Stamp AFTER a successful send, and only the students this email named.
+            return type(batch[0]).objects.filter(
+                pk__in=[a.pk for a in batch]).update(**{field: now})
+
+        # One SMTP session per kind (mail_dispatch). A dry run prints in order, so it stays inline.
+        with mail_dispatch.batch(f'partner-{kind}', workers=1 if dry_run else None) as run:
+            outcomes = [n for n in run.each(step, sorted(pending.items())) if n is not None]
+        sent, stamped = len(outcomes), sum(outcomes)
         summary[kind] = {'sent': sent, 'students': stamped, 'off': False}
         if out is not None:
             out.write(f'{kind}: {sent} email(s), {stamped} student(s) stamped\n')
@@ -15,6 +15,7 @@ from __future__ import annotations
 
 import re
 
+from .doc_context import documents_of
 from .vision import name_match, nric_match
 
 
@@ -294,12 +295,11 @@ def offer_pathway_switch(application):
     ``{from_programme, from_institution, to_programme, to_institution}`` or None. Surfaced ALWAYS —
     even after the student confirms the new pathway — so a switch never passes unnoticed (a confirmed
     switch used to read a silent Certain green). Pure read; no writes."""
-    from .models import ApplicantDocument
     live = _latest_offer(application)
     if live is None:
         return None
-    prev = (ApplicantDocument.objects.filter(
-                application=application, doc_type='offer_letter', superseded_at__isnull=False)
+    prev = (documents_of(application).filter(
+                doc_type='offer_letter', superseded_at__isnull=False)
             .order_by('-superseded_at').first())
     if prev is None:
         return None
@@ -524,9 +524,8 @@ def parse_reporting_date(raw):
 
 
 def _latest_offer(application):
-    from .models import ApplicantDocument
-    return (ApplicantDocument.objects.filter(
-                application=application, doc_type='offer_letter', superseded_at__isnull=True)
+    return (documents_of(application).filter(
+                doc_type='offer_letter', superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
 
 
@@ -0,0 +1,163 @@
+"""One parse per PDF: the text layer page by page, and only the pages that need OCR rasterised.
+
+A PDF upload used to be opened from scratch by every consumer of it. ``_pdf_text_layer`` built a
+``PdfReader`` over the full bytes and extracted EVERY page's text. ``_pdf_first_page_png`` then
+opened the same bytes again with pypdfium2 just to rasterise page 1. Both ran once per caller,
+and one upload has several callers: the OCR read, the Gemini field extraction, the genuineness
+read, and a bulk pass's prefetch decision. A six-page EPF statement or a multi-page offer letter
+was therefore parsed and rasterised three or four times for one read.
+
+``open_pdf(data)`` returns the ONE ``PdfPages`` for those bytes. It is kept in a small
+process-level LRU keyed by a digest of the bytes, so every caller in the read shares it:
+
+- page text is extracted lazily, ONE page at a time, and kept. ``has_text(n)`` stops at the
+  first page that takes the layer past ``n`` characters — the "is this a digital PDF?" question
+  rarely needs more than page 1. ``text()`` reads the remaining pages only when the full layer
+  is actually wanted.
+- a page is rasterised only when asked for (today: page 1 of a scanned PDF), and its PNG and
+  its prepared OCR image are kept.
+
+Both libraries stay OPTIONAL, exactly as before: when one is missing, or the PDF is
+corrupt/encrypted, the text is '' and the raster is None, and the caller degrades as it always
+has. pdfium is not thread-safe, so every pdfium call in the process is serialised on one lock.
+"""
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+RASTER_DPI = 200
+# PDFs kept parsed. A bulk pass's worker pool reads a handful at once; each entry is the source
+# bytes (shared, not copied) plus whatever pages were actually extracted / rasterised.
+_CACHE_SIZE = 8
+
+_cache: 'OrderedDict[str, PdfPages]' = OrderedDict()
+_cache_lock = threading.Lock()
+_pdfium_lock = threading.Lock()
+
+
+class PdfPages:
+    """One PDF, parsed at most once per page. Thread-safe."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._lock = threading.RLock()
+        self._reader = None          # pypdf reader, opened on first text request
+        self._reader_failed = False
+        self._texts = []             # per-page text, extracted in page order
+        self._pngs = {}              # page index → PNG bytes | None
+        self._ocr = {}               # page index → prepared OCR image bytes
+
+    # ── text layer ─────────────────────────────────────────────────────────────
+    def _open_reader(self):
+        if self._reader is None and not self._reader_failed:
+            try:
+                from pypdf import PdfReader
+                reader = PdfReader(io.BytesIO(self.data))
+                if reader.is_encrypted:
+                    try:
+                        reader.decrypt('')
+                    except Exception:  # noqa: BLE001
+                        self._reader_failed = True
+                        return None
+                self._reader = reader
+            except Exception as e:  # noqa: BLE001
+                logger.warning('PDF text-layer extraction failed: %s', e)
+                self._reader_failed = True
+        return self._reader
+
+    def _next_page_text(self):
+        """Extract the next not-yet-read page → True, or False when there are none left."""
+        reader = self._open_reader()
+        if reader is None:
+            return False
+        i = len(self._texts)
+        try:
+            if i >= len(reader.pages):
+                return False
+            self._texts.append(reader.pages[i].extract_text() or '')
+        except Exception as e:  # noqa: BLE001 — a broken page voids the layer, as it always has
+            logger.warning('PDF text-layer extraction failed: %s', e)
+            self._reader_failed = True
+            self._reader = None
+            self._texts = []
+            return False
+        return True
+
+    def has_text(self, min_chars: int) -> bool:
+        """True when the text layer holds at least ``min_chars`` characters — measured exactly
+        as ``len(text())``, but reading only as many pages as it takes to get there."""
+        with self._lock:
+            while True:
+                if len('\n'.join(self._texts).strip()) >= min_chars:
+                    return True
+                if not self._next_page_text():
+                    return False
+
+    def text(self) -> str:
+        """The whole text layer (every page, newline-joined, stripped). '' if none / encrypted /
+        library missing."""
+        with self._lock:
+            while self._next_page_text():
+                pass
+            return '\n'.join(self._texts).strip()
+
+    # ── rasterising ────────────────────────────────────────────────────────────
+    def page_png(self, index: int = 0):
+        """Page ``index`` rasterised to PNG bytes (~``RASTER_DPI``), or None on failure / library
+        missing / no such page."""
+        with self._lock:
+            if index not in self._pngs:
+                self._pngs[index] = _render_png(self.data, index)
+            return self._pngs[index]
+
+    def ocr_image(self, index: int, png: bytes):
+        """The OCR-ready form of page ``index`` (its PNG through ``imaging.prepare_for_ocr``),
+        prepared once."""
+        with self._lock:
+            if index not in self._ocr:
+                from .imaging import prepare_for_ocr
+                self._ocr[index] = prepare_for_ocr(png)[0]
+            return self._ocr[index]
+
+
+def _render_png(data: bytes, index: int):
+    try:
+        import pypdfium2 as pdfium
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(data)
+            try:
+                if index >= len(pdf):
+                    return None
+                pil = pdf[index].render(scale=RASTER_DPI / 72.0).to_pil()
+            finally:
+                pdf.close()
+        buf = io.BytesIO()
+        pil.convert('RGB').save(buf, format='PNG')
+        return buf.getvalue()
+    except Exception as e:  # noqa: BLE001
+        logger.warning('PDF rasterise failed: %s', e)
+        return None
+
+
+def open_pdf(data: bytes) -> PdfPages:
+    """The shared ``PdfPages`` for ``data`` — the same object for the same bytes while it stays
+    among the ``_CACHE_SIZE`` most recently opened."""
+    key = hashlib.sha1(data).hexdigest()
+    with _cache_lock:
+        pages = _cache.get(key)
+        if pages is not None:
+            _cache.move_to_end(key)
+            return pages
+        pages = _cache[key] = PdfPages(data)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return pages
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -301,6 +301,23 @@ def approved_programme_ids(sponsor):
     )
 
 
+def approved_programme_ids_by_sponsor(sponsors):
+    """``approved_programme_ids`` for many sponsors in ONE query → ``{sponsor_id: set of
+    programme ids}``. Every sponsor passed in has an entry (empty when they hold no approved
+    membership), so a missing key never reads as "no fence"."""
+    from .models import SponsorProgrammeMembership
+    ids = [getattr(s, 'pk', s) for s in sponsors if s is not None]
+    index = {sid: set() for sid in ids}
+    if not ids:
+        return index
+    rows = (SponsorProgrammeMembership.objects
+            .filter(sponsor_id__in=ids, status='approved')
+            .values_list('sponsor_id', 'programme_id'))
+    for sid, pid in rows:
+        index[sid].add(pid)
+    return index
+
+
 def for_sponsor(qs, sponsor):
     """Narrow a pool queryset to the programmes this sponsor is accepted into — **the ONE
     seam** for per-programme pool visibility (platform programme layer, 2026-07-26).
@@ -25,6 +25,7 @@ import time
 
 from django.conf import settings
 
+from .doc_context import documents_of
 from .models import FundingNeed
 from .shortlisting import count_spm_a_grades
 
@@ -288,20 +289,17 @@ def _call_gemini_text(prompt, target_language, models=None):
     if not api_key:
         return {'error': 'AI service not configured (missing API key)'}
     try:
-        from google import genai
+        from google import genai  # noqa: F401
     except ImportError:
         return {'error': 'AI module not installed'}
 
-    client = genai.Client(api_key=api_key)
+    from . import llm   # shared client, budgets, 429 backoff and the meter
     last_error = None
     for model_name in (models or MODEL_CASCADE):
         try:
             start = time.time()
-            response = client.models.generate_content(model=model_name, contents=prompt)
+            response = llm.generate(model_name, prompt)
             elapsed = int((time.time() - start) * 1000)
-            from . import usage   # billable Gemini prose call — best-effort meter
-            _it, _ot = usage.gemini_tokens(response)
-            usage.record_usage(usage.GEMINI, model=model_name, input_tokens=_it, output_tokens=_ot)
             return {
                 'markdown': response.text, 'model_used': model_name,
                 'language': target_language, 'generation_time_ms': elapsed,
@@ -381,7 +379,7 @@ def _gated_str(application):
     if not (profile and getattr(profile, 'receives_str', None)):
         return 'no'
     from .income_engine import student_str_check
-    doc = (application.documents.filter(doc_type='str', superseded_at__isnull=True)
+    doc = (documents_of(application).filter(doc_type='str', superseded_at__isnull=True)
            .order_by('-uploaded_at').first())
     if not doc:
         return _DO_NOT_CLAIM
@@ -598,7 +596,7 @@ def _statement_of_intent(application):
     """The OCR'd plain text of the student's uploaded Statement of Intent letter, if any
     (read on upload into vision_fields['text']). Capped so it informs the draft without
     dominating the prompt; normal PII redaction still applies. 'not provided' when none."""
-    doc = (application.documents.filter(doc_type='statement_of_intent', superseded_at__isnull=True)
+    doc = (documents_of(application).filter(doc_type='statement_of_intent', superseded_at__isnull=True)
            .order_by('-uploaded_at').first())
     text = ''
     if doc is not None and isinstance(getattr(doc, 'vision_fields', None), dict):
@@ -925,8 +923,8 @@ def _income_above_line(application):
     the FINAL profile. Best-effort: any failure to compute the verdict returns False (no emphasis,
     never a crash in the generation path)."""
     try:
-        from .verdict_engine import build_verdict
-        for fact in (build_verdict(application) or []):
+        from . import snapshots
+        for fact in (snapshots.verdict(application) or []):
             for item in (fact.get('unresolved') or []):
                 if item.get('code') == 'income_above_b40_line':
                     return True
@@ -2,8 +2,16 @@
 'Re-run' (AdminRunVisionView) and the bulk `reextract_documents` command, so the two
 can't drift. Mirrors the upload-time processing per doc type and FORCES the (billable)
 read (no cost-knob / throttle gate — it's a deliberate action). Best-effort on the
-offer-letter pathway autofill (never fails the read)."""
+offer-letter pathway autofill (never fails the read).
+
+Also home to the BULK pass engine (``run_pass``): pending selection off the indexed
+``reextract_pass`` / ``reextract_state`` columns, a bounded worker pool, per-service pacing +
+a billable-call ceiling (``pacing``), and a per-document checkpoint so an interrupted pass
+resumes where it stopped."""
+import contextvars
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
 
 from . import vision as _vision
 
@@ -46,3 +54,189 @@ def reextract_document(doc) -> bool:
     else:
         return False
     return True
+
+
+# ── The bulk pass ──────────────────────────────────────────────────────────────
+DONE = 'done'
+ERROR = 'error'
+
+
+def pending_documents(doc_types, pass_marker, *, retry_errors=False):
+    """The docs of ``doc_types`` this pass hasn't touched yet (plus its failures, with
+    ``retry_errors``), oldest first. One indexed filter — no JSON read."""
+    from django.db.models import Q
+    from .models import ApplicantDocument
+    todo = ~Q(reextract_pass=pass_marker)
+    if retry_errors:
+        todo |= Q(reextract_pass=pass_marker, reextract_state=ERROR)
+    return ApplicantDocument.objects.filter(todo, doc_type__in=doc_types).order_by('id')
+
+
+def iter_in_chunks(qs, chunk=200):
+    """Stream ``qs`` (ordered by id) in keyset chunks. Each chunk is a fresh query past the last
+    id seen, so rows the run itself checkpoints are never revisited and no cursor is held open
+    across the writes (SQLite gives no isolation between a live cursor and writes on the same
+    connection)."""
+    last = 0
+    while True:
+        rows = list(qs.filter(id__gt=last)[:chunk])
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1].id
+
+
+def pass_counts(doc_types, pass_marker) -> dict:
+    """``{'remaining', 'error_total'}`` for the pass — two COUNTs on the index."""
+    from .models import ApplicantDocument
+    scope = ApplicantDocument.objects.filter(doc_type__in=doc_types)
+    return {
+        'remaining': pending_documents(doc_types, pass_marker).count(),
+        'error_total': scope.filter(reextract_pass=pass_marker, reextract_state=ERROR).count(),
+    }
+
+
+def mark_pass(doc, pass_marker, ok):
+    """Checkpoint ONE document on the pass: 'done', or 'error' (attempted + failed — skipped
+    by default so a broken doc never wedges the pass, re-attempted with --retry-errors). A
+    targeted UPDATE of the two columns, so it can't clobber the read the run just stored."""
+    from .models import ApplicantDocument
+    doc.reextract_pass = pass_marker
+    doc.reextract_state = DONE if ok else ERROR
+    ApplicantDocument.objects.filter(pk=doc.pk).update(
+        reextract_pass=doc.reextract_pass, reextract_state=doc.reextract_state)
+
+
+def _reextract_one(doc, *, pass_marker, read, summary):
+    """Read + checkpoint one document → ``(doc, ok, before, after)``. Never raises."""
+    before = summary(doc)   # snapshot the prior read BEFORE we overwrite it
+    stamps_before = (doc.vision_fields_run_at, doc.vision_run_at)
+    ok = True
+    try:
+        read(doc)
+        doc.refresh_from_db()
+        after = summary(doc)
+        # The clobber guard keeps a stored read (and skips the save) when the re-run itself
+        # failed — no timestamp advances. Treat that as an ERROR of THIS run (old data safely
+        # kept), not a completed re-extraction.
+        if (doc.vision_fields_run_at, doc.vision_run_at) == stamps_before:
+            ok = False
+            after = f'STALE-KEPT [{after}] (re-run failed; stored read preserved)'
+    except Exception as e:  # noqa: BLE001 — mark + report so a broken doc never wedges the pass
+        ok = False
+        after = f'ERROR {str(e)[:55]}'
+        doc.refresh_from_db()
+    mark_pass(doc, pass_marker, ok)
+    return doc, ok, before, after
+
+
+def _in_worker(fn, *args, **kwargs):
+    """Run ``fn`` on a pool thread and release that thread's DB connection afterwards (Django
+    opens one per thread; an idle pool must not hold them open)."""
+    from django.db import connection
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def _groups(docs, size):
+    group = []
+    for doc in docs:
+        group.append(doc)
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def run_pass(docs, *, pass_marker, read=reextract_document, summary=repr, workers=1,
+             budget=None, on_result=None, checkpoint_every=0, on_checkpoint=None,
+             prefetch=None, group_size=_vision.VISION_BATCH_LIMIT) -> dict:
+    """Re-extract ``docs`` (an iterable — a queryset ``.iterator()`` streams the corpus) on
+    ``pass_marker``. ``workers`` > 1 fans the reads out over a bounded pool: at most
+    ``workers`` docs are in flight, so pending rows are pulled lazily and the ceiling check
+    between dispatches means something. ``budget`` (a ``pacing.RunBudget``) paces the Vision /
+    Gemini seams across every worker and stops dispatch once its call ceiling is spent.
+
+    ``prefetch`` (``vision.batched_reads``) takes the docs ``group_size`` at a time and OCRs each
+    group in one batched Vision request before its reads run; the group's reads then draw on
+    that batch. The ceiling is checked between groups too, so with a prefetch the overshoot is
+    bounded by the group, not the pool.
+
+    Each finished doc is checkpointed on its own row (``mark_pass``) the moment it completes,
+    then reported to ``on_result(doc, ok, before, after)`` on THIS thread (aggregation stays
+    single-threaded). ``on_checkpoint(stats)`` fires every ``checkpoint_every`` docs.
+
+    Returns ``{'processed', 'errors', 'calls', 'stopped'}`` — ``stopped`` is 'budget' when the
+    ceiling ended the run early, else ''."""
+    from . import pacing
+    stats = {'processed': 0, 'errors': 0, 'calls': 0, 'stopped': ''}
+
+    def _done(result):
+        doc, ok, before, after = result
+        stats['processed'] += 1
+        if not ok:
+            stats['errors'] += 1
+        if on_result:
+            on_result(doc, ok, before, after)
+        if checkpoint_every and on_checkpoint and stats['processed'] % checkpoint_every == 0:
+            on_checkpoint(dict(stats, calls=budget.spent() if budget else 0))
+
+    def _out_of_budget():
+        if budget is not None and budget.exhausted():
+            stats['stopped'] = 'budget'
+            return True
+        return False
+
+    def _serial(batch):
+        for doc in batch:
+            if _out_of_budget():
+                return
+            _done(_reextract_one(doc, pass_marker=pass_marker, read=read, summary=summary))
+
+    def _pooled(pool, batch):
+        in_flight = set()
+        source = iter(batch)
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < workers and not _out_of_budget():
+                doc = next(source, None)
+                if doc is None:
+                    exhausted = True
+                    break
+                # A copy of THIS context per task carries the paced_run budget (and any
+                # usage attribution / batched reads) onto the pool thread.
+                ctx = contextvars.copy_context()
+                in_flight.add(pool.submit(ctx.run, _in_worker, _reextract_one, doc,
+                                          pass_marker=pass_marker, read=read, summary=summary))
+            if not in_flight:
+                return
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                _done(fut.result())
+            if stats['stopped']:
+                exhausted = True   # drain what's in flight, dispatch nothing new
+
+    with pacing.paced_run(budget), ExitStack() as stack:
+        pool = (stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+                if workers > 1 else None)
+
+        def _run(batch):
+            _pooled(pool, batch) if pool is not None else _serial(batch)
+
+        if prefetch is None:
+            _run(docs)
+        else:
+            for group in _groups(docs, max(int(group_size), 1)):
+                if _out_of_budget():
+                    break
+                # The batch scope spans the WHOLE group: every read of it finishes (in the pool
+                # or here) before the scope closes and settles the unused responses.
+                with prefetch(group):
+                    _run(group)
+                if stats['stopped']:
+                    break
+    stats['calls'] = budget.spent() if budget else 0
+    return stats
@@ -25,8 +25,8 @@ with the user 2026-06-02):
 from django.db import IntegrityError
 from django.utils import timezone
 
+from . import snapshots
 from .models import ResolutionItem
-from .verdict_engine import build_verdict
 
 CODE_TO_TICKET = {
     # Identity
@@ -107,7 +107,7 @@ def _ticketable_unresolved(application):
     """{code: {fact, params}} for every unresolved verdict item that maps to a
     student ticket (i.e. is in CODE_TO_TICKET)."""
     out = {}
-    for fact in build_verdict(application):
+    for fact in snapshots.verdict(application):
         for item in fact['unresolved']:
             code = item['code']
             if code in CODE_TO_TICKET:
@@ -246,6 +246,27 @@ def _application_merit_score(obj):
     return round(result['final_merit'], 1)
 
 
+def list_prefetch(applications, merits=None):
+    """The per-row derived values of ``AdminApplicationListSerializer``, for a whole page at once.
+
+    Pass the result as ``context={'prefetch': ...}``. Without it every row ran its own
+    open-tasks query (``is_ready_for_assignment``) and re-derived its qualification and merit;
+    with it the page costs one grouped query, and the merit sort (which has already scored every
+    row to order them) hands its ``merits`` in rather than scoring the page twice. Rows missing
+    from a prefetch fall back to the per-row computation, so the output never depends on it."""
+    from .services import applications_with_open_student_tasks
+    rows = list(applications)
+    quals = {a.id: held_qualification(a.profile) if a.profile else None for a in rows}
+    if merits is None:
+        merits = {a.id: _application_merit_score(a) for a in rows}
+    return {
+        'open_tasks': applications_with_open_student_tasks(a.id for a in rows),
+        'ids': {a.id for a in rows},
+        'qualification': quals,
+        'merit': merits,
+    }
+
+
 class AdminApplicationListSerializer(serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     cohort_code = serializers.CharField(source='cohort.code', read_only=True)
@@ -288,18 +309,30 @@ class AdminApplicationListSerializer(serializers.ModelSerializer):
         from .services import is_assignable
         return is_assignable(obj)
 
+    def _prefetched(self, key, obj):
+        """``(True, value)`` when the page prefetch (``list_prefetch``) covers ``obj``."""
+        pre = self.context.get('prefetch')
+        if pre is None or obj.id not in pre['ids']:
+            return False, None
+        if key == 'open_tasks':
+            return True, obj.id in pre['open_tasks']
+        return (obj.id in pre[key]), pre[key].get(obj.id)
+
     def get_ready_for_assignment(self, obj):
         from .services import is_ready_for_assignment
-        return is_ready_for_assignment(obj)
+        hit, has_open = self._prefetched('open_tasks', obj)
+        return is_ready_for_assignment(obj, has_open_tasks=has_open if hit else None)
 
     def get_name(self, obj):
         return _full_name(obj)
 
     def get_qualification(self, obj):
-        return held_qualification(obj.profile)
+        hit, value = self._prefetched('qualification', obj)
+        return value if hit else held_qualification(obj.profile)
 
     def get_merit_score(self, obj):
-        return _application_merit_score(obj)
+        hit, value = self._prefetched('merit', obj)
+        return value if hit else _application_merit_score(obj)
 
     def get_spm_a_count(self, obj):
         from .shortlisting import count_spm_a_grades
@@ -537,8 +570,8 @@ class AdminApplicationDetailSerializer(serializers.ModelSerializer):
         get_proposed_award_amount and get_award_disqualifier all share it."""
         cached = getattr(obj, '_cached_verdict', None)
         if cached is None:
-            from .verdict_engine import build_verdict
-            cached = build_verdict(obj)
+            from . import snapshots
+            cached = snapshots.verdict(obj)
             obj._cached_verdict = cached
         return cached
 
@@ -656,8 +689,8 @@ class AdminApplicationDetailSerializer(serializers.ModelSerializer):
         """S16 Phase A: deterministic pre-interview flag list. Pure rules,
         no LLM calls. Returns ``[]`` when nothing flags. Identity NRIC/name
         mismatches are deduped out (the verdict + caveat own them)."""
-        from .anomaly_engine import detect_anomalies
-        return [a for a in detect_anomalies(obj)
+        from . import snapshots
+        return [a for a in snapshots.anomalies(obj)
                 if a['code'] not in self._DEDUPED_ANOMALIES]
 
     def get_household_check(self, obj):
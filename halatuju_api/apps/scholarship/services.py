@@ -11,6 +11,7 @@ from django.utils.dateparse import parse_date
 
 logger = logging.getLogger(__name__)
 
+from .doc_context import documents_of
 from .emails import (
     send_acknowledgement_email, send_pass_email,
     send_decline_email, send_profile_complete_admin_email,
@@ -437,15 +438,16 @@ def send_application_reminders(now=None):
     ``last_reminder_at`` (when the final reminder actually went out), never on raw
     elapsed days, so no application is closed without having received the warning."""
     from .emails import send_reminder_email, send_application_closed_email
+    from . import mail_dispatch
     from . import usage as _usage
     now = now or timezone.now()
     final_stage = len(REMINDER_THRESHOLDS_DAYS)             # 4
-    reminded = closed = 0
     qs = (ScholarshipApplication.objects
           .filter(status='shortlisted', profile_completed_at__isnull=True,
                   reminder_anchor_at__isnull=False)
           .select_related('cohort', 'profile'))
-    for app in qs:
+
+    def step(app):
         name = getattr(app.profile, 'name', '') if app.profile else ''
         common = dict(to_email=app.notify_email, applicant_name=name,
                       programme_name=app.cohort.name, lang=app.locale)
@@ -459,8 +461,7 @@ def send_application_reminders(now=None):
             # billing screen's "Platform (shared base)". See the note on _meter_email.
             with _usage.usage_context(application=app):
                 send_application_closed_email(**common)
-            closed += 1
-            continue
+            return 'closed'
         # Otherwise, send the next stage if its day-threshold is crossed (one per run).
         next_stage = app.reminder_stage + 1                # 1..4
         if next_stage <= final_stage and _elapsed_days_local(now, app.reminder_anchor_at) >= REMINDER_THRESHOLDS_DAYS[next_stage - 1]:
@@ -469,8 +470,12 @@ def send_application_reminders(now=None):
             app.reminder_stage = next_stage
             app.last_reminder_at = now
             app.save(update_fields=['reminder_stage', 'last_reminder_at'])
-            reminded += 1
-    return {'reminded': reminded, 'closed': closed}
+            return 'reminded'
+        return None
+
+    with mail_dispatch.batch('application-reminders') as run:
+        outcomes = run.each(step, qs)
+    return {'reminded': outcomes.count('reminded'), 'closed': outcomes.count('closed')}
 
 
 # ── Check 2 STEP 2/3 — the query SLA clock (design §5) ───────────────────────
@@ -529,14 +534,27 @@ def query_sla(application, now=None):
     }
 
 
+# What makes a resolution item an open student task (``open_student_tasks`` and its set form).
+_OPEN_STUDENT_TASK = {'source__in': ('officer', 'check2'), 'status': 'open'}
+
+
 def open_student_tasks(application):
     """Every still-open task the student owes — the items shown in their Action Centre /
     the Check-2 Outstanding box (officer-raised + Check-2 queries/doc-requests). Broader
     than ``open_clarify_queries`` (which is only the clarify-SLA subset)."""
-    return application.resolution_items.filter(source__in=('officer', 'check2'), status='open')
+    return application.resolution_items.filter(**_OPEN_STUDENT_TASK)
+
+
+def applications_with_open_student_tasks(application_ids):
+    """The subset of ``application_ids`` that have any open student task — one query for a whole
+    page, where ``open_student_tasks(app).exists()`` per row was one query each."""
+    from .models import ResolutionItem
+    return set(ResolutionItem.objects.filter(application_id__in=list(application_ids),
+                                             **_OPEN_STUDENT_TASK)
+               .values_list('application_id', flat=True).distinct())
 
 
-def is_ready_for_assignment(application, now=None):
+def is_ready_for_assignment(application, now=None, *, has_open_tasks=None):
     """The Check-3 assignment gate: an application is ready when ALL student-assigned tasks
     are done OR the SLA window (5 days from submit) has lapsed — whichever comes first
     (proceed-as-is, flagged for the reviewer). Never ready before submission.
@@ -544,11 +562,16 @@ def is_ready_for_assignment(application, now=None):
     V3 (#8, owner decision 2026-07-03): the FLOOR here is the SUBMIT clock (submit + SLA days),
     DECOUPLED from a late query's own per-item deadline — so a query raised late can't push the
     review start back forever. The per-item clock (``query_sla``) governs the student REMINDER,
-    not this floor."""
+    not this floor.
+
+    ``has_open_tasks`` lets a list that already knows (``applications_with_open_student_tasks``)
+    skip the per-application query."""
     from datetime import timedelta
     if application.profile_completed_at is None:
         return False
-    if not open_student_tasks(application).exists():
+    if has_open_tasks is None:
+        has_open_tasks = open_student_tasks(application).exists()
+    if not has_open_tasks:
         return True
     now = now or timezone.now()
     return now >= application.profile_completed_at + timedelta(days=query_sla_days(application))
@@ -904,18 +927,19 @@ def send_due_query_emails(now=None):
     from django.conf import settings as _settings
     from .check2_queries import sync_check2_queries
     from .emails import send_query_raised_email
+    from . import mail_dispatch
     if not getattr(_settings, 'CHECK2_STUDENT_QUERIES_ENABLED', False):
         return {'sent': 0}   # student queries held until the questions are reviewed
     now = now or timezone.now()
     cutoff = now - timedelta(hours=QUERY_EMAIL_DELAY_HOURS)
-    sent = 0
     qs = (ScholarshipApplication.objects
           .filter(status__in=QUERY_SLA_ACTIVE_STATUSES,
                   profile_completed_at__isnull=False, profile_completed_at__lte=cutoff,
                   query_raised_notified_at__isnull=True)
           .select_related('cohort', 'profile'))
     from .resolution import STUDENT_DOC_REQUEST_CODES
-    for app in qs:
+
+    def step(app):
         # Every open thing the student must act on counts — the Check-2 clarify questions +
         # the one-tap pathway confirm (sync_check2_queries) AND the "review assistant"
         # missing-compulsory-document requests (a `doc` system gap, created at submit by
@@ -931,14 +955,17 @@ def send_due_query_emails(now=None):
                         .filter(source='officer', status='open').exclude(kind='human').count())
         n_open = len(queries) + doc_requests + officer_open
         if n_open == 0:
-            continue
+            return False
         name = getattr(app.profile, 'name', '') if app.profile else ''
         send_query_raised_email(
             to_email=app.notify_email, applicant_name=name,
             programme_name=app.cohort.name, n_queries=n_open, lang=app.locale)
         app.query_raised_notified_at = now
         app.save(update_fields=['query_raised_notified_at'])
-        sent += 1
+        return True
+
+    with mail_dispatch.batch('query-emails') as run:
+        sent = sum(run.each(step, qs))
     return {'sent': sent}
 
 
@@ -1372,10 +1399,9 @@ def confirm_pathway(application):
     reads 'verified'. Idempotent-ish (re-confirming just refreshes the snapshot).
     Returns False when there's no offer letter to confirm."""
     from . import offer_pathway as op
-    from .models import ApplicantDocument
     from .pathway_engine import student_offer_check
-    offer = (ApplicantDocument.objects.filter(
-                application=application, doc_type='offer_letter', superseded_at__isnull=True)
+    offer = (documents_of(application).filter(
+                doc_type='offer_letter', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
     if offer is None:
         return False
@@ -1528,11 +1554,10 @@ def sync_reporting_date_from_offer(application, offer=None):
     the officer only typed a value because the letter had none, so a letter we can now read is
     better evidence than a human's inference. Returns True when it wrote.
     """
-    from .models import ApplicantDocument
     from .pathway_engine import student_offer_check, parse_reporting_date
     if offer is None:
-        offer = (ApplicantDocument.objects.filter(
-                    application=application, doc_type='offer_letter', superseded_at__isnull=True)
+        offer = (documents_of(application).filter(
+                    doc_type='offer_letter', superseded_at__isnull=True)
                  .order_by('-uploaded_at').first())
     if offer is None:
         return False
@@ -1581,7 +1606,6 @@ def sync_institution_from_catalogue(application, offer=None, offer_check=None):
     ``course_id``/``course_name``/``source`` are preserved, so nothing is re-attributed to the offer.
     Idempotent. Returns True when it wrote.
     """
-    from .models import ApplicantDocument
     from .pathway_engine import student_offer_check
     from . import offer_pathway as op
 
@@ -1595,8 +1619,8 @@ def sync_institution_from_catalogue(application, offer=None, offer_check=None):
     # because a letter that CONTRADICTS the declared course is a stop — see below.
     if offer_check is None:
         if offer is None:
-            offer = (ApplicantDocument.objects.filter(
-                        application=application, doc_type='offer_letter',
+            offer = (documents_of(application).filter(
+                        doc_type='offer_letter',
                         superseded_at__isnull=True)
                      .order_by('-uploaded_at').first())
         offer_check = student_offer_check(offer) if offer is not None else {}
@@ -1678,12 +1702,11 @@ def autofill_pathway_from_offer(application):
     Fires only when the offer is the applicant's (identity not mismatched), readable, and
     NOT a genuine clash with an already-specific declared programme (that stays the
     ``pathway_confirm`` query's job). No-op (returns False) otherwise. Idempotent."""
-    from .models import ApplicantDocument
     from .pathway_engine import student_offer_check
     from . import offer_pathway as op
 
-    offer = (ApplicantDocument.objects.filter(
-                application=application, doc_type='offer_letter', superseded_at__isnull=True)
+    offer = (documents_of(application).filter(
+                doc_type='offer_letter', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
     if offer is None:
         return False
@@ -2027,7 +2050,7 @@ def application_completeness(application):
         funding_done = bool(fn.categories) and fn.programme_months is not None
     except FundingNeed.DoesNotExist:
         funding_done = False
-    present = set(application.documents.filter(superseded_at__isnull=True)
+    present = set(documents_of(application).filter(superseded_at__isnull=True)
                   .values_list('doc_type', flat=True))
     # Gate v2 (2026-06-05): the documents bar is route-aware and STRICT for a not-yet-
     # submitted application — ic + results_slip + offer_letter (now compulsory for all)
@@ -2042,7 +2065,7 @@ def application_completeness(application):
         # correct slip before submitting. 'pending'/'unreadable'/'match' all pass here;
         # only a positive name MISMATCH blocks.
         from .academic_engine import _slip_name_status
-        slip = (application.documents.filter(doc_type='results_slip', superseded_at__isnull=True)
+        slip = (documents_of(application).filter(doc_type='results_slip', superseded_at__isnull=True)
                 .order_by('-uploaded_at').first())
         slip_name_ok = slip is None or _slip_name_status(slip) != 'mismatch'
         # Layer 0: WHICH documents this programme asks for now comes from the catalogue
@@ -2148,7 +2171,7 @@ def ic_identity_blockers(application):
     are skipped (can't compare). Caller guarantees an 'ic' document exists.
     """
     from .vision import nric_match, name_match
-    ic = (application.documents.filter(doc_type='ic', superseded_at__isnull=True)
+    ic = (documents_of(application).filter(doc_type='ic', superseded_at__isnull=True)
           .order_by('-uploaded_at').first())
     if ic is None or not ic.vision_run_at:
         return ['ic_service_down']  # never processed — treat as a system issue
@@ -2221,23 +2244,29 @@ def reprocess_unread_ic_documents(limit=200):
     such doc — once each: after a run, ``vision_run_at`` is set, so it's never re-picked (cost
     is one Vision read per stuck doc). Defensive: if a run ever does raise, we stamp an outcome
     so it can't loop. Returns ``{scanned, processed, errored}``.
+
+    The cards are OCR'd ``VISION_BATCH_LIMIT`` at a time in one batched Vision request
+    (``batched_reads``) — after an outage the backlog is every IC uploaded meanwhile.
     """
-    from .vision import run_vision_for_document
+    from . import vision
     stuck = list(ApplicantDocument.objects
                  .filter(doc_type__in=('ic', 'parent_ic'), vision_run_at__isnull=True)
                  .order_by('uploaded_at')[:limit])
     scanned = processed = errored = 0
-    for doc in stuck:
-        scanned += 1
-        try:
-            res = run_vision_for_document(doc)
-            errored += 1 if res.get('error') else 0
-            processed += 0 if res.get('error') else 1
-        except Exception:
-            errored += 1
-            doc.vision_error = doc.vision_error or 'reprocess_failed'
-            doc.vision_run_at = timezone.now()
-            doc.save(update_fields=['vision_error', 'vision_run_at'])
+    for start in range(0, len(stuck), vision.VISION_BATCH_LIMIT):
+        group = stuck[start:start + vision.VISION_BATCH_LIMIT]
+        with vision.batched_reads(group):
+            for doc in group:
+                scanned += 1
+                try:
+                    res = vision.run_vision_for_document(doc)
+                    errored += 1 if res.get('error') else 0
+                    processed += 0 if res.get('error') else 1
+                except Exception:
+                    errored += 1
+                    doc.vision_error = doc.vision_error or 'reprocess_failed'
+                    doc.vision_run_at = timezone.now()
+                    doc.save(update_fields=['vision_error', 'vision_run_at'])
     return {'scanned': scanned, 'processed': processed, 'errored': errored}
 
 
@@ -2271,7 +2300,7 @@ def income_doc_blockers(application):
     route = (getattr(application, 'income_route', '') or '').strip()
     if not route:
         return ['income_incomplete']
-    present = set(application.documents.filter(superseded_at__isnull=True)
+    present = set(documents_of(application).filter(superseded_at__isnull=True)
                   .values_list('doc_type', flat=True))
     out = []
     if route == 'str':
@@ -2361,14 +2390,14 @@ def _offer_blocks(application):
     if (getattr(application, 'chosen_pathway', '') or '').strip().lower() == 'stpm':
         return False
     from .pathway_engine import offer_official_status
-    offer = (application.documents.filter(doc_type='offer_letter', superseded_at__isnull=True)
+    offer = (documents_of(application).filter(doc_type='offer_letter', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
     if offer is None or offer_official_status(offer) != 'not_genuine':
         return False                       # missing / official / unknown → not a block
     # A not-official offer blocks UNLESS the pathway verdict the officer sees is Probable+.
-    from .verdict_engine import build_verdict
+    from . import snapshots
     from .verdict_narrative import _fact_band
-    for fact in build_verdict(application):
+    for fact in snapshots.verdict(application):
         if fact.get('fact') == 'pathway':
             return _fact_band(fact) not in ('Certain', 'Probable')
     return True
@@ -2396,7 +2425,7 @@ def consent_blockers(application):
         blockers.append('address_incomplete')
     if not c['funding_done']:
         blockers.append('funding_incomplete')
-    present = set(application.documents.filter(superseded_at__isnull=True)
+    present = set(documents_of(application).filter(superseded_at__isnull=True)
                   .values_list('doc_type', flat=True))
     # Layer 0: only chase what this programme actually asks for. A document that is not asked for
     # must not appear as outstanding — the student would be looking for something nobody wants.
@@ -2471,7 +2500,7 @@ def document_red_blockers(application):
     def has(d, *keys):
         return any(d.get(k) == 'mismatch' for k in keys)
 
-    for doc in application.documents.filter(superseded_at__isnull=True):
+    for doc in documents_of(application).filter(superseded_at__isnull=True):
         dt = doc.doc_type
         if income_ok and dt in _INCOME_CLUSTER_DOC_TYPES:
             continue
@@ -2529,11 +2558,11 @@ def document_unreadable_blockers(application):
     from .income_engine import (income_cluster_advice, effective_working_members,
                                 _member_ic_doc, student_income_ic_check)
     codes = set()
-    slip = (application.documents.filter(doc_type='results_slip', superseded_at__isnull=True)
+    slip = (documents_of(application).filter(doc_type='results_slip', superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
     if slip and student_slip_check(slip).get('name') == 'unreadable':
         codes.add('results_slip_unreadable')
-    offer = (application.documents.filter(doc_type='offer_letter', superseded_at__isnull=True)
+    offer = (documents_of(application).filter(doc_type='offer_letter', superseded_at__isnull=True)
              .order_by('-uploaded_at').first())
     if offer and student_offer_check(offer).get('name') == 'unreadable':
         codes.add('offer_letter_unreadable')
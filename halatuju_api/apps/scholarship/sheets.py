@@ -262,39 +262,52 @@ def _drive_for_upload():
         return None
 
 
-def fetch_drive_pdf(folder_path, filename):
+def _find_drive_pdf(drive, folder_path, filename):
+    """The newest non-trashed PDF named ``filename`` in ``folder_path`` → its Drive metadata
+    (``id``, ``modifiedTime``, ``md5Checksum``), or None (logged) when the folder or file is
+    missing."""
+    folder_id = _find_folder_path(drive, folder_path)
+    if not folder_id:
+        logger.warning('Drive read: folder path %r not found in the Drive of %s',
+                       folder_path, getattr(settings, 'MEET_ORGANISER_EMAIL', ''))
+        return None
+    q = (f"name='{_escape_query(filename)}' and '{folder_id}' in parents "
+         f"and mimeType='application/pdf' and trashed=false")
+    # orderBy modifiedTime desc: if a duplicate name ever exists, take the newest.
+    files = drive.files().list(
+        q=q, fields='files(id,name,modifiedTime,md5Checksum)',
+        orderBy='modifiedTime desc', pageSize=10,
+    ).execute().get('files', [])
+    if not files:
+        logger.warning('Drive read: file %r not found in %r', filename, folder_path)
+        return None
+    return files[0]
+
+
+def fetch_drive_pdf(folder_path, filename, *, file_id=None):
     """Best-effort READ: download ``filename`` from the Drive ``folder_path`` (in the organiser's
     Drive) and return its bytes — or None (logged, never raised) on disabled / not found / any
     error. Read-only in effect: only ``files().list`` + ``get_media``. Reuses the same SA + full
     ``drive`` scope the payments filer uses — ``drive.readonly`` is NOT in this SA's domain-wide-
     delegation allowlist, so requesting it would fail ``unauthorized_client``; the already-granted
-    ``drive`` scope is what works (verified against the live folder)."""
+    ``drive`` scope is what works (verified against the live folder). A ``file_id`` from a
+    ``drive_pdf_file`` lookup skips the folder walk."""
     if not sheets_enabled():
         return None
     try:
         drive = _drive_for_upload()
         if drive is None:
             return None
-        folder_id = _find_folder_path(drive, folder_path)
-        if not folder_id:
-            logger.warning('Drive read: folder path %r not found in the Drive of %s',
-                           folder_path, getattr(settings, 'MEET_ORGANISER_EMAIL', ''))
-            return None
-        q = (f"name='{_escape_query(filename)}' and '{folder_id}' in parents "
-             f"and mimeType='application/pdf' and trashed=false")
-        # orderBy modifiedTime desc: if a duplicate name ever exists, take the newest.
-        files = drive.files().list(
-            q=q, fields='files(id,name,modifiedTime)',
-            orderBy='modifiedTime desc', pageSize=10,
-        ).execute().get('files', [])
-        if not files:
-            logger.warning('Drive read: file %r not found in %r', filename, folder_path)
-            return None
+        if file_id is None:
+            found = _find_drive_pdf(drive, folder_path, filename)
+            if found is None:
+                return None
+            file_id = found['id']
         import io
 
         from googleapiclient.http import MediaIoBaseDownload  # type: ignore
         buf = io.BytesIO()
-        downloader = MediaIoBaseDownload(buf, drive.files().get_media(fileId=files[0]['id']))
+        downloader = MediaIoBaseDownload(buf, drive.files().get_media(fileId=file_id))
         done = False
         while not done:
             _, done = downloader.next_chunk()
@@ -304,6 +317,28 @@ def fetch_drive_pdf(folder_path, filename):
         return None
 
 
+def drive_pdf_file(folder_path, filename):
+    """Best-effort: ``(file_id, version)`` of the Drive PDF ``fetch_drive_pdf`` would download,
+    without downloading it. The version — its ``md5Checksum`` (else ``id@modifiedTime``) — is the
+    ETag a cached copy is revalidated against: two small metadata calls instead of the whole file;
+    the id lets the download that follows skip the folder walk. None (logged, never raised) on
+    disabled / not found / any error."""
+    if not sheets_enabled():
+        return None
+    try:
+        drive = _drive_for_upload()
+        if drive is None:
+            return None
+        found = _find_drive_pdf(drive, folder_path, filename)
+        if found is None:
+            return None
+        return found['id'], found.get('md5Checksum') or f"{found['id']}@{found.get('modifiedTime', '')}"
+    except Exception:
+        logger.warning('Drive read: version check failed for %r/%r', folder_path, filename,
+                       exc_info=True)
+        return None
+
+
 def read_sheet_values(spreadsheet_id, cell_range):
     """Best-effort READ of a Google Sheet's cell range → a list of rows (each a list of strings),
     or [] on disabled / error (logged, never raised). Uses the ``spreadsheets`` scope the SA
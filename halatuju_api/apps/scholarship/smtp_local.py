@@ -0,0 +1,143 @@
+"""A local SMTP server for tests and development — no network, no provider account.
+
+``LocalSMTPServer`` listens on 127.0.0.1 (an ephemeral port by default) and speaks just enough
+SMTP for Django's ``smtp.EmailBackend``: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP and QUIT — no
+STARTTLS, no AUTH, so point it at the server with ``EMAIL_USE_TLS=False`` and an empty
+``EMAIL_HOST_USER``. It records what a real relay would have accepted:
+
+- ``messages`` — ``(mail_from, [rcpt, ...], raw bytes)`` per accepted message;
+- ``connections`` — how many SMTP sessions were opened (what ``mail_dispatch`` saves);
+- ``drop_after`` — close a session after that many messages, the way a relay drops an idle or
+  over-quota connection (``mail_dispatch`` should reconnect once and carry on);
+- ``refuse`` — recipient addresses answered ``550``.
+
+    with LocalSMTPServer() as smtp:
+        with override_settings(**smtp.settings()):
+            ...
+        assert len(smtp.messages) == 3
+
+``python -m apps.scholarship.smtp_local`` runs one on port 1025 and prints what arrives.
+"""
+import socketserver
+import threading
+
+
+class _Session(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server.owner
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost ESMTP stand-in')
+        mail_from, rcpts, delivered = None, [], 0
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            verb = line[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                mail_from, rcpts = line.split(':', 1)[1].strip().strip('<>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                rcpt = line.split(':', 1)[1].strip().strip('<>')
+                if rcpt in server.refuse:
+                    self.reply('550 no such user')
+                else:
+                    rcpts.append(rcpt)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 end with <CR><LF>.<CR><LF>')
+                body = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b'.\r\n', b'.\n'):
+                        break
+                    body.append(chunk[1:] if chunk.startswith(b'..') else chunk)
+                with server.lock:
+                    server.messages.append((mail_from, list(rcpts), b''.join(body)))
+                self.reply('250 OK queued')
+                delivered += 1
+                if server.drop_after and delivered >= server.drop_after:
+                    return                  # hang up without a 221, like a relay timing us out
+            elif verb == 'RSET':
+                mail_from, rcpts = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 command not implemented')
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class LocalSMTPServer:
+    """A threaded stand-in SMTP relay on ``host:port`` (``port=0`` picks a free one)."""
+
+    def __init__(self, host='127.0.0.1', port=0, *, drop_after=0, refuse=()):
+        self.drop_after = drop_after
+        self.refuse = set(refuse)
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _Server((host, port), _Session)
+        self._server.owner = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name=f'smtp-local-{self.port}')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def settings(self) -> dict:
+        """The Django settings that point ``smtp.EmailBackend`` here."""
+        return {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': self.host, 'EMAIL_PORT': self.port,
+            'EMAIL_USE_TLS': False, 'EMAIL_USE_SSL': False,
+            'EMAIL_HOST_USER': '', 'EMAIL_HOST_PASSWORD': '', 'EMAIL_TIMEOUT': 5,
+        }
+
+
+if __name__ == '__main__':
+    import time
+
+    with LocalSMTPServer(port=1025) as smtp:
+        print(f'stand-in SMTP on {smtp.host}:{smtp.port} — Ctrl-C to stop')
+        seen = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                for mail_from, rcpts, _raw in smtp.messages[seen:]:
+                    print(f'{mail_from} → {", ".join(rcpts)}')
+                seen = len(smtp.messages)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,243 @@
+"""The verdict and the anomaly flags, computed once per real change instead of on every read.
+
+``build_verdict`` and ``detect_anomalies`` are pure functions of an application's inputs, and
+they are called from everywhere: the cockpit detail payload (verdict, anomalies, the interview
+agenda, the submission review, the resolution sync), the gap engine, the Check-2 queries, the
+case narrative, the consent gate's offer check, the sponsor-profile refresh. One record open ran
+each several times, and every run re-read and re-matched every document.
+
+``verdict(application)`` / ``anomalies(application)`` answer from a ``VerdictSnapshot`` row
+whenever the application's **inputs stamp** still equals the stamp the row was computed from.
+The stamp is a digest of everything the engines read:
+
+- the application row (route, roster, pathway, status, officer decisions and overrides…),
+- the cohort row (the income ceilings and intake year the headroom is judged against) and the
+  programme row,
+- the student's profile row,
+- every document row, live and superseded (through ``documents_of``, so inside a
+  ``doc_context.loaded`` block it costs no extra query),
+- the consents, the funding need and the resolution items (officer asks, student answers),
+- the programme's resolved document requirements,
+- the catalogue rows the offer-pathway checks read for the chosen course (the course, its
+  campuses and their institutions), plus the catalogue's refresh marks (``CourseDataStatus`` —
+  every catalogue import stamps one) for the offer-side lookup across all institutions,
+- today's date (STR currency and payslip age are judged against it), and ``ENGINE_VERSION``.
+
+So invalidation is by content, not by remembering to bump a counter at each write: no write
+path — a serializer save, a ``QuerySet.update``, an admin edit, a migration — can leave a stale
+snapshot behind, because the next read hashes what is actually there. Computing the stamp is a
+handful of row fetches; the engines it saves are hundreds of name matches.
+
+**Bump ``ENGINE_VERSION`` whenever the verdict / anomaly logic changes**, or the rows computed by
+the old code keep being served until some input changes. ``check_verdict_snapshots`` recomputes
+every current row live and diffs it, which is how a missed bump (or an input the stamp doesn't
+cover) shows up.
+
+Best-effort in the usual way: a snapshot that can't be read or written is logged and the live
+answer is returned. ``VERDICT_SNAPSHOTS_ENABLED=False`` turns the whole thing back into a live
+compute on every call.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .doc_context import documents_of
+
+logger = logging.getLogger(__name__)
+
+# Bump on ANY change to what build_verdict / detect_anomalies return for the same inputs.
+ENGINE_VERSION = 1
+
+# Applications whose snapshot this request/thread is computing right now (re-entrancy guard: an
+# engine that asks for the verdict of the application it is computing gets a live answer, not a
+# loop). A context variable, so one request's in-flight work is invisible to the others.
+_computing = contextvars.ContextVar('verdict_snapshots_computing', default=frozenset())
+
+
+def _enabled():
+    return getattr(settings, 'VERDICT_SNAPSHOTS_ENABLED', True)
+
+
+def _row(instance):
+    if instance is None:
+        return None
+    return [(f.attname, getattr(instance, f.attname)) for f in instance._meta.concrete_fields]
+
+
+def _related_rows(application, name):
+    related = getattr(application, name, None)
+    if related is None:
+        return []
+    return sorted((_row(r) for r in related.all()), key=lambda r: dict(r).get('id') or 0)
+
+
+def _catalogue_rows(application):
+    """The catalogue rows ``offer_pathway`` reads for the chosen course (``_campus_rows``,
+    ``catalogue_institution``), and the catalogue's refresh marks."""
+    from apps.courses.models import (Course, CourseDataStatus, CourseInstitution, Institution,
+                                     StpmCourse)
+    refreshed = sorted((k, str(t)) for k, t in CourseDataStatus.objects.values_list('key', 'last_run_at'))
+    cp = getattr(application, 'chosen_programme', None)
+    cid = (cp.get('course_id') or '').strip() if isinstance(cp, dict) else ''
+    if not cid:
+        return [refreshed]
+    offers = list(CourseInstitution.objects.filter(course_id=cid).order_by('pk'))
+    stpm = list(StpmCourse.objects.filter(course_id=cid))
+    inst_ids = {o.institution_id for o in offers} | {c.institution_id for c in stpm if c.institution_id}
+    return [
+        refreshed,
+        [_row(c) for c in Course.objects.filter(course_id=cid)],
+        [_row(c) for c in stpm],
+        [_row(o) for o in offers],
+        [_row(i) for i in Institution.objects.filter(institution_id__in=inst_ids).order_by('pk')],
+    ]
+
+
+def inputs_stamp(application) -> str:
+    """The digest of every input the verdict + anomaly engines read for ``application``."""
+    from . import requirements
+    from .models import FundingNeed
+
+    try:
+        funding = application.funding_need
+    except FundingNeed.DoesNotExist:
+        funding = None
+    docs = documents_of(application)
+    parts = [
+        ENGINE_VERSION,
+        timezone.localdate().isoformat(),
+        _row(application),
+        _row(getattr(application, 'cohort', None)),
+        _row(getattr(application, 'programme', None)),
+        _row(getattr(application, 'profile', None)),
+        sorted((_row(d) for d in (docs.all() if docs is not None else [])),
+               key=lambda r: dict(r)['id']),
+        _related_rows(application, 'consents'),
+        _row(funding),
+        _related_rows(application, 'resolution_items'),
+        sorted(requirements.resolve(application, 'document').items()),
+        _catalogue_rows(application),
+    ]
+    blob = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+
+def _compute(application):
+    from . import anomaly_engine, matching, verdict_engine
+    start = time.perf_counter()
+    with matching.memoised():       # both engines re-compare the same household names
+        verdict = verdict_engine.build_verdict(application)
+        flags = anomaly_engine.detect_anomalies(application)
+    return verdict, flags, int((time.perf_counter() - start) * 1000)
+
+
+def _frozen(verdict, flags):
+    """The pair as the JSON text it is stored as. Every caller gets a fresh ``json.loads`` of it,
+    so a hit and a miss return the same types, and one caller mutating its copy can't reach the
+    next caller's."""
+    return json.dumps([verdict, flags], cls=DjangoJSONEncoder)
+
+
+def _live(application):
+    """True when this read skips the snapshot: switched off, an unsaved (or stand-in)
+    application, or a read from inside the engines computing it."""
+    key = getattr(application, 'pk', None)
+    return not _enabled() or key is None or key in _computing.get()
+
+
+def current(application):
+    """``(verdict, anomalies)`` for ``application`` — from its snapshot when the inputs are
+    unchanged, else recomputed (and the snapshot rewritten).
+
+    Inside a ``doc_context.loaded`` block the answer is kept on the context, so the stamp is
+    hashed once per block rather than once per caller; the block is a read snapshot already."""
+    from .doc_context import ApplicationDocumentContext
+    from .models import VerdictSnapshot
+
+    if _live(application):
+        verdict, flags, _ = _compute(application)
+        return verdict, flags
+    ctx = documents_of(application)
+    memo = ctx.memo if isinstance(ctx, ApplicationDocumentContext) else None
+    if memo is not None and 'verdict_snapshot' in memo:
+        return tuple(json.loads(memo['verdict_snapshot']))
+
+    key = application.pk
+    stamp = inputs_stamp(application)
+    snap = None
+    try:
+        snap = VerdictSnapshot.objects.filter(application_id=key).first()
+    except DatabaseError as e:
+        logger.warning('verdict snapshot read failed app=%s: %s', key, e)
+    if snap is not None and snap.inputs_stamp == stamp:
+        frozen = _frozen(snap.verdict, snap.anomalies)
+    else:
+        token = _computing.set(_computing.get() | {key})
+        try:
+            verdict, flags, ms = _compute(application)
+        finally:
+            _computing.reset(token)
+        frozen = _frozen(verdict, flags)
+        verdict, flags = json.loads(frozen)
+        try:
+            VerdictSnapshot.objects.update_or_create(
+                application_id=key,
+                defaults={'inputs_stamp': stamp, 'verdict': verdict, 'anomalies': flags,
+                          'compute_ms': ms})
+        except DatabaseError as e:
+            logger.warning('verdict snapshot write failed app=%s: %s', key, e)
+    if memo is not None:
+        memo['verdict_snapshot'] = frozen
+    verdict, flags = json.loads(frozen)
+    return verdict, flags
+
+
+def verdict(application) -> list:
+    """``build_verdict(application)``, served from the snapshot when the inputs are unchanged."""
+    if _live(application):
+        from . import verdict_engine
+        return verdict_engine.build_verdict(application)
+    return current(application)[0]
+
+
+def anomalies(application) -> list:
+    """``detect_anomalies(application)``, served from the snapshot when the inputs are unchanged."""
+    if _live(application):
+        from . import anomaly_engine
+        return anomaly_engine.detect_anomalies(application)
+    return current(application)[1]
+
+
+def diff(application, snap=None):
+    """Recompute live and compare with the stored snapshot → ``(state, detail)``, where state is
+    'missing' (no row), 'stale' (inputs changed since — the next read recomputes it; not a
+    fault), 'ok', or 'drift' (SAME inputs, DIFFERENT answer: a missed ``ENGINE_VERSION`` bump or
+    an input the stamp doesn't cover). ``detail`` names what differs for a drift."""
+    from .models import VerdictSnapshot
+    if snap is None:
+        snap = VerdictSnapshot.objects.filter(application_id=application.pk).first()
+    if snap is None:
+        return 'missing', ''
+    if snap.inputs_stamp != inputs_stamp(application):
+        return 'stale', ''
+    verdict, flags = json.loads(_frozen(*_compute(application)[:2]))
+    detail = []
+    stored = {f.get('fact'): f for f in snap.verdict or []}
+    live = {f.get('fact'): f for f in verdict}
+    for fact in sorted(set(stored) | set(live)):
+        a, b = stored.get(fact), live.get(fact)
+        if a != b:
+            detail.append(f'{fact}: {(a or {}).get("status", "—")} -> {(b or {}).get("status", "—")}'
+                          + ('' if (a or {}).get('status') != (b or {}).get('status') else ' (items)'))
+    stored_codes = [f.get('code') for f in snap.anomalies or []]
+    live_codes = [f.get('code') for f in flags]
+    if snap.anomalies != flags:
+        detail.append(f'anomalies: {",".join(stored_codes) or "—"} -> {",".join(live_codes) or "—"}')
+    return ('drift' if detail else 'ok'), '; '.join(detail)
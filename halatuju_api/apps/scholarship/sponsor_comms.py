@@ -159,15 +159,14 @@ def student_cards_blocks(cards, lang='en'):
     something from here).
 
     Capped at `MAX_CARDS`, and the cap SAYS SO. The old email truncated at five in silence.
+
+    Inside a `mail_dispatch` run each card is built once for the whole batch (`_sponsor_cards`).
     """
-    from .emails import _sponsor_card_html, _sponsor_card_text, _tax_name_map, _P
+    from .emails import _sponsor_cards, _P
 
     rows = list(cards or [])
     shown, dropped = rows[:MAX_CARDS], max(0, len(rows) - MAX_CARDS)
-    frontend, tax = _P.frontend_url, _tax_name_map()
-
-    html = ''.join(_sponsor_card_html(c, lang, frontend, tax) for c in shown)
-    text = '\n\n'.join(_sponsor_card_text(c, lang, frontend, tax) for c in shown)
+    html, text = _sponsor_cards(shown, lang, _P.frontend_url)
     if dropped:
         more = f'… and {dropped} more waiting on the site.'
         html += ('<p style="margin:0 0 12px;font-size:12.5px;color:#6b7280;">'
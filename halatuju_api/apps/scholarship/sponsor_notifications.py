@@ -10,6 +10,9 @@ sponsor. Two scheduled entry points (run via the cron endpoint / management comm
   * ``send_sponsor_digests``   — weekly; per-sponsor digest of students published since
     that sponsor's ``last_digest_sent_at``.
 
+A digest goes through the email outbox (``outbox.py``): queued with the clock advance,
+delivered at once, retried with backoff if that send fails.
+
 Both respect a soft per-run cap (``SPONSOR_NOTIFY_MAX_PER_RUN``, default 250) so a run
 never blows the Brevo daily quota; the overflow is logged and picked up next run.
 """
@@ -18,7 +21,7 @@ import logging
 from django.conf import settings
 from django.utils import timezone
 
-from . import pool
+from . import mail_dispatch, pool
 # S3: both alerts now go through `sponsor_notify`, which routes them to an editable template
 # once its switch is on and to the ORIGINAL hardcoded sender until then — these two are
 # live on production, so a dark template must not silence them.
@@ -32,15 +35,52 @@ def _max_per_run():
     return int(getattr(settings, 'SPONSOR_NOTIFY_MAX_PER_RUN', 250) or 250)
 
 
-def _serialise_cards(apps, sponsor):
-    """Anonymised cards for these apps, honouring the sponsor's trust level
+def _serialise_cards(apps, trusted):
+    """Anonymised cards for these apps at a trust level — a sponsor's ``is_trusted``
     (institution crosses to trusted sponsors only — the Boundary decision)."""
     from .serializers import SponsorPoolDetailSerializer
     return SponsorPoolDetailSerializer(
-        apps, many=True, context={'is_trusted': sponsor.is_trusted}
+        apps, many=True, context={'is_trusted': trusted}
     ).data
 
 
+def _fanout_plan(new_apps, sponsors):
+    """``[(sponsor, cards)]`` for the real-time alert — each sponsor with the cards of the new
+    students in the programmes they are accepted into, in ``new_apps`` order; sponsors with
+    none are left out.
+
+    Programme fence: a sponsor is alerted ONLY about students in gifts they are accepted into.
+    Without it a Sabah-only funder would learn that flagship students exist — the pool fence is
+    worthless if the emails route around it.
+
+    Built in bulk rather than per sponsor: the approved memberships of every sponsor in one
+    query (``pool.approved_programme_ids_by_sponsor``), the new students grouped by programme,
+    and each student's card serialised ONCE per trust level and shared by every sponsor at that
+    level — the card differs only by ``is_trusted``. The per-sponsor loop re-queried the
+    memberships and re-serialised the same cards for every sponsor."""
+    by_programme = {}
+    for a in new_apps:
+        by_programme.setdefault(a.programme_id, []).append(a)
+    programmes = pool.approved_programme_ids_by_sponsor(sponsors)
+
+    order = {a.pk: i for i, a in enumerate(new_apps)}
+    wanted = {}                      # sponsor id → their students' ids, in new_apps order
+    for s in sponsors:
+        ids = [a.pk for pid in programmes.get(s.pk, ()) for a in by_programme.get(pid, ())]
+        if ids:
+            wanted[s.pk] = sorted(ids, key=order.__getitem__)
+
+    cards = {}                       # is_trusted → {app id: card}
+    for trusted in {s.is_trusted for s in sponsors if s.pk in wanted}:
+        need = {i for s in sponsors if s.pk in wanted and s.is_trusted == trusted
+                for i in wanted[s.pk]}
+        apps = [a for a in new_apps if a.pk in need]
+        cards[trusted] = {a.pk: c for a, c in zip(apps, _serialise_cards(apps, trusted))}
+
+    return [(s, [cards[s.is_trusted][i] for i in wanted[s.pk]])
+            for s in sponsors if s.pk in wanted]
+
+
 def send_sponsor_realtime():
     """Alert every approved ``realtime`` sponsor about students published since the
     last run (pool-eligible + not yet real-time-notified). One batched email per
@@ -61,15 +101,11 @@ def send_sponsor_realtime():
         sponsors = sponsors[:cap]
 
     sent = 0
-    for s in sponsors:
-        # Programme fence: alert each sponsor ONLY about students in gifts they are
-        # accepted into. Without this a Sabah-only funder would learn that flagship
-        # students exist — the pool fence is worthless if the emails route around it.
-        theirs = [a for a in new_apps if a.programme_id in set(pool.approved_programme_ids(s))]
-        if not theirs:
-            continue
-        if sponsor_notify.send_student_alert(s, _serialise_cards(theirs, s)):
-            sent += 1
+    # One dispatch run: one SMTP session, and each card rendered once for every email showing it.
+    with mail_dispatch.batch('sponsor-realtime'):
+        for s, cards in _fanout_plan(new_apps, sponsors):
+            if sponsor_notify.send_student_alert(s, cards):
+                sent += 1
 
     # Stamp the whole batch as real-time-notified (whether or not any sponsor is
     # currently subscribed) so these students are never re-alerted in real time.
@@ -84,7 +120,14 @@ def send_sponsor_digests():
     their ``last_digest_sent_at`` (or all currently-eligible if never sent). A
     sponsor with nothing new is skipped (no empty digest). ``last_digest_sent_at``
     advances whenever there were students to report, so a digest is never duplicated.
-    Returns a summary dict."""
+    Returns a summary dict.
+
+    The digest is queued in the email outbox in the SAME transaction that advances the
+    clock (key ``sponsor_digest:<sponsor>:<fingerprint of the students>``), then delivered
+    at once; a failed send is retried by ``drain_outbox`` instead of being lost with the
+    clock already moved on."""
+    from django.db import transaction
+    from . import outbox
     sponsors = list(Sponsor.objects.filter(status='approved', notify_frequency='weekly'))
     cap = _max_per_run()
     if len(sponsors) > cap:
@@ -94,21 +137,41 @@ def send_sponsor_digests():
 
     base = pool.eligible_pool_queryset(ScholarshipApplication)
     now = timezone.now()
-    sent = 0
+    queued = []
     for s in sponsors:
         # Programme fence — see send_sponsor_realtime: a digest must never surface a
         # student from a gift this sponsor was not accepted into.
         qs = pool.for_sponsor(base, s)
         if s.last_digest_sent_at:
             qs = qs.filter(sponsor_profile__anon_published_at__gt=s.last_digest_sent_at)
-        apps = list(qs)
-        if not apps:
+        ids = sorted(qs.values_list('pk', flat=True))
+        if not ids:
             continue
-        sponsor_notify.send_student_alert(s, _serialise_cards(apps, s), weekly=True)
-        sent += 1
-        # Advance the clock whether or not the best-effort send succeeded, so the
-        # sponsor is never sent the same digest twice (the students remain browsable
-        # in the pool regardless).
-        s.last_digest_sent_at = now
-        s.save(update_fields=['last_digest_sent_at', 'updated_at'])
-    return {'sponsors': len(sponsors), 'sent': sent}
+        with transaction.atomic():
+            row, _ = outbox.enqueue(
+                'sponsor_digest', f'sponsor_digest:{s.pk}:{outbox.fingerprint(ids)}',
+                to_email=s.email, payload={'sponsor': s.pk, 'applications': ids})
+            s.last_digest_sent_at = now
+            s.save(update_fields=['last_digest_sent_at', 'updated_at'])
+        queued.append(row)
+    result = outbox.deliver(queued)
+    return {'sponsors': len(sponsors), 'sent': result['sent'], 'queued': len(queued)}
+
+
+def deliver_digest(payload):
+    """The outbox handler for one weekly digest. The cards are built now, through the same
+    pool + programme fence, so a student who left the pool since the digest was queued is not
+    in it; nothing left (or the sponsor no longer approved / weekly) → ``outbox.SKIP``. So is a
+    digest the sponsor comms would hold back on purpose (template off or not seeded, no
+    address): that is a decision, and only a send that FAILED is worth retrying."""
+    from . import outbox, sponsor_comms
+    s = Sponsor.objects.filter(pk=payload.get('sponsor')).first()
+    if s is None or s.status != 'approved' or s.notify_frequency != 'weekly':
+        return outbox.SKIP
+    apps = list(pool.for_sponsor(pool.eligible_pool_queryset(ScholarshipApplication), s)
+                .filter(pk__in=payload.get('applications') or []))
+    if not apps:
+        return outbox.SKIP
+    if sponsor_comms.comms_enabled() and sponsor_notify.held_back('weekly_digest', s):
+        return outbox.SKIP
+    return bool(sponsor_notify.send_student_alert(s, _serialise_cards(apps, s.is_trusted), weekly=True))
@@ -48,6 +48,37 @@ def _sponsor_org_id(sponsor):
         return None
 
 
+def _hold(kind, recipient):
+    """`(note, template)`: why `kind` does not go to `recipient` right now, or `''` when it can.
+    Each note is a decision or a missing setup step, never a failed send."""
+    if not sponsor_comms.comms_enabled():
+        return 'platform_off', None
+    template = sponsor_comms.template_for(kind)
+    if template is None:
+        # Not seeded. Distinct from "switched off" on purpose: one is a decision, the other is a
+        # deployment step nobody ran, and they need different fixes.
+        return 'no_template', None
+    if not template.enabled:
+        return 'disabled', template
+    if not recipient:
+        return 'no_recipient', template
+    return '', template
+
+
+def held_back(kind, sponsor):
+    """Why `deliver` would not send `kind` to `sponsor` right now — `platform_off`,
+    `no_template`, `disabled` or `no_recipient`, logged as `deliver` logs it — or '' if it would.
+
+    For a caller that retries a failed send (the email outbox): none of these is a failure, and
+    retrying one only writes the same log row again until the row dies.
+    """
+    recipient = (sponsor_comms.recipient_for(sponsor) or '').strip().lower()
+    note, _ = _hold(kind, recipient)
+    if note:
+        sponsor_comms.log_attempt(kind, sponsor, [recipient] if recipient else [], note=note)
+    return note
+
+
 def deliver(kind, sponsor, context=None, *, to_email=None):
     """Render and send ONE sponsor email of `kind`, logging whatever happens.
 
@@ -57,24 +88,9 @@ def deliver(kind, sponsor, context=None, *, to_email=None):
     context = dict(context or {})
     recipient = (to_email or sponsor_comms.recipient_for(sponsor) or '').strip().lower()
 
-    if not sponsor_comms.comms_enabled():
-        sponsor_comms.log_attempt(kind, sponsor, [recipient] if recipient else [],
-                                  note='platform_off')
-        return False
-
-    template = sponsor_comms.template_for(kind)
-    if template is None:
-        # Not seeded. Distinct from "switched off" on purpose: one is a decision, the other is a
-        # deployment step nobody ran, and they need different fixes.
-        sponsor_comms.log_attempt(kind, sponsor, [recipient] if recipient else [],
-                                  note='no_template')
-        return False
-    if not template.enabled:
-        sponsor_comms.log_attempt(kind, sponsor, [recipient] if recipient else [],
-                                  note='disabled')
-        return False
-    if not recipient:
-        sponsor_comms.log_attempt(kind, sponsor, [], note='no_recipient')
+    note, template = _hold(kind, recipient)
+    if note:
+        sponsor_comms.log_attempt(kind, sponsor, [recipient] if recipient else [], note=note)
         return False
 
     context.setdefault('sponsor_name', getattr(sponsor, 'name', '') or '')
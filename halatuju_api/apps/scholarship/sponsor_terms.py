@@ -172,15 +172,11 @@ def _gemini_generate(prompt, model):
     if not api_key:
         raise SponsorTermsError('quiz_ai_unconfigured')
     try:
-        from google import genai
+        from google import genai  # noqa: F401
     except ImportError:
         raise SponsorTermsError('quiz_ai_unavailable')
-    client = genai.Client(api_key=api_key)
-    response = client.models.generate_content(model=model, contents=prompt)
-    from . import usage   # billable — best-effort meter
-    _it, _ot = usage.gemini_tokens(response)
-    usage.record_usage(usage.GEMINI, model=model, input_tokens=_it, output_tokens=_ot)
-    return response.text
+    from . import llm   # shared client, budgets, 429 backoff and the meter
+    return llm.generate(model, prompt).text
 
 
 def _build_quiz_prompt(section):
@@ -537,56 +537,75 @@ def release_award_offer_emails(now=None):
     was missed. A genuinely undeliverable address now retries hourly — visible in the logs, and
     fixable — rather than failing silently forever.
 
+    Each award goes through the email outbox (``outbox.py``, key ``award_offer:<sponsorship>``):
+    queued once however many runs find it, delivered at once by ``deliver_award_offer``, and — if
+    that fails — retried with backoff by ``drain_outbox`` rather than waiting for the next hourly
+    run. A row that went dead is revived by the next run, so the hourly retry above still holds.
+
     On a successful send it also raises the Vircle setup task, because the email now carries the
     Vircle instructions and the task it points at must exist by the time the student reads it."""
     from django.conf import settings as _settings
+    from . import outbox
     now = now or timezone.now()
     hours = getattr(_settings, 'AWARD_OFFER_EMAIL_COOLOFF_HOURS', 24)
     cutoff = now - timezone.timedelta(hours=hours)
+    qs = (Sponsorship.objects
+          .filter(status__in=Sponsorship.HOLDING, offer_emailed_at__isnull=True, offered_at__lte=cutoff)
+          .select_related('application'))
+    queued = [outbox.enqueue('award_offer', f'award_offer:{sp.pk}',
+                             to_email=sp.application.notify_email,
+                             payload={'sponsorship': sp.pk}, revive=True)[0]
+              for sp in qs]
+    return outbox.deliver(queued)['sent']
+
+
+def deliver_award_offer(payload):
+    """The outbox handler for one award email (see ``release_award_offer_emails``) → True when
+    sent, False to retry, ``outbox.SKIP`` when the award was cancelled or already emailed in the
+    meantime."""
+    from django.conf import settings as _settings
+    from . import outbox
+    sp = (Sponsorship.objects.filter(pk=payload.get('sponsorship'))
+          .select_related('application', 'application__profile').first())
+    if sp is None or sp.status not in Sponsorship.HOLDING or sp.offer_emailed_at is not None:
+        return outbox.SKIP
+    now = timezone.now()
+    app = sp.application
+    name = getattr(app.profile, 'name', '') if app.profile else ''
     # Contract mode (go-live transition, 2026-07-19): when the bursary agreement flag is ON the
     # good-news email invites the student to REVIEW & SIGN the agreement, carries NO Vircle content,
     # and raises NO Vircle setup task here — the Vircle install email + task now fire automatically
     # at agreement EXECUTION (bursary.distribute_executed_agreement). When the flag is OFF the path
     # below is byte-identical to before (Vircle-flavoured award email + raise_setup_task).
-    bursary_on = getattr(_settings, 'BURSARY_AGREEMENT_ENABLED', False)
-    qs = (Sponsorship.objects
-          .filter(status__in=Sponsorship.HOLDING, offer_emailed_at__isnull=True, offered_at__lte=cutoff)
-          .select_related('application', 'application__profile'))
-    sent = 0
-    for sp in qs:
-        app = sp.application
-        name = getattr(app.profile, 'name', '') if app.profile else ''
-        if bursary_on:
-            # Bill the tenant — an unwrapped send meters org-NULL (see emails._meter_email).
-            with _usage.usage_context(application=app):
-                ok = send_award_offer_sign_email(
-                    to_email=app.notify_email, applicant_name=name,
-                    lang=getattr(app, 'locale', '') or 'en')
-            if not ok:
-                continue   # stamp only on success (see below); retry next run
-            sp.offer_emailed_at = now
-            sp.save(update_fields=['offer_emailed_at', 'updated_at'])
-            sent += 1
-            continue   # NO Vircle task on the contract-mode path — it's raised at execution
-        from .vircle import can_register
+    if getattr(_settings, 'BURSARY_AGREEMENT_ENABLED', False):
+        # Bill the tenant — an unwrapped send meters org-NULL (see emails._meter_email).
         with _usage.usage_context(application=app):
-            ok = send_award_offer_email(
+            ok = send_award_offer_sign_email(
                 to_email=app.notify_email, applicant_name=name,
-                lang=getattr(app, 'locale', '') or 'en',
-                guardian_note=not can_register(app))
+                lang=getattr(app, 'locale', '') or 'en')
         if not ok:
-            # Stamp ONLY on success. This query filters offer_emailed_at__isnull=True, so stamping
-            # a FAILED send would permanently suppress that student's award email — they'd simply
-            # never hear they won. Leaving it unstamped means the next hourly run retries.
-            # (The same fix was made in send_award_offer_emails; this path was missed.)
-            continue
+            return False   # stamp only on success (see below); the outbox retries
         sp.offer_emailed_at = now
         sp.save(update_fields=['offer_emailed_at', 'updated_at'])
-        # The award email now CARRIES the Vircle instructions, so the task it refers to must exist
-        # the moment the student reads it — but never for a student whose email failed.
-        raise_setup_task(app)
-        sent += 1
-    return sent
+        return True        # NO Vircle task on the contract-mode path — it's raised at execution
+    from .vircle import can_register
+    with _usage.usage_context(application=app):
+        ok = send_award_offer_email(
+            to_email=app.notify_email, applicant_name=name,
+            lang=getattr(app, 'locale', '') or 'en',
+            guardian_note=not can_register(app))
+    if not ok:
+        # Stamp ONLY on success. This query filters offer_emailed_at__isnull=True, so stamping
+        # a FAILED send would permanently suppress that student's award email — they'd simply
+        # never hear they won. Leaving it unstamped means the outbox retries.
+        # (The same fix was made in send_award_offer_emails; this path was missed.)
+        return False
+    sp.offer_emailed_at = now
+    sp.save(update_fields=['offer_emailed_at', 'updated_at'])
+    # The award email now CARRIES the Vircle instructions, so the task it refers to must exist
+    # the moment the student reads it — but never for a student whose email failed.
+    raise_setup_task(app)
+    return True
 
 
 def current_offer(application):
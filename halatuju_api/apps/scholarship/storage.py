@@ -16,6 +16,8 @@ import urllib.request
 
 from django.conf import settings
 
+from .timing import timed
+
 logger = logging.getLogger(__name__)
 
 BUCKET = 'b40-documents'
@@ -95,6 +97,7 @@ def _post(path, payload):
         return None
 
 
+@timed('storage.sign_upload')
 def create_signed_upload_url(path):
     """Signed URL the browser can PUT a file to (private bucket). None on failure."""
     result = _post(f'/object/upload/sign/{BUCKET}/{path}', {})
@@ -102,6 +105,7 @@ def create_signed_upload_url(path):
     return f'{_base_url()}/storage/v1{rel}' if rel else None
 
 
+@timed('storage.sign_download')
 def create_signed_download_url(path, expires_in=3600):
     """Time-limited signed URL to view a private object. None on failure."""
     result = _post(f'/object/sign/{BUCKET}/{path}', {'expiresIn': expires_in})
@@ -146,6 +150,7 @@ def list_objects(prefix='', limit=1000):
         return []
 
 
+@timed('storage.exists')
 def object_exists(path):
     """Tri-state existence check for a blob: True (present), False (CONFIRMED absent),
     or None (couldn't verify — unconfigured or a storage error). Callers must treat
@@ -179,6 +184,7 @@ def object_exists(path):
         return None
 
 
+@timed('storage.download')
 def download_object(path):
     """Fetch the raw bytes of one private object via the service key. None on failure.
 
@@ -202,6 +208,7 @@ def download_object(path):
         return None
 
 
+@timed('storage.delete')
 def delete_objects(paths):
     """Best-effort batch DELETE of private objects from the bucket. Returns
     True on success, False on any failure (logged). No-op if paths is empty.
@@ -235,6 +242,7 @@ def delete_objects(paths):
         return False
 
 
+@timed('storage.upload')
 def upload_object(path, data, content_type):
     """Upsert raw bytes to the private bucket (overwrites the object at ``path``). Used to replace
     a HEIC upload with its JPEG conversion. True on success, False on any failure (logged)."""
@@ -31,8 +31,9 @@ Verification taxonomy for a ledger row:
 """
 from __future__ import annotations
 
-from .anomaly_engine import sibling_tertiary_count, detect_anomalies
-from .verdict_engine import build_verdict
+from . import snapshots
+from .doc_context import documents_of
+from .anomaly_engine import sibling_tertiary_count
 
 # A verification-verdict status → the ledger verification it implies.
 _VERDICT_TO_VERIFICATION = {
@@ -47,7 +48,7 @@ _VALUE_MAX = 280  # narrative values are truncated in the ledger (the full text
 
 def _verdict_map(application) -> dict:
     """``{fact_name: status}`` for the four verification facts."""
-    return {f['fact']: f['status'] for f in build_verdict(application)}
+    return {f['fact']: f['status'] for f in snapshots.verdict(application)}
 
 
 def _ver_from_verdict(status: str) -> str:
@@ -66,7 +67,7 @@ def _row(claim, value, source, verification):
 
 def _letter_of_intent_text(application) -> str:
     """The OCR'd plain text of the letter of intent (P1), or '' if not uploaded/read."""
-    doc = (application.documents.filter(doc_type='statement_of_intent', superseded_at__isnull=True)
+    doc = (documents_of(application).filter(doc_type='statement_of_intent', superseded_at__isnull=True)
            .order_by('-uploaded_at').first())
     if doc is None or not isinstance(getattr(doc, 'vision_fields', None), dict):
         return ''
@@ -175,7 +176,7 @@ def completeness_gaps(application) -> list[dict]:
 def consistency_flags(application) -> list[dict]:
     """Contradictions / ambiguities for the reviewer — the deterministic anomaly engine
     IS the narrative-vs-data consistency layer (design §3, check 3). Each: ``{code, params}``."""
-    return detect_anomalies(application)
+    return snapshots.anomalies(application)
 
 
 def submission_review(application) -> dict:
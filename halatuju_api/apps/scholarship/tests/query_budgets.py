@@ -0,0 +1,48 @@
+"""Query budgets for the admin API (not collected by pytest — no ``test_`` prefix).
+
+``assertNumQueries`` pins an exact number, which breaks on every harmless change and so gets
+bumped without a look. A budget is a ceiling: the endpoint may get cheaper freely, and only a
+regression past it fails — with the repeated statements named, because the usual cause is a
+serializer method field that now queries once per row.
+
+    class TestBudgets(QueryBudgetMixin, PhaseCBase):
+        def test_list(self):
+            self.get_within_budget('/api/v1/admin/scholarship/applications/', 40)
+
+        def test_something(self):
+            with self.assertQueryBudget(12, max_repeats=2):
+                ...
+"""
+from contextlib import contextmanager
+
+from halatuju.middleware.profiling import QueryProfile
+
+
+def _report(prof, limit=5):
+    lines = [f'  {fp} x{n}: {sql[:200]}' for fp, n, sql in prof.duplicates()[:limit]]
+    return '\n'.join(lines) or '  (no statement ran twice)'
+
+
+class QueryBudgetMixin:
+    """``assertQueryBudget`` / ``get_within_budget`` for a ``TestCase`` (needs ``self.client``
+    for the latter)."""
+
+    @contextmanager
+    def assertQueryBudget(self, budget, *, max_repeats=None):
+        """Fail if the block runs more than ``budget`` queries, or (when given) if any single
+        statement shape runs more than ``max_repeats`` times — the N+1 signature."""
+        with QueryProfile() as prof:
+            yield prof
+        if prof.count > budget:
+            self.fail(f'{prof.count} queries > budget {budget}; most repeated:\n{_report(prof)}')
+        if max_repeats is not None:
+            worst = prof.duplicates()[:1]
+            if worst and worst[0][1] > max_repeats:
+                self.fail(f'a statement ran {worst[0][1]} times > {max_repeats}:\n{_report(prof)}')
+
+    def get_within_budget(self, url, budget, *, max_repeats=None, status=200, **params):
+        """GET ``url`` inside a budget and check the status; returns the response."""
+        with self.assertQueryBudget(budget, max_repeats=max_repeats):
+            resp = self.client.get(url, params)
+        self.assertEqual(resp.status_code, status, getattr(resp, 'content', b'')[:300])
+        return resp
@@ -543,3 +543,111 @@ class TestParseSpmSlip(SimpleTestCase):
 
     def test_too_few_rows_returns_none(self):
         self.assertIsNone(self._parse(self.SHARMILA[:2]))
+
+
+class TestKnownSubjectIndex(SimpleTestCase):
+    """``_match_known_subject`` checks only the subjects a row shares a token with — it must
+    pick exactly what the full longest-first scan picks."""
+
+    def test_same_pick_as_the_full_scan(self):
+        from apps.scholarship import academic_engine as ae
+
+        def full_scan(raw):
+            tokens = set(ae._norm(raw).split())
+            return next((name for name, kt in ae._KNOWN_SUBJECTS if kt and kt <= tokens), '') \
+                if tokens else ''
+
+        names = sorted({name for name, _ in ae._KNOWN_SUBJECTS})
+        rows = ['', '1103 BAHASA MELAYU', '4541 KIMIA Malaysia', 'UJIAN LISAN', '3472 MATEMATIK TAMBAHAN A']
+        rows += [f'{i} {n.upper()} LULUS' for i, n in enumerate(names)]
+        rows += [f'{a} {b}' for a, b in zip(names, reversed(names))]
+        for raw in rows:
+            self.assertEqual(ae._match_known_subject(raw), full_scan(raw), raw)
+
+
+def _ref_upright_rows(words, y_tol_frac=0.6):
+    """The pre-index upright grouping, verbatim: every word scans every row so far."""
+    usable = [w for w in words if (w.get('text') or '').strip()]
+    heights = sorted((w.get('h') or 0) for w in usable)
+    med_h = heights[len(heights) // 2] or 12
+    tol = max(med_h * y_tol_frac, 6)
+    rows = []
+    for w in sorted(usable, key=lambda w: w['cy']):
+        for row in rows:
+            if abs(w['cy'] - row['cy']) <= tol:
+                row['ws'].append(w)
+                break
+        else:
+            rows.append({'cy': w['cy'], 'ws': [w]})
+    rows.sort(key=lambda r: r['cy'])
+    return [sorted(r['ws'], key=lambda w: w['cx']) for r in rows]
+
+
+class TestRowIndex(SimpleTestCase):
+    """The upright row grouping bisects into the row anchors instead of scanning them — same
+    rows, same order, on the real fixtures and on a dense jittered multi-column page."""
+
+    def _dense(self, seed, columns=4, rows=300):
+        import random
+        rng = random.Random(seed)
+        words = []
+        for r in range(rows):
+            for c in range(columns):
+                for k in range(3):
+                    words.append({'text': f'W{r}.{c}.{k}', 'cx': 100 + c * 400 + k * 60,
+                                  'cy': 200 + r * rng.choice((14, 18, 22)) + rng.uniform(-9, 9),
+                                  'h': rng.choice((16, 18, 20, 24))})
+        return words
+
+    def test_same_rows_as_the_scan(self):
+        from pathlib import Path
+        import json
+        from apps.scholarship.academic_engine import _dominant_angle, _group_rows
+        fixtures = sorted((Path(__file__).parent / 'fixtures' / 'slips').glob('*.json'))
+        pages = [[{'text': w['t'], 'cx': w['cx'], 'cy': w['cy'], 'h': w['h'], 'angle': w.get('a')}
+                  for w in json.loads(p.read_text(encoding='utf-8'))['words']] for p in fixtures]
+        pages += [self._dense(seed) for seed in range(5)]
+        pages.append(_slip_words(TestParseSpmSlip.HEADER, TestParseSpmSlip.SHARMILA))
+        checked = 0
+        for words in pages:
+            if _dominant_angle([w for w in words if (w.get('text') or '').strip()]):
+                continue                    # rotated branch — unchanged
+            self.assertEqual(_group_rows(words), _ref_upright_rows(words))
+            checked += 1
+        self.assertGreaterEqual(checked, 6)
+
+
+class TestSlipMemo(SimpleTestCase):
+
+    def setUp(self):
+        from apps.scholarship import academic_engine
+        academic_engine.clear_caches()
+
+    def test_parse_is_memoised_on_the_geometry(self):
+        from unittest import mock
+        from apps.scholarship import academic_engine
+        words = _slip_words(TestParseSpmSlip.HEADER, TestParseSpmSlip.SHARMILA)
+        with mock.patch.object(academic_engine, '_group_rows',
+                               wraps=academic_engine._group_rows) as grouped:
+            first = parse_spm_slip(words)
+            first['results'].clear()                    # a caller's copy is its own
+            second = parse_spm_slip([dict(w) for w in words])
+            self.assertEqual(grouped.call_count, 1)
+            self.assertEqual(len(second['results']), 9)
+            words[-1] = dict(words[-1], cy=words[-1]['cy'] + 1)
+            parse_spm_slip(words)                        # moved a box → a new parse
+            self.assertEqual(grouped.call_count, 2)
+
+    def test_read_slip_is_memoised_per_document_and_fields(self):
+        from unittest import mock
+        from apps.scholarship import academic_engine
+        doc = SimpleNamespace(pk=7, vision_fields={'fields': {'results': [
+            {'subject': 'Matematik', 'grade': 'A', 'band': 'cemerlang'}]}})
+        with mock.patch.object(academic_engine, '_read_slip',
+                               wraps=academic_engine._read_slip) as read:
+            read_slip(doc)['names'].append('x')
+            self.assertEqual(read_slip(doc)['names'], ['Matematik'])
+            self.assertEqual(read.call_count, 1)
+            doc.vision_fields['fields']['results'][0]['grade'] = 'B'
+            read_slip(doc)                               # re-extracted → re-read
+            self.assertEqual(read.call_count, 2)
@@ -0,0 +1,83 @@
+"""The process asset cache (asset_cache.py): size-bounded LRU, TTL then ETag revalidation, a
+stale copy kept when the source is down, and bundled files re-read only when they change."""
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.scholarship.asset_cache import AssetCache
+
+
+def _later(seconds):
+    import time
+    return mock.patch('apps.scholarship.asset_cache.time.monotonic',
+                      return_value=time.monotonic() + seconds)
+
+
+class TestAssetCache(SimpleTestCase):
+
+    def test_the_least_recently_used_goes_first(self):
+        c = AssetCache(max_bytes=10)
+        c.get('a', lambda: (b'aaaa', None), ttl=60)
+        c.get('b', lambda: (b'bbbb', None), ttl=60)
+        self.assertEqual(c.get('a', lambda: (b'new', None), ttl=60), b'aaaa')   # a: most recent
+        c.get('c', lambda: (b'cccc', None), ttl=60)              # over budget → b goes
+        self.assertEqual(c.get('b', lambda: (b'b2', None), ttl=60), b'b2')
+        c.get('d', lambda: (b'dddd', None), ttl=60)              # → a, now the oldest, goes
+        self.assertEqual(c.get('a', lambda: (b'x', None), ttl=60), b'x')
+        st = c.stats()
+        self.assertLessEqual(st['bytes'], 10)
+        self.assertEqual(st['evictions'], 3)                    # b, a, then c to fit x
+
+    def test_an_asset_over_the_budget_is_served_but_not_kept(self):
+        c = AssetCache(max_bytes=3)
+        self.assertEqual(c.get('big', lambda: (b'12345', None), ttl=60), b'12345')
+        self.assertEqual(c.stats()['entries'], 0)
+
+    def test_after_the_ttl_only_a_new_version_is_fetched(self):
+        c = AssetCache(max_bytes=100)
+        fetch = mock.Mock(return_value=(b'v1', 'e1'))
+        version = mock.Mock(return_value='e1')
+        c.get('k', fetch, ttl=60, version=version)
+        c.get('k', fetch, ttl=60, version=version)
+        version.assert_not_called()                              # fresh: no check at all
+        with _later(61):
+            self.assertEqual(c.get('k', fetch, ttl=60, version=version), b'v1')
+        self.assertEqual(fetch.call_count, 1)
+        version.return_value, fetch.return_value = 'e2', (b'v2', 'e2')
+        with _later(200):
+            self.assertEqual(c.get('k', fetch, ttl=60, version=version), b'v2')
+        self.assertEqual(c.stats()['refetched'], 1)
+
+    def test_a_source_that_is_down_keeps_the_copy_we_have(self):
+        c = AssetCache(max_bytes=100)
+        c.get('k', lambda: (b'v1', 'e1'), ttl=60, version=lambda: None)
+        with _later(61):
+            self.assertEqual(c.get('k', lambda: (None, None), ttl=60, version=lambda: None), b'v1')
+            self.assertEqual(c.get('k', lambda: (None, None), ttl=60, version=lambda: 'e9'), b'v1')
+        self.assertIsNone(c.get('other', lambda: (None, None), ttl=60))
+
+    def test_a_failed_refetch_keeps_the_copy_for_another_ttl(self):
+        c = AssetCache(max_bytes=100)
+        c.get('k', lambda: (b'v1', 'e1'), ttl=60)
+        version = mock.Mock(return_value='e2')                   # changed — but the download fails
+        with _later(61):
+            self.assertEqual(c.get('k', lambda: (None, None), ttl=60, version=version), b'v1')
+            self.assertEqual(c.get('k', lambda: (None, None), ttl=60, version=version), b'v1')
+        version.assert_called_once()                             # not re-asked on every call
+
+    def test_a_file_is_read_once_until_it_changes(self):
+        c = AssetCache(max_bytes=100)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'guide.pdf')
+            with open(path, 'wb') as fh:
+                fh.write(b'%PDF one')
+            self.assertEqual(c.file_bytes(path), b'%PDF one')
+            with mock.patch('builtins.open', side_effect=AssertionError('re-read')):
+                self.assertEqual(c.file_bytes(path), b'%PDF one')
+            with open(path, 'wb') as fh:
+                fh.write(b'%PDF second')
+            self.assertEqual(c.file_bytes(path), b'%PDF second')
+            self.assertIsNone(c.file_bytes(os.path.join(d, 'missing.pdf')))
+        self.assertEqual((c.stats()['hits'], c.stats()['refetched']), (1, 1))
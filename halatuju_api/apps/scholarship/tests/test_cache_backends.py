@@ -0,0 +1,170 @@
+"""The cache backends (halatuju/cache.py): the tiered front serves read-mostly keys from memory
+and sends everything else to the shared store; counters there increment atomically — the SQLite
+stand-in across threads, the database cache under a row lock — and ``count`` is add-or-increment."""
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from halatuju import cache as halatuju_cache
+from halatuju import ratelimit
+
+
+def _tiered(shared, **options):
+    return {
+        'default': {'BACKEND': 'halatuju.cache.TieredCache',
+                    'OPTIONS': {'SHARED': 'shared', 'LOCAL_KEY_PREFIXES': ['vcs:'], **options}},
+        'shared': shared,
+    }
+
+
+_LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tier-test'}
+
+
+@override_settings(CACHES=_tiered(_LOCMEM, LOCAL_TIMEOUT=30, LOCAL_MAX_ENTRIES=2))
+class TestTieredCache(SimpleTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_a_read_mostly_key_is_served_from_memory(self):
+        c = caches['default']
+        c.set('vcs:1', 'summary')
+        with mock.patch.object(caches['shared'], 'get', side_effect=AssertionError('shared read')):
+            self.assertEqual(c.get('vcs:1'), 'summary')
+        self.assertEqual(caches['shared'].get('vcs:1'), 'summary')      # written through
+        self.assertEqual(c.stats()['local_hits'], 1)
+
+    def test_other_keys_always_go_to_the_shared_store(self):
+        c = caches['default']
+        c.set('throttle_x', [1])
+        caches['shared'].set('throttle_x', [1, 2])                       # another instance
+        self.assertEqual(c.get('throttle_x'), [1, 2])
+
+    def test_the_front_expires_evicts_and_forgets_deletes(self):
+        c = caches['default']
+        c.set('vcs:1', 'a')
+        caches['shared'].set('vcs:1', 'b')
+        self.assertEqual(c.get('vcs:1'), 'a')
+        with mock.patch('halatuju.cache.time.monotonic', return_value=10 ** 9):
+            self.assertEqual(c.get('vcs:1'), 'b')                         # front copy expired
+        c.set('vcs:2', 'x')
+        c.set('vcs:3', 'y')
+        self.assertLessEqual(c.stats()['local_entries'], 2)
+        c.delete('vcs:3')
+        self.assertIsNone(c.get('vcs:3'))
+
+    def test_count_adds_then_increments(self):
+        self.assertEqual([halatuju_cache.count('n', timeout=60) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(halatuju_cache.count('n', timeout=60, delta=5), 8)
+
+
+class TestSQLiteCache(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        overrides = override_settings(CACHES=_tiered({
+            'BACKEND': 'halatuju.cache.SQLiteCache',
+            'LOCATION': os.path.join(tmp.name, 'cache.sqlite3')}))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_the_basics(self):
+        c = caches['shared']
+        c.set('k', {'a': 1}, 60)
+        self.assertEqual(c.get('k'), {'a': 1})
+        self.assertFalse(c.add('k', 'other'))
+        self.assertTrue(c.touch('k', 120))
+        self.assertTrue(c.delete('k'))
+        self.assertIsNone(c.get('k'))
+        with self.assertRaises(ValueError):
+            c.incr('k')
+        c.set('gone', 1, 60)
+        with mock.patch('halatuju.cache.time.time', return_value=10 ** 12):
+            self.assertIsNone(c.get('gone'))
+            self.assertTrue(c.add('gone', 2))
+
+    def test_concurrent_counts_are_never_lost(self):
+        totals, errors = [], []
+
+        def worker():
+            try:
+                for _ in range(25):
+                    totals.append(halatuju_cache.count('hits', timeout=60))
+            except Exception as e:  # noqa: BLE001 — reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(totals), list(range(1, 101)))
+        self.assertEqual(caches['default'].get('hits'), 100)
+
+
+@override_settings(CACHES=_tiered({'BACKEND': 'halatuju.cache.AtomicDatabaseCache',
+                                   'LOCATION': 'test_cache_table'}))
+class TestAtomicDatabaseCache(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Inside the class transaction, before the per-test cache reset in conftest needs it.
+        call_command('createcachetable', verbosity=0)
+
+    def test_incr_keeps_the_value_and_expiry(self):
+        c = caches['shared']
+        with self.assertRaises(ValueError):
+            c.incr('n')
+        self.assertEqual([halatuju_cache.count('n', timeout=60) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(c.get('n'), 3)
+        c.set('old', 1, 60)
+        later = timezone.now() + timedelta(seconds=120)
+        with mock.patch('django.utils.timezone.now', return_value=later), \
+                self.assertRaises(ValueError):
+            c.incr('old')
+
+    def test_a_count_is_one_statement(self):
+        for expected in (1, 2):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(halatuju_cache.count('n', timeout=60), expected)
+            self.assertEqual(len(queries), 1)
+        self.assertEqual(caches['default'].get('n'), 2)
+        later = timezone.now() + timedelta(seconds=120)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(halatuju_cache.count('n', timeout=60), 1)   # a new window
+
+    def test_a_counter_written_by_set_keeps_its_count(self):
+        caches['shared'].set('n', 5, 60)
+        self.assertEqual(halatuju_cache.count('n', timeout=60), 6)
+        self.assertEqual(caches['shared'].incr('n'), 7)
+        self.assertEqual(caches['shared'].get('n'), 7)
+
+    def test_an_allowed_request_costs_no_more_than_the_get_and_set_it_replaced(self):
+        # DRF's throttle was a get and a set: 6 queries on this cache. A hit is the count and
+        # a read of the previous window.
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(ratelimit.hit('t', 'ip', limit=5, period=60))
+        self.assertEqual(len(queries), 2)
+
+    @mock.patch('halatuju.ratelimit._clock', return_value=1_800_000_000.0)
+    def test_a_refusal_reads_and_tallies_but_never_counts(self, _clock):
+        for _ in range(2):
+            ratelimit.hit('t', 'ip', limit=2, period=60)
+        with mock.patch.object(caches['shared'], 'incr', wraps=caches['shared'].incr) as incr, \
+                CaptureQueriesContext(connection) as queries:
+            self.assertFalse(ratelimit.hit('t', 'ip', limit=2, period=60))
+        self.assertEqual(len(queries), 2)                   # both windows, and the daily tally
+        incr.assert_not_called()                            # no count, so no refund
+        self.assertEqual(ratelimit.rejections(['t']), {'t': 1})
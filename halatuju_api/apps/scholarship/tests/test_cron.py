@@ -1,7 +1,18 @@
-"""Tests for the internal Cloud-Scheduler cron endpoint (shared-secret auth)."""
+"""Tests for the internal Cloud-Scheduler cron endpoint (shared-secret auth) and the background
+job queue behind it (jobs.py, run_jobs, the ops/jobs admin read)."""
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
 
+from apps.scholarship import jobs
+from apps.scholarship.models import BackgroundJob
+from apps.scholarship.tests.test_phase_c import SUPER, VIEWER, PhaseCBase
+
 
 @override_settings(ROOT_URLCONF='halatuju.urls', CRON_SECRET='test-cron-secret')
 class TestCronEndpoint(TestCase):
@@ -20,12 +31,14 @@ class TestCronEndpoint(TestCase):
         r = self.client.post('/api/v1/internal/cron/not-a-job/', HTTP_X_CRON_SECRET='test-cron-secret')
         self.assertEqual(r.status_code, 404)
 
+    @override_settings(JOB_QUEUE_ENABLED=False)
     def test_runs_vision_outage(self):
         r = self.client.post('/api/v1/internal/cron/vision-outage/', HTTP_X_CRON_SECRET='test-cron-secret')
         self.assertEqual(r.status_code, 200)
         self.assertEqual(r.json()['job'], 'vision-outage')
         self.assertIn('output', r.json())
 
+    @override_settings(JOB_QUEUE_ENABLED=False)
     def test_runs_decision_emails(self):
         r = self.client.post('/api/v1/internal/cron/decision-emails/', HTTP_X_CRON_SECRET='test-cron-secret')
         self.assertEqual(r.status_code, 200)
@@ -35,3 +48,140 @@ class TestCronEndpoint(TestCase):
         # No CRON_SECRET configured → endpoint refuses everything (can't be hit blind).
         r = self.client.post('/api/v1/internal/cron/vision-outage/', HTTP_X_CRON_SECRET='')
         self.assertEqual(r.status_code, 403)
+
+
+@override_settings(ROOT_URLCONF='halatuju.urls', CRON_SECRET='test-cron-secret',
+                   JOB_QUEUE_ENABLED=True, JOB_HEARTBEAT_SECONDS=0)
+class TestJobQueue(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def _cron(self, job='vision-outage'):
+        return self.client.post(f'/api/v1/internal/cron/{job}/', HTTP_X_CRON_SECRET='test-cron-secret')
+
+    def test_endpoint_only_enqueues(self):
+        with mock.patch('apps.scholarship.jobs.call_command') as run:
+            r = self._cron()
+        self.assertEqual(r.status_code, 202)
+        self.assertFalse(run.called)
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.name, job.command, job.status, job.source),
+                         ('vision-outage', 'alert_vision_outage', 'queued', 'cron'))
+        self.assertEqual(r.json(), {'job': 'vision-outage', 'id': job.id, 'status': 'queued',
+                                    'deduped': False})
+
+    def test_overlapping_requests_dedupe_while_live(self):
+        first = self._cron().json()
+        again = self._cron().json()
+        self.assertTrue(again['deduped'])
+        self.assertEqual(again['id'], first['id'])
+        jobs.lease('w1')
+        self.assertTrue(self._cron().json()['deduped'])       # running is live too
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        self.assertEqual(self._cron('decision-emails').status_code, 202)   # other names queue
+        self.assertEqual(BackgroundJob.objects.count(), 2)
+
+    def test_one_active_row_per_name_is_enforced_by_the_database(self):
+        from django.db import IntegrityError, transaction
+        jobs.enqueue('x', 'alert_vision_outage')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BackgroundJob.objects.create(name='x', command='alert_vision_outage')
+
+    def test_worker_runs_and_records_the_outcome(self):
+        jobs.enqueue('vision-outage', 'alert_vision_outage')
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('ran 1 job', out.getvalue())
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.status, job.attempts, job.error), ('succeeded', 1, ''))
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNotNone(job.duration_ms)
+        self.assertIsNone(job.lease_expires_at)
+        self.assertEqual(self._cron().json()['deduped'], False)   # finished → a new run queues
+
+    def test_a_raising_command_fails_without_retry(self):
+        jobs.enqueue('vision-outage', 'alert_vision_outage')
+        with mock.patch('apps.scholarship.jobs.call_command', side_effect=RuntimeError('boom')):
+            jobs.work('w1', once=True)
+        job = BackgroundJob.objects.get()
+        self.assertEqual((job.status, job.error, job.attempts), ('failed', 'boom', 1))
+
+    def test_output_and_progress_are_kept(self):
+        def command(name, stdout, stderr):
+            stdout.write('step 1 of 2\n')
+            stdout.write('step 2 of 2\n\n')
+        jobs.enqueue('vision-outage', 'alert_vision_outage')
+        with mock.patch('apps.scholarship.jobs.call_command', side_effect=command):
+            jobs.work('w1', once=True)
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.progress, 'step 2 of 2')
+        self.assertIn('step 1 of 2', job.output)
+
+    def test_a_lease_is_taken_once(self):
+        jobs.enqueue('a', 'alert_vision_outage')
+        self.assertIsNotNone(jobs.lease('w1'))
+        self.assertIsNone(jobs.lease('w2'))
+
+    def test_heartbeat_extends_only_the_holders_lease(self):
+        jobs.enqueue('a', 'alert_vision_outage')
+        job = jobs.lease('w1')
+        later = timezone.now() + datetime.timedelta(seconds=200)
+        self.assertTrue(jobs.beat(job.id, 'w1', 'half way', now=later))
+        self.assertFalse(jobs.beat(job.id, 'w2', now=later))
+        job.refresh_from_db()
+        self.assertEqual(job.progress, 'half way')
+        self.assertGreater(job.lease_expires_at, later)
+
+    def test_a_dead_workers_job_is_requeued_then_failed(self):
+        jobs.enqueue('a', 'alert_vision_outage')
+        BackgroundJob.objects.update(max_attempts=2)
+        t = timezone.now()
+        jobs.lease('dead-1', now=t)
+        t += datetime.timedelta(seconds=301)
+        job = jobs.lease('w2', now=t)                     # reaped and leased again
+        self.assertEqual((job.worker, job.attempts), ('w2', 2))
+        self.assertIn('lease expired on dead-1', job.error)
+        t += datetime.timedelta(seconds=301)
+        self.assertIsNone(jobs.lease('w3', now=t))        # out of attempts
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    def test_a_worker_that_lost_its_lease_does_not_overwrite(self):
+        jobs.enqueue('a', 'alert_vision_outage')
+        job = jobs.lease('w1')
+        BackgroundJob.objects.filter(pk=job.pk).update(status='queued', worker='')
+        with mock.patch('apps.scholarship.jobs.call_command'):
+            jobs.run(job, 'w1')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+
+
+@override_settings(JOB_HEARTBEAT_SECONDS=0)
+class TestJobsAdminRead(PhaseCBase):
+    URL = '/api/v1/admin/scholarship/ops/jobs/'
+
+    def test_super_reads_runs_and_latest_per_name(self):
+        jobs.enqueue('a', 'alert_vision_outage')
+        with mock.patch('apps.scholarship.jobs.call_command', side_effect=RuntimeError('x')):
+            jobs.work('w1', once=True)
+        jobs.enqueue('a', 'alert_vision_outage')
+        jobs.enqueue('b', 'alert_vision_outage')
+        self._auth(SUPER)
+        r = self.client.get(self.URL)
+        self.assertEqual(r.status_code, 200)
+        body = r.json()
+        self.assertFalse(body['queue_enabled'])                  # off until a worker is deployed
+        self.assertEqual(body['counts'], {'queued': 2, 'running': 0, 'succeeded': 0, 'failed': 1})
+        self.assertEqual(sorted((j['name'], j['status']) for j in body['latest']),
+                         [('a', 'queued'), ('b', 'queued')])
+        self.assertEqual(len(body['jobs']), 3)
+        self.assertNotIn('output', body['jobs'][0])
+        self.assertEqual(len(self.client.get(self.URL + '?status=failed').json()['jobs']), 1)
+        failed = BackgroundJob.objects.get(status='failed')
+        detail = self.client.get(f'{self.URL}{failed.id}/').json()
+        self.assertEqual((detail['error'], detail['output']), ('x', ''))
+        self.assertEqual(self.client.get(f'{self.URL}999999/').status_code, 404)
+
+    def test_non_super_is_refused(self):
+        self._auth(VIEWER)
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
@@ -0,0 +1,168 @@
+"""ApplicationDocumentContext (doc_context.py): one documents fetch serving every engine read.
+
+Three things are pinned here. (1) The in-memory answers equal the queryset's for every call
+shape the engines make, live AND superseded. (2) The cockpit detail payload is identical with
+and without the context. (3) The query-count regression: opening a record reads the documents
+table a fixed number of times, however many documents the family has uploaded.
+"""
+import json
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.scholarship import doc_context
+from apps.scholarship.doc_context import documents_of
+from apps.scholarship.models import (
+    ApplicantDocument, ScholarshipApplication, ScholarshipCohort,
+)
+from apps.scholarship.serializers_admin import AdminApplicationDetailSerializer
+from apps.scholarship.tests.test_phase_c import SUPER, PhaseCBase
+
+
+def _doc(app, doc_type, member='', request_code='', **kw):
+    return ApplicantDocument.objects.create(
+        application=app, doc_type=doc_type, household_member=member,
+        request_code=request_code, storage_path=f'x/{doc_type}/{member}/{request_code}', **kw)
+
+
+class _Fixture(PhaseCBase):
+    def _family(self):
+        """A salary-route family: both parents' ICs, payslips and EPF, a birth certificate,
+        a re-uploaded (superseded) results slip and two officer-requested 'other' docs."""
+        app = self._complete(self._make_app())
+        ScholarshipApplication.objects.filter(pk=app.id).update(income_route='salary')
+        app.refresh_from_db()
+        for dt, m in (('salary_slip', 'father'), ('epf', 'father'), ('parent_ic', 'mother'),
+                      ('salary_slip', 'mother'), ('birth_certificate', '')):
+            _doc(app, dt, m, vision_fields={'fields': {'name': 'KOMATHI'}})
+        old = app.documents.get(doc_type='results_slip')
+        new = _doc(app, 'results_slip')
+        ApplicantDocument.objects.filter(pk=old.pk).update(superseded_at=timezone.now(),
+                                                           superseded_by=new)
+        _doc(app, 'other', request_code='officer_1')
+        _doc(app, 'other', request_code='officer_2')
+        return app
+
+
+class TestQuerysetParity(_Fixture):
+    def setUp(self):
+        super().setUp()
+        self.app = self._family()
+
+    def _both(self, read):
+        """``read(docs)`` against the manager and against the context → (db, memory)."""
+        db = read(self.app.documents)
+        with doc_context.loaded(self.app):
+            ctx = documents_of(self.app)
+            self.assertIsInstance(ctx, doc_context.ApplicationDocumentContext)
+            memory = read(ctx)
+        return db, memory
+
+    def _ids(self, read):
+        db, memory = self._both(lambda docs: [d.id for d in read(docs)])
+        self.assertEqual(db, memory)
+        return memory
+
+    def test_filter_shapes(self):
+        self._ids(lambda d: d.filter(superseded_at__isnull=True))
+        self._ids(lambda d: d.filter(superseded_at__isnull=False))
+        self._ids(lambda d: d.filter(doc_type='salary_slip', superseded_at__isnull=True))
+        self._ids(lambda d: d.filter(doc_type__in=('salary_slip', 'epf'), household_member='father'))
+        self._ids(lambda d: d.filter(doc_type='other', household_member__in=['', 'mother'])
+                  .order_by('-uploaded_at'))
+        self._ids(lambda d: d.filter(doc_type__in=('parent_ic', 'salary_slip', 'epf'))
+                  .exclude(household_member=''))
+        self._ids(lambda d: d.filter(doc_type='other').order_by('request_code', '-id'))
+
+    def test_terminal_calls(self):
+        for read in (lambda d: d.filter(doc_type='ic', superseded_at__isnull=True).exists(),
+                     lambda d: d.filter(doc_type='guardianship_letter').exists(),
+                     lambda d: d.filter(superseded_at__isnull=True).count(),
+                     lambda d: sorted(d.filter(superseded_at__isnull=True)
+                                      .values_list('doc_type', flat=True)),
+                     lambda d: sorted(d.exclude(household_member='')
+                                      .values_list('doc_type', 'household_member')),
+                     lambda d: getattr(d.filter(doc_type='results_slip', superseded_at__isnull=True)
+                                       .order_by('-uploaded_at').first(), 'id', None),
+                     lambda d: getattr(d.filter(doc_type='results_slip', superseded_at__isnull=False)
+                                       .order_by('-superseded_at').first(), 'id', None)):
+            db, memory = self._both(read)
+            self.assertEqual(db, memory)
+
+    def test_slot_index(self):
+        with doc_context.loaded(self.app) as ctx:
+            self.assertEqual(len(ctx.slot('other', '', 'officer_1')), 1)
+            self.assertEqual([d.household_member for d in ctx.slot('salary_slip', 'mother')],
+                             ['mother'])
+            self.assertEqual(len(ctx.slot('results_slip')), 1)                  # live only
+            self.assertEqual(len(ctx.slot('results_slip', live=False)), 2)
+
+    def test_unmodelled_lookup_replays_on_the_db(self):
+        with doc_context.loaded(self.app):
+            docs = documents_of(self.app)
+            docs.rows                                   # the snapshot itself
+            with self.assertNumQueries(1):              # ...then only the replayed read
+                got = list(docs.filter(doc_type='salary_slip')
+                           .filter(vision_fields__has_key='fields'))
+        self.assertEqual(len(got), 2)
+
+    def test_one_fetch_for_every_read(self):
+        with doc_context.loaded(self.app):
+            with self.assertNumQueries(1):
+                for dt in ('ic', 'parent_ic', 'salary_slip', 'epf', 'str', 'other'):
+                    documents_of(self.app).filter(doc_type=dt, superseded_at__isnull=True).first()
+                    documents_of(self.app).filter(doc_type=dt).exists()
+
+    def test_write_through_the_context_drops_the_snapshot(self):
+        with doc_context.loaded(self.app):
+            docs = documents_of(self.app)
+            self.assertTrue(docs.filter(doc_type='epf', superseded_at__isnull=True).exists())
+            docs.filter(doc_type='epf').update(superseded_at=timezone.now())
+            self.assertFalse(docs.filter(doc_type='epf', superseded_at__isnull=True).exists())
+
+    def test_scoped_to_its_application_and_its_block(self):
+        cohort = ScholarshipCohort.objects.create(code='c2', name='B40-2', year=2025)
+        other = ScholarshipApplication.objects.create(cohort=cohort, profile=self.profile)
+        with doc_context.loaded(self.app):
+            self.assertNotIsInstance(documents_of(other), doc_context.ApplicationDocumentContext)
+        self.assertNotIsInstance(documents_of(self.app), doc_context.ApplicationDocumentContext)
+        self.assertIsNone(documents_of(object()))       # a test double without .documents
+
+
+class TestDetailView(_Fixture):
+    URL = '/api/v1/admin/scholarship/applications/{}/'
+
+    def _document_queries(self, app):
+        self._auth(SUPER)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.URL.format(app.id))
+        self.assertEqual(resp.status_code, 200)
+        docs = [q for q in ctx.captured_queries
+                if re.search(r'FROM "applicant_documents"', q['sql'])]
+        return resp, len(docs), len(ctx.captured_queries)
+
+    def test_payload_is_unchanged_by_the_context(self):
+        app = self._family()
+        plain = json.dumps(AdminApplicationDetailSerializer(app).data, sort_keys=True, default=str)
+        app = ScholarshipApplication.objects.get(pk=app.pk)
+        with doc_context.loaded(app):
+            cached = json.dumps(AdminApplicationDetailSerializer(app).data, sort_keys=True,
+                                default=str)
+        self.assertEqual(plain, cached)
+
+    def test_document_queries_do_not_grow_with_the_documents(self):
+        """Query-count regression. Was ~500 `applicant_documents` queries for this family (every
+        engine helper re-queried); now the context's one fetch + the nested `documents` list."""
+        app = self._family()
+        self._document_queries(app)                       # warm per-process caches
+        _, doc_queries, total = self._document_queries(app)
+        self.assertLessEqual(doc_queries, 2)
+        self.assertLessEqual(total, 30)
+
+        for m in ('father', 'mother'):
+            _doc(app, 'income_support_doc', m)
+            _doc(app, 'water_bill', m)
+        _, more_doc_queries, _ = self._document_queries(app)
+        self.assertEqual(more_doc_queries, doc_queries)
@@ -580,3 +580,61 @@ class TestWaterParser(SimpleTestCase):
     def test_non_water_or_unrecognised_defers(self):
         self.assertIsNone(parse_by_labels('water_bill', 'CamScanner'))
         self.assertIsNone(parse_by_labels('water_bill', 'SYARIKAT XYZ\nsome bill\nRM50'))
+
+
+# ── the shared text index + compiled patterns: same answers as a per-call re-scan ──
+
+def _ref_find_value(text, label):
+    """``find_value`` as it was before the line index — the parity reference."""
+    import re
+    pat = re.compile(label, re.IGNORECASE)
+    norm = (text or '').replace('\r\n', '\n').replace('\r', '\n')
+    lines = [ln.strip() for ln in norm.split('\n')]
+    for i, ln in enumerate(lines):
+        m = pat.search(ln)
+        if not m:
+            continue
+        rest = ln[m.end():].lstrip(' \t:=-').strip()
+        if rest:
+            return rest
+        for nxt in lines[i + 1:]:
+            if nxt:
+                return nxt
+        return ''
+    return ''
+
+
+class TestTextIndex(SimpleTestCase):
+    _CORPUS = [_LETTER, _SEMAKAN, _SEMAKAN_COLUMNS, _DASHBOARD, _SALINAN, _SARA_ONLY, _TNB, _KWSP,
+               _BORANG_EC, _BC, _BC_MONONYM, _WATER_AIRSGR, _WATER_INTERLEAVED, _WATER_MASKED]
+    _LABELS = [r'nama\s+penerima', r'\bnama\b', r'status\s+permohonan(?:\s+str|\s+semasa)?',
+               r'caj\s+semasa\s*\(?\s*rm\s*\)?', r'baki\s+terdahulu\s*\(?\s*rm\s*\)?', r'tempoh\s+bil',
+               r'no\.?\s*kad\s+pengenalan', r'no\.?\s*majikan', r'jumlah\s+simpanan', r'tarikh\s+penyata',
+               r'amount\s+due', r'kad\s+pengenalan', r'\bcatatan\b', r'\bkelakuan\b', r'^nama', r'bil\s+air']
+
+    def test_find_value_matches_the_per_line_rescan(self):
+        for text in self._CORPUS + ['', 'Nama\r\nPenerima\r\nALI', 'x\n  nama :  \n\n B ']:
+            for label in self._LABELS:
+                self.assertEqual(find_value(text, label), _ref_find_value(text, label), (label, text[:40]))
+
+    def test_a_label_split_across_lines_still_does_not_match(self):
+        # The whole-text pre-check sees "nama\npenerima"; the per-line read must not.
+        self.assertEqual(find_value('NAMA\nPENERIMA\nALI', r'nama\s+penerima'), '')
+
+    def test_has_is_one_scan_over_all_markers(self):
+        self.assertTrue(has('bil air\nbaki terdahulu', r'jumlah\s+perlu', r'baki\s+terdahulu'))
+        self.assertFalse(has('bil air', r'jumlah\s+perlu', r'tunggakan'))
+        self.assertFalse(has('anything'))
+
+    def test_parsers_agree_with_the_rescan_helpers(self):
+        from unittest import mock
+        import re
+        for text in self._CORPUS:
+            for doc_type in ('str', 'electricity_bill', 'epf', 'birth_certificate', 'water_bill',
+                             'school_leaving_cert'):
+                fast = parse_by_labels(doc_type, text)
+                with mock.patch.object(doc_parse, 'find_value', _ref_find_value), \
+                        mock.patch.object(doc_parse, 'has', lambda t, *ps: any(
+                            re.search(p, t or '', re.IGNORECASE) for p in ps)):
+                    slow = parse_by_labels(doc_type, text)
+                self.assertEqual(fast, slow, (doc_type, text[:40]))
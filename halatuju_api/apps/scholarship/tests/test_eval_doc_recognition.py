@@ -74,3 +74,33 @@ class EvalDocRecognitionHarnessTest(TestCase):
         self._run()
         self.assertEqual(ApplicantDocument.objects.count(), 0)
         self.assertEqual(ScholarshipApplication.objects.count(), 0)
+
+    def test_bench_replays_every_stage_and_times_each_function(self):
+        """``--bench N`` replays the verdict, the OCR-text parsers and the slip parser N times,
+        reports docs/s per doc type with the verdict pass count, and restores the timed seams."""
+        from apps.scholarship import resolution
+        nric, name = '030101-14-1234', 'PRIYA DEVI'
+        self._snapshot('ic_match', {'vision_nric': nric, 'vision_name': name, 'vision_run_at': _RAN, 'vision_fields': {}})
+        self._write('context.json', {'ic_match': {'profile_name': name, 'profile_nric': nric}})
+        self._write('labels.json', {'docs': {'ic_match': {'doc_type': 'ic', 'expect_verdict': 'ok'}}})
+        with open(os.path.join(self.dir, 'snapshots', 'water_bill__w1.ocr.txt'), 'w', encoding='utf-8') as f:
+            f.write('AIR SELANGOR\nBIL AIR\nNo. Akaun 1234567890\nJumlah Perlu Dibayar RM 45.60\n')
+        fixture = os.path.join(os.path.dirname(__file__), 'fixtures', 'slips', 'janani.json')
+        os.makedirs(os.path.join(self.dir, 'slips'))
+        shutil.copy(fixture, os.path.join(self.dir, 'slips', 'janani.json'))
+        real = resolution.doc_match_verdict
+
+        out = StringIO()
+        call_command('eval_doc_recognition', '--eval-dir', self.dir, '--bench', '3', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+
+        rows = {(r['stage'], r['doc_type']): r for r in report['by_doc_type']}
+        self.assertEqual((rows[('verdict', 'ic')]['correct'], rows[('verdict', 'ic')]['labelled']), (1, 1))
+        self.assertIn(('parse', 'water_bill'), rows)
+        self.assertIn(('parse', 'results_slip (words)'), rows)
+        calls = {f['function']: f['calls'] for f in report['functions']}
+        self.assertEqual(calls['doc_match_verdict'], 3)
+        self.assertEqual(calls['parse_by_labels'], 3)
+        self.assertEqual(calls['water_genuineness'], 3)
+        self.assertEqual(calls['parse_spm_slip'], 3)
+        self.assertIs(resolution.doc_match_verdict, real)
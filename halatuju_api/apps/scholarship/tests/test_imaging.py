@@ -1,12 +1,15 @@
-"""HEIC → JPEG conversion (apps.scholarship.imaging)."""
+"""HEIC → JPEG conversion and the OCR copy (apps.scholarship.imaging)."""
+import io
 import sys
 import uuid
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
 
-from apps.scholarship.imaging import convert_heic_to_jpeg, is_heic
+from apps.scholarship.imaging import (OCR_MAX_EDGE, convert_heic_to_jpeg, is_heic, ocr_copy_key,
+                                      ocr_image, prepare_for_ocr, upright_rotation)
 from apps.scholarship.models import (ApplicantDocument, ScholarshipApplication,
                                      ScholarshipCohort)
 from apps.courses.models import StudentProfile
@@ -82,3 +85,99 @@ class TestConvertHeic(TestCase):
         self.assertFalse(convert_heic_to_jpeg(d))
         d.refresh_from_db()
         self.assertEqual(d.content_type, 'image/heic')
+
+
+def _img(w, h, fmt='PNG', exif_orientation=None):
+    buf = io.BytesIO()
+    im = Image.new('RGB', (w, h), 'white')
+    kw = {}
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        kw['exif'] = exif
+    im.save(buf, format=fmt, **kw)
+    return buf.getvalue()
+
+
+class TestPrepareForOcr(SimpleTestCase):
+    def test_large_png_is_downscaled_to_a_jpeg(self):
+        out, mime = prepare_for_ocr(_img(4000, 3000))
+        self.assertEqual(mime, 'image/jpeg')
+        self.assertEqual(Image.open(io.BytesIO(out)).size, (OCR_MAX_EDGE, 1800))
+
+    def test_small_upright_jpeg_passes_through_untouched(self):
+        data = _img(800, 600, 'JPEG')
+        out, mime = prepare_for_ocr(data)
+        self.assertIs(out, data)
+        self.assertEqual(mime, 'image/jpeg')
+
+    def test_exif_orientation_is_applied(self):
+        # Orientation 6 = "rotate 90° CW to view": the stored landscape pixels are a portrait page.
+        out, _ = prepare_for_ocr(_img(600, 400, 'JPEG', exif_orientation=6))
+        self.assertEqual(Image.open(io.BytesIO(out)).size, (400, 600))
+
+    def test_rotate_turns_the_page(self):
+        out, _ = prepare_for_ocr(_img(600, 400, 'JPEG'), rotate=90)
+        self.assertEqual(Image.open(io.BytesIO(out)).size, (400, 600))
+
+    def test_undecodable_bytes_are_returned_unchanged(self):
+        self.assertEqual(prepare_for_ocr(b'%PDF-1.4 not an image'), (b'%PDF-1.4 not an image', ''))
+
+    @override_settings(OCR_PREPROCESS_ENABLED=False)
+    def test_switched_off_sends_the_original(self):
+        data = _img(4000, 3000)
+        self.assertEqual(prepare_for_ocr(data), (data, ''))
+
+
+class TestUprightRotation(SimpleTestCase):
+    def test_sideways_page_snaps_to_a_right_angle(self):
+        words = [{'text': 'w', 'angle': a} for a in (88.0, 91.0, 90.0)]
+        self.assertEqual(upright_rotation(words), 90)
+
+    def test_upright_or_slightly_tilted_page_is_left_alone(self):
+        self.assertEqual(upright_rotation([{'text': 'w', 'angle': 4.0}] * 3), 0)
+        self.assertEqual(upright_rotation([]), 0)
+
+
+class TestOcrCopy(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cohort = ScholarshipCohort.objects.create(code='ocrc', name='B40', year=2026)
+
+    def _doc(self, **kw):
+        prof = StudentProfile.objects.create(
+            supabase_user_id=str(uuid.uuid4()), nric='030101-14-1234', name='S')
+        app = ScholarshipApplication.objects.create(
+            cohort=self.cohort, profile=prof, status='shortlisted')
+        return ApplicantDocument.objects.create(
+            application=app, doc_type='results_slip', storage_path='x/results_slip/abc',
+            content_type='image/png', size=100, **kw)
+
+    @patch('apps.scholarship.storage.upload_object', return_value=True)
+    def test_first_read_stores_the_copy_and_later_reads_reuse_it(self, mock_upload):
+        d = self._doc()
+        with patch('apps.scholarship.vision._fetch_image_bytes', return_value=_img(4000, 3000)) as f:
+            first = ocr_image(d)
+        f.assert_called_once_with('x/results_slip/abc')
+        self.assertEqual(first[:3], b'\xff\xd8\xff')
+        self.assertEqual(mock_upload.call_args[0][0], ocr_copy_key('x/results_slip/abc'))
+        d.refresh_from_db()
+        self.assertEqual(d.ocr_copy_path, ocr_copy_key('x/results_slip/abc'))
+
+        with patch('apps.scholarship.vision._fetch_image_bytes', return_value=first) as f:
+            self.assertEqual(ocr_image(d), first)
+        f.assert_called_once_with(d.ocr_copy_path)      # the copy, never the original
+
+    @patch('apps.scholarship.storage.upload_object', return_value=False)
+    def test_copy_upload_failure_still_reads_the_prepared_bytes(self, _upload):
+        d = self._doc()
+        with patch('apps.scholarship.vision._fetch_image_bytes', return_value=_img(4000, 3000)):
+            out = ocr_image(d)
+        self.assertEqual(out[:3], b'\xff\xd8\xff')
+        d.refresh_from_db()
+        self.assertEqual(d.ocr_copy_path, '')
+
+    def test_pdf_is_read_from_its_original_bytes(self):
+        d = self._doc()
+        with patch('apps.scholarship.vision._fetch_image_bytes', return_value=b'%PDF-1.4 x'):
+            self.assertEqual(ocr_image(d), b'%PDF-1.4 x')
@@ -0,0 +1,209 @@
+"""The shared Gemini broker (llm.py): client reuse, the concurrency / token budgets, 429
+backoff, per-model latency on the usage row, and the seams riding it — all on the local fake
+backend, never the network."""
+import threading
+import time
+from unittest import mock
+
+from django.core.signals import request_finished, request_started
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.scholarship import llm, pacing, profile_engine, usage, vision
+from apps.scholarship.models import UsageEvent
+
+
+class _Base(SimpleTestCase):
+    def setUp(self):
+        llm.reset()
+        self.waits = []
+        patcher = mock.patch.object(llm, '_sleep', self.waits.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(llm.reset)
+
+
+@override_settings(GEMINI_API_KEY='test-key')
+class TestClients(_Base):
+
+    def test_one_client_per_key(self):
+        with mock.patch('google.genai.Client') as cls:
+            self.assertIs(llm.client('a'), llm.client('a'))
+            llm.client('b')
+        self.assertEqual(cls.call_count, 2)
+
+    def test_a_patched_client_class_is_not_served_a_stale_client(self):
+        with mock.patch('google.genai.Client') as first:
+            a = llm.client('k')
+        with mock.patch('google.genai.Client') as second:
+            b = llm.client('k')
+        self.assertIsNot(a, b)
+        self.assertEqual((first.call_count, second.call_count), (1, 1))
+
+    def test_fake_backend_by_setting(self):
+        with override_settings(LLM_BACKEND='fake'), \
+                mock.patch.object(llm, '_fake', None):
+            self.assertIsInstance(llm.client('k'), llm.FakeClient)
+
+
+@override_settings(GEMINI_API_KEY='test-key', GEMINI_RETRY_ON_429=2, GEMINI_BACKOFF_BASE_S=1.0)
+class TestBackoff(_Base):
+
+    def test_429_is_retried_on_the_same_model(self):
+        answers = iter([llm.RateLimitError('429 RESOURCE_EXHAUSTED'), '{"ok": 1}'])
+        with mock.patch.object(usage, 'record_usage'), \
+                llm.use_fake(lambda m, c, cfg: next(answers)) as fake:
+            resp = llm.generate('gemini-2.5-flash', 'hi')
+        self.assertEqual(resp.text, '{"ok": 1}')
+        self.assertEqual([c['model'] for c in fake.calls], ['gemini-2.5-flash'] * 2)
+        self.assertEqual(len(self.waits), 1)
+        self.assertTrue(0.5 <= self.waits[0] <= 1.0)
+
+    def test_gives_up_after_the_retries(self):
+        with llm.use_fake(lambda m, c, cfg: llm.RateLimitError('quota')) as fake:
+            with self.assertRaises(llm.RateLimitError):
+                llm.generate('m', 'hi')
+        self.assertEqual(len(fake.calls), 3)
+        self.assertEqual(len(self.waits), 2)
+        self.assertGreater(self.waits[1], self.waits[0] / 2)      # doubling, jittered
+
+    def test_other_errors_are_not_retried(self):
+        with llm.use_fake(lambda m, c, cfg: RuntimeError('bad request')) as fake:
+            with self.assertRaises(RuntimeError):
+                llm.generate('m', 'hi')
+        self.assertEqual(len(fake.calls), 1)
+        self.assertEqual(self.waits, [])
+
+    def test_a_429_falls_through_the_seam_cascade_after_backoff(self):
+        def answer(model, contents, config):
+            return llm.RateLimitError('429') if model == profile_engine.MODEL_CASCADE[0] \
+                else '{"fine": true}'
+        with mock.patch.object(usage, 'record_usage'), llm.use_fake(answer) as fake:
+            out = vision._call_gemini_json('prompt', {'type': 'object'})
+        self.assertEqual(out, {'fine': True})
+        self.assertEqual([c['model'] for c in fake.calls],
+                         [profile_engine.MODEL_CASCADE[0]] * 3 + [profile_engine.MODEL_CASCADE[1]])
+
+
+@override_settings(GEMINI_API_KEY='test-key', GEMINI_RETRY_ON_429=2, GEMINI_REQUEST_RETRY_ON_429=0)
+class TestRequestPath(TestCase):
+    """A person is waiting on a request: a 429 goes straight back to the seam's cascade."""
+
+    def setUp(self):
+        llm.reset()
+        patcher = mock.patch.object(llm, '_sleep', lambda s: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(llm._in_request.set, False)
+
+    def _attempts(self):
+        with llm.use_fake(lambda m, c, cfg: llm.RateLimitError('429')) as fake:
+            with self.assertRaises(llm.RateLimitError):
+                llm.generate('m', 'hi')
+        return len(fake.calls)
+
+    def test_a_request_is_not_retried_and_the_rest_is(self):
+        request_started.send(sender=self.__class__, environ={})
+        self.assertEqual(self._attempts(), 1)
+        with llm.background():                          # the inline cron endpoint
+            self.assertEqual(self._attempts(), 3)
+        self.assertEqual(self._attempts(), 1)
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(self._attempts(), 3)
+
+
+@override_settings(GEMINI_API_KEY='test-key')
+class TestBudgets(_Base):
+
+    def _peak(self, calls, *, source='', workers=8):
+        state = {'now': 0, 'peak': 0}
+        lock = threading.Lock()
+
+        def answer(model, contents, config):
+            with lock:
+                state['now'] += 1
+                state['peak'] = max(state['peak'], state['now'])
+            time.sleep(0.02)
+            with lock:
+                state['now'] -= 1
+            return 'ok'
+
+        def one(_):
+            with usage.usage_context(source=source):
+                return llm.generate('m', 'hi').text
+
+        with mock.patch.object(usage, 'record_usage'), llm.use_fake(answer):
+            out = llm.run_concurrently(one, range(calls), workers=workers)
+        self.assertEqual(out, ['ok'] * calls)
+        return state['peak']
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=2)
+    def test_global_concurrency_cap(self):
+        self.assertLessEqual(self._peak(10), 2)
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=8, GEMINI_SOURCE_CONCURRENCY={'anon_blurb': 1})
+    def test_per_source_cap(self):
+        self.assertEqual(self._peak(6, source='anon_blurb'), 1)
+        self.assertGreater(self._peak(6, source='doc_extract'), 1)
+
+    @override_settings(GEMINI_TOKENS_PER_MINUTE=600)
+    def test_token_budget_waits_and_settles_the_actual_cost(self):
+        clock = {'t': 0.0}
+        slept = []
+
+        def sleep(s):
+            slept.append(s)
+            clock['t'] += s
+
+        bucket = pacing.TokenBucket(600, burst=600, clock=lambda: clock['t'], sleep=sleep)
+        with mock.patch.object(pacing, 'TokenBucket', return_value=bucket), \
+                mock.patch.object(usage, 'record_usage'), \
+                llm.use_fake(lambda m, c, cfg: 'x' * 2000):             # ≈500 output tokens
+            llm.generate('m', 'p' * 400)                                  # 100 up front
+            self.assertEqual(slept, [])
+            llm.generate('m', 'p' * 400)                                  # the debit is owed
+        self.assertEqual(len(slept), 1)
+        self.assertAlmostEqual(slept[0], 10.0)        # (100 - 0) tokens at 10 a second
+
+    @override_settings(GEMINI_MAX_CONCURRENCY=1, GEMINI_TOKENS_PER_MINUTE=600)
+    def test_the_token_wait_holds_no_slot(self):
+        held = []
+
+        def acquire(tokens):
+            free = llm.budget().slots.acquire(blocking=False)
+            held.append(not free)
+            if free:
+                llm.budget().slots.release()
+
+        with mock.patch.object(pacing.TokenBucket, 'acquire', side_effect=acquire), \
+                mock.patch.object(usage, 'record_usage'), llm.use_fake():
+            llm.generate('m', 'hi')
+        self.assertEqual(held, [False])
+
+    def test_run_concurrently_keeps_order_and_context(self):
+        def one(i):
+            return (i, usage.current_context().get('source'))
+        with usage.usage_context(source='batch'):
+            out = llm.run_concurrently(one, range(5), workers=3)
+        self.assertEqual(out, [(i, 'batch') for i in range(5)])
+
+
+@override_settings(GEMINI_API_KEY='test-key')
+class TestMetering(TestCase):
+
+    def setUp(self):
+        llm.reset()
+
+    def test_usage_row_carries_model_and_latency(self):
+        with llm.use_fake(lambda m, c, cfg: 'draft', latency=0.01), \
+                usage.usage_context(source='profile_draft'):
+            out = profile_engine._call_gemini_text('prompt', 'English')
+        self.assertEqual(out['markdown'], 'draft')
+        ev = UsageEvent.objects.get()
+        self.assertEqual((ev.model, ev.source), (profile_engine.MODEL_CASCADE[0], 'profile_draft'))
+        self.assertGreaterEqual(ev.latency_ms, 10)
+        self.assertEqual(ev.output_tokens, 1)
+
+    def test_explicit_source_overrides_the_context(self):
+        with llm.use_fake(), usage.usage_context(source='outer'):
+            llm.generate('m', 'hi', source='report')
+        self.assertEqual(UsageEvent.objects.get().source, 'report')
@@ -0,0 +1,125 @@
+"""Batched mail dispatch (mail_dispatch.py) against the local SMTP stand-in (smtp_local.py): one
+session per run instead of one per message, a dropped session reopened, a refused message still
+best-effort, the worker pool, and a real sweep riding it."""
+import threading
+
+from django.core.mail import EmailMessage
+from django.test import SimpleTestCase, override_settings
+
+from apps.scholarship import emails, mail_dispatch
+from apps.scholarship.smtp_local import LocalSMTPServer
+from apps.scholarship.services import send_application_reminders
+from apps.scholarship.tests.test_reminders import _Base as _ReminderBase
+
+
+def _ack(to):
+    return emails.send_acknowledgement_email(to, 'Priya', 'B40', 'en')
+
+
+class _SMTPCase(SimpleTestCase):
+    smtp_options = {}
+
+    def setUp(self):
+        self.smtp = LocalSMTPServer(**self.smtp_options).start()
+        self.addCleanup(self.smtp.stop)
+        overrides = override_settings(**self.smtp.settings())
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+
+class TestPooledConnection(_SMTPCase):
+
+    def test_without_a_run_every_message_opens_its_own_session(self):
+        for i in range(3):
+            self.assertTrue(_ack(f's{i}@example.com'))
+        self.assertEqual(self.smtp.connections, 3)
+        self.assertEqual(len(self.smtp.messages), 3)
+
+    def test_a_run_sends_everything_over_one_session(self):
+        with mail_dispatch.batch('t') as run:
+            for i in range(5):
+                self.assertTrue(_ack(f's{i}@example.com'))
+            self.assertTrue(emails.send_partner_email(
+                'org@example.com', subject='Hi', text_body='x', html_body='<p>x</p>'))
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual([m[1] for m in self.smtp.messages][-1], ['org@example.com'])
+        stats = run.summary()
+        self.assertEqual((stats['sent'], stats['failed'], stats['connections']), (6, 0, 1))
+        self.assertEqual(mail_dispatch.recent()[-1]['name'], 't')
+
+    def test_a_nested_run_joins_the_open_one(self):
+        with mail_dispatch.batch('outer') as outer:
+            _ack('a@example.com')
+            with mail_dispatch.batch('inner') as inner:
+                _ack('b@example.com')
+        self.assertIs(inner, outer)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(outer.sent, 2)
+
+    def test_the_connection_is_closed_with_the_run(self):
+        with mail_dispatch.batch('t') as run:
+            _ack('a@example.com')
+        self.assertEqual(run._backends, [])
+        self.assertIsNone(mail_dispatch.connection())
+        self.assertIsNotNone(run.summary()['elapsed_ms'])
+
+
+class TestDroppedSession(_SMTPCase):
+    smtp_options = {'drop_after': 2}
+
+    def test_a_dropped_session_is_reopened_and_nothing_is_lost(self):
+        with mail_dispatch.batch('t') as run:
+            results = [_ack(f's{i}@example.com') for i in range(5)]
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(len(self.smtp.messages), 5)
+        self.assertEqual(run.reconnects, 2)
+        self.assertEqual(self.smtp.connections, 3)
+
+
+class TestBestEffort(_SMTPCase):
+    smtp_options = {'refuse': {'gone@example.com'}}
+
+    def test_a_refused_message_fails_alone(self):
+        with mail_dispatch.batch('t') as run:
+            results = [_ack(a) for a in ('a@example.com', 'gone@example.com', 'b@example.com')]
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual((run.sent, run.failed, run.reconnects), (2, 1, 0))
+        self.assertEqual(self.smtp.connections, 1)
+
+
+class TestPool(_SMTPCase):
+
+    def test_workers_each_hold_one_session(self):
+        threads = set()
+
+        def one(i):
+            threads.add(threading.get_ident())
+            return _ack(f's{i}@example.com')
+
+        with mail_dispatch.batch('t', workers=3) as run:
+            results = run.each(one, range(12))
+        self.assertEqual(results, [True] * 12)
+        self.assertEqual(len(self.smtp.messages), 12)
+        self.assertLessEqual(self.smtp.connections, 3)
+        self.assertEqual(self.smtp.connections, len(threads))
+        self.assertEqual(run.summary()['sent'], 12)
+
+    def test_each_keeps_order_and_runs_inline_outside_a_run(self):
+        self.assertEqual(mail_dispatch.each(lambda i: i * 2, range(4)), [0, 2, 4, 6])
+
+    def test_a_message_built_with_the_pooled_connection_counts(self):
+        with mail_dispatch.batch('t') as run:
+            EmailMessage('s', 'b', 'from@example.com', ['x@example.com'],
+                         connection=mail_dispatch.connection()).send()
+        self.assertEqual(run.sent, 1)
+
+
+class TestSweep(_ReminderBase):
+
+    def test_reminder_sweep_uses_one_session(self):
+        with LocalSMTPServer() as smtp, override_settings(**smtp.settings()):
+            apps = [self._app(anchor_days_ago=3, email=f's{i}@example.com') for i in range(4)]
+            res = send_application_reminders(now=self.now)
+        self.assertEqual(res, {'reminded': 4, 'closed': 0})
+        self.assertEqual(smtp.connections, 1)
+        self.assertEqual(sorted(m[1][0] for m in smtp.messages), [a.notify_email for a in apps])
@@ -0,0 +1,247 @@
+"""Name / NRIC matching kernels (matching.py): the cached, bounded, memoised versions must
+answer EXACTLY what the uncached code did — held here against a verbatim copy of it over a
+generated corpus of household names, romanisation variants and OCR slips."""
+import itertools
+import random
+import re
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from apps.scholarship import matching, vision
+
+# ── the pre-matching.py implementations, verbatim (the parity reference) ───────────────
+
+
+def _ref_tokens(s):
+    if not s:
+        return set()
+    cleaned = matching._NAME_NOISE.sub(' ', matching.split_glued_markers(s.lower()))
+    return {t for t in re.split(r'[^a-z]+', cleaned) if t}
+
+
+def _ref_seq(s):
+    if not s:
+        return []
+    cleaned = matching._NAME_NOISE.sub(' ', matching.split_glued_markers(s.lower()))
+    return [t for t in re.split(r'[^a-z]+', cleaned) if t]
+
+
+def _ref_fold(tok):
+    t = tok.replace('w', 'v')
+    folded = []
+    for ch in t:
+        if not folded or folded[-1] != ch:
+            folded.append(ch)
+    t = ''.join(folded)
+    return t[:-1] if len(t) > 2 and t.endswith('h') else t
+
+
+def _ref_glued_equal(a, b, *, fold):
+    def reduce(name):
+        toks = _ref_seq(name)
+        return ''.join(_ref_fold(t) for t in toks) if fold else ''.join(toks)
+    ra, rb = reduce(a), reduce(b)
+    return bool(ra) and ra == rb
+
+
+def _ref_levenshtein(a, b):
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[-1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def _ref_tokens_close(x, y):
+    fx, fy = _ref_fold(x), _ref_fold(y)
+    if fx == fy:
+        return True
+    return min(len(fx), len(fy)) >= 5 and _ref_levenshtein(fx, fy) <= 1
+
+
+def _ref_name_match(extracted, profile_name):
+    a, b = _ref_tokens(extracted), _ref_tokens(profile_name)
+    if not a or not b:
+        return 'mismatch'
+    if a == b:
+        return 'match'
+    if a < b or b < a:
+        return 'partial'
+    if _ref_glued_equal(extracted, profile_name, fold=False):
+        return 'match'
+    return 'mismatch'
+
+
+def _ref_relationship_name_match(extracted, reference):
+    a = list(_ref_tokens(extracted))
+    b = list(_ref_tokens(reference))
+    if not a or not b:
+        return 'mismatch'
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    used = [False] * len(large)
+    matched = True
+    for x in small:
+        hit = next((i for i, y in enumerate(large) if not used[i] and _ref_tokens_close(x, y)), None)
+        if hit is None:
+            matched = False
+            break
+        used[hit] = True
+    if matched:
+        return 'match' if len(a) == len(b) else 'partial'
+    return 'match' if _ref_glued_equal(extracted, reference, fold=True) else 'mismatch'
+
+
+def _ref_nric_close(extracted, reference):
+    a, b = re.sub(r'\D', '', extracted or ''), re.sub(r'\D', '', reference or '')
+    if not a or not b or a == b:
+        return False
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        return sum(1 for x, y in zip(a, b) if x != y) == 1
+    short, long = (a, b) if la < lb else (b, a)
+    i = j = 0
+    skipped = False
+    while i < len(short) and j < len(long):
+        if short[i] == long[j]:
+            i += 1
+            j += 1
+        elif skipped:
+            return False
+        else:
+            skipped = True
+            j += 1
+    return True
+
+
+# ── the corpus ───────────────────────────────────────────────────────────────────────
+
+_GIVEN = ['SARAVANAN', 'SARAWANAN', 'RUSHAINDRA', 'THEEPICAA', 'LAKSMITHAA', 'KALAI',
+          'VIJAYAN', 'SUPRAMANIAM', 'SUBRAMANIAM', 'MUTHU', 'SIVA', 'SIRA', 'PILAAPPARAO',
+          'PILAAPARAO', 'KUMAR', 'KUMARH', 'AHMAD', 'NUR AISYAH', 'TAN', 'LEE', 'DEVI']
+_FORMS = ['{a} A/L {b}', '{a} A/P {b}', '{a} a / p {b}', '{a}A/P {b}', '{a} D/O {b}',
+          '{a} BIN {b}', '{a} {b}', 'SDRI {a} {b}', '{b} {a}', '{a}', '{a} @ {b}']
+
+
+def _variants(name):
+    """The name plus OCR-ish slips: a split token, a glued pair, one letter changed/dropped."""
+    out = {name}
+    if len(name) > 6:
+        out.add(name[:5] + ' ' + name[5:])
+        out.add(name[:4] + name[5:])
+        out.add(name[:3] + 'X' + name[4:])
+    out.add(name.replace(' ', '', 1))
+    return out
+
+
+def _names(limit=700, seed=7):
+    rng = random.Random(seed)
+    names = set()
+    for a, b in itertools.product(_GIVEN, repeat=2):
+        for form in _FORMS:
+            names |= _variants(form.format(a=a, b=b))
+    names |= {'', ' ', 'A/P', 'BIN'}
+    names = sorted(names)
+    rng.shuffle(names)
+    return names[:limit]
+
+
+def _nrics(seed=11):
+    rng = random.Random(seed)
+    out = ['', '030101-14-1234', '030101141234', '0301011412345', '03010114123', '760809-10-5566']
+    for _ in range(60):
+        base = ''.join(rng.choice('0123456789') for _ in range(12))
+        out.append(f'{base[:6]}-{base[6:8]}-{base[8:]}')
+        pos = rng.randrange(12)
+        out.append(base[:pos] + rng.choice('0123456789') + base[pos + 1:])
+        out.append(base[:pos] + base[pos + 1:])
+        out.append(base[:pos] + '7' + base[pos:])
+    return out
+
+
+class TestParity(SimpleTestCase):
+
+    def setUp(self):
+        matching.clear_caches()
+        self.names = _names()
+
+    def test_normalisers(self):
+        for n in self.names:
+            self.assertEqual(vision.canonical_name_tokens(n), _ref_tokens(n), n)
+            self.assertEqual(vision._canonical_name_seq(n), _ref_seq(n), n)
+
+    def test_name_match(self):
+        rng = random.Random(3)
+        for _ in range(6000):
+            a, b = rng.choice(self.names), rng.choice(self.names)
+            self.assertEqual(vision.name_match(a, b), _ref_name_match(a, b), (a, b))
+
+    def test_relationship_name_match(self):
+        rng = random.Random(5)
+        with matching.memoised():
+            for _ in range(6000):
+                a, b = rng.choice(self.names), rng.choice(self.names)
+                self.assertEqual(vision.relationship_name_match(a, b),
+                                 _ref_relationship_name_match(a, b), (a, b))
+
+    def test_tokens_close_and_bounded_distance(self):
+        toks = sorted({t for n in self.names for t in _ref_tokens(n)})
+        for x, y in itertools.product(toks[:120], repeat=2):
+            self.assertEqual(vision._tokens_close(x, y), _ref_tokens_close(x, y), (x, y))
+            d = _ref_levenshtein(x, y)
+            self.assertEqual(vision._levenshtein(x, y), d)
+            for k in (0, 1, 2):
+                self.assertEqual(matching.within_distance(x, y, k), d <= k, (x, y, k))
+
+    def test_nric_close(self):
+        nrics = _nrics()
+        for a, b in itertools.product(nrics, repeat=2):
+            self.assertEqual(vision.nric_close(a, b), _ref_nric_close(a, b), (a, b))
+
+
+class TestMemo(SimpleTestCase):
+
+    def test_pairs_are_memoised_only_inside_a_scope(self):
+        calls = []
+        real = matching._name_match
+
+        def counting(a, b):
+            calls.append((a, b))
+            return real(a, b)
+
+        matching._name_match, saved = counting, matching._name_match
+        try:
+            vision.name_match('ALI BIN ABU', 'ALI ABU')
+            vision.name_match('ALI BIN ABU', 'ALI ABU')
+            self.assertEqual(len(calls), 2)
+            with matching.memoised():
+                with matching.memoised():           # reentrant — shares the outer memo
+                    vision.name_match('ALI BIN ABU', 'ALI ABU')
+                vision.name_match('ALI BIN ABU', 'ALI ABU')
+            self.assertEqual(len(calls), 3)
+            self.assertIsNone(matching._pairs.get())
+        finally:
+            matching._name_match = saved
+
+    def test_callers_get_a_mutable_token_set(self):
+        tokens = vision.canonical_name_tokens('ALI BIN ABU')
+        tokens.add('x')
+        self.assertEqual(vision.canonical_name_tokens('ALI BIN ABU'), {'ali', 'abu'})
+
+
+class TestBenchmark(SimpleTestCase):
+
+    def test_runs_and_reports_parity(self):
+        out = StringIO()
+        call_command('bench_name_matching', '--households', '3', '--repeat', '1', stdout=out)
+        self.assertIn('speedup', out.getvalue())
+        self.assertIn('parity ok', out.getvalue())
@@ -310,6 +310,15 @@ class TestFenceCoverageCompleteness(TestCase):
         # super may read or write it (403 for org_admin, not 404: the route's existence is not
         # the secret, its contents are).
         'AdminBillingRatesView': 'super-only (platform commercial config, no tenant data)',
+        # Process-local latency histogram (timing.py): stage names, doc types and durations only —
+        # no tenant, application or document appears in it, so there is nothing to fence.
+        'AdminUploadTimingsView': 'super-only (platform telemetry, no tenant data)',
+        # Rate-limit counts per scope (halatuju/ratelimit.py): scope names and numbers only.
+        'AdminRateLimitsView': 'super-only (platform telemetry, no tenant data)',
+        # Background-job runs (jobs.py): job names, command output and timings — platform
+        # operations, no tenant rows behind them, so there is nothing to fence.
+        'AdminJobsView': 'super-only (platform operations, no tenant data)',
+    'AdminOutboxView': 'super-only (platform email queue across every organisation)',
         # Org-scoped: filtered on organisation_id, cross-org is 404. Super writes (a charge
         # against a tenant), org_admin reads its own only.
         'AdminOrgBuildHoursView': 'org-fenced (org_admin own org read; super writes)',
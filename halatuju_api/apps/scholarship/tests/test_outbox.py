@@ -0,0 +1,208 @@
+"""The email outbox (outbox.py): a digest / award email is queued with its state change, sent at
+once, retried with backoff when the send fails, never queued twice for one key, and readable by
+a super admin."""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.scholarship import outbox
+from apps.scholarship import sponsor_notifications as notif
+from apps.scholarship.models import (
+    EmailOutbox, ScholarshipCohort, Sponsor, SponsorEmailLog, SponsorEmailTemplate, Sponsorship,
+)
+from apps.scholarship.tests.test_contract_golive_t1 import _cohort, _offered_past_cooloff
+from apps.scholarship.tests.contract_helpers import brightpath_org
+from apps.scholarship.tests.test_phase_c import SUPER, VIEWER, PhaseCBase
+from apps.scholarship.tests.test_sponsor_notifications import _publish_now, _sponsor
+from apps.scholarship.tests.test_sponsor_pool import _make_eligible_app
+
+_DIGEST_SEND = 'apps.scholarship.emails.send_sponsor_digest_email'
+
+
+def _later(minutes):
+    return timezone.now() + timedelta(minutes=minutes)
+
+
+@override_settings(EMAIL_OUTBOX_BACKOFF_BASE_S=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class TestQueue(TestCase):
+
+    def test_one_row_per_key(self):
+        a, created = outbox.enqueue('award_offer', 'award_offer:1', payload={'sponsorship': 1})
+        b, again = outbox.enqueue('award_offer', 'award_offer:1', payload={'sponsorship': 1})
+        self.assertEqual((created, again, a.pk), (True, False, b.pk))
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_unknown_kind_is_refused(self):
+        with self.assertRaises(ValueError):
+            outbox.enqueue('nope', 'k')
+
+    def test_backoff_doubles_then_the_row_dies(self):
+        row, _ = outbox.enqueue('award_offer', 'k', payload={})
+        with patch('apps.scholarship.sponsorship.deliver_award_offer', return_value=False):
+            self.assertEqual(outbox.deliver([row])['retry'], 1)
+            row.refresh_from_db()
+            self.assertEqual(row.attempts, 1)
+            first = row.next_attempt_at
+            self.assertEqual(outbox.drain()['sent'], 0)              # not due yet
+            self.assertEqual(outbox.drain(now=first)['retry'], 1)
+            row.refresh_from_db()
+            self.assertAlmostEqual((row.next_attempt_at - first).total_seconds(), 120, delta=1)
+            self.assertEqual(outbox.drain(now=row.next_attempt_at)['dead'], 1)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.last_error), ('dead', 3, 'send failed'))
+
+    def test_a_raising_handler_is_a_failure_with_its_error(self):
+        row, _ = outbox.enqueue('award_offer', 'k', payload={})
+        with patch('apps.scholarship.sponsorship.deliver_award_offer', side_effect=RuntimeError('smtp')):
+            outbox.deliver([row])
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.last_error), ('pending', 'smtp'))
+
+    def test_a_row_is_sent_once_however_often_it_is_delivered(self):
+        row, _ = outbox.enqueue('award_offer', 'k', payload={})
+        with patch('apps.scholarship.sponsorship.deliver_award_offer', return_value=True) as send:
+            self.assertEqual(outbox.deliver([row, row])['busy'], 1)
+            self.assertEqual(outbox.deliver([row])['busy'], 1)
+        self.assertEqual(send.call_count, 1)
+        row.refresh_from_db()
+        self.assertEqual(row.status, 'sent')
+        self.assertIsNotNone(row.send_ms)
+
+    def test_revive_requeues_a_dead_row(self):
+        row, _ = outbox.enqueue('award_offer', 'k', payload={})
+        EmailOutbox.objects.filter(pk=row.pk).update(status='dead', attempts=3)
+        row, created = outbox.enqueue('award_offer', 'k', payload={}, revive=True)
+        self.assertFalse(created)
+        self.assertEqual((row.status, row.attempts), ('pending', 0))
+
+    def test_stats_and_the_drain_command(self):
+        row, _ = outbox.enqueue('award_offer', 'k', payload={})
+        outbox.enqueue('award_offer', 'k2', payload={})
+        with patch('apps.scholarship.sponsorship.deliver_award_offer', return_value=True):
+            outbox.deliver([row])
+            out = StringIO()
+            call_command('drain_outbox', stdout=out)
+        self.assertIn('sent 1', out.getvalue())
+        st = outbox.stats()
+        self.assertEqual(st['counts'], {'pending': 0, 'sent': 2, 'skipped': 0, 'dead': 0})
+        self.assertEqual(st['sample'], 2)
+        self.assertIsNotNone(st['lag_ms']['p95'])
+
+
+class TestSponsorDigest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cohort = ScholarshipCohort.objects.create(code='c', name='B40', year=2026)
+
+    def setUp(self):
+        mail.outbox = []
+
+    def test_a_failed_digest_is_kept_and_retried(self):
+        a = _make_eligible_app(self.cohort); _publish_now(a)
+        s = _sponsor('wk', 'weekly')
+        with patch(_DIGEST_SEND, return_value=False):
+            res = notif.send_sponsor_digests()
+        self.assertEqual((res['sent'], res['queued']), (0, 1))
+        s.refresh_from_db()
+        self.assertIsNotNone(s.last_digest_sent_at)           # the clock moved on with the row
+        row = EmailOutbox.objects.get()
+        self.assertEqual((row.kind, row.to_email, row.status), ('sponsor_digest', s.email, 'pending'))
+        self.assertEqual(row.payload, {'sponsor': s.pk, 'applications': [a.pk]})
+        self.assertEqual(notif.send_sponsor_digests()['queued'], 0)      # no second digest
+        self.assertEqual(outbox.drain(now=_later(2))['sent'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_a_sponsor_who_stopped_the_digest_is_skipped(self):
+        a = _make_eligible_app(self.cohort); _publish_now(a)
+        s = _sponsor('wk', 'weekly')
+        with patch(_DIGEST_SEND, return_value=False):
+            notif.send_sponsor_digests()
+        s.notify_frequency = 'off'
+        s.save(update_fields=['notify_frequency'])
+        self.assertEqual(outbox.drain(now=_later(2))['skipped'], 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def _held_back(self):
+        """Queue the digest with the comms live, and return the row and the log notes."""
+        with override_settings(SPONSOR_COMMS_ENABLED=True):
+            res = notif.send_sponsor_digests()
+        self.assertEqual((res['sent'], res['queued']), (0, 1))
+        row = EmailOutbox.objects.get()
+        return row, list(SponsorEmailLog.objects.values_list('note', flat=True))
+
+    def test_a_switched_off_digest_template_is_skipped_not_retried(self):
+        call_command('seed_sponsor_email_templates', verbosity=0)
+        SponsorEmailTemplate.objects.filter(kind='weekly_digest').update(enabled=False)
+        a = _make_eligible_app(self.cohort); _publish_now(a)
+        _sponsor('wk', 'weekly')
+        row, notes = self._held_back()
+        self.assertEqual((row.status, row.attempts), ('skipped', 1))
+        self.assertEqual(notes, ['disabled'])                  # logged once, not per retry
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_a_sponsor_without_an_address_is_skipped_not_retried(self):
+        call_command('seed_sponsor_email_templates', verbosity=0)
+        SponsorEmailTemplate.objects.filter(kind='weekly_digest').update(enabled=True)
+        a = _make_eligible_app(self.cohort); _publish_now(a)
+        s = _sponsor('wk', 'weekly')
+        Sponsor.objects.filter(pk=s.pk).update(email='')
+        row, notes = self._held_back()
+        self.assertEqual((row.status, row.attempts), ('skipped', 1))
+        self.assertEqual(notes, ['no_recipient'])
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(BURSARY_AGREEMENT_ENABLED=False)
+class TestAwardOffer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cohort = _cohort(brightpath_org(), suffix='ob')
+
+    @patch('apps.scholarship.sponsorship.raise_setup_task')
+    def test_the_retry_stamps_and_raises_the_task(self, task):
+        from apps.scholarship import sponsorship as svc
+        sp, _app = _offered_past_cooloff(self.cohort, 'ob1')
+        with patch('apps.scholarship.sponsorship.send_award_offer_email', return_value=False):
+            self.assertEqual(svc.release_award_offer_emails(), 0)
+        self.assertEqual(svc.release_award_offer_emails(), 0)      # queued once, not yet due
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        with patch('apps.scholarship.sponsorship.send_award_offer_email', return_value=True):
+            self.assertEqual(outbox.drain(now=_later(2))['sent'], 1)
+        sp.refresh_from_db()
+        self.assertIsNotNone(sp.offer_emailed_at)
+        task.assert_called_once()
+
+    def test_an_award_cancelled_before_the_retry_is_not_sent(self):
+        from apps.scholarship import sponsorship as svc
+        sp, _app = _offered_past_cooloff(self.cohort, 'ob2')
+        with patch('apps.scholarship.sponsorship.send_award_offer_email', return_value=False):
+            svc.release_award_offer_emails()
+        Sponsorship.objects.filter(pk=sp.pk).update(status='cancelled')
+        with patch('apps.scholarship.sponsorship.send_award_offer_email') as send:
+            self.assertEqual(outbox.drain(now=_later(2))['skipped'], 1)
+        send.assert_not_called()
+
+
+class TestOutboxAdmin(PhaseCBase):
+    URL = '/api/v1/admin/scholarship/ops/outbox/'
+
+    def test_super_reads_and_retries(self):
+        row, _ = outbox.enqueue('award_offer', 'k', to_email='x@example.com', payload={})
+        EmailOutbox.objects.filter(pk=row.pk).update(status='dead', attempts=6, last_error='boom')
+        self._auth(SUPER)
+        body = self.client.get(self.URL + '?status=dead').json()
+        self.assertEqual(body['counts']['dead'], 1)
+        self.assertEqual([(r['id'], r['last_error']) for r in body['rows']], [(row.pk, 'boom')])
+        r = self.client.post(f'{self.URL}{row.pk}/retry/')
+        self.assertEqual((r.status_code, r.json()['status'], r.json()['attempts']), (200, 'pending', 0))
+        EmailOutbox.objects.filter(pk=row.pk).update(status='sent')
+        self.assertEqual(self.client.post(f'{self.URL}{row.pk}/retry/').status_code, 404)
+
+    def test_non_super_is_refused(self):
+        self._auth(VIEWER)
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
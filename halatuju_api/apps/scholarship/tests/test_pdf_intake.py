@@ -15,8 +15,9 @@ from apps.scholarship.models import (
 )
 from apps.scholarship.services import ic_identity_blockers, is_ic_decode_error
 from apps.scholarship.views import _is_allowed_upload
+from apps.scholarship import pdf
 from apps.scholarship.vision import (
-    _is_pdf, _pdf_first_page_png, _pdf_text_layer, extract_mykad, extract_text,
+    _is_pdf, _pdf_first_page_png, _pdf_is_digital, _pdf_text_layer, extract_mykad, extract_text,
 )
 
 _PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
@@ -24,15 +25,24 @@ _PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
 
 def _make_text_pdf(text='HELLO GRED A'):
     """A minimal, valid one-page PDF with a real text layer (correct xref)."""
+    return _make_pages_pdf(text)
+
+
+def _make_pages_pdf(*texts):
+    """A minimal, valid PDF with one page per text, each with a real text layer."""
+    n = len(texts)
+    kids = b' '.join(f'{4 + 2 * i} 0 R'.encode() for i in range(n))
     objs = [
         b"<< /Type /Catalog /Pages 2 0 R >>",
-        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
-        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 200] "
-        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(n).encode() + b" >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
     ]
-    stream = b"BT /F1 24 Tf 36 100 Td (" + text.encode() + b") Tj ET"
-    objs.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
-    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(texts):
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 200] "
+                    b"/Resources << /Font << /F1 3 0 R >> >> /Contents "
+                    + str(5 + 2 * i).encode() + b" 0 R >>")
+        stream = b"BT /F1 24 Tf 36 100 Td (" + text.encode() + b") Tj ET"
+        objs.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
     out = b"%PDF-1.4\n"
     offsets = []
     for i, body in enumerate(objs, start=1):
@@ -67,6 +77,44 @@ class TestPdfHelpers(SimpleTestCase):
         self.assertTrue(img.startswith(_PNG_MAGIC))
 
 
+class TestPdfPages(SimpleTestCase):
+    """pdf.open_pdf: one parse per PDF, text read page by page, pages rasterised on demand."""
+
+    def setUp(self):
+        pdf.clear_cache()
+
+    def test_same_bytes_share_one_parse(self):
+        data = _make_pages_pdf('PAGE ONE TEXT', 'PAGE TWO TEXT')
+        with patch('pypdf.PdfReader', wraps=__import__('pypdf').PdfReader) as reader:
+            self.assertEqual(_pdf_text_layer(data), 'PAGE ONE TEXT\nPAGE TWO TEXT')
+            self.assertEqual(_pdf_text_layer(data), 'PAGE ONE TEXT\nPAGE TWO TEXT')
+        reader.assert_called_once()
+
+    def test_digital_check_stops_at_the_first_page_that_is_enough(self):
+        data = _make_pages_pdf('EPF PENYATA AHLI 2025 CARUMAN', 'SECOND', 'THIRD')
+        self.assertTrue(_pdf_is_digital(data))
+        self.assertEqual(len(pdf.open_pdf(data)._texts), 1)    # pages 2-3 never extracted
+
+    def test_digital_check_matches_the_full_layer(self):
+        # Short text on every page: only the WHOLE layer clears the threshold.
+        short = _make_pages_pdf('AAAAAAAAAA', 'BBBBBBBBBB', 'CCCCCCCCCC')
+        self.assertEqual(_pdf_is_digital(short), len(_pdf_text_layer(short)) >= 25)
+        self.assertFalse(_pdf_is_digital(b'not a pdf'))
+
+    def test_page_is_rasterised_once(self):
+        data = _make_pages_pdf('X', 'Y')
+        with patch('pypdfium2.PdfDocument', wraps=__import__('pypdfium2').PdfDocument) as doc:
+            first = _pdf_first_page_png(data)
+            self.assertIs(_pdf_first_page_png(data), first)
+        doc.assert_called_once()
+        self.assertIsNone(pdf.open_pdf(data).page_png(5))        # no such page
+
+    def test_cache_is_bounded(self):
+        for i in range(pdf._CACHE_SIZE + 3):
+            pdf.open_pdf(b'%PDF-' + str(i).encode())
+        self.assertEqual(len(pdf._cache), pdf._CACHE_SIZE)
+
+
 class TestExtractDispatch(SimpleTestCase):
     def test_digital_pdf_uses_text_layer_no_vision(self):
         # Realistic length (> _MIN_PDF_TEXT) so it's treated as a digital PDF.
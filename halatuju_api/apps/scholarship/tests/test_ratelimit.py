@@ -0,0 +1,149 @@
+"""The rate-limit engine (halatuju/ratelimit.py): a sliding-window counter — two integers per
+client — that admits at most the limit under concurrency, never counts a refused request, hands
+a slot back on refund, and keeps per-scope rejection metrics for the super-only readout."""
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import jwt
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.courses.models import PartnerAdmin, PartnerOrganisation
+from halatuju import ratelimit
+
+TEST_JWT_SECRET = 'test-supabase-jwt-secret'
+URL = '/api/v1/admin/scholarship/ops/rate-limits/'
+
+# A fixed clock at the start of a 60-second window.
+T0 = 60 * 1_000_000
+
+
+def _at(t):
+    return mock.patch('halatuju.ratelimit._clock', return_value=t)
+
+
+def _hits(n, t=T0, **kw):
+    with _at(t):
+        return [ratelimit.hit('t', 'c', limit=3, period=60, **kw).allowed for _ in range(n)]
+
+
+class TestSlidingWindow(SimpleTestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        ratelimit.reset()
+
+    def test_the_limit_holds_and_a_refusal_is_not_counted(self):
+        self.assertEqual(_hits(5), [True, True, True, False, False])
+        with _at(T0):
+            refused = ratelimit.hit('t', 'c', limit=3, period=60)
+        self.assertFalse(refused)
+        self.assertEqual(refused.retry_after, 60)                   # the window must end
+        self.assertEqual(caches['default'].get(f'rl:t:c:{T0 // 60}'), 3)
+        self.assertEqual(_hits(1, t=T0 + 5), [False])
+        self.assertEqual(ratelimit.hit('t', 'other', limit=3, period=60).allowed, True)
+
+    def test_the_previous_window_is_weighted_by_its_overlap(self):
+        _hits(3)
+        # 15s into the next window: 3 × 0.75 = 2.25 still in the sliding window → 0 more.
+        self.assertEqual(_hits(1, t=T0 + 75), [False])
+        with _at(T0 + 75):
+            self.assertAlmostEqual(ratelimit.hit('t', 'c', limit=3, period=60).retry_after, 5)
+        # 45s in: 3 × 0.25 = 0.75 → two more fit.
+        self.assertEqual(_hits(3, t=T0 + 105), [True, True, False])
+        # Two windows on, the old ones are gone.
+        self.assertEqual(_hits(4, t=T0 + 240), [True, True, True, False])
+
+    def test_refund_hands_the_slot_back_once(self):
+        with _at(T0):
+            first = ratelimit.hit('t', 'c', limit=1, period=60)
+            self.assertFalse(ratelimit.hit('t', 'c', limit=1, period=60))
+            first.refund()
+            first.refund()                                          # idempotent
+            self.assertTrue(ratelimit.hit('t', 'c', limit=1, period=60))
+            self.assertFalse(ratelimit.hit('t', 'c', limit=1, period=60))
+
+    def test_a_cache_outage_allows(self):
+        down = mock.Mock(side_effect=ConnectionError('down'))
+        broken = mock.Mock(spec=['get_many', 'add', 'incr'], get_many=down, add=down, incr=down)
+        self.assertTrue(ratelimit.hit('t', 'c', limit=0, period=60, cache=broken))
+
+    def test_metrics_per_scope(self):
+        _hits(5)
+        with _at(T0):
+            ratelimit.hit('u', 'c', limit=0, period=60)
+        self.assertEqual(ratelimit.stats(), {'t': {'allowed': 3, 'rejected': 2},
+                                             'u': {'allowed': 0, 'rejected': 1}})
+        self.assertEqual(ratelimit.rejections(['t', 'u', 'v']), {'t': 2, 'u': 1, 'v': 0})
+        ratelimit.reset()
+        self.assertEqual(ratelimit.stats(), {})
+        self.assertEqual(ratelimit.rejections(['t'])['t'], 2)      # shared counts stay
+
+
+class TestConcurrency(SimpleTestCase):
+
+    def test_a_burst_across_threads_admits_exactly_the_limit(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = {'BACKEND': 'halatuju.cache.SQLiteCache',
+                 'LOCATION': os.path.join(tmp.name, 'cache.sqlite3')}
+        allowed, errors = [], []
+
+        def worker():
+            try:
+                for _ in range(10):
+                    allowed.append(ratelimit.hit('burst', 'c', limit=12, period=3600).allowed)
+            except Exception as e:  # noqa: BLE001 — reported below
+                errors.append(e)
+
+        with override_settings(CACHES={'default': store}):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(allowed.count(True), 12)
+
+
+def _token(uid):
+    return jwt.encode({'sub': uid, 'aud': 'authenticated', 'role': 'authenticated'},
+                      TEST_JWT_SECRET, algorithm='HS256')
+
+
+@override_settings(ROOT_URLCONF='halatuju.urls', SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+class TestRateLimitsEndpoint(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        org = PartnerOrganisation.objects.create(code='aa', name='Alpha Org')
+        PartnerAdmin.objects.create(supabase_user_id='super-uid', is_super_admin=True,
+                                    is_active=True, name='Super', email='super@x.com')
+        PartnerAdmin.objects.create(supabase_user_id='oa-a', role='org_admin', is_active=True,
+                                    owning_organisation=org, name='OA A', email='oa-a@x.com')
+
+    def setUp(self):
+        caches['default'].clear()
+        ratelimit.reset()
+
+    def _client(self, uid):
+        c = APIClient()
+        c.credentials(HTTP_AUTHORIZATION=f'Bearer {_token(uid)}')
+        return c
+
+    def test_super_reads_every_scope(self):
+        for _ in range(2):
+            ratelimit.hit('report', 'u1', limit=1, period=86400)
+        body = self._client('super-uid').get(URL).json()
+        rows = {r['scope']: r for r in body['scopes']}
+        self.assertTrue({'anon', 'upload', 'public_count', 'help_coach'} <= set(rows))
+        self.assertEqual(rows['report'], {'scope': 'report', 'allowed': 1, 'rejected': 1,
+                                          'rejected_shared': 1})
+        self.assertEqual(self._client('super-uid').delete(URL).status_code, 204)
+        self.assertEqual(ratelimit.stats(), {})
+
+    def test_org_roles_are_refused(self):
+        self.assertEqual(self._client('oa-a').get(URL).status_code, 403)
+        self.assertEqual(self._client('oa-a').delete(URL).status_code, 403)
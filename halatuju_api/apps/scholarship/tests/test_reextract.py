@@ -1,10 +1,14 @@
 """The bulk reextract command: self-batching by the pass marker, scoped to supporting
 doc types (photos/ICs excluded), advancing each run. The actual per-doc read is mocked
-(no Vision/Gemini in tests) — we assert the batching + marking contract."""
+(no Vision/Gemini in tests) — we assert the batching + marking contract, the whole-corpus
+walk, the billable-call ceiling, the worker pool and the pacing buckets."""
+from io import StringIO
 from unittest.mock import patch
 
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
+
+from apps.scholarship import pacing, usage
 
 from apps.courses.models import StudentProfile
 from apps.scholarship.models import (
@@ -27,7 +31,7 @@ class ReextractCommandTests(TestCase):
         ApplicantDocument.objects.create(application=self.app, doc_type='photo', storage_path='p')
 
     def _marked(self):
-        return ApplicantDocument.objects.filter(**{f'vision_fields__{MARKER}': True}).count()
+        return ApplicantDocument.objects.filter(reextract_pass=MARKER, reextract_state='done').count()
 
     @staticmethod
     def _stamped_read(doc):
@@ -50,13 +54,13 @@ class ReextractCommandTests(TestCase):
         self.assertEqual(mock_re.call_count, 3)        # only the 3 offer letters, never the photo
         self.assertEqual(self._marked(), 3)
         photo = ApplicantDocument.objects.get(doc_type='photo')
-        self.assertNotIn(MARKER, (photo.vision_fields or {}))
+        self.assertEqual(photo.reextract_pass, '')
         # Batch 3 → nothing left to do.
         call_command('reextract_documents', '--limit', '2')
         self.assertEqual(mock_re.call_count, 3)
 
     def _marked_error(self):
-        return ApplicantDocument.objects.filter(**{f'vision_fields__{MARKER}': 'error'}).count()
+        return ApplicantDocument.objects.filter(reextract_pass=MARKER, reextract_state='error').count()
 
     @patch('apps.scholarship.management.commands.reextract_documents.reextract_document',
            side_effect=RuntimeError('boom'))
@@ -90,3 +94,135 @@ class ReextractCommandTests(TestCase):
         call_command('reextract_documents', '--limit', '5')
         self.assertEqual(self._marked(), 0)
         self.assertEqual(self._marked_error(), 3)
+
+    @patch('apps.scholarship.management.commands.reextract_documents.reextract_document')
+    def test_all_walks_the_whole_corpus_in_one_run(self, mock_re):
+        mock_re.side_effect = self._stamped_read
+        out = StringIO()
+        call_command('reextract_documents', '--all', stdout=out)
+        self.assertEqual(mock_re.call_count, 3)
+        self.assertEqual(self._marked(), 3)
+        self.assertIn('0 remaining', out.getvalue())
+
+    @patch('apps.scholarship.management.commands.reextract_documents.reextract_document')
+    def test_call_ceiling_stops_dispatch_and_the_next_run_resumes(self, mock_re):
+        def read(doc):
+            pacing.pace(usage.GEMINI)           # each read spends ONE billable call
+            return self._stamped_read(doc)
+        mock_re.side_effect = read
+        out = StringIO()
+        call_command('reextract_documents', '--all', '--max-calls', '2', stdout=out)
+        self.assertEqual(mock_re.call_count, 2)
+        self.assertIn('STOPPED at the 2-call ceiling', out.getvalue())
+        self.assertIn('1 remaining', out.getvalue())
+        # The checkpointed docs are never re-read — the next run picks up the last one only.
+        call_command('reextract_documents', '--all', '--max-calls', '2', stdout=StringIO())
+        self.assertEqual(mock_re.call_count, 3)
+        self.assertEqual(self._marked(), 3)
+
+
+class RunPassPoolTests(SimpleTestCase):
+    """``run_pass`` with workers > 1: every doc read exactly once on the pool, checkpointed, and
+    reported back on the calling thread. DB-free (SQLite's shared-cache test DB locks under
+    concurrent writers) — the checkpoint write itself is covered by the command tests above."""
+
+    @staticmethod
+    def _doc(i):
+        from types import SimpleNamespace
+        d = SimpleNamespace(id=i, pk=i, vision_fields_run_at=None, vision_run_at=None)
+        d.refresh_from_db = lambda: None
+        return d
+
+    @patch('apps.scholarship.reextract.mark_pass')
+    def test_prefetch_scope_wraps_each_group(self, _mark):
+        from apps.scholarship.reextract import run_pass
+        events = []
+
+        class _Scope:
+            def __init__(self, group):
+                self.ids = [d.id for d in group]
+
+            def __enter__(self):
+                events.append(('prefetch', self.ids))
+
+            def __exit__(self, *exc):
+                events.append(('settle', self.ids))
+
+        def read(doc):
+            events.append(('read', doc.id))
+            doc.vision_fields_run_at = 'now'
+        for workers in (1, 2):
+            events.clear()
+            stats = run_pass([self._doc(i) for i in range(5)], pass_marker=MARKER, read=read,
+                             summary=lambda d: '', workers=workers, prefetch=_Scope, group_size=2)
+            self.assertEqual(stats['processed'], 5)
+            scopes = [e for e in events if e[0] != 'read']
+            self.assertEqual(scopes, [('prefetch', [0, 1]), ('settle', [0, 1]),
+                                      ('prefetch', [2, 3]), ('settle', [2, 3]),
+                                      ('prefetch', [4]), ('settle', [4])])
+            # Every read of a group runs INSIDE that group's scope.
+            for i in range(5):
+                at = events.index(('read', i))
+                self.assertLess(events.index(('prefetch', scopes[2 * (i // 2)][1])), at)
+                self.assertLess(at, events.index(('settle', scopes[2 * (i // 2)][1])))
+
+    @patch('apps.scholarship.reextract.mark_pass')
+    def test_pool_reads_each_doc_once(self, mock_mark):
+        import threading
+        from apps.scholarship.reextract import run_pass
+        seen, reported, threads = [], [], set()
+
+        def read(doc):
+            seen.append(doc.id)
+            threads.add(threading.get_ident())
+            doc.vision_fields_run_at = 'now'
+        stats = run_pass([self._doc(i) for i in range(8)], pass_marker=MARKER, read=read,
+                         summary=lambda d: '', workers=3,
+                         on_result=lambda doc, ok, *_: reported.append((doc.id, ok,
+                                                                         threading.get_ident())))
+        self.assertEqual(sorted(seen), list(range(8)))
+        self.assertEqual(stats['processed'], 8)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(mock_mark.call_count, 8)
+        self.assertNotIn(threading.get_ident(), threads)                     # reads ran on the pool
+        self.assertEqual({t for *_, t in reported}, {threading.get_ident()})  # reports did not
+
+    @patch('apps.scholarship.reextract.mark_pass')
+    def test_pool_stops_dispatch_at_the_ceiling(self, _mark):
+        from apps.scholarship.reextract import run_pass
+
+        def read(doc):
+            pacing.pace(usage.VISION_OCR)
+            doc.vision_fields_run_at = 'now'
+        budget = pacing.RunBudget(max_calls=4)
+        stats = run_pass([self._doc(i) for i in range(20)], pass_marker=MARKER, read=read,
+                         summary=lambda d: '', workers=2, budget=budget)
+        self.assertEqual(stats['stopped'], 'budget')
+        # In-flight docs finish, nothing new starts: the overshoot is bounded by the pool width.
+        self.assertGreaterEqual(stats['processed'], 4)
+        self.assertLessEqual(stats['processed'], 4 + 2)
+
+
+class PacingTests(SimpleTestCase):
+    def test_bucket_waits_out_the_rate_once_the_burst_is_spent(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(s):
+            slept.append(s)
+            now[0] += s
+        bucket = pacing.TokenBucket(60, burst=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(len(slept), 2)            # burst of 2 free, then 1/sec
+        self.assertAlmostEqual(sum(slept), 2.0)
+
+    def test_pace_is_a_noop_outside_a_run_and_tallied_inside(self):
+        pacing.pace(usage.VISION_OCR)              # no run → nothing to count, never blocks
+        budget = pacing.RunBudget(max_calls=2)
+        with pacing.paced_run(budget):
+            pacing.pace(usage.VISION_OCR)
+            self.assertFalse(budget.exhausted())
+            pacing.pace(usage.GEMINI)
+        self.assertTrue(budget.exhausted())
+        self.assertEqual(budget.calls, {usage.VISION_OCR: 1, usage.GEMINI: 1})
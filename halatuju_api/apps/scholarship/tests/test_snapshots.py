@@ -0,0 +1,206 @@
+"""Verdict / anomaly snapshots (snapshots.py): served from the row while the inputs are unchanged,
+recomputed the moment any input changes — however it was written — and audited by
+``check_verdict_snapshots``."""
+import json
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from apps.scholarship import snapshots
+from apps.scholarship.models import (
+    ApplicantDocument, Consent, ScholarshipApplication, ScholarshipCohort, VerdictSnapshot,
+)
+from apps.scholarship.serializers_admin import AdminApplicationDetailSerializer
+from apps.scholarship.tests.test_phase_c import PhaseCBase
+from apps.courses.models import (
+    Course, CourseInstitution, FieldTaxonomy, Institution, StudentProfile,
+)
+
+
+def _fresh(app):
+    return ScholarshipApplication.objects.get(pk=app.pk)
+
+
+class _Base(PhaseCBase):
+    def setUp(self):
+        super().setUp()
+        self.app = self._complete(self._make_app())
+
+    def _counting(self):
+        """Patch both engines with pass-throughs that count their calls."""
+        from apps.scholarship import anomaly_engine, verdict_engine
+        calls = {'verdict': 0, 'anomalies': 0}
+        real_v, real_a = verdict_engine.build_verdict, anomaly_engine.detect_anomalies
+
+        def v(app):
+            calls['verdict'] += 1
+            return real_v(app)
+
+        def a(app):
+            calls['anomalies'] += 1
+            return real_a(app)
+        return calls, mock.patch.object(verdict_engine, 'build_verdict', v), \
+            mock.patch.object(anomaly_engine, 'detect_anomalies', a)
+
+
+class TestServing(_Base):
+    def test_same_answer_as_the_engines(self):
+        from apps.scholarship.anomaly_engine import detect_anomalies
+        from apps.scholarship.verdict_engine import build_verdict
+        live_v, live_a = build_verdict(self.app), detect_anomalies(self.app)
+        self.assertEqual(snapshots.verdict(self.app), json.loads(json.dumps(live_v)))
+        self.assertEqual(snapshots.anomalies(_fresh(self.app)), json.loads(json.dumps(live_a)))
+
+    def test_second_read_is_served_from_the_row(self):
+        calls, pv, pa = self._counting()
+        with pv, pa:
+            snapshots.verdict(self.app)
+            snapshots.anomalies(_fresh(self.app))
+            snapshots.current(_fresh(self.app))
+        self.assertEqual(calls, {'verdict': 1, 'anomalies': 1})
+        snap = VerdictSnapshot.objects.get(application=self.app)
+        self.assertEqual(snap.inputs_stamp, snapshots.inputs_stamp(self.app))
+
+    def test_callers_get_their_own_copy(self):
+        snapshots.verdict(self.app).clear()
+        self.assertTrue(snapshots.verdict(self.app))
+
+    def test_one_stamp_per_loaded_block(self):
+        from apps.scholarship import doc_context
+        real = snapshots.inputs_stamp
+        with mock.patch.object(snapshots, 'inputs_stamp', side_effect=real) as stamp:
+            with doc_context.loaded(self.app):
+                snapshots.verdict(self.app)
+                snapshots.anomalies(self.app)
+                snapshots.verdict(self.app)
+        self.assertEqual(stamp.call_count, 1)
+
+    @override_settings(VERDICT_SNAPSHOTS_ENABLED=False)
+    def test_disabled_computes_live_and_stores_nothing(self):
+        calls, pv, pa = self._counting()
+        with pv, pa:
+            snapshots.verdict(self.app)
+            snapshots.verdict(self.app)
+        self.assertEqual(calls['verdict'], 2)
+        self.assertFalse(VerdictSnapshot.objects.exists())
+
+
+class TestInvalidation(_Base):
+    def _recomputes_after(self, change):
+        snapshots.current(self.app)
+        before = VerdictSnapshot.objects.get(application=self.app).inputs_stamp
+        change()
+        calls, pv, pa = self._counting()
+        with pv, pa:
+            snapshots.current(_fresh(self.app))
+        self.assertEqual(calls['verdict'], 1)
+        self.assertNotEqual(VerdictSnapshot.objects.get(application=self.app).inputs_stamp, before)
+
+    def test_document_written_by_queryset_update(self):
+        """No signal fires for ``QuerySet.update`` — the stamp still sees it."""
+        doc = self.app.documents.first()
+        self._recomputes_after(lambda: ApplicantDocument.objects.filter(pk=doc.pk).update(
+            superseded_at=timezone.now()))
+
+    def test_new_document(self):
+        self._recomputes_after(lambda: ApplicantDocument.objects.create(
+            application=self.app, doc_type='birth_certificate', storage_path='x/bc'))
+
+    def test_profile_change(self):
+        self._recomputes_after(lambda: StudentProfile.objects.filter(
+            pk=self.app.profile_id).update(name='SOMEONE ELSE'))
+
+    def test_application_change(self):
+        self._recomputes_after(lambda: ScholarshipApplication.objects.filter(
+            pk=self.app.pk).update(income_route='salary'))
+
+    def test_consent_change(self):
+        self._recomputes_after(lambda: Consent.objects.filter(
+            application=self.app).update(is_active=False))
+
+    def test_cohort_ceiling_change(self):
+        """The income headroom reads the cohort's ceilings — an admin edit must be seen."""
+        self._recomputes_after(lambda: ScholarshipCohort.objects.filter(
+            pk=self.app.cohort_id).update(income_ceiling=9999))
+
+    def test_catalogue_change_for_the_chosen_course(self):
+        ft = FieldTaxonomy.objects.create(key='snap', name_en='Education', name_ms='Pendidikan',
+                                          name_ta='x', image_slug='edu')
+        course = Course.objects.create(course_id='SNAP01', course='Pendidikan Rendah',
+                                       level='Ijazah Sarjana Muda', department='Edu',
+                                       field='Education', field_key=ft)
+        inst = Institution.objects.create(institution_id='SNAPI', type='IPG', state='Perak',
+                                          institution_name='Institut Pendidikan Guru Kampus A')
+        CourseInstitution.objects.create(course=course, institution=inst)
+        ScholarshipApplication.objects.filter(pk=self.app.pk).update(
+            chosen_programme={'course_id': 'SNAP01'})
+        self.app = _fresh(self.app)
+        self._recomputes_after(lambda: Institution.objects.filter(pk='SNAPI').update(
+            institution_name='Institut Pendidikan Guru Kampus B'))
+
+    def test_engine_version_bump(self):
+        self._recomputes_after(lambda: setattr(snapshots, 'ENGINE_VERSION',
+                                               snapshots.ENGINE_VERSION + 1))
+
+    def tearDown(self):
+        snapshots.ENGINE_VERSION = 1
+        super().tearDown()
+
+
+class TestReentrancyGuard(_Base):
+    def test_in_flight_work_is_private_to_its_thread(self):
+        token = snapshots._computing.set(frozenset({self.app.pk}))
+        try:
+            self.assertTrue(snapshots._live(self.app))
+            seen = []
+            t = threading.Thread(target=lambda: seen.append(snapshots._live(self.app)))
+            t.start()
+            t.join()
+            self.assertEqual(seen, [False])
+        finally:
+            snapshots._computing.reset(token)
+        self.assertFalse(snapshots._live(self.app))
+
+
+class TestDetailPayload(_Base):
+
+    def test_payload_identical_live_and_from_the_row(self):
+        with override_settings(VERDICT_SNAPSHOTS_ENABLED=False):
+            live = json.dumps(AdminApplicationDetailSerializer(_fresh(self.app)).data,
+                              sort_keys=True, default=str)
+        first = json.dumps(AdminApplicationDetailSerializer(_fresh(self.app)).data,
+                           sort_keys=True, default=str)
+        served = json.dumps(AdminApplicationDetailSerializer(_fresh(self.app)).data,
+                            sort_keys=True, default=str)
+        self.assertEqual(live, first)
+        self.assertEqual(live, served)
+
+
+class TestChecker(_Base):
+    def _run(self, *args):
+        out = StringIO()
+        call_command('check_verdict_snapshots', '--app', str(self.app.id), *args, stdout=out)
+        return out.getvalue()
+
+    def test_missing_then_ok(self):
+        self.assertIn('1 missing', self._run())
+        snapshots.current(self.app)
+        self.assertIn('1 ok, 0 drift', self._run())
+
+    def test_stale_is_not_a_fault(self):
+        snapshots.current(self.app)
+        ScholarshipApplication.objects.filter(pk=self.app.pk).update(income_route='salary')
+        self.assertIn('0 drift, 1 stale', self._run())
+
+    def test_drift_is_listed_and_repaired(self):
+        snapshots.current(self.app)
+        VerdictSnapshot.objects.filter(application=self.app).update(verdict=[], anomalies=[])
+        out = self._run()
+        self.assertIn('1 drift', out)
+        self.assertIn(f'app {self.app.id}', out)
+        self.assertIn('1 rewritten', self._run('--repair'))
+        self.assertIn('1 ok, 0 drift', self._run())
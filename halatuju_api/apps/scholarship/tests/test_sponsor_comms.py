@@ -423,6 +423,38 @@ class TestRendering(CommsBase):
             'cards': [{'ref': 'S-A', 'course': 'Medicine', 'amount': '3000'}]})
         self.assertNotIn('{student_cards}', subject)
 
+    def test_a_template_is_compiled_once_per_version(self):
+        from apps.scholarship import email_templates
+        email_templates.compile_template.cache_clear()
+        tpl = _template('credit_confirmed')
+        for ref in ('T-1', 'T-2', 'T-3'):
+            _s, text, _h = sponsor_comms.render('credit_confirmed', tpl, {
+                'amount': '10', 'available': '5', 'bank_ref': ref})
+            self.assertIn(ref, text)
+        self.assertEqual(email_templates.compile_template.cache_info().misses, 1)
+        tpl.body = 'Edited: {bank_ref}'                       # a new version is compiled afresh
+        _s, text, _h = sponsor_comms.render('credit_confirmed', tpl, {'bank_ref': 'T-4'})
+        self.assertEqual(text, 'Edited: T-4')
+        self.assertEqual(email_templates.compile_template.cache_info().misses, 2)
+
+    def test_a_value_is_substituted_once(self):
+        tpl = _template('referral_invite', body='{note}\n\n{invitee_name} <{invite_link}>')
+        _s, text, html = sponsor_comms.render('referral_invite', tpl, {
+            'note': 'See {invite_link}', 'invitee_name': 'A & B', 'invite_link': 'x'})
+        self.assertEqual(text, 'See {invite_link}\n\nA & B <x>')
+        self.assertIn('A &amp; B &lt;x&gt;', html)
+
+    def test_cards_are_built_once_per_dispatch_run(self):
+        from apps.scholarship import emails, mail_dispatch
+        cards = [{'id': i, 'ref': f'S-{i}', 'course': 'Medicine'} for i in range(3)]
+        with mock.patch.object(emails, '_sponsor_card_html', wraps=emails._sponsor_card_html) as build, \
+                mock.patch.object(emails, '_tax_name_map', wraps=emails._tax_name_map) as tax:
+            with mail_dispatch.batch('t'):
+                first = [sponsor_comms.student_cards_blocks(cards) for _ in range(4)]
+            self.assertEqual((build.call_count, tax.call_count), (3, 1))
+            self.assertEqual(sponsor_comms.student_cards_blocks(cards), first[0])   # no run: rebuilt
+            self.assertEqual((build.call_count, tax.call_count), (6, 2))
+
 
 # ── the endpoints ─────────────────────────────────────────────────────────────
 
@@ -255,3 +255,14 @@ class TestSponsorNotificationPref(TestCase):
         r = self.client.patch('/api/v1/sponsor/notifications/', {'notify_frequency': 'daily'}, format='json')
         self.assertEqual(r.status_code, 400)
         self.assertEqual(r.json()['error'], 'bad_frequency')
+
+
+class TestDigestRenderBenchmark(TestCase):
+    def test_the_benchmark_runs_and_holds_parity(self):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('bench_sponsor_digest', '--sponsors', '6', '--students', '4',
+                     '--repeat', '1', stdout=out)
+        self.assertIn('parity ok', out.getvalue())
+        self.assertIn('template speedup', out.getvalue())
@@ -15,6 +15,7 @@ governs WHICH cards are visible, never WHAT a card shows.
 """
 import inspect
 from decimal import Decimal
+from unittest.mock import patch
 
 import jwt
 from django.test import TestCase, override_settings
@@ -137,6 +138,58 @@ class TestNotificationsRespectTheFence(PoolFenceMixin, TestCase):
         self.assertEqual([a.id for a in theirs], [self.flagship_app.id])
 
 
+class TestRealtimeFanOut(PoolFenceMixin, TestCase):
+    """The real-time alert's bulk planner: the same fence and the same cards as asking per
+    sponsor, with the memberships read once and each card built once per trust level."""
+
+    def _realtime(self, uid, *programmes, trusted=True):
+        s = Sponsor.objects.create(supabase_user_id=uid, name=uid, email=f'{uid}@x.com',
+                                   status='approved', notify_frequency='realtime',
+                                   is_trusted=trusted)
+        for p in programmes:
+            _accept(s, p)
+        return s
+
+    def _alerts(self):
+        alerts = {}
+        with patch('apps.scholarship.sponsor_notify.send_student_alert',
+                   side_effect=lambda s, cards: alerts.setdefault(s.pk, list(cards)) or True):
+            res = sponsor_notifications.send_sponsor_realtime()
+        return res, alerts
+
+    def test_each_sponsor_gets_exactly_their_fenced_cards(self):
+        from apps.scholarship.serializers import SponsorPoolDetailSerializer
+        sabah = self._realtime('rt-a', self.sabah)
+        both = self._realtime('rt-b', self.flagship, self.sabah, trusted=False)
+        flag = self._realtime('rt-c', self.flagship)
+        self._realtime('rt-d')                                   # accepted into nothing
+        self._realtime('rt-e', self.sabah, trusted=False)
+        res, alerts = self._alerts()
+        self.assertEqual((res['sponsors'], res['sent']), (5, 4))
+        base = pool.eligible_pool_queryset(ScholarshipApplication)
+        for s in (sabah, both, flag):
+            theirs = list(pool.for_sponsor(base, s).order_by('id'))
+            expected = SponsorPoolDetailSerializer(
+                theirs, many=True, context={'is_trusted': s.is_trusted}).data
+            got = sorted(alerts[s.pk], key=lambda c: c['id'])
+            self.assertEqual(got, list(expected), s.supabase_user_id)
+
+    def test_memberships_are_read_once_and_cards_built_once_per_trust_level(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        for i in range(6):
+            self._realtime(f'rt-{i}', self.flagship, self.sabah, trusted=bool(i % 2))
+        real = sponsor_notifications._serialise_cards
+        with patch.object(sponsor_notifications, '_serialise_cards', side_effect=real) as build, \
+                CaptureQueriesContext(connection) as ctx:
+            _res, alerts = self._alerts()
+        self.assertEqual(len(alerts), 6)
+        self.assertEqual(build.call_count, 2)                   # trusted + untrusted, not 6
+        membership = [q for q in ctx.captured_queries
+                      if 'sponsor_programme_memberships' in q['sql']]
+        self.assertEqual(len(membership), 1)
+
+
 class TestStandingGiftRespectsTheFence(PoolFenceMixin, TestCase):
     def test_standing_gift_never_reaches_an_unaccepted_programme(self):
         from apps.scholarship.models import Donation
@@ -195,8 +248,10 @@ class TestEverySponsorPoolReadIsFenced(TestCase):
             )
 
     def test_notification_paths_narrow_by_membership(self):
+        # The real-time alert fences in its bulk fan-out planner.
+        self.assertIn('_fanout_plan', inspect.getsource(sponsor_notifications.send_sponsor_realtime))
         for fn in (sponsor_notifications.send_sponsor_digests,
-                   sponsor_notifications.send_sponsor_realtime):
+                   sponsor_notifications._fanout_plan):
             source = inspect.getsource(fn)
             self.assertTrue(
                 'for_sponsor' in source or 'approved_programme_ids' in source,
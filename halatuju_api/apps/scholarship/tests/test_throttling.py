@@ -8,7 +8,7 @@ The limit (num_requests/duration) is forced on each throttle instance rather
 than via override_settings, because DRF caches its settings at import and the
 test-time reload is unreliable; in production the rate is read from
 settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] at startup. A real LocMemCache
-is pinned so the sliding-window history actually persists between requests.
+is pinned so the window counters (halatuju.ratelimit) persist between requests.
 """
 from django.core.cache import cache
 from django.test import RequestFactory, TestCase, override_settings
@@ -79,6 +79,16 @@ class AnonThrottleTests(TestCase):
         self.assertFalse(hit('1.1.1.1'))  # client A: 3rd → blocked
         self.assertTrue(hit('3.3.3.3'))   # client B unaffected → separate bucket
 
+    def test_a_blocked_client_is_told_when_to_retry(self):
+        t = _capped(ClientAnonRateThrottle, num=1, dur=60)
+        r = self.rf.get('/', HTTP_X_FORWARDED_FOR='4.4.4.4', REMOTE_ADDR='10.0.0.1')
+        self.assertTrue(t.allow_request(r, None))
+        self.assertIsNone(t.wait())
+        self.assertFalse(t.allow_request(r, None))
+        self.assertTrue(0 < t.wait() <= 60)
+        # Two integers per client, not a timestamp list.
+        self.assertFalse(any(isinstance(v, list) for v in cache._cache.values()))
+
 
 @override_settings(CACHES=LOCMEM)
 class UploadThrottleTests(TestCase):
@@ -0,0 +1,179 @@
+"""Upload-pipeline timing (timing.py): the span/trace facility, the per-process histogram, the
+super-only readout, and the wiring into the upload POST."""
+import logging
+from unittest.mock import patch
+
+import jwt
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.courses.models import PartnerAdmin, PartnerOrganisation, StudentProfile
+from apps.scholarship import timing
+from apps.scholarship.models import ScholarshipApplication, ScholarshipCohort
+
+TEST_JWT_SECRET = 'test-supabase-jwt-secret'
+URL = '/api/v1/admin/scholarship/ops/upload-timings/'
+
+
+def _token(uid):
+    return jwt.encode({'sub': uid, 'aud': 'authenticated', 'role': 'authenticated'},
+                      TEST_JWT_SECRET, algorithm='HS256')
+
+
+def _row(stage, doc_type=''):
+    return next((r for r in timing.HISTOGRAM.snapshot()
+                 if r['stage'] == stage and r['doc_type'] == doc_type), None)
+
+
+class TestHistogram(SimpleTestCase):
+    def test_percentiles_are_nearest_rank_over_the_reservoir(self):
+        h = timing.Histogram()
+        for ms in range(1, 101):                  # 1..100 ms
+            h.observe('vision.ocr', 'ic', float(ms))
+        (row,) = h.snapshot()
+        self.assertEqual((row['count'], row['p50_ms'], row['p95_ms'], row['max_ms']),
+                         (100, 50.0, 95.0, 100.0))
+
+    def test_reservoir_is_bounded_but_count_is_not(self):
+        h = timing.Histogram(size=10)
+        for ms in range(100):
+            h.observe('s', '', float(ms))
+        (row,) = h.snapshot()
+        self.assertEqual(row['count'], 100)
+        self.assertEqual(row['p50_ms'], 94.0)     # only the last ten (90..99) are kept
+
+    def test_slowest_p95_first_and_reset(self):
+        h = timing.Histogram()
+        h.observe('fast', 'ic', 1.0)
+        h.observe('slow', 'ic', 900.0)
+        self.assertEqual([r['stage'] for r in h.snapshot()], ['slow', 'fast'])
+        h.reset()
+        self.assertEqual(h.snapshot(), [])
+
+
+class TestSpans(SimpleTestCase):
+    def setUp(self):
+        timing.HISTOGRAM.reset()
+
+    def test_span_inherits_the_trace_doc_type(self):
+        with timing.trace('upload', doc_type='salary_slip'):
+            with timing.span('vision.ocr'):
+                pass
+        self.assertIsNotNone(_row('vision.ocr', 'salary_slip'))
+        self.assertIsNotNone(_row('upload', 'salary_slip'))
+
+    def test_span_outside_a_trace_has_no_doc_type(self):
+        with timing.span('storage.download'):
+            pass
+        self.assertIsNotNone(_row('storage.download', ''))
+
+    def test_exception_is_recorded_and_propagates(self):
+        with self.assertLogs('apps.scholarship.timing', level='DEBUG') as logs:
+            with self.assertRaises(ValueError):
+                with timing.span('gemini'):
+                    raise ValueError('boom')
+        self.assertEqual(_row('gemini')['count'], 1)
+        self.assertIn('ok=0', logs.output[0])
+
+    def test_timed_decorator_passes_the_result_through(self):
+        @timing.timed('storage.exists')
+        def probe(x):
+            return x * 2
+        self.assertEqual(probe(21), 42)
+        self.assertEqual(_row('storage.exists')['count'], 1)
+
+    @override_settings(UPLOAD_SLOW_STAGE_MS=0)
+    def test_slow_stage_logs_at_warning(self):
+        with self.assertLogs('apps.scholarship.timing', level='WARNING') as logs:
+            with timing.span('vision.ocr', doc_type='ic'):
+                pass
+        self.assertIn('span stage=vision.ocr doc_type=ic', logs.output[0])
+
+    def test_trace_logs_one_summary_line(self):
+        with self.assertLogs('apps.scholarship.timing', level=logging.INFO) as logs:
+            with timing.trace('upload', doc_type='ic'):
+                with timing.span('upload.read'):
+                    pass
+        (line,) = [l for l in logs.output if 'trace upload' in l]
+        self.assertIn('doc_type=ic', line)
+        self.assertIn('stages=upload.read:', line)
+
+
+@override_settings(ROOT_URLCONF='halatuju.urls', SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+class TestUploadTimingsEndpoint(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        org = PartnerOrganisation.objects.create(code='aa', name='Alpha Org')
+        PartnerAdmin.objects.create(supabase_user_id='super-uid', is_super_admin=True,
+                                    is_active=True, name='Super', email='super@x.com')
+        PartnerAdmin.objects.create(supabase_user_id='oa-a', role='org_admin', is_active=True,
+                                    owning_organisation=org, name='OA A', email='oa-a@x.com')
+        PartnerAdmin.objects.create(supabase_user_id='rev-a', role='reviewer', is_active=True,
+                                    owning_organisation=org, name='Rev A', email='rev-a@x.com')
+
+    def setUp(self):
+        timing.HISTOGRAM.reset()
+        timing.HISTOGRAM.observe('vision.ocr', 'ic', 400.0)
+        timing.HISTOGRAM.observe('storage.download', 'payslip', 30.0)
+
+    def _client(self, uid):
+        c = APIClient()
+        c.credentials(HTTP_AUTHORIZATION=f'Bearer {_token(uid)}')
+        return c
+
+    def test_super_reads_the_stages(self):
+        resp = self._client('super-uid').get(URL)
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual(set(body), {'pid', 'since', 'slow_ms', 'stages'})
+        self.assertEqual([r['stage'] for r in body['stages']], ['vision.ocr', 'storage.download'])
+
+    def test_filters(self):
+        c = self._client('super-uid')
+        self.assertEqual([r['stage'] for r in c.get(URL, {'stage': 'storage.'}).json()['stages']],
+                         ['storage.download'])
+        self.assertEqual([r['doc_type'] for r in c.get(URL, {'doc_type': 'ic'}).json()['stages']],
+                         ['ic'])
+
+    def test_org_roles_are_refused(self):
+        for uid in ('oa-a', 'rev-a'):
+            self.assertEqual(self._client(uid).get(URL).status_code, 403, uid)
+            self.assertEqual(self._client(uid).delete(URL).status_code, 403, uid)
+        self.assertEqual(len(timing.HISTOGRAM.snapshot()), 2)
+
+    def test_delete_resets(self):
+        self.assertEqual(self._client('super-uid').delete(URL).status_code, 204)
+        self.assertEqual(timing.HISTOGRAM.snapshot(), [])
+
+
+@override_settings(ROOT_URLCONF='halatuju.urls', SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+class TestUploadIsTraced(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cohort = ScholarshipCohort.objects.create(code='c', name='B40', year=2026)
+        profile = StudentProfile.objects.create(supabase_user_id='tim-a', nric='030101-14-1234')
+        cls.app = ScholarshipApplication.objects.create(cohort=cohort, profile=profile,
+                                                        status='shortlisted')
+
+    def setUp(self):
+        timing.HISTOGRAM.reset()
+
+    @patch('apps.scholarship.vision.run_vision_for_document', return_value=None)
+    def test_upload_records_the_trace_and_its_stages(self, _mock_vision):
+        c = APIClient()
+        c.credentials(HTTP_AUTHORIZATION=f'Bearer {_token("tim-a")}')
+        resp = c.post('/api/v1/scholarship/documents/', {
+            'doc_type': 'ic', 'storage_path': f'{self.app.id}/ic/new',
+            'original_filename': 'ic.jpeg', 'size': 1000,
+        }, format='json')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(_row('upload', 'ic')['count'], 1)
+        self.assertEqual(_row('upload.read', 'ic')['count'], 1)
+
+    def test_unknown_doc_type_is_not_a_histogram_key(self):
+        c = APIClient()
+        c.credentials(HTTP_AUTHORIZATION=f'Bearer {_token("tim-a")}')
+        c.post('/api/v1/scholarship/documents/', {
+            'doc_type': 'x' * 40, 'storage_path': f'{self.app.id}/ic/new',
+        }, format='json')
+        self.assertEqual({r['doc_type'] for r in timing.HISTOGRAM.snapshot()}, {''})
@@ -241,3 +241,107 @@ class TestVerdictMetricsEndpoint(TestCase):
         self.assertEqual(self.client.get('/api/v1/admin/scholarship/verdict-metrics/').status_code, 401)
         self._auth(STUDENT)
         self.assertEqual(self.client.get('/api/v1/admin/scholarship/verdict-metrics/').status_code, 403)
+
+
+# ── per-fact outcome columns + the SQL roll-up ───────────────────────────────
+
+_STATUSES = ('verified', 'review', 'gap', '')
+_OFFICER = ('pass', 'fail', '')
+
+
+class TestFactOutcomes(TestCase):
+    def test_codes(self):
+        out = audit.fact_outcomes(
+            _snapshot(identity='verified', academic='review', income='gap', pathway='verified'),
+            {'identity': 'fail', 'academic': 'pass', 'income': 'fail', 'pathway': ''})
+        self.assertEqual(out, {'identity': 'generous', 'academic': 'cautious',
+                               'income': 'agreed', 'pathway': ''})
+
+    def test_counts_reproduce_override_metrics(self):
+        records = [(_snapshot(identity=s), {'identity': o, 'income': o2})
+                   for s in _STATUSES for o in _OFFICER for o2 in _OFFICER]
+        per_fact = {f: {'decided': 0, 'overrides': 0} for f in audit.FACTS}
+        for snap, ov in records:
+            for fact, code in audit.fact_outcomes(snap, ov).items():
+                per_fact[fact]['decided'] += bool(code)
+                per_fact[fact]['overrides'] += code in audit.OVERRIDE_OUTCOMES
+        self.assertEqual(audit.metrics_from_counts(len(records), per_fact),
+                         audit.override_metrics(records))
+
+    def test_backfill_migration_matches_audit(self):
+        import importlib
+        mig = importlib.import_module(
+            'apps.scholarship.migrations.0150_verdict_fact_outcomes')
+        for s in _STATUSES:
+            for o in _OFFICER:
+                snap, ov = _snapshot(identity=s, pathway=s), {'identity': o, 'pathway': 'pass'}
+                self.assertEqual(mig._outcomes(snap, ov), audit.fact_outcomes(snap, ov))
+
+
+@override_settings(ROOT_URLCONF='halatuju.urls', SUPABASE_JWT_SECRET=TEST_JWT_SECRET)
+class TestOutcomeColumns(TestCase):
+    URL = '/api/v1/admin/scholarship/verdict-metrics/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cohort = ScholarshipCohort.objects.create(code='c', name='B40', year=2026)
+        cls.cohort2 = ScholarshipCohort.objects.create(code='c2', name='B40-2', year=2027)
+        PartnerAdmin.objects.create(supabase_user_id=REVIEWER, role='reviewer', is_active=True,
+                                    name='Rev', email='r@x.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {_token(REVIEWER)}')
+        self.n = 0
+
+    def _decided(self, snap, ov, cohort=None):
+        self.n += 1
+        p = StudentProfile.objects.create(supabase_user_id=f'oc{self.n}',
+                                          nric=f'0301{self.n:02d}-14-1234', name=f'O{self.n}')
+        return ScholarshipApplication.objects.create(
+            cohort=cohort or self.cohort, profile=p, status='interviewed',
+            ai_verdict_snapshot=snap, officer_verdict=ov, verdict_decided_at=timezone.now())
+
+    def test_save_derives_and_partial_save_follows(self):
+        app = self._decided(_snapshot(identity='verified'), {'identity': 'fail'})
+        self.assertEqual(app.verdict_outcome_identity, 'generous')
+        app.officer_verdict = {'identity': 'pass'}
+        app.save(update_fields=['officer_verdict'])
+        app.refresh_from_db()
+        self.assertEqual(app.verdict_outcome_identity, 'agreed')
+
+    def test_sql_rollup_equals_the_python_one(self):
+        records = [(_snapshot(identity=s, income=s), {'identity': o, 'income': 'pass', 'pathway': o})
+                   for s in _STATUSES for o in _OFFICER]
+        for snap, ov in records:
+            self._decided(snap, ov)
+        with self.assertNumQueries(2):                 # the admin lookup + ONE aggregate
+            body = self.client.get(self.URL).json()
+        self.assertEqual(body, audit.override_metrics(records))
+
+    def test_grouped_by_cohort(self):
+        self._decided(_snapshot(identity='verified'), {'identity': 'fail'})
+        self._decided(_snapshot(identity='verified'), {'identity': 'pass'}, cohort=self.cohort2)
+        self._decided(_snapshot(identity='gap'), {'identity': 'pass'}, cohort=self.cohort2)
+        body = self.client.get(self.URL, {'group': 'cohort'}).json()
+        self.assertEqual(body['applications'], 3)
+        groups = {g['cohort_id']: g for g in body['groups']}
+        self.assertEqual(groups[self.cohort.id]['override_rate'], 1.0)
+        self.assertEqual(groups[self.cohort2.id]['per_fact']['identity'],
+                         {'decided': 2, 'overrides': 1})
+
+    def test_record_verdict_writes_the_columns(self):
+        app = self._decided([], {})
+        ScholarshipApplication.objects.filter(pk=app.pk).update(verdict_decided_at=None,
+                                                                status='interviewing')
+        PartnerAdmin.objects.filter(supabase_user_id=REVIEWER).update(is_super_admin=True)
+        with patch('apps.scholarship.verdict_engine.build_verdict',
+                   return_value=_snapshot(identity='verified', academic='gap')):
+            r = self.client.post(
+                f'/api/v1/admin/scholarship/applications/{app.id}/record-verdict/',
+                {'officer_verdict': {'identity': 'fail', 'academic': 'pass', 'income': 'fail',
+                                     'pathway': 'pass', 'overall': 'decline'}}, format='json')
+        self.assertEqual(r.status_code, 200, r.content)
+        app.refresh_from_db()
+        self.assertEqual((app.verdict_outcome_identity, app.verdict_outcome_academic),
+                         ('generous', 'cautious'))
@@ -390,22 +390,49 @@ class TestInstallEmail(TestCase):
         self.assertTrue(content.startswith(b'%PDF'))
         self.assertNotIn(b'drive-live-copy', content)
 
+    @mock.patch('apps.scholarship.sheets.drive_pdf_file', return_value=('file-1', 'md5-1'))
     @mock.patch('apps.scholarship.sheets.fetch_drive_pdf')
     @override_settings(VIRCLE_GUIDE_CACHE_SECONDS=600)
-    def test_live_guide_bytes_are_cached_between_sends(self, fetch):
-        # A batch send must not re-download 1.5 MB per email: the fetched bytes are cached.
+    def test_live_guide_bytes_are_cached_between_sends(self, fetch, lookup):
+        # A batch send must not re-download 1.5 MB per email: the fetched bytes are cached — in
+        # the worker's memory, not the (database) Django cache.
         from django.core.cache import cache
 
+        from apps.scholarship import asset_cache
         from apps.scholarship.emails import vircle_guide_attachment
-        cache.clear()
-        try:
+        asset_cache.clear()
+        self.addCleanup(asset_cache.clear)
+        with mock.patch.object(cache, 'set') as cache_set:
             fetch.return_value = b'%PDF-1.7 cached-once'
             first = vircle_guide_attachment()
             second = vircle_guide_attachment()
-            self.assertEqual(first, second)
-            fetch.assert_called_once()
-        finally:
-            cache.clear()
+        self.assertEqual(first, second)
+        fetch.assert_called_once_with(settings.VIRCLE_GUIDE_FOLDER, settings.VIRCLE_GUIDE_FILENAME,
+                                      file_id='file-1')
+        lookup.assert_called_once()             # one folder walk: the download reuses its id
+        cache_set.assert_not_called()
+
+    @mock.patch('apps.scholarship.sheets.drive_pdf_file')
+    @mock.patch('apps.scholarship.sheets.fetch_drive_pdf')
+    @override_settings(VIRCLE_GUIDE_CACHE_SECONDS=600)
+    def test_an_expired_guide_is_downloaded_again_only_when_drive_changed(self, fetch, lookup):
+        from apps.scholarship import asset_cache
+        from apps.scholarship.emails import vircle_guide_attachment
+        asset_cache.clear()
+        self.addCleanup(asset_cache.clear)
+        fetch.return_value, lookup.return_value = b'%PDF-1.7 v1', ('file-1', 'md5-1')
+        vircle_guide_attachment()
+        with mock.patch('apps.scholarship.asset_cache.time.monotonic',
+                        return_value=asset_cache.time.monotonic() + 601):
+            self.assertEqual(vircle_guide_attachment()[1], b'%PDF-1.7 v1')     # same checksum
+            self.assertEqual(fetch.call_count, 1)
+            fetch.return_value, lookup.return_value = b'%PDF-1.7 v2', ('file-1', 'md5-2')
+        with mock.patch('apps.scholarship.asset_cache.time.monotonic',
+                        return_value=asset_cache.time.monotonic() + 1300):
+            self.assertEqual(vircle_guide_attachment()[1], b'%PDF-1.7 v2')     # the owner's edit
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(lookup.call_count, 3)      # the miss, then one per revalidation
+        self.assertEqual(asset_cache.stats()['revalidated'], 1)
 
     def test_sends_in_each_language_with_the_guide_attached(self):
         from django.core import mail
@@ -0,0 +1,118 @@
+"""Batched Cloud Vision reads (vision.annotate_batch / batched_reads) against the local
+FakeAnnotator — chunking, fan-back to each document, metering, and the fallbacks."""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.courses.models import StudentProfile
+from apps.scholarship import vision
+from apps.scholarship.models import (ApplicantDocument, ScholarshipApplication,
+                                     ScholarshipCohort, UsageEvent)
+from apps.scholarship.tests.vision_fakes import FakeAnnotator
+
+
+class TestAnnotateBatch(SimpleTestCase):
+    def test_chunks_at_the_batch_limit_and_keeps_order(self):
+        images = [f'img-{i}'.encode() for i in range(vision.VISION_BATCH_LIMIT + 4)]
+        fake = FakeAnnotator({b: b.decode().upper() for b in images})
+        with patch.object(vision, '_annotator', return_value=fake):
+            out = vision.annotate_batch(images)
+        self.assertEqual(fake.calls, [('batch', vision.VISION_BATCH_LIMIT), ('batch', 4)])
+        self.assertEqual([r.full_text_annotation.text for r, _ in out],
+                         [b.decode().upper() for b in images])
+
+    def test_byte_budget_closes_a_batch_early(self):
+        big = b'x' * (vision._VISION_BATCH_MAX_BYTES // 2 + 1)
+        fake = FakeAnnotator()
+        with patch.object(vision, '_annotator', return_value=fake):
+            vision.annotate_batch([big, big + b'y', b'small'])
+        self.assertEqual(fake.calls, [('batch', 1), ('batch', 2)])
+
+    def test_per_image_error_and_failed_request(self):
+        fake = FakeAnnotator({b'bad': ValueError('Bad image data.')})
+        with patch.object(vision, '_annotator', return_value=fake):
+            (resp, err), = vision.annotate_batch([b'bad'])
+        self.assertIsNotNone(resp)                 # Vision answered — it was a call
+        self.assertEqual(err, 'Bad image data.')
+        with patch.object(vision, '_annotator', return_value=FakeAnnotator(fail_batches=True)):
+            self.assertEqual(vision.annotate_batch([b'a', b'b']),
+                             [(None, '503 batch unavailable')] * 2)
+
+    def test_one_client_per_process(self):
+        with patch.object(vision, '_annotator_client', None), \
+                patch('google.cloud.vision.ImageAnnotatorClient') as ctor:
+            vision._annotator()
+            vision._annotator()
+        ctor.assert_called_once()
+
+
+class TestBatchedReads(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cohort = ScholarshipCohort.objects.create(code='vb', name='B40', year=2026)
+
+    def _doc(self, path):
+        prof = StudentProfile.objects.create(
+            supabase_user_id=str(uuid.uuid4()), nric='030101-14-1234', name='S')
+        app = ScholarshipApplication.objects.create(cohort=self.cohort, profile=prof)
+        return ApplicantDocument.objects.create(
+            application=app, doc_type='salary_slip', storage_path=path, content_type='image/jpeg')
+
+    def _run(self, fake, docs, blobs):
+        with patch.object(vision, '_annotator', return_value=fake), \
+                patch.object(vision, '_fetch_image_bytes', side_effect=blobs.get) as fetch:
+            with vision.batched_reads(docs):
+                reads = [vision.ocr_document_full(d) for d in docs]
+        return reads, fetch
+
+    def test_one_request_fans_back_to_each_document(self):
+        docs = [self._doc('a'), self._doc('b')]
+        fake = FakeAnnotator({b'img-a': 'GAJI ALI', b'img-b': 'GAJI ABU'})
+        reads, fetch = self._run(fake, docs, {'a': b'img-a', 'b': b'img-b'})
+        self.assertEqual(fake.calls, [('batch', 2)])
+        self.assertEqual([r['text'] for r in reads], ['GAJI ALI', 'GAJI ABU'])
+        self.assertEqual([w['text'] for w in reads[0]['words']], ['GAJI', 'ALI'])
+        self.assertEqual(fetch.call_count, 2)       # each blob fetched once, by the prefetch
+        # Metered once per image, on the document that used it.
+        self.assertEqual(sorted(UsageEvent.objects.values_list('application_id', flat=True)),
+                         sorted(d.application_id for d in docs))
+
+    def test_unused_prefetch_is_still_metered(self):
+        doc = self._doc('a')
+        fake = FakeAnnotator({b'img-a': 'GAJI'})
+        with patch.object(vision, '_annotator', return_value=fake), \
+                patch.object(vision, '_fetch_image_bytes', return_value=b'img-a'):
+            with vision.batched_reads([doc]):
+                pass
+        self.assertEqual(UsageEvent.objects.count(), 1)
+
+    def test_failed_batch_falls_back_to_single_reads(self):
+        docs = [self._doc('a')]
+        fake = FakeAnnotator({b'img-a': 'GAJI ALI'}, fail_batches=True)
+        reads, _ = self._run(fake, docs, {'a': b'img-a'})
+        self.assertEqual(fake.calls, [('batch', 1), ('single', 1)])
+        self.assertEqual(reads[0]['text'], 'GAJI ALI')
+        self.assertEqual(UsageEvent.objects.count(), 1)
+
+    def test_digital_pdf_is_not_sent(self):
+        doc = self._doc('a')
+        fake = FakeAnnotator()
+        with patch.object(vision, '_pdf_is_digital', return_value=True):
+            self._run(fake, [doc], {'a': b'%PDF-1.4 digital'})
+        self.assertEqual(fake.calls, [])
+
+    def test_a_malformed_page_reads_as_nothing_and_spares_the_batch(self):
+        docs = [self._doc('a'), self._doc('b')]
+        # Page b's word annotation has no bounding_poly — a partial response.
+        partial = SimpleNamespace(error=None, full_text_annotation=SimpleNamespace(text='GAJI'),
+                                  text_annotations=[SimpleNamespace(description='GAJI'),
+                                                    SimpleNamespace(description='GAJI')])
+        fake = FakeAnnotator({b'img-a': 'GAJI ALI', b'img-b': partial})
+        with self.assertLogs('apps.scholarship.vision', level='WARNING'):
+            reads, _ = self._run(fake, docs, {'a': b'img-a', 'b': b'img-b'})
+        self.assertEqual(fake.calls, [('batch', 2)])
+        self.assertEqual([w['text'] for w in reads[0]['words']], ['GAJI', 'ALI'])
+        self.assertEqual(reads[1]['words'], [])
+        self.assertTrue(reads[1]['error'])
@@ -0,0 +1,54 @@
+"""A local stand-in for the Cloud Vision ``ImageAnnotatorClient`` (not collected by pytest — no
+``test_`` prefix). Patch it in over the client seam::
+
+    fake = FakeAnnotator({b'img-a': 'NAMA ALI', b'img-b': 'NAMA ABU'})
+    with patch('apps.scholarship.vision._annotator', return_value=fake):
+        ...
+
+It answers ``document_text_detection`` and ``batch_annotate_images`` with REAL response protos
+(so the production parsing runs unchanged) and records every request it served in ``calls``:
+``('single', 1)`` or ``('batch', n_images)``. Unknown images read as empty text; an image mapped
+to an ``Exception`` instance comes back as a per-image error response; any other object is
+answered as-is (a malformed page the real proto could not express)."""
+from types import SimpleNamespace
+
+from google.cloud import vision
+
+
+def _response(text):
+    if isinstance(text, Exception):
+        return vision.AnnotateImageResponse(error={'code': 3, 'message': str(text)})
+    words = text.split()
+    annotations = [vision.EntityAnnotation(description=text)]
+    for i, w in enumerate(words):          # one word per 100 px column, all on one line
+        x = i * 100
+        annotations.append(vision.EntityAnnotation(
+            description=w,
+            bounding_poly={'vertices': [{'x': x, 'y': 0}, {'x': x + 80, 'y': 0},
+                                        {'x': x + 80, 'y': 20}, {'x': x, 'y': 20}]}))
+    return vision.AnnotateImageResponse(
+        full_text_annotation={'text': text}, text_annotations=annotations)
+
+
+class FakeAnnotator:
+    def __init__(self, texts=None, *, fail_batches=False):
+        self.texts = dict(texts or {})
+        self.fail_batches = fail_batches
+        self.calls = []
+
+    def _read(self, image):
+        value = self.texts.get(image.content, '')
+        return _response(value) if isinstance(value, (str, Exception)) else value
+
+    def document_text_detection(self, *, image):
+        self.calls.append(('single', 1))
+        return self._read(image)
+
+    def batch_annotate_images(self, *, requests):
+        self.calls.append(('batch', len(requests)))
+        if self.fail_batches:
+            raise RuntimeError('503 batch unavailable')
+        responses = [self._read(r.image) for r in requests]
+        if all(isinstance(r, vision.AnnotateImageResponse) for r in responses):
+            return vision.BatchAnnotateImagesResponse(responses=responses)
+        return SimpleNamespace(responses=responses)
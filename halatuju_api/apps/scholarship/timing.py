@@ -0,0 +1,150 @@
+"""Where the time goes in a document read: per-stage spans, a log line each, and a p50/p95 readout.
+
+The upload POST does everything inline: the HEIC conversion, the Storage fetch, the Vision OCR,
+the Gemini extraction, the name/address match, the income tag guard and the judge→promote step.
+Nothing recorded how long each took, so "uploads are slow today" had no answer short of
+reproducing it. A ``span(stage)`` block measures one stage and feeds two sinks:
+
+- **a log line** — ``span stage=vision.ocr doc_type=salary_slip ms=812 ok=1`` at DEBUG, or at
+  WARNING once the stage passes ``UPLOAD_SLOW_STAGE_MS`` (a slow external dependency should be
+  visible in the logs without turning on debug). A ``trace`` (the upload view opens one per
+  POST) adds one INFO summary line per upload with every stage it ran.
+- **an in-memory histogram** — the last ``_RESERVOIR`` durations per (stage, doc_type), from
+  which ``snapshot()`` computes count / p50 / p95 / max. A super admin reads it at
+  ``admin/scholarship/ops/upload-timings/``.
+
+The histogram is PER PROCESS and resets on deploy. That is deliberate: it answers "what is
+slow right now" with no table, no migration and no write on the hot path, and each gunicorn
+worker's readout is a fair sample of the same traffic. Long-run trends belong in the log
+pipeline, which has every span.
+
+A span's ``doc_type`` comes from the enclosing ``trace`` when it isn't given, so the seams deep
+in ``vision.py`` need not know which document they serve. Outside any trace (a bulk pass, the
+cron) it is ''. Spans never raise and never swallow: an exception in the block is recorded as
+``ok=0`` and propagates unchanged.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Durations kept per (stage, doc_type). Enough for a stable p95; bounded so a busy process's
+# memory stays flat (a few dozen keys × 500 floats).
+_RESERVOIR = 500
+
+_trace: 'contextvars.ContextVar[dict | None]' = contextvars.ContextVar('timing_trace', default=None)
+
+
+class Histogram:
+    """Thread-safe rolling reservoir of durations (ms) per (stage, doc_type)."""
+
+    def __init__(self, size=_RESERVOIR):
+        self.size = size
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def observe(self, stage, doc_type, ms):
+        key = (stage, doc_type or '')
+        with self._lock:
+            bucket = self._samples.get(key)
+            if bucket is None:
+                bucket = self._samples[key] = deque(maxlen=self.size)
+            bucket.append(ms)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def snapshot(self) -> list:
+        """``[{stage, doc_type, count, p50_ms, p95_ms, max_ms}]``, slowest p95 first. ``count`` is
+        every observation since the process started; the percentiles are over the reservoir."""
+        with self._lock:
+            items = [(key, sorted(samples), self._counts[key])
+                     for key, samples in self._samples.items()]
+        rows = [{'stage': stage, 'doc_type': doc_type, 'count': count,
+                 'p50_ms': _percentile(xs, 50), 'p95_ms': _percentile(xs, 95),
+                 'max_ms': round(xs[-1], 1)}
+                for (stage, doc_type), xs, count in items]
+        return sorted(rows, key=lambda r: (-r['p95_ms'], r['stage'], r['doc_type']))
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self.since = time.time()
+
+
+def _percentile(sorted_xs, pct):
+    """Nearest-rank percentile of an already-sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_xs) * pct // 100))      # ceil without floats
+    return round(sorted_xs[int(rank) - 1], 1)
+
+
+HISTOGRAM = Histogram()
+
+
+def _slow_ms():
+    return getattr(settings, 'UPLOAD_SLOW_STAGE_MS', 5000)
+
+
+@contextmanager
+def span(stage, *, doc_type=None):
+    """Time the block as ``stage``. ``doc_type`` defaults to the enclosing trace's."""
+    trace = _trace.get()
+    if doc_type is None:
+        doc_type = trace['doc_type'] if trace else ''
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        ms = (time.perf_counter() - start) * 1000.0
+        try:
+            HISTOGRAM.observe(stage, doc_type, ms)
+            if trace is not None:
+                trace['spans'].append((stage, ms))
+            level = logging.WARNING if ms >= _slow_ms() else logging.DEBUG
+            logger.log(level, 'span stage=%s doc_type=%s ms=%.0f ok=%d',
+                       stage, doc_type or '-', ms, ok)
+        except Exception:  # noqa: BLE001 — instrumentation must never break the work it times
+            pass
+
+
+def timed(stage):
+    """Decorator form of ``span`` for a whole function (the external-dependency seams)."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+@contextmanager
+def trace(name, *, doc_type=''):
+    """One request's worth of spans: everything timed inside carries ``doc_type``, the whole
+    block is itself a span (``name``), and one INFO line summarises the stages it ran."""
+    state = {'doc_type': doc_type or '', 'spans': []}
+    token = _trace.set(state)
+    try:
+        with span(name, doc_type=doc_type):
+            yield state
+    finally:
+        _trace.reset(token)
+        try:
+            total = state['spans'][-1][1] if state['spans'] else 0.0
+            stages = ','.join(f'{s}:{ms:.0f}' for s, ms in state['spans'][:-1])
+            logger.info('trace %s doc_type=%s total_ms=%.0f stages=%s',
+                        name, doc_type or '-', total, stages or '-')
+        except Exception:  # noqa: BLE001
+            pass
@@ -123,6 +123,10 @@ from .views_admin import (
     AdminPaymentFundingSummaryView,
     AdminBillingRatesView,
     AdminBillingUsageView,
+    AdminUploadTimingsView,
+    AdminRateLimitsView,
+    AdminJobsView,
+    AdminOutboxView,
     AdminOrgBuildHoursView,
     AdminOrgRequestListView,
     AdminOrgRequestCountView,
@@ -261,6 +265,13 @@ urlpatterns = [
     path('admin/scholarship/payments/funding-summary/', AdminPaymentFundingSummaryView.as_view()),
     # Billing & usage v1 (Sprint 13a) — super/org_admin usage screen, flag-gated 404-first.
     path('admin/scholarship/billing/usage/', AdminBillingUsageView.as_view()),
+    # Upload-pipeline latency readout (SUPER only) — per-stage p50/p95 from this process.
+    path('admin/scholarship/ops/upload-timings/', AdminUploadTimingsView.as_view()),
+    path('admin/scholarship/ops/rate-limits/', AdminRateLimitsView.as_view()),
+    path('admin/scholarship/ops/jobs/', AdminJobsView.as_view()),
+    path('admin/scholarship/ops/jobs/<int:job_id>/', AdminJobsView.as_view()),
+    path('admin/scholarship/ops/outbox/', AdminOutboxView.as_view()),
+    path('admin/scholarship/ops/outbox/<int:row_id>/retry/', AdminOutboxView.as_view()),
     # Platform-side editable rates (SUPER only) + org-side build hours (super writes,
     # org_admin reads its own). Owner design 2026-07-27.
     path('admin/scholarship/billing/rates/', AdminBillingRatesView.as_view()),
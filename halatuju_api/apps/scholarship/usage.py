@@ -15,7 +15,8 @@ Two hard promises:
 Call sites thread a lightweight context (organisation / application / source tag) via
 ``usage_context``; the seam reads it when it logs, so the seams' public return shapes
 never change. Token counts (AI only) are read from each provider response's own usage
-metadata inside the seam.
+metadata inside the seam; AI calls made through ``llm.generate`` also carry the model's
+response time (``latency_ms``).
 
 NO prices anywhere in v1 (units/tokens only) — there is no price table yet.
 """
@@ -82,7 +83,7 @@ def _int_or_none(v):
 
 
 def record_usage(service, *, model='', source=None, quantity=1,
-                 input_tokens=None, output_tokens=None,
+                 input_tokens=None, output_tokens=None, latency_ms=None,
                  organisation_id=None, application_id=None):
     """Log ONE billable event. ABSOLUTELY best-effort: any exception (including a DB
     write failure) is caught and dropped so the surrounding user-facing call is never
@@ -106,6 +107,7 @@ def record_usage(service, *, model='', source=None, quantity=1,
             quantity=quantity if isinstance(quantity, int) and quantity > 0 else 1,
             input_tokens=_int_or_none(input_tokens),
             output_tokens=_int_or_none(output_tokens),
+            latency_ms=_int_or_none(latency_ms),
         )
     except Exception:  # noqa: BLE001 — a metering failure must NEVER surface
         logger.warning('usage metering failed (service=%s)', service, exc_info=True)
@@ -41,6 +41,7 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass, field
 
+from .doc_context import documents_of
 from .services import ic_identity_blockers
 from .vision import name_match
 from .genuineness.bands import canonical_status
@@ -68,7 +69,7 @@ def _fact(name, status, evidence, unresolved):
 # Phase 2 (version history): these three are the MAIN verdict read funnel — every one
 # filters `superseded_at__isnull=True` so a replaced document can never count in a verdict.
 def _latest_doc(application, doc_type):
-    return (application.documents.filter(doc_type=doc_type, superseded_at__isnull=True)
+    return (documents_of(application).filter(doc_type=doc_type, superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
 
 
@@ -76,13 +77,13 @@ def _latest_doc_for_member(application, doc_type, member):
     """The latest LIVE income document of *doc_type* tagged to a specific household
     *member* (salary route). The (doc_type, household_member) pair is the
     single-instance key, so this returns that member's current IC / payslip / EPF."""
-    return (application.documents.filter(
+    return (documents_of(application).filter(
                 doc_type=doc_type, household_member=member, superseded_at__isnull=True)
             .order_by('-uploaded_at').first())
 
 
 def _present_doc_types(application):
-    return set(application.documents.filter(superseded_at__isnull=True)
+    return set(documents_of(application).filter(superseded_at__isnull=True)
                .values_list('doc_type', flat=True))
 
 
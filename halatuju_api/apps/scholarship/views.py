@@ -10,7 +10,8 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.courses.models import StudentProfile
+from halatuju import ratelimit
+from halatuju.middleware.profile_loader import find_profile
 from halatuju.middleware.supabase_auth import SupabaseIsAuthenticated
 from halatuju.throttling import UploadRateThrottle
 
@@ -34,6 +35,7 @@ from .serializers import (
 from . import in_programme as in_programme_service
 from . import scheduling
 from . import sponsorship as sponsorship_service
+from . import timing
 from . import whatsapp
 from .serializers_admin import interview_schedule_payload
 from .services import (
@@ -67,8 +69,12 @@ def _log_coach_serve(kind, app_id, source, verdict):
                 kind, app_id, source, verdict or '-')
 
 
-def _get_profile(user_id):
-    return StudentProfile.objects.filter(supabase_user_id=user_id).first()
+def _coach_allowed(app_id):
+    """The coach's Gemini cap: ``DOC_HELP_RATE_LIMIT_PER_HOUR`` calls per application per hour,
+    shared by the per-document and income-cluster helpers."""
+    from django.conf import settings as _settings
+    cap = getattr(_settings, 'DOC_HELP_RATE_LIMIT_PER_HOUR', 20)
+    return ratelimit.hit('help_coach', app_id, limit=cap, period=3600).allowed
 
 
 class WhatsAppInboundView(APIView):
@@ -158,7 +164,7 @@ class ApplicationListCreateView(APIView):
                 {'error': 'A verified account is required to apply.'},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        profile = _get_profile(request.user_id)
+        profile = find_profile(request)
         if profile is None:
             return Response(
                 {'error': 'A HalaTuju profile is required to apply.'},
@@ -904,7 +910,17 @@ class DocumentListCreateView(APIView):
     def _is_single_instance(self, doc_type, member):
         return True
 
+    _TIMED_DOC_TYPES = frozenset(k for k, _ in ApplicantDocument.DOC_TYPES)
+
     def post(self, request):
+        # One timing trace per upload (timing.py): every stage below — and the Storage / Vision /
+        # Gemini seams it calls — lands in the per-(stage, doc_type) latency readout. The label is
+        # only taken from the known doc types, so a junk payload can't mint histogram keys.
+        doc_type = request.data.get('doc_type') if hasattr(request.data, 'get') else ''
+        with timing.trace('upload', doc_type=doc_type if doc_type in self._TIMED_DOC_TYPES else ''):
+            return self._create(request)
+
+    def _create(self, request):
         app = _current_application(request.user_id)
         if app is None:
             return Response({'error': 'No shortlisted application.'}, status=status.HTTP_403_FORBIDDEN)
@@ -1023,12 +1039,14 @@ class DocumentListCreateView(APIView):
         # iPhone HEIC → JPEG, in place, BEFORE any Vision/extraction — so OCR can read it and the
         # cockpit viewer / download URL serve a browser-renderable image (soft; no-op otherwise).
         from .imaging import convert_heic_to_jpeg
-        convert_heic_to_jpeg(doc)
+        with timing.span('upload.heic'):
+            convert_heic_to_jpeg(doc)
         # S13 + S17: auto-run Vision OCR on IC uploads (student's IC OR the
         # parent/guardian IC for minor consent). Soft signal — never blocks.
         if doc.doc_type in ('ic', 'parent_ic'):
             from .vision import run_vision_for_document
-            run_vision_for_document(doc)
+            with timing.span('upload.read'):
+                run_vision_for_document(doc)
         # Supporting docs: OCR once, then (a) the free name/address presence check
         # and (b) automatic Gemini field-extraction with student feedback. Soft,
         # never blocks. Gemini is guardrailed by the hourly per-application cap.
@@ -1040,7 +1058,8 @@ class DocumentListCreateView(APIView):
             city = getattr(profile, 'city', '') or ''
             street = getattr(profile, 'address', '') or ''   # #3: street line for the bill fallback
             check_address = doc.doc_type in BILL_DOC_TYPES
-            ocr = _vision.ocr_document_full(doc)   # ONE fetch + ONE Vision call, shared by every consumer
+            with timing.span('upload.read'):
+                ocr = _vision.ocr_document_full(doc)   # ONE fetch + ONE Vision call, shared by every consumer
             # RE-SLOT an EPF that arrived in the salary-slip slot (owner, 2026-07-14).
             #
             # The income-proof request says "his latest salary slip OR EPF (KWSP) statement", but it
@@ -1056,21 +1075,24 @@ class DocumentListCreateView(APIView):
             _resloted = _reslot_income_doc(doc, ocr)
             if _resloted:
                 check_address = doc.doc_type in BILL_DOC_TYPES
-            match = _vision.run_vision_match_for_document(
-                doc, names=names, postcode=postcode, city=city, street=street,
-                check_address=check_address, ocr=ocr)
+            with timing.span('upload.match'):
+                match = _vision.run_vision_match_for_document(
+                    doc, names=names, postcode=postcode, city=city, street=street,
+                    check_address=check_address, ocr=ocr)
             if doc.doc_type in _vision.GEMINI_EXTRACT_DOC_TYPES:
                 # force=True: this is the ONE document the student just uploaded in
                 # response to a request — always read it now, even if the hourly
                 # doc-assist cap is hit. A deferred read here is exactly what let an
                 # unscanned re-upload greenlight its task (see resolution.doc_match_verdict).
-                self._maybe_extract_fields(app, doc, _vision, ocr, names, postcode, city, street,
-                                           check_address, match, _settings, force=True)
+                with timing.span('upload.extract'):
+                    self._maybe_extract_fields(app, doc, _vision, ocr, names, postcode, city, street,
+                                               check_address, match, _settings, force=True)
         # P1 (Check 2): the letter of intent — OCR its plain text so the submission
         # review can read motivation. No matching/extraction, just the text. Soft.
         elif doc.doc_type in TEXT_READ_DOC_TYPES:
             from . import vision as _vision
-            _vision.read_text_document(doc)
+            with timing.span('upload.read'):
+                _vision.read_text_document(doc)
         # ── Tag guard (the airtight last line): attribute an income doc (parent_ic / salary_slip /
         # epf / str) to the household member by the NAME now read off it (Vision/Gemini has run above),
         # in two cases:
@@ -1088,7 +1110,8 @@ class DocumentListCreateView(APIView):
         if doc.doc_type in ('parent_ic', 'salary_slip', 'epf', 'str'):
             from .income_engine import resolved_member_for, name_contradicts_tag
             has_tag = bool((doc.household_member or '').strip())
-            derived = name_contradicts_tag(app, doc) if has_tag else resolved_member_for(app, doc)
+            with timing.span('upload.tag_guard'):
+                derived = name_contradicts_tag(app, doc) if has_tag else resolved_member_for(app, doc)
             if derived and derived != (doc.household_member or '').strip():
                 doc.household_member = derived
                 doc.save(update_fields=['household_member'])
@@ -1132,8 +1155,10 @@ class DocumentListCreateView(APIView):
             # newest still wins, the task stays open, and the quality proxy keeps a pending doc from
             # burying an 'ok' one). Only a CONFIRMED 'mismatch'/'unreadable' is not-usable → stays
             # staged so a wrong/blurry re-upload can't displace a good live proof.
-            usable = doc_match_verdict(doc) not in ('mismatch', 'unreadable')
-            if promotion.should_promote(doc, existing_live, usable=usable):
+            with timing.span('upload.judge'):
+                usable = doc_match_verdict(doc) not in ('mismatch', 'unreadable')
+                promote = promotion.should_promote(doc, existing_live, usable=usable)
+            if promote:
                 # Promote: supersede everything this upload replaces — the staged-against set (the
                 # slot sweep, incl. any blank-tagged legacy copy) PLUS any other live copy in this
                 # doc's exact slot — then unstage this one into the prime slot.
@@ -1167,7 +1192,8 @@ class DocumentListCreateView(APIView):
         # S3: a new upload may clear a verdict gap → auto-resolve its ticket
         # (and link the doc), or surface a fresh ticket. Idempotent, never blocks.
         from .resolution import sync_resolution_items, resolve_doc_items_for_upload
-        sync_resolution_items(app)
+        with timing.span('upload.resolve'):
+            sync_resolution_items(app)
         # A verified offer letter silently settles a pathway the student hadn't locked
         # (undecided→decided) — no query; mirrors the apply form's storage shapes. A
         # genuine clash with a specific declared pick is left for the pathway_confirm
@@ -1251,7 +1277,7 @@ class DocumentDetailView(APIView):
             chain.extend(parents)
             frontier = parents
         from .storage import delete_objects
-        paths = [d.storage_path for d in chain if d.storage_path]
+        paths = [p for d in chain for p in (d.storage_path, d.ocr_copy_path) if p]
         if paths:
             delete_objects(paths)
         application = doc.application
@@ -1617,17 +1643,11 @@ class DocumentHelpView(APIView):
             grade_diffs = student_slip_check(doc).get('mismatched') or []
 
         # Throttle the billable call (never block — decisions.md "throttle the AI").
-        # Per-application hourly cap via the default cache; degrade to the FE fallback copy.
-        from django.conf import settings as _settings
-        from django.core.cache import cache
-        from django.utils import timezone
-        cap = getattr(_settings, 'DOC_HELP_RATE_LIMIT_PER_HOUR', 20)
-        key = f'help_coach:{doc.application_id}:{timezone.now():%Y%m%d%H}'
-        if cache.get(key, 0) >= cap:
+        # Per-application hourly cap (halatuju.ratelimit); degrade to the FE fallback copy.
+        if not _coach_allowed(doc.application_id):
             _log_coach_serve('doc', doc.application_id, 'fallback', verdict)
             return Response({'message': '', 'source': 'fallback', 'verdict': verdict,
                              'grade_diffs': grade_diffs})
-        cache.set(key, cache.get(key, 0) + 1, 3600)
 
         from .profile_engine import _resolve_language
         language = _resolve_language(doc.application, request.query_params.get('lang'))
@@ -1675,15 +1695,9 @@ class IncomeClusterHelpView(APIView):
             _log_coach_serve('income_cluster', app.id, 'none', '')
             return Response({'message': '', 'source': 'none'})
 
-        from django.conf import settings as _settings
-        from django.core.cache import cache
-        from django.utils import timezone
-        cap = getattr(_settings, 'DOC_HELP_RATE_LIMIT_PER_HOUR', 20)
-        key = f'help_coach:{app.id}:{timezone.now():%Y%m%d%H}'
-        if cache.get(key, 0) >= cap:
+        if not _coach_allowed(app.id):
             _log_coach_serve('income_cluster', app.id, 'fallback', verdict)
             return Response({'message': '', 'source': 'fallback', 'verdict': verdict})
-        cache.set(key, cache.get(key, 0) + 1, 3600)
 
         from .profile_engine import _resolve_language
         language = _resolve_language(app, request.query_params.get('lang'))
@@ -1889,7 +1903,13 @@ class CronRunView(APIView):
     inside the already-running api service (which holds all DB/email config), so we
     avoid a separate Cloud Run Job that would have to replicate plain-env secrets.
     Auth is a shared-secret header compared in constant time. Public route, but inert
-    without the secret. Never 500s the scheduler (that just causes retries)."""
+    without the secret. Never 500s the scheduler (that just causes retries).
+
+    With ``JOB_QUEUE_ENABLED=1`` the endpoint only ENQUEUES (202, with the job row): a
+    ``run_jobs`` worker runs it, so a long job holds no web worker and outlives the request
+    timeout. A job already queued or running is not queued twice — the response says
+    ``deduped`` and names the live row (see jobs.py). Off (the default, until a worker is
+    deployed) the command runs inline here, as before."""
     permission_classes = [AllowAny]
 
     JOBS = {
@@ -1913,6 +1933,7 @@ class CronRunView(APIView):
         'release-award-offer-emails': 'release_award_offer_emails',  # hourly: send award emails past the cool-off window
         'sponsor-realtime': 'send_sponsor_realtime',   # F3: hourly
         'sponsor-digests': 'send_sponsor_digests',     # F3: weekly
+        'email-outbox': 'drain_outbox',  # every ~5 min: retry queued digest / award emails that failed (outbox.py)
         'auto-sponsor': 'auto_sponsor',                # R6: hourly AutoSponsor allocation
         'purge-referrals': 'purge_sponsor_referrals',  # F4: daily PDPA purge (60-day)
         'rescore-pending': 'rescore_pending_decisions',  # on-demand after a policy change
@@ -1961,9 +1982,20 @@ class CronRunView(APIView):
         command = self.JOBS.get(job)
         if not command:
             return Response({'error': 'unknown job'}, status=status.HTTP_404_NOT_FOUND)
+        from . import jobs
+        if jobs.enabled():
+            try:
+                row, created = jobs.enqueue(job, command, source='cron')
+            except Exception as e:  # noqa: BLE001 — report, never 500 into scheduler retries
+                logging.getLogger(__name__).warning('Cron enqueue %s failed: %s', job, e, exc_info=True)
+                return Response({'job': job, 'error': str(e)[:300]}, status=status.HTTP_200_OK)
+            return Response({'job': job, 'id': row.id, 'status': row.status, 'deduped': not created},
+                            status=status.HTTP_202_ACCEPTED)
+        from . import llm, mail_dispatch
         out = io.StringIO()
         try:
-            call_command(command, stdout=out)
+            with mail_dispatch.batch(job), llm.background():
+                call_command(command, stdout=out)
         except Exception as e:  # noqa: BLE001 — report, never 500 into scheduler retries
             logging.getLogger(__name__).warning('Cron job %s failed: %s', job, e, exc_info=True)
             return Response({'job': job, 'error': str(e)[:300]}, status=status.HTTP_200_OK)
@@ -1999,7 +2031,6 @@ class GuarantorPhoneVerifyStartView(APIView):
 
     def post(self, request):
         from django.conf import settings as _s
-        from django.core.cache import cache
         from . import bursary, whatsapp
         if not getattr(_s, 'BURSARY_AGREEMENT_ENABLED', False):
             return Response({'error': 'bursary_disabled', 'code': 'bursary_disabled'},
@@ -2012,19 +2043,18 @@ class GuarantorPhoneVerifyStartView(APIView):
         if not phone:
             return Response({'error': 'guarantor_phone_missing', 'code': 'guarantor_phone_missing'},
                             status=status.HTTP_400_BAD_REQUEST)
-        rl_key = f'guarantor_phoneverify:send:{app.pk}'
-        sent = cache.get(rl_key, 0)
-        if sent >= 5:
+        limit = ratelimit.hit('guarantor_phone_verify', app.pk, limit=5, period=3600)
+        if not limit.allowed:
             return Response({'error': 'rate_limited', 'code': 'rate_limited'},
                             status=status.HTTP_429_TOO_MANY_REQUESTS)
         channel = getattr(_s, 'PHONE_VERIFY_CHANNEL', 'sms')
         ok, vstatus, _err = whatsapp.start_phone_verification(phone, channel=channel)
         if not ok:
+            limit.refund()
             http = {'unconfigured': status.HTTP_503_SERVICE_UNAVAILABLE,
                     'invalid_number': status.HTTP_400_BAD_REQUEST}.get(
                         vstatus, status.HTTP_502_BAD_GATEWAY)
             return Response({'error': vstatus or 'failed'}, status=http)
-        cache.set(rl_key, sent + 1, 3600)
         return Response({'status': 'sent', 'phone_hint': _mask_phone(phone)})
 
 
@@ -27,7 +27,8 @@ from . import reopen as reopen_service
 from . import disbursement as disbursement_service
 from . import maintenance as maintenance_service
 from . import closure as closure_service
-from .anomaly_engine import detect_anomalies
+from . import doc_context
+from . import snapshots
 from .emails import send_request_info_email
 from .verdict_engine import build_verdict
 from .models import (
@@ -47,6 +48,7 @@ from .serializers_admin import (
     AdminGraduationMessageSerializer,
     InterviewSessionSerializer,
     interview_schedule_payload,
+    list_prefetch,
     OrgRequestOrgSerializer,
     OrgRequestOwnerSerializer,
     ReviewerProfileSerializer,
@@ -341,11 +343,15 @@ class AdminApplicationListView(_AdminBase):
             page = paginator.paginate_queryset(qs, request, view=self)
         elif sort_f == 'merit':
             from .serializers_admin import _application_merit_score
-            rows = sorted(qs, key=lambda a: _application_merit_score(a) or 0, reverse=desc)
+            rows = list(qs)
+            merits = {a.id: _application_merit_score(a) for a in rows}
+            rows.sort(key=lambda a: merits[a.id] or 0, reverse=desc)
             page = paginator.paginate_queryset(rows, request, view=self)
         else:
             page = paginator.paginate_queryset(qs, request, view=self)
-        data = AdminApplicationListSerializer(page, many=True).data
+        # The page's derived fields in set-based passes (one open-tasks query, not one per row).
+        prefetch = list_prefetch(page, merits=merits if sort_f == 'merit' else None)
+        data = AdminApplicationListSerializer(page, many=True, context={'prefetch': prefetch}).data
         return paginator.envelope(
             data,
             results_key='applications',
@@ -368,7 +374,10 @@ class AdminApplicationDetailView(_AdminBase):
             'AUDIT applicant_detail_read admin_id=%s app_id=%s',
             getattr(admin, 'id', '?'), pk,
         )
-        return Response(AdminApplicationDetailSerializer(app).data)
+        # The payload runs the verdict, anomaly, completeness and resolution engines plus a
+        # check per document; one documents fetch serves all of them (doc_context.py).
+        with doc_context.loaded(app):
+            return Response(AdminApplicationDetailSerializer(app).data)
 
     def patch(self, request, pk):
         """Admin-editable per-application flags: mentoring-candidate. Writes are
@@ -404,7 +413,8 @@ class AdminApplicationDetailView(_AdminBase):
             fields.append('vircle_id')
         if fields:
             app.save(update_fields=fields)
-        return Response(AdminApplicationDetailSerializer(app).data)
+        with doc_context.loaded(app):
+            return Response(AdminApplicationDetailSerializer(app).data)
 
 
 class AdminVerdictSummaryView(_AdminBase):
@@ -838,7 +848,7 @@ def _interview_agenda(application):
     """The anomaly codes that form the interview agenda (same flags the admin
     'Pre-interview flags' card shows). Flat list — kept stable for the AdminInterviewView
     scaffold + its FE. V3 (#9) adds the richer folded agenda in ``interview_agenda_full``."""
-    return [a['code'] for a in detect_anomalies(application)]
+    return [a['code'] for a in snapshots.anomalies(application)]
 
 
 # V3 (#9): the verdict items that explicitly say "confirm at interview" — folded onto the agenda
@@ -867,9 +877,8 @@ def interview_agenda_full(application):
     talking point, and the generic echo was noise the reviewer deleted every time). V3 #9's "nothing
     evaporates" is served by Check-2 remaining open — not by duplicating it onto the agenda."""
     from .submission_review import completeness_gaps as _submission_gaps
-    from .verdict_engine import build_verdict
     agenda = [{'code': a['code'], 'kind': 'anomaly', 'params': a.get('params', {})}
-              for a in detect_anomalies(application)]
+              for a in snapshots.anomalies(application)]
     seen = {(e['kind'], e['code']) for e in agenda}
 
     def _add(kind, code, params):
@@ -878,7 +887,7 @@ def interview_agenda_full(application):
             seen.add((kind, code))
 
     # the "needs interview" verdict ambers.
-    for fact in build_verdict(application):
+    for fact in snapshots.verdict(application):
         for item in fact.get('unresolved', []):
             if item['code'] in _NEEDS_INTERVIEW_AMBERS:
                 _add('needs_interview', item['code'], item.get('params', {}))
@@ -2866,6 +2875,8 @@ class AdminRecordVerdictView(_AdminBase):
                         finalise_result = {'ok': True, 'published': False, 'leaks': leaks}
 
         with transaction.atomic():
+            # Saving officer_verdict / ai_verdict_snapshot also writes the per-fact outcome
+            # columns (ScholarshipApplication.save) that the verdict-metrics roll-up counts.
             app.save(update_fields=verdict_fields)
             if sp_to_save is not None:
                 sp_to_save.save()
@@ -3107,25 +3118,53 @@ class AdminCancelReopenView(_AdminBase):
         return Response(AdminApplicationDetailSerializer(app).data)
 
 
+def _override_counts():
+    """The aggregate expressions behind the override roll-up: decided applications, and per
+    fact the decided and overridden counts, read off the ``verdict_outcome_<fact>`` columns."""
+    from django.db.models import Count, Q
+    from .audit import FACTS, OVERRIDE_OUTCOMES
+    aggs = {'applications': Count('id')}
+    for fact in FACTS:
+        col = f'verdict_outcome_{fact}'
+        aggs[f'{fact}_decided'] = Count('id', filter=~Q(**{col: ''}))
+        aggs[f'{fact}_overrides'] = Count('id', filter=Q(**{f'{col}__in': OVERRIDE_OUTCOMES}))
+    return aggs
+
+
+def _override_metrics_row(row):
+    from .audit import FACTS, metrics_from_counts
+    return metrics_from_counts(row['applications'], {
+        f: {'decided': row[f'{f}_decided'], 'overrides': row[f'{f}_overrides']} for f in FACTS})
+
+
 class AdminVerdictMetricsView(_AdminBase):
-    """GET .../verdict-metrics/?cohort=<id> — the override-rate roll-up ("how good is
-    the AI"): across applications whose verdict the officer has recorded, how often did
-    the human disagree with the AI's assertion, per fact. Read-only aggregate; any admin."""
+    """GET .../verdict-metrics/?cohort=<id>&group=cohort|organisation — the override-rate
+    roll-up ("how good is the AI"): across applications whose verdict the officer has recorded,
+    how often did the human disagree with the AI's assertion, per fact. Read-only aggregate; any
+    admin. ``group`` adds a ``groups`` list with the same figures per cohort / organisation.
+
+    One aggregate query (two with ``group``) over the per-fact outcome columns the model derives
+    on save — it no longer reads every decided record's verdict JSON into Python. The numbers
+    are ``audit.override_metrics``' exactly."""
+    _GROUPS = {'cohort': 'cohort_id', 'organisation': 'owning_organisation_id'}
+
     def get(self, request):
         admin = self.get_admin(request)
         if not admin:
             return self._deny()
-        from .audit import override_metrics
         # org-fence: _org_scoped applied below (fences the metrics roll-up).
-        qs = (ScholarshipApplication.objects
-              .filter(verdict_decided_at__isnull=False)
-              .only('ai_verdict_snapshot', 'officer_verdict', 'cohort_id'))
+        qs = ScholarshipApplication.objects.filter(verdict_decided_at__isnull=False)
         qs = self._org_scoped(qs, admin)   # super global
         cohort = request.query_params.get('cohort')
         if cohort:
             qs = qs.filter(cohort_id=cohort)
-        pairs = ((a.ai_verdict_snapshot, a.officer_verdict) for a in qs)
-        return Response(override_metrics(pairs))
+        aggs = _override_counts()
+        body = _override_metrics_row(qs.order_by().aggregate(**aggs))
+        key = self._GROUPS.get(request.query_params.get('group') or '')
+        if key:
+            rows = qs.order_by().values(key).annotate(**aggs).order_by(key)
+            body['groups'] = [{key: row[key], **_override_metrics_row(row)} for row in rows]
+        return Response(body)
 
 
 class AdminAssignReviewerView(_AdminBase):
@@ -3829,6 +3868,185 @@ class AdminBillingUsageView(_AdminBase):
         return Response(payload)
 
 
+class AdminUploadTimingsView(_AdminBase):
+    """GET .../ops/upload-timings/ — where the time goes in a document read: count, p50, p95 and
+    max (ms) per (stage, doc_type), slowest p95 first (``timing.HISTOGRAM``). DELETE clears it,
+    e.g. to measure a change from a clean slate. SUPER-ONLY: it is platform telemetry and says
+    nothing about any one tenant.
+
+    The readout is the serving PROCESS's (no table, reset on deploy — see timing.py); ``pid`` says
+    which worker answered. ``?doc_type=`` / ``?stage=`` (a prefix, e.g. ``storage.``) narrow it.
+    """
+
+    def _super(self, request):
+        admin = self.get_admin(request)
+        if not admin:
+            return self._deny()
+        if not self.has_role(admin, 'super'):
+            return self._deny_role()
+        return None
+
+    def get(self, request):
+        denied = self._super(request)
+        if denied:
+            return denied
+        import datetime
+        import os
+        from . import timing
+        rows = timing.HISTOGRAM.snapshot()
+        doc_type = request.query_params.get('doc_type')
+        stage = request.query_params.get('stage')
+        if doc_type is not None:
+            rows = [r for r in rows if r['doc_type'] == doc_type]
+        if stage:
+            rows = [r for r in rows if r['stage'].startswith(stage)]
+        return Response({
+            'pid': os.getpid(),
+            'since': datetime.datetime.fromtimestamp(
+                timing.HISTOGRAM.since, tz=datetime.timezone.utc).isoformat(),
+            'slow_ms': getattr(settings, 'UPLOAD_SLOW_STAGE_MS', 5000),
+            'stages': rows,
+        })
+
+    def delete(self, request):
+        denied = self._super(request)
+        if denied:
+            return denied
+        from . import timing
+        timing.HISTOGRAM.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminRateLimitsView(AdminUploadTimingsView):
+    """GET .../ops/rate-limits/ — requests allowed and rejected per rate-limit scope
+    (``halatuju.ratelimit``): the DRF throttles (their DEFAULT_THROTTLE_RATES keys) and the
+    endpoint caps (report, phone verify, the help coach's Gemini cap). SUPER-ONLY, like the
+    timings. Per scope: ``allowed`` / ``rejected`` — the serving PROCESS's since it started
+    (``pid``) — and ``rejected_shared``, every instance's rejections over the last ``?days=``
+    (default 1 = today, UTC; at most 8). DELETE clears this process's counts."""
+
+    def get(self, request):
+        denied = self._super(request)
+        if denied:
+            return denied
+        import os
+        from halatuju import ratelimit
+        try:
+            days = int(request.query_params.get('days', 1))
+        except ValueError:
+            days = 1
+        local = ratelimit.stats()
+        rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+        scopes = sorted(set(rates) | set(ratelimit.CAP_SCOPES) | set(local))
+        shared = ratelimit.rejections(scopes, days=days)
+        return Response({
+            'pid': os.getpid(),
+            'days': days,
+            'scopes': [{'scope': scope,
+                        'allowed': local.get(scope, {}).get('allowed', 0),
+                        'rejected': local.get(scope, {}).get('rejected', 0),
+                        'rejected_shared': shared[scope]}
+                       for scope in scopes],
+        })
+
+    def delete(self, request):
+        denied = self._super(request)
+        if denied:
+            return denied
+        from halatuju import ratelimit
+        ratelimit.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AdminJobsView(_AdminBase):
+    """GET .../ops/jobs/ — the background-job runs (jobs.py), newest first: status, attempts,
+    worker, progress, duration and error per run, plus ``latest`` — the most recent run of each
+    job name, so "did last night's digest go out" is one read. ``?name=`` / ``?status=`` narrow
+    the list; ``?limit=`` (default 50, max 500). SUPER-ONLY: job names and command output are
+    platform operations, not tenant data.
+
+    GET .../ops/jobs/<id>/ — one run, with its output tail."""
+
+    def get(self, request, job_id=None):
+        admin = self.get_admin(request)
+        if not admin:
+            return self._deny()
+        if not self.has_role(admin, 'super'):
+            return self._deny_role()
+        from . import jobs
+        from .models import BackgroundJob
+        if job_id is not None:
+            job = BackgroundJob.objects.filter(pk=job_id).first()
+            if job is None:
+                return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(jobs.as_dict(job, output=True))
+        qs = BackgroundJob.objects.defer('output')
+        name = request.query_params.get('name')
+        state = request.query_params.get('status')
+        if name:
+            qs = qs.filter(name=name)
+        if state:
+            qs = qs.filter(status=state)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 500)
+        except ValueError:
+            limit = 50
+        from django.db.models import Count, Max
+        newest = BackgroundJob.objects.values('name').annotate(last=Max('id')).values('last')
+        latest = BackgroundJob.objects.defer('output').filter(id__in=newest).order_by('name')
+        counts = dict(BackgroundJob.objects.values_list('status').annotate(n=Count('id')))
+        return Response({
+            'queue_enabled': jobs.enabled(),
+            'counts': {s: counts.get(s, 0) for s, _ in BackgroundJob.STATUS_CHOICES},
+            'latest': [jobs.as_dict(j) for j in latest],
+            'jobs': [jobs.as_dict(j) for j in qs[:limit]],
+        })
+
+
+class AdminOutboxView(_AdminBase):
+    """GET .../ops/outbox/ — the email outbox (outbox.py): counts by status, the age of the
+    oldest due row, p50/p95 send time and queue lag, and the rows themselves, newest first
+    (``?status=`` / ``?kind=`` narrow them; ``?limit=`` default 50, max 500). SUPER-ONLY:
+    recipient addresses across every organisation.
+
+    POST .../ops/outbox/<id>/retry/ — put a dead (or failing) row back in the queue, due now."""
+
+    def get(self, request):
+        admin = self.get_admin(request)
+        if not admin:
+            return self._deny()
+        if not self.has_role(admin, 'super'):
+            return self._deny_role()
+        from . import outbox
+        from .models import EmailOutbox
+        qs = EmailOutbox.objects.all()
+        for param in ('status', 'kind'):
+            if request.query_params.get(param):
+                qs = qs.filter(**{param: request.query_params[param]})
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 500)
+        except ValueError:
+            limit = 50
+        return Response({**outbox.stats(), 'rows': [outbox.as_dict(r) for r in qs[:limit]]})
+
+    def post(self, request, row_id):
+        admin = self.get_admin(request)
+        if not admin:
+            return self._deny()
+        if not self.has_role(admin, 'super'):
+            return self._deny_role()
+        from django.utils import timezone as _tz
+        from . import outbox
+        from .models import EmailOutbox
+        updated = EmailOutbox.objects.filter(
+            pk=row_id, status__in=[EmailOutbox.DEAD, EmailOutbox.PENDING],
+        ).update(status=EmailOutbox.PENDING, attempts=0, next_attempt_at=_tz.now())
+        if not updated:
+            return Response({'error': 'Not found or already delivered'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response(outbox.as_dict(EmailOutbox.objects.get(pk=row_id)))
+
+
 class AdminBillingRatesView(_AdminBase):
     """SUPER-ONLY: read + set the conversion rate and per-category margins.
 
@@ -9,69 +9,40 @@ the testable core — they run pure and require no API key. The actual Vision
 call (``extract_mykad``) is mocked in tests and degrades gracefully to an
 error dict when the API is unavailable or the SDK isn't installed.
 """
+import contextvars
+import hashlib
 import json
 import logging
 import math
 import re
+import threading
+from contextlib import contextmanager
 from typing import Optional
 
 from django.conf import settings
 from django.utils import timezone
 
-logger = logging.getLogger(__name__)
-
-# Stripped before name comparison — common MyKad name suffixes / parentage markers.
-_NAME_NOISE = re.compile(
-    # MyKad parentage tokens + Malay/English honorifics that prefix a name on official
-    # letters (e.g. an offer addressed to "SDRI THEEPICAA …") — stripped so the name
-    # matches the profile name regardless of the title.
-    # The slash markers tolerate stray whitespace around the slash ("A/ P", "A / P",
-    # "A /P") — a student who types their name that way otherwise leaves orphan single
-    # letters "a"/"p" in the token set, which makes the EXACT name_match read a clean
-    # subset → a false 'partial'/mismatch on the IC + offer letter (#20).
-    r"\b(bin|binti|a\s*/\s*l|a\s*/\s*p|al|ap|d\s*/\s*o|s\s*/\s*o|@"
-    r"|sdr|sdri|saudara|saudari|encik|puan|cik|tuan|dr|datuk|dato|datin)\b",
-    flags=re.IGNORECASE,
-)
+from . import matching, pdf, timing
+from .matching import _NAME_NOISE
 
-# An OCR read that GLUES a slash parentage marker onto the name ("LAKSMITHAA/P VIJAYAN", #48)
-# defeats _NAME_NOISE — its \b never fires mid-word, so the leftover "a"+"p" letters pollute the
-# token set AND the glued comparison (name_match's boundary tolerance), producing a false red Name
-# chip on the student's own document. These two patterns re-insert the lost space around a glued
-# a/l, a/p, d/o or s/o (backward glue: marker stuck to the preceding name; forward glue: stuck to
-# the following name). Slash-form markers ONLY — a '/' never legitimately occurs inside a name, so
-# this cannot corrupt names that merely contain "al"/"ap" letters (e.g. KALAI).
-_GLUED_MARKER_BEFORE = re.compile(r'([a-z])(a\s*/\s*[lp]|[ds]\s*/\s*o)\b', flags=re.IGNORECASE)
-_GLUED_MARKER_AFTER = re.compile(r'\b(a\s*/\s*[lp]|[ds]\s*/\s*o)([a-z])', flags=re.IGNORECASE)
-
-
-def _split_glued_markers(s: str) -> str:
-    """Detach a slash parentage marker glued to a name token (both directions)."""
-    s = _GLUED_MARKER_BEFORE.sub(r'\1 \2', s)
-    return _GLUED_MARKER_AFTER.sub(r'\1 \2', s)
+logger = logging.getLogger(__name__)
 
 
 def _canonical_nric(s: str) -> str:
     """Strip hyphens, spaces, and non-digits. Returns ''-on-blank."""
-    return re.sub(r'\D', '', s or '')
+    return matching.canonical_nric(s)
 
 
 def canonical_name_tokens(s: str) -> set:
     """Lowercase, strip MyKad parentage tokens + honorific prefixes, return a tokens set."""
-    if not s:
-        return set()
-    cleaned = _NAME_NOISE.sub(' ', _split_glued_markers(s.lower()))
-    return {t for t in re.split(r'[^a-z]+', cleaned) if t}
+    return set(matching.name_tokens(s))
 
 
 def _canonical_name_seq(s: str) -> list:
     """Like canonical_name_tokens but ORDER-PRESERVING (a list) — so the words can be
     glued back in their printed order. Needed to compare a name that an OCR space SPLIT
     inside a token (RUSHAINDRA → "RUSHAIND RA") or GLUED across a real space."""
-    if not s:
-        return []
-    cleaned = _NAME_NOISE.sub(' ', _split_glued_markers(s.lower()))
-    return [t for t in re.split(r'[^a-z]+', cleaned) if t]
+    return list(matching.name_seq(s))
 
 
 def _glued_equal(a: str, b: str, *, fold: bool) -> bool:
@@ -81,11 +52,7 @@ def _glued_equal(a: str, b: str, *, fold: bool) -> bool:
     identical — this comparison is agnostic to that. ``fold=True`` also applies the
     romanisation folding (cross-document use); ``fold=False`` keeps spelling exact
     (identity). Pure boundary tolerance — it can only turn a mismatch INTO a match."""
-    def reduce(name: str) -> str:
-        toks = _canonical_name_seq(name)
-        return ''.join(_fold_name_token(t) for t in toks) if fold else ''.join(toks)
-    ra, rb = reduce(a), reduce(b)
-    return bool(ra) and ra == rb
+    return matching.glued_equal(a, b, fold=fold)
 
 
 def nric_match(extracted: str, profile_nric: str) -> bool:
@@ -101,27 +68,7 @@ def nric_close(extracted: str, reference: str) -> bool:
     False when either is blank, when they're equal (that's an exact match — use nric_match),
     or when they differ by more than one digit. RELATIONSHIP context only — used to phrase a
     soft 'check the number' nudge more precisely; it never relaxes the strict identity gate."""
-    a, b = _canonical_nric(extracted), _canonical_nric(reference)
-    if not a or not b or a == b:
-        return False
-    la, lb = len(a), len(b)
-    if abs(la - lb) > 1:
-        return False
-    if la == lb:                                   # one substitution
-        return sum(1 for x, y in zip(a, b) if x != y) == 1
-    short, long = (a, b) if la < lb else (b, a)    # one inserted/dropped digit
-    i = j = 0
-    skipped = False
-    while i < len(short) and j < len(long):
-        if short[i] == long[j]:
-            i += 1
-            j += 1
-        elif skipped:
-            return False
-        else:
-            skipped = True
-            j += 1
-    return True
+    return matching.nric_close(extracted, reference)
 
 
 def reference_names(application):
@@ -160,20 +107,8 @@ def name_match(extracted: str, profile_name: str) -> str:
     name omits a middle/surname the IC carries, or vice versa);
     'mismatch' otherwise. Empty inputs return 'mismatch'.
     """
-    a = canonical_name_tokens(extracted)
-    b = canonical_name_tokens(profile_name)
-    if not a or not b:
-        return 'mismatch'
-    if a == b:
-        return 'match'
-    if a < b or b < a:
-        return 'partial'
-    # An OCR space split or glued a name token (RUSHAINDRA ↔ "RUSHAIND RA"), shifting a
-    # boundary so the token sets differ — compare the names glued (spelling-exact for
-    # identity). Strictly boundary tolerance; spelling differences still mismatch.
-    if _glued_equal(extracted, profile_name, fold=False):
-        return 'match'
-    return 'mismatch'
+    # The comparison lives in matching.py (cached normalisation, memoised per request).
+    return matching.name_match(extracted, profile_name)
 
 
 # ── Relationship / cross-document name matching (transliteration-tolerant) ────────────
@@ -190,64 +125,31 @@ def name_match(extracted: str, profile_name: str) -> str:
 def _fold_name_token(tok: str) -> str:
     """Conservative romanisation folding so two spellings of ONE Tamil/Indian name agree:
     w→v, collapse a doubled letter (Pilaapparao≈Pilaaparao), drop a trailing silent 'h'."""
-    t = tok.replace('w', 'v')
-    folded = []
-    for ch in t:
-        if not folded or folded[-1] != ch:
-            folded.append(ch)
-    t = ''.join(folded)
-    return t[:-1] if len(t) > 2 and t.endswith('h') else t
+    return matching.fold_token(tok)
 
 
 def _levenshtein(a: str, b: str) -> int:
     """Plain edit distance (no dependency) — used only to allow a single-char token slip."""
-    if a == b:
-        return 0
-    if not a or not b:
-        return len(a) or len(b)
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a, 1):
-        cur = [i]
-        for j, cb in enumerate(b, 1):
-            cur.append(min(prev[j] + 1, cur[-1] + 1, prev[j - 1] + (ca != cb)))
-        prev = cur
-    return prev[-1]
+    return matching.levenshtein(a, b)
 
 
 def _tokens_close(x: str, y: str) -> bool:
     """True iff two name tokens are the same person's name under romanisation / OCR variance."""
-    fx, fy = _fold_name_token(x), _fold_name_token(y)
-    if fx == fy:
-        return True
     # a single-character difference between LONGER tokens (an OCR slip or spelling variant);
     # short tokens must fold-match exactly (keeps Siva≠Sira, Vani≠Vasu from merging).
-    return min(len(fx), len(fy)) >= 5 and _levenshtein(fx, fy) <= 1
+    return matching.tokens_close(x, y)
 
 
 def relationship_name_match(extracted: str, reference: str) -> str:
     """Like name_match, but tolerant of Malaysian-Tamil/Indian romanisation + OCR variance —
     for comparing the SAME person's name across two documents (relationship / income-proof
     checks). 'match' when the token sets agree under folding; 'partial' when one is a tolerant
-    subset of the other; 'mismatch' otherwise. STRICTLY more lenient than name_match."""
-    a = list(canonical_name_tokens(extracted))
-    b = list(canonical_name_tokens(reference))
-    if not a or not b:
-        return 'mismatch'
-    small, large = (a, b) if len(a) <= len(b) else (b, a)
-    used = [False] * len(large)
-    matched = True
-    for x in small:
-        hit = next((i for i, y in enumerate(large) if not used[i] and _tokens_close(x, y)), None)
-        if hit is None:
-            matched = False
-            break
-        used[hit] = True
-    if matched:
-        return 'match' if len(a) == len(b) else 'partial'
-    # Token-by-token failed: an OCR space split a name token (RUSHAINDRA → "RUSHAIND RA")
-    # or glued two — the boundary moved, so the token sets can't line up. Compare the names
-    # GLUED (folded), which is agnostic to where the spaces fell. Strictly mismatch→match.
-    return 'match' if _glued_equal(extracted, reference, fold=True) else 'mismatch'
+    subset of the other; 'mismatch' otherwise. STRICTLY more lenient than name_match.
+
+    Tokens pair up greedily; when that fails, an OCR space that split a name token
+    (RUSHAINDRA → "RUSHAIND RA") or glued two is tolerated by comparing the names GLUED
+    (folded), which is agnostic to where the spaces fell. Strictly mismatch→match."""
+    return matching.relationship_name_match(extracted, reference)
 
 
 _NRIC_REGEX = re.compile(r'\b(\d{6}[-\s]?\d{2}[-\s]?\d{4})\b')
@@ -583,7 +485,7 @@ def _extract_address(text: str) -> str:
 # degrades to "unreadable" — today's behaviour — rather than crashing.
 _PDF_MAGIC = b'%PDF-'
 _MIN_PDF_TEXT = 25      # chars of real text → treat as a digital PDF (skip Vision)
-_RASTER_DPI = 200
+_RASTER_DPI = pdf.RASTER_DPI
 
 
 def _is_pdf(content_type: str, data: bytes) -> bool:
@@ -594,62 +496,248 @@ def _is_pdf(content_type: str, data: bytes) -> bool:
 
 def _pdf_text_layer(data: bytes) -> str:
     """The concatenated text layer of a PDF (all pages). '' if none / encrypted /
-    library missing — caller then falls back to rasterise+OCR."""
-    try:
-        import io
-        from pypdf import PdfReader
-        reader = PdfReader(io.BytesIO(data))
-        if reader.is_encrypted:
-            try:
-                reader.decrypt('')
-            except Exception:  # noqa: BLE001
-                return ''
-        return '\n'.join((p.extract_text() or '') for p in reader.pages).strip()
-    except Exception as e:  # noqa: BLE001
-        logger.warning('PDF text-layer extraction failed: %s', e)
-        return ''
+    library missing — caller then falls back to rasterise+OCR. Parsed once per PDF and
+    shared by every caller (``pdf.open_pdf``)."""
+    return pdf.open_pdf(data).text()
+
+
+def _pdf_is_digital(data: bytes) -> bool:
+    """Does the PDF carry a usable text layer (≥ ``_MIN_PDF_TEXT`` chars)? The same answer as
+    ``len(_pdf_text_layer(data)) >= _MIN_PDF_TEXT``, reading only as many pages as it takes."""
+    return pdf.open_pdf(data).has_text(_MIN_PDF_TEXT)
 
 
 def _pdf_first_page_png(data: bytes) -> Optional[bytes]:
     """Rasterise page 1 of a PDF to PNG bytes (~200 DPI). None on failure /
-    library missing. Page 1 only — bounds the Vision cost to 1 unit per doc."""
-    try:
-        import io
+    library missing. Page 1 only — bounds the Vision cost to 1 unit per doc.
+    Rendered once per PDF (``pdf.open_pdf``)."""
+    return pdf.open_pdf(data).page_png(0)
 
-        import pypdfium2 as pdfium
-        pdf = pdfium.PdfDocument(data)
-        try:
-            if len(pdf) == 0:
-                return None
-            pil = pdf[0].render(scale=_RASTER_DPI / 72.0).to_pil()
-            buf = io.BytesIO()
-            pil.convert('RGB').save(buf, format='PNG')
-            return buf.getvalue()
-        finally:
-            pdf.close()
-    except Exception as e:  # noqa: BLE001
-        logger.warning('PDF rasterise failed: %s', e)
+
+def _pdf_page_for_ocr(data: bytes) -> Optional[bytes]:
+    """Page 1 of a scanned PDF as the image a read should send: rasterised, then through the
+    OCR pre-processing stage (``imaging.prepare_for_ocr`` — a 200-DPI PNG becomes a JPEG a
+    fraction of the size). None when the PDF can't be rasterised."""
+    png = _pdf_first_page_png(data)
+    if png is None:
         return None
+    return pdf.open_pdf(data).ocr_image(0, png)
+
+
+def _fetch_for_ocr(doc) -> Optional[bytes]:
+    """The bytes every read of ``doc`` starts from: its stored OCR copy when there is one, else
+    the original, pre-processed on the way (see ``imaging.ocr_image``). Inside a
+    ``batched_reads`` block, the bytes that block already fetched."""
+    batch = _batched.get()
+    if batch is not None and getattr(doc, 'pk', None) in batch.fetched:
+        return batch.fetched[doc.pk]
+    from .imaging import ocr_image
+    return ocr_image(doc)
+
+
+# ── The Cloud Vision client + batched reads ───────────────────────────────────
+# One ImageAnnotatorClient per process, built on first use. Constructing one per call (as every
+# read used to) re-resolves credentials and opens a fresh gRPC channel each time — fine for one
+# upload, a real share of the wall-clock of a bulk pass.
+_annotator_client = None
+_annotator_lock = threading.Lock()
+
+# ``batch_annotate_images`` takes at most 16 images per synchronous request, and the request body
+# (base64, so ~4/3 of the raw bytes) must stay under 10 MB — a batch is closed at whichever comes
+# first. An OCR copy (imaging.py) is a few hundred KB, so in practice it's the image count.
+VISION_BATCH_LIMIT = 16
+_VISION_BATCH_MAX_BYTES = 7 * 1024 * 1024
+
+
+def _annotator():
+    """The process's shared ``ImageAnnotatorClient`` (thread-safe — the gRPC client is). Raises
+    ImportError when google-cloud-vision isn't installed; tests patch this seam with
+    ``tests/vision_fakes.FakeAnnotator``."""
+    global _annotator_client
+    with _annotator_lock:
+        if _annotator_client is None:
+            from google.cloud import vision  # type: ignore
+            api_key = getattr(settings, 'GOOGLE_CLOUD_VISION_API_KEY', '') or ''
+            _annotator_client = (vision.ImageAnnotatorClient(client_options={'api_key': api_key})
+                                 if api_key else vision.ImageAnnotatorClient())
+        return _annotator_client
+
+
+class _BatchedReads:
+    """The responses of one ``batched_reads`` block, keyed by a digest of the image sent, plus the
+    bytes fetched for each document. Shared by the block's worker threads (hence the lock).
+
+    Metering follows CONSUMPTION: a prefetched response is recorded as a billable Vision call
+    the first time a document's read uses it — inside that document's usage context, so the call
+    is attributed to its organisation + application exactly as a single read would be. Anything
+    fetched but never used is still recorded when the block closes (it was billed)."""
+
+    def __init__(self):
+        self.reads = {}          # digest → [resp, error | None, billed]
+        self.fetched = {}        # doc pk → bytes | None
+        self._lock = threading.Lock()
+
+    def take(self, image_bytes):
+        """``(resp, error)`` for a prefetched image, or None when this image wasn't in the batch."""
+        entry = self.reads.get(_image_digest(image_bytes))
+        if entry is None:
+            return None
+        with self._lock:
+            bill, entry[2] = not entry[2], True
+        if bill:
+            from . import usage
+            usage.record_usage(usage.VISION_OCR)
+        return (None, entry[1]) if entry[1] else (entry[0], None)
+
+    def settle(self):
+        from . import usage
+        for entry in self.reads.values():
+            if not entry[2]:
+                entry[2] = True
+                usage.record_usage(usage.VISION_OCR)
 
 
-def _vision_document_text(image_bytes: bytes) -> dict:
-    """Google Vision DOCUMENT_TEXT_DETECTION on *image* bytes → ``{'text', 'error'}``.
-    The single seam the OCR functions share (and tests patch). Graceful — returns
-    an error dict, never raises. ``error`` is None on success."""
+_batched: 'contextvars.ContextVar[_BatchedReads | None]' = contextvars.ContextVar(
+    'vision_batched_reads', default=None)
+
+
+def _image_digest(image_bytes: bytes) -> str:
+    return hashlib.sha1(image_bytes).hexdigest()
+
+
+def _annotate(image_bytes: bytes):
+    """ONE ``document_text_detection`` of ``image_bytes`` → ``(response, error)`` — served from
+    the enclosing ``batched_reads`` block when the image was prefetched, else a single paced,
+    metered call on the shared client. Never raises."""
+    batch = _batched.get()
+    if batch is not None:
+        hit = batch.take(image_bytes)
+        if hit is not None:
+            return hit
     try:
         from google.cloud import vision  # type: ignore
     except ImportError:
-        return {'text': '', 'error': 'AI module not installed'}
-    api_key = getattr(settings, 'GOOGLE_CLOUD_VISION_API_KEY', '') or ''
+        return None, 'AI module not installed'
     try:
-        client = (vision.ImageAnnotatorClient(client_options={'api_key': api_key})
-                  if api_key else vision.ImageAnnotatorClient())
-        resp = client.document_text_detection(image=vision.Image(content=image_bytes))
-        from . import usage
+        client = _annotator()
+        from . import pacing, usage
+        pacing.pace(usage.VISION_OCR)   # no-op outside a paced bulk run
+        with timing.span('vision.ocr'):
+            resp = client.document_text_detection(image=vision.Image(content=image_bytes))
         usage.record_usage(usage.VISION_OCR)   # billable Cloud Vision call — best-effort meter
         if resp.error and resp.error.message:
-            return {'text': '', 'error': resp.error.message[:200]}
-        return {'text': resp.full_text_annotation.text if resp.full_text_annotation else '', 'error': None}
+            return None, resp.error.message[:200]
+        return resp, None
+    except Exception as e:  # noqa: BLE001 — graceful: never propagate to a 500
+        logger.warning('Vision OCR failed: %s', e)
+        return None, str(e)[:200]
+
+
+def annotate_batch(images) -> list:
+    """``document_text_detection`` of every image in ``images`` → one ``(response, error)`` per
+    image, in order. Sent as ``batch_annotate_images`` requests of up to ``VISION_BATCH_LIMIT``
+    images on the shared client. An image Vision answered carries its response even when that
+    response is an error (``error`` set — it was still a call); an image whose whole request
+    failed gets ``(None, error)``. Each image is paced (``pacing``) as the one billable call it
+    is. Metering is the caller's — see ``_BatchedReads``. Never raises."""
+    images = list(images)
+    if not images:
+        return []
+    try:
+        from google.cloud import vision  # type: ignore
+        client = _annotator()
+    except Exception as e:  # noqa: BLE001 — missing library / bad credentials: every image fails
+        return [(None, 'AI module not installed' if isinstance(e, ImportError) else str(e)[:200])] * len(images)
+    from . import pacing, usage
+    feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+    out = []
+    for chunk in _batch_chunks(images):
+        for _ in chunk:
+            pacing.pace(usage.VISION_OCR)
+        try:
+            with timing.span('vision.ocr_batch'):
+                resp = client.batch_annotate_images(requests=[
+                    vision.AnnotateImageRequest(image=vision.Image(content=b), features=[feature])
+                    for b in chunk])
+            responses = list(resp.responses)
+        except Exception as e:  # noqa: BLE001
+            logger.warning('Vision batch OCR failed (%d images): %s', len(chunk), e)
+            out.extend([(None, str(e)[:200])] * len(chunk))
+            continue
+        out.extend((r, r.error.message[:200] if r.error and r.error.message else None)
+                   for r in responses)
+        out.extend([(None, 'no response')] * (len(chunk) - len(responses)))
+    return out
+
+
+def _batch_chunks(images):
+    """Split ``images`` into requests of ≤ ``VISION_BATCH_LIMIT`` images and ≤
+    ``_VISION_BATCH_MAX_BYTES`` raw bytes (a single oversized image still goes, alone)."""
+    chunk, size = [], 0
+    for b in images:
+        if chunk and (len(chunk) >= VISION_BATCH_LIMIT or size + len(b) > _VISION_BATCH_MAX_BYTES):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(b)
+        size += len(b)
+    if chunk:
+        yield chunk
+
+
+def _vision_input(doc, image: bytes) -> Optional[bytes]:
+    """The exact image a read of ``doc`` will send to Vision, given its fetched bytes — or None
+    when the read makes no Vision call (a digital PDF is read from its free text layer). Mirrors
+    ``extract_mykad`` (an IC PDF is always rasterised) and ``extract_text`` /
+    ``ocr_document_full`` (everything else tries the text layer first)."""
+    if not _is_pdf(doc.content_type, image):
+        return image
+    if doc.doc_type not in ('ic', 'parent_ic') and _pdf_is_digital(image):
+        return None
+    return _pdf_page_for_ocr(image)
+
+
+@contextmanager
+def batched_reads(docs):
+    """Prefetch the OCR of ``docs`` in batched Vision requests for the reads run inside the
+    block. Each document is fetched once (its OCR copy, as ``_fetch_for_ocr``), the images that
+    would each have cost a single ``document_text_detection`` are sent together through
+    ``annotate_batch``, and every ``_vision_document_text`` / ``_vision_words`` call in the
+    block — on this thread or a worker started from a copy of this context — is answered from
+    the batch when its image matches. Reads are unchanged otherwise: an image that wasn't
+    prefetched (or a failed fetch) takes the single-call path as before.
+
+    For bulk passes (``reextract.run_pass``, ``reprocess_unread_ic_documents``): hand it only
+    documents that WILL be read — a prefetched response nobody uses is still a billed call."""
+    batch = _BatchedReads()
+    images = {}
+    for doc in docs:
+        with _doc_usage_ctx(doc):
+            data = _fetch_for_ocr(doc)
+        batch.fetched[doc.pk] = data
+        sent = _vision_input(doc, data) if data else None
+        if sent:
+            images.setdefault(_image_digest(sent), sent)
+    for digest, (resp, err) in zip(images, annotate_batch(images.values())):
+        if resp is not None:     # a request that failed outright → those reads go singly
+            batch.reads[digest] = [resp, err, False]
+    token = _batched.set(batch)
+    try:
+        yield batch
+    finally:
+        _batched.reset(token)
+        batch.settle()
+
+
+def _vision_document_text(image_bytes: bytes) -> dict:
+    """Google Vision DOCUMENT_TEXT_DETECTION on *image* bytes → ``{'text', 'error'}``.
+    The single seam the OCR functions share (and tests patch). Graceful — returns
+    an error dict, never raises. ``error`` is None on success."""
+    resp, err = _annotate(image_bytes)
+    if err:
+        return {'text': '', 'error': err}
+    try:
+        return {'text': resp.full_text_annotation.text if resp.full_text_annotation else '',
+                'error': None}
     except Exception as e:  # noqa: BLE001 — graceful: never propagate to a 500
         logger.warning('Vision OCR failed: %s', e)
         return {'text': '', 'error': str(e)[:200]}
@@ -664,19 +752,12 @@ def _vision_words(data: bytes, content_type: str = '') -> dict:
     img, _mime = _as_image_for_gemini(data, content_type)
     if img is None:
         return {'words': [], 'text': '', 'error': 'no image'}
+    resp, err = _annotate(img)
+    if err:
+        return {'words': [], 'text': '', 'error': err}
+    # Parsed per response, inside the guard: one malformed or partial page (a batched read
+    # shares its request with others) reads as nothing and is logged, never raised.
     try:
-        from google.cloud import vision  # type: ignore
-    except ImportError:
-        return {'words': [], 'text': '', 'error': 'AI module not installed'}
-    api_key = getattr(settings, 'GOOGLE_CLOUD_VISION_API_KEY', '') or ''
-    try:
-        client = (vision.ImageAnnotatorClient(client_options={'api_key': api_key})
-                  if api_key else vision.ImageAnnotatorClient())
-        resp = client.document_text_detection(image=vision.Image(content=img))
-        from . import usage
-        usage.record_usage(usage.VISION_OCR)   # billable Cloud Vision call — best-effort meter
-        if resp.error and resp.error.message:
-            return {'words': [], 'text': '', 'error': resp.error.message[:200]}
         # The SAME response carries the flattened text (full_text_annotation) — return it
         # too, so one billable call can serve both the positional parsers (words) and the
         # text consumers (name/address match, label parsers). See ocr_document_full.
@@ -713,7 +794,7 @@ def extract_mykad(data: bytes, content_type: str = '') -> dict:
     if not data:
         return {'nric': '', 'name': '', 'address': '', 'error': 'empty image'}
     if _is_pdf(content_type, data):
-        img = _pdf_first_page_png(data)
+        img = _pdf_page_for_ocr(data)
         if img is None:
             return {'nric': '', 'name': '', 'address': '', 'error': 'Bad image data.'}
         data = img
@@ -730,6 +811,7 @@ def extract_mykad(data: bytes, content_type: str = '') -> dict:
     }
 
 
+@timing.timed('storage.fetch')
 def _fetch_image_bytes(storage_path: str) -> Optional[bytes]:
     """Download a document's raw bytes from Supabase Storage (image OR PDF).
     Returns None on failure."""
@@ -782,12 +864,17 @@ _IC_GEMINI_PROMPT = (
 
 def _as_image_for_gemini(data: bytes, content_type: str):
     """Return ``(image_bytes, mime_type)`` Gemini can read, or ``(None, '')``. A PDF
-    (scanned MyKad) is rasterised to PNG page 1 first."""
+    (scanned MyKad) is rasterised to page 1 first. The mime is read off the bytes when they
+    say — an OCR copy is a JPEG whatever the row's ``content_type`` says."""
     if not data:
         return None, ''
+    from .imaging import sniff_image_mime
     if _is_pdf(content_type, data):
-        png = _pdf_first_page_png(data)
-        return (png, 'image/png') if png else (None, '')
+        img = _pdf_page_for_ocr(data)
+        return (img, sniff_image_mime(img) or 'image/png') if img else (None, '')
+    sniffed = sniff_image_mime(data)
+    if sniffed:
+        return data, sniffed
     ct = (content_type or '').lower().split(';')[0].strip()
     return data, (ct if ct.startswith('image/') else 'image/jpeg')
 
@@ -868,7 +955,7 @@ def run_vision_for_document(doc) -> dict:
     """
     from . import usage
     _ctx = _doc_usage_ctx(doc)
-    image = _fetch_image_bytes(doc.storage_path)
+    image = _fetch_for_ocr(doc)
     used_gemini = False
     with _ctx:
         if image is None:
@@ -970,7 +1057,7 @@ def extract_text(data: bytes, content_type: str = '') -> dict:
         text = _pdf_text_layer(data)
         if len(text) >= _MIN_PDF_TEXT:
             return {'text': text, 'error': None}   # digital PDF — no billable Vision call
-        img = _pdf_first_page_png(data)
+        img = _pdf_page_for_ocr(data)
         if img is None:
             return {'text': '', 'error': 'Bad image data.'}
         data = img
@@ -1105,7 +1192,7 @@ def ocr_document(doc) -> dict:
     run_vision_match_for_document / run_field_extraction_for_document as ``ocr=``
     so the same upload OCRs only once."""
     with _doc_usage_ctx(doc):
-        image = _fetch_image_bytes(doc.storage_path)
+        image = _fetch_for_ocr(doc)
         return {'text': '', 'error': 'could not fetch image'} if image is None else extract_text(image, doc.content_type)
 
 
@@ -1125,7 +1212,7 @@ def ocr_document_full(doc) -> dict:
     otherwise carries both the text and the word boxes (previously two identical
     billable calls per slip/BC upload — code-health S2 #22)."""
     with _doc_usage_ctx(doc):
-        image = _fetch_image_bytes(doc.storage_path)
+        image = _fetch_for_ocr(doc)
         if image is None:
             return {'text': '', 'words': None, 'image': None, 'error': 'could not fetch image'}
         if _is_pdf(doc.content_type, image):
@@ -1133,6 +1220,10 @@ def ocr_document_full(doc) -> dict:
             if len(text) >= _MIN_PDF_TEXT:
                 return {'text': text, 'words': None, 'image': image, 'error': None}
         r = _vision_words(image, doc.content_type)
+        if r.get('words') and not _is_pdf(doc.content_type, image):
+            # A sideways photo: keep an upright OCR copy for the Gemini fallback + later reads.
+            from .imaging import deskew_ocr_copy
+            image = deskew_ocr_copy(doc, image, r['words'])
         return {'text': r.get('text') or '', 'words': r.get('words'), 'image': image,
                 'error': r.get('error')}
 
@@ -1551,25 +1642,24 @@ def _call_gemini_json(prompt: str, schema: dict, *, image: Optional[bytes] = Non
     if not api_key:
         return {'_error': 'AI service not configured (missing API key)'}
     try:
-        from google import genai
+        from google import genai  # noqa: F401
         from google.genai import types
     except ImportError:
         return {'_error': 'AI module not installed'}
+    from . import llm
     from .profile_engine import MODEL_CASCADE
-    client = genai.Client(api_key=api_key)
     contents = (prompt if image is None
                 else [types.Part.from_bytes(data=image, mime_type=mime_type), prompt])
     last_error = None
     for model_name in MODEL_CASCADE:
         try:
-            resp = client.models.generate_content(
-                model=model_name, contents=contents,
+            # The broker paces, budgets, retries a 429, meters and times the call.
+            resp = llm.generate(
+                model_name, contents,
                 config=types.GenerateContentConfig(
-                    response_mime_type='application/json', response_schema=schema, temperature=0.1),
+                    response_mime_type='application/json', response_schema=schema,
+                    temperature=0.1),
             )
-            from . import usage   # billable Gemini call — best-effort meter (tokens from usage_metadata)
-            _it, _ot = usage.gemini_tokens(resp)
-            usage.record_usage(usage.GEMINI, model=model_name, input_tokens=_it, output_tokens=_ot)
             return json.loads(resp.text)
         except Exception as e:  # noqa: BLE001 — graceful: never propagate to a 500
             last_error = str(e)
@@ -1930,7 +2020,7 @@ def _run_field_extraction_impl(doc, *, names, postcode='', city='', street='', c
     _o = ocr if isinstance(ocr, dict) else {}
 
     def _image():
-        return _o['image'] if _o.get('image') is not None else _fetch_image_bytes(doc.storage_path)
+        return _o['image'] if _o.get('image') is not None else _fetch_for_ocr(doc)
 
     pre_words = _o.get('words')                 # None = not computed (compute if needed)
     if doc.doc_type == 'results_slip':
@@ -2067,7 +2157,7 @@ def _run_field_extraction_impl(doc, *, names, postcode='', city='', street='', c
             from .genuineness import assess
             rr = ocr if ocr is not None else ocr_document(doc)
             text = (rr or {}).get('text', '') or ''
-            gimg = image if image is not None else _fetch_image_bytes(doc.storage_path)
+            gimg = image if image is not None else _fetch_for_ocr(doc)
             # The offer is scored TEXT-only (signatures). An empty/failed OCR is OUR failure →
             # no signal, never a 'suspect' penalty (mirrors the slip/BC/EPF branches).
             auth = (assess('offer_letter', image=gimg, content_type=doc.content_type, ocr_text=text)
@@ -4,7 +4,9 @@ Test isolation for rate-limiting: the global anon throttle (added 2026-06)
 keeps a sliding-window count in the cache. Without resetting it between tests,
 the many anonymous API calls the suite makes — all from 127.0.0.1, one bucket —
 could accumulate past the limit and cause spurious 429s in unrelated tests.
-Clearing the cache before each test keeps throttle state per-test.
+Clearing the cache before each test keeps throttle state per-test. The
+middleware's verified-token cache and the NRIC gate's remembered passes are
+per process too, and are cleared with it.
 """
 import pytest
 from django.core.cache import cache
@@ -12,5 +14,9 @@ from django.core.cache import cache
 
 @pytest.fixture(autouse=True)
 def _reset_cache_between_tests():
+    from halatuju.middleware.profile_loader import clear_nric_gate_cache
+    from halatuju.middleware.supabase_auth import clear_token_cache
     cache.clear()
+    clear_token_cache()
+    clear_nric_gate_cache()
     yield
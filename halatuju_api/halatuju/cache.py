@@ -0,0 +1,484 @@
+"""
+Cache backends for HalaTuju: a per-process front over a shared store, with atomic counters.
+
+Production cached in ``DatabaseCache`` (code-health S5 #21: rate limits need a store every
+Cloud Run instance shares). That fixed the limits but made every cache read a Postgres round
+trip, and every rate-limited request two (DRF's throttle history, the report cap and the
+email / phone-verify limits all get then set). Worse, ``DatabaseCache.incr`` is a get and a
+set, so two instances counting the same key could both read 2 and both write 3 — the limit
+leaked under exactly the burst it exists for. And every ``set`` counts the whole table first.
+
+Three backends, chosen by setting (``CACHE_SHARED`` / ``CACHE_TIERED`` in settings/base.py):
+
+- ``TieredCache`` — the ``default`` cache. A small per-process LRU in front of the ``shared``
+  alias, for READ-MOSTLY keys only: keys starting with one of ``LOCAL_KEY_PREFIXES`` (the
+  verdict case summary, ``vcs:``) are served from memory for up to ``LOCAL_TIMEOUT`` seconds
+  and written through. Everything else — counters, throttle histories — goes straight to the
+  shared store, so a limit is always counted in one place. A write in another process reaches
+  this one's front within ``LOCAL_TIMEOUT``, which is why only keys that tolerate that opt in.
+- ``AtomicDatabaseCache`` — ``DatabaseCache`` whose counters the database increments: ``incr`` is
+  one ``UPDATE … RETURNING`` and ``count`` one ``INSERT … ON CONFLICT DO UPDATE … RETURNING``
+  (PostgreSQL, SQLite 3.35+), so concurrent increments never lose counts and a counted request
+  costs one query — no get, no cull. Elsewhere the row is locked (``SELECT … FOR UPDATE``).
+- ``SQLiteCache`` — a stand-in shared store in one SQLite file (WAL mode), for a dev server or a
+  test run with several processes, where ``LocMemCache`` would give each its own counts. Atomic
+  ``incr`` and ``add`` (``BEGIN IMMEDIATE``).
+
+``count(key, timeout=…)`` is the rate-limit primitive on top: add-or-increment in one atomic
+step on whichever store is configured. It increments first and adds only when the counter is
+missing, since a counter is created once per window and incremented on every other request
+(LocMem and Redis increment atomically already; the database cache upserts).
+"""
+import base64
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.db import DatabaseCache
+
+# The local front's defaults when OPTIONS leave them out.
+_LOCAL_MAX_ENTRIES = 1000
+_LOCAL_TIMEOUT = 60
+
+# A counter's text in AtomicDatabaseCache, and the LIKE pattern every stored pickle matches.
+_NUMBER = re.compile(r'-?[0-9]+')
+_PICKLED = 'gA%'
+
+
+class AtomicDatabaseCache(DatabaseCache):
+    """``DatabaseCache`` whose counters the database adds to itself: ``incr`` and ``count`` are
+    one statement each on PostgreSQL and SQLite, so they cannot lose a concurrent increment.
+
+    A counter is stored as its decimal text, not pickled, so the statement that finds the row can
+    add to it. Django pickles at the highest protocol, and the base64 of such a pickle always
+    starts ``gA`` — a number never does, so ``get`` tells the two apart. A counter written by
+    ``set`` (pickled) is incremented under a row lock instead, and stored as text from then on.
+    """
+
+    def _connection(self):
+        from django.db import connections, router
+        db = router.db_for_write(self.cache_model_class)
+        return db, connections[db]
+
+    @staticmethod
+    def _one_statement(connection):
+        """Whether the database has ``ON CONFLICT … DO UPDATE`` and ``RETURNING``."""
+        return (connection.vendor == 'postgresql'
+                or (connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 35)))
+
+    @staticmethod
+    def _now(connection):
+        from django.utils.timezone import now as tz_now
+        return connection.ops.adapt_datetimefield_value(tz_now().replace(microsecond=0))
+
+    def _expires(self, connection, timeout):
+        from datetime import datetime, timezone as dt_timezone
+
+        from django.conf import settings
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            expires = datetime.max
+        else:
+            tz = dt_timezone.utc if settings.USE_TZ else None
+            expires = datetime.fromtimestamp(timeout, tz=tz)
+        return connection.ops.adapt_datetimefield_value(expires.replace(microsecond=0))
+
+    def _decode(self, value):
+        if _NUMBER.fullmatch(value):
+            return int(value)
+        return pickle.loads(base64.b64decode(value.encode()))
+
+    def _encode(self, value):
+        if type(value) is int:
+            return str(value)
+        return base64.b64encode(pickle.dumps(value, self.pickle_protocol)).decode('latin1')
+
+    def get_many(self, keys, version=None):
+        # DatabaseCache.get_many, decoding a counter's text as well as a pickle.
+        from django.db import connections, models, router
+        from django.utils.timezone import now as tz_now
+        if not keys:
+            return {}
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        db = router.db_for_read(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT %s, %s, %s FROM %s WHERE %s IN (%s)' % (
+                    quote_name('cache_key'), quote_name('value'), quote_name('expires'),
+                    quote_name(self._table), quote_name('cache_key'),
+                    ', '.join(['%s'] * len(key_map))),
+                list(key_map))
+            rows = cursor.fetchall()
+        result, expired_keys = {}, []
+        expression = models.Expression(output_field=models.DateTimeField())
+        converters = (connection.ops.get_db_converters(expression)
+                      + expression.get_db_converters(connection))
+        for key, value, expires in rows:
+            for converter in converters:
+                expires = converter(expires, expression, connection)
+            if expires < tz_now():
+                expired_keys.append(key)
+            else:
+                result[key_map.get(key)] = self._decode(connection.ops.process_clob(value))
+        self._base_delete_many(expired_keys)
+        return result
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db, connection = self._connection()
+        if self._one_statement(connection):
+            quote_name = connection.ops.quote_name
+            value = quote_name('value')
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'UPDATE %s SET %s = CAST(CAST(%s AS BIGINT) + %%s AS TEXT) '
+                    'WHERE %s = %%s AND %s >= %%s AND %s NOT LIKE %%s RETURNING %s' % (
+                        quote_name(self._table), value, value, quote_name('cache_key'),
+                        quote_name('expires'), value, value),
+                    [delta, key, self._now(connection), _PICKLED])
+                row = cursor.fetchone()
+            if row is not None:
+                return int(row[0])
+        return self._locked_incr(db, connection, key, delta)
+
+    def _locked_incr(self, db, connection, key, delta):
+        """The read-add-write under a row lock: a pickled counter, or a database without the
+        one-statement forms. Raises ``ValueError`` for a missing or expired key."""
+        from django.db import models, transaction
+        from django.utils.timezone import now as tz_now
+        quote_name = connection.ops.quote_name
+        table = quote_name(self._table)
+        lock = ' FOR UPDATE' if connection.features.has_select_for_update else ''
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT %s, %s FROM %s WHERE %s = %%s%s' % (
+                    quote_name('value'), quote_name('expires'), table,
+                    quote_name('cache_key'), lock),
+                [key])
+            row = cursor.fetchone()
+            expires = row[1] if row else None
+            if row is not None:
+                expression = models.Expression(output_field=models.DateTimeField())
+                for converter in (connection.ops.get_db_converters(expression)
+                                  + expression.get_db_converters(connection)):
+                    expires = converter(expires, expression, connection)
+            if row is None or expires < tz_now():
+                raise ValueError("Key '%s' not found" % key)
+            value = self._decode(connection.ops.process_clob(row[0])) + delta
+            cursor.execute(
+                'UPDATE %s SET %s = %%s WHERE %s = %%s' % (
+                    table, quote_name('value'), quote_name('cache_key')),
+                [self._encode(value), key])
+        return value
+
+    def count(self, key, *, timeout, delta=1, version=None):
+        """``halatuju.cache.count`` in one statement: an upsert that starts a new window when the
+        row is missing or expired and adds ``delta`` to a live counter. It skips the cull that
+        every ``set`` runs (a COUNT of the table): those ``set``s still clear expired counters."""
+        db, connection = self._connection()
+        if not self._one_statement(connection):
+            return _count(self, key, timeout=timeout, delta=delta, version=version)
+        made = self.make_and_validate_key(key, version=version)
+        quote_name = connection.ops.quote_name
+        table = quote_name(self._table)
+        value, expires = quote_name('value'), quote_name('expires')
+        stale = '%s.%s < %%s' % (table, expires)
+        now = self._now(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO %s (%s, %s, %s) VALUES (%%s, %%s, %%s) ON CONFLICT (%s) DO UPDATE '
+                'SET %s = CASE WHEN %s THEN EXCLUDED.%s '
+                'ELSE CAST(CAST(%s.%s AS BIGINT) + %%s AS TEXT) END, '
+                '%s = CASE WHEN %s THEN EXCLUDED.%s ELSE %s.%s END '
+                'WHERE %s OR %s.%s NOT LIKE %%s RETURNING %s' % (
+                    table, quote_name('cache_key'), value, expires, quote_name('cache_key'),
+                    value, stale, value, table, value,
+                    expires, stale, expires, table, expires,
+                    stale, table, value, value),
+                [made, str(delta), self._expires(connection, timeout),
+                 now, delta, now, now, _PICKLED])
+            row = cursor.fetchone()
+        if row is not None:
+            return int(row[0])
+        # A live counter written by ``set``, pickled: add to it under the lock (which stores it
+        # as text from then on).
+        return _count(self, key, timeout=timeout, delta=delta, version=version)
+
+
+class SQLiteCache(BaseCache):
+    """A shared cache in one SQLite file (``LOCATION`` is its path). Safe across processes and
+    threads; each thread keeps its own connection."""
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            db = sqlite3.connect(self._path, timeout=10, isolation_level=None,
+                                 check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute('CREATE TABLE IF NOT EXISTS cache '
+                       '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)')
+            self._local.db = db
+        return db
+
+    def _write(self, fn):
+        """Run ``fn(db)`` in a write transaction taken up front, so a read-then-write is atomic."""
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(db)
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+        return result
+
+    @staticmethod
+    def _alive(expires):
+        return expires is None or expires > time.time()
+
+    def _put(self, db, key, value, timeout):
+        db.execute('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                   (key, pickle.dumps(value, self.pickle_protocol),
+                    self.get_backend_timeout(timeout)))
+        if self._max_entries:
+            (n,) = db.execute('SELECT COUNT(*) FROM cache').fetchone()
+            if n > self._max_entries:
+                db.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?',
+                           (time.time(),))
+                db.execute('DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                           'ORDER BY expires IS NULL, expires LIMIT ?)',
+                           (max(n // self._cull_frequency, 1),))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db().execute('SELECT value, expires FROM cache WHERE key = ?',
+                                 (key,)).fetchone()
+        if row is None or not self._alive(row[1]):
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write(lambda db: self._put(db, key, value, timeout))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def add(db):
+            row = db.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._alive(row[0]):
+                return False
+            self._put(db, key, value, timeout)
+            return True
+        return self._write(add)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+
+        def incr(db):
+            row = db.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None or not self._alive(row[1]):
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            db.execute('UPDATE cache SET value = ? WHERE key = ?',
+                       (pickle.dumps(value, self.pickle_protocol), key))
+            return value
+        return self._write(incr)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+
+        def touch(db):
+            row = db.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None or not self._alive(row[0]):
+                return False
+            db.execute('UPDATE cache SET expires = ? WHERE key = ?', (expires, key))
+            return True
+        return self._write(touch)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._write(
+            lambda db: db.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount))
+
+    def clear(self):
+        self._write(lambda db: db.execute('DELETE FROM cache'))
+
+    def close(self, **kwargs):
+        # A connection per thread, kept for the process: SQLite opens are cheap but not free,
+        # and Django calls close() at the end of every request.
+        pass
+
+
+class TieredCache(BaseCache):
+    """A per-process LRU for read-mostly keys in front of the ``SHARED`` cache alias.
+
+    OPTIONS: ``SHARED`` (the alias, default ``'shared'``), ``LOCAL_KEY_PREFIXES`` (keys the
+    front may hold), ``LOCAL_MAX_ENTRIES``, ``LOCAL_TIMEOUT`` (seconds a local copy is trusted).
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get('OPTIONS') or {})
+        self._shared_alias = options.pop('SHARED', 'shared')
+        self._prefixes = tuple(options.pop('LOCAL_KEY_PREFIXES', ()))
+        self._local_max = int(options.pop('LOCAL_MAX_ENTRIES', _LOCAL_MAX_ENTRIES))
+        self._local_timeout = float(options.pop('LOCAL_TIMEOUT', _LOCAL_TIMEOUT))
+        super().__init__({**params, 'OPTIONS': options})
+        self._front = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {'local_hits': 0, 'local_misses': 0}
+
+    @property
+    def shared(self):
+        from django.core.cache import caches
+        return caches[self._shared_alias]
+
+    def _local(self, key):
+        return bool(self._prefixes) and str(key).startswith(self._prefixes)
+
+    def _front_get(self, key, version):
+        with self._lock:
+            hit = self._front.get((key, version))
+            if hit is not None and hit[1] > time.monotonic():
+                self._front.move_to_end((key, version))
+                self.counts['local_hits'] += 1
+                return True, hit[0]
+            if hit is not None:
+                del self._front[(key, version)]
+            self.counts['local_misses'] += 1
+            return False, None
+
+    def _front_put(self, key, version, value, timeout):
+        ttl = self._local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, float(timeout))
+        if ttl <= 0:
+            return self._front_drop(key, version)
+        with self._lock:
+            self._front[(key, version)] = (value, time.monotonic() + ttl)
+            self._front.move_to_end((key, version))
+            while len(self._front) > self._local_max:
+                self._front.popitem(last=False)
+
+    def _front_drop(self, key, version):
+        with self._lock:
+            self._front.pop((key, version), None)
+
+    def get(self, key, default=None, version=None):
+        if not self._local(key):
+            return self.shared.get(key, default, version=version)
+        found, value = self._front_get(key, version)
+        if found:
+            return value
+        sentinel = object()
+        value = self.shared.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._front_put(key, version, value, DEFAULT_TIMEOUT)
+        return value
+
+    def get_many(self, keys, version=None):
+        # Front hits first; everything else in one read of the shared store.
+        found, missing = {}, []
+        for key in keys:
+            hit, value = self._front_get(key, version) if self._local(key) else (False, None)
+            if hit:
+                found[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            for key, value in fetched.items():
+                if self._local(key):
+                    self._front_put(key, version, value, DEFAULT_TIMEOUT)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        if self._local(key):
+            self._front_put(key, version, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if self._local(key):
+            self._front_drop(key, version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        if self._local(key):
+            self._front_drop(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def count(self, key, *, timeout, delta=1, version=None):
+        # Counters are never local: count on the shared store, in one step if it has one.
+        shared = self.shared
+        if hasattr(shared, 'count'):
+            return shared.count(key, timeout=timeout, delta=delta, version=version)
+        return _count(shared, key, timeout=timeout, delta=delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        if self._local(key):
+            self._front_drop(key, version)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.shared.has_key(key, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._front.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'local_entries': len(self._front), **self.counts}
+
+
+def count(key, *, timeout, delta=1, cache=None):
+    """Add ``delta`` to the counter ``key`` and return the new total — creating it, expiring in
+    ``timeout`` seconds, when it does not exist. One atomic step on the store: concurrent callers
+    each see a distinct total. The window starts at the first count and is not extended by the
+    later ones (a fixed window).
+
+    A backend with its own ``count`` (the database cache's upsert) does it in one statement;
+    any other store is incremented first, and only a missing counter is added."""
+    if cache is None:
+        from django.core.cache import cache
+    own = getattr(cache, 'count', None)
+    if own is not None:
+        return own(key, timeout=timeout, delta=delta)
+    return _count(cache, key, timeout=timeout, delta=delta)
+
+
+def _count(cache, key, *, timeout, delta=1, version=None):
+    for _ in range(3):
+        try:
+            return cache.incr(key, delta, version=version)
+        except ValueError:
+            pass                # no live counter — start a window
+        if cache.add(key, delta, timeout, version=version):
+            return delta
+    return cache.incr(key, delta, version=version)   # lost the add race three times: it exists
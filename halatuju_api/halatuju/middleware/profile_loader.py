@@ -0,0 +1,177 @@
+"""
+The caller's StudentProfile, loaded at most once per request — and the NRIC gate's verdict,
+remembered for a short while per process.
+
+An authenticated student request read the same profile row two or three times: once in
+``NricGateMiddleware`` (``only('nric')``), then again in the view
+(``StudentProfile.objects.get(supabase_user_id=request.user_id)``), and sometimes once more in
+a helper the view called. So:
+
+- **One loader per request.** ``SupabaseAuthMiddleware`` attaches a ``ProfileLoader`` for the
+  authenticated user; nothing is queried until something asks. The NRIC gate and the views
+  then ask through the same three helpers, shaped like the ORM calls they replace:
+  ``get_profile(request)`` (raises ``StudentProfile.DoesNotExist``), ``find_profile(request)``
+  (None when missing) and ``get_or_create_profile(request)`` → ``(profile, created)``. The
+  first loads the full row; every later call gets the same instance, so a view that saves it
+  and a helper that reads it agree. A request that never reached the middleware (a view
+  called straight from ``APIRequestFactory`` in a test) gets a loader made on first use.
+- **The gate's "has an NRIC" is remembered** per process for ``NRIC_GATE_CACHE_SECONDS``
+  (default 60; 0 = ask every time), keyed on the user id alone — a profile version in the key
+  would cost the read it saves. So a write that changes whose NRIC is whose must drop the
+  pass: a save or delete of the profile in this process does so through the model signals,
+  and a write that sends none (the NRIC claim moves a profile to another account in raw SQL)
+  calls ``forget_nric_gate_passes`` for every user id it touched. A pass read while any
+  profile was being written is not kept. Only the PASS is remembered: a student without an NRIC is about to claim one, and
+  must not be turned away for a minute after they do. The cost is that an NRIC cleared on
+  another instance still passes here for up to the TTL — the views behind the gate still
+  load the profile themselves.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+# Defaults when the settings are absent.
+_NRIC_GATE_CACHE_SECONDS = 60
+_NRIC_GATE_CACHE_MAX_ENTRIES = 10000
+
+_MISSING = object()
+
+
+class ProfileLoader:
+    """Loads ``user_id``'s StudentProfile on first use and keeps it for the request."""
+    __slots__ = ('user_id', '_profile')
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._profile = _MISSING
+
+    def find(self):
+        if self._profile is _MISSING:
+            from apps.courses.models import StudentProfile
+            self._profile = StudentProfile.objects.filter(supabase_user_id=self.user_id).first()
+        return self._profile
+
+    def get_or_create(self):
+        profile = self.find()
+        if profile is not None:
+            return profile, False
+        from apps.courses.models import StudentProfile
+        profile, created = StudentProfile.objects.get_or_create(supabase_user_id=self.user_id)
+        self._profile = profile
+        return profile, created
+
+
+def attach(request, user_id):
+    """Give ``request`` a (lazy) loader for ``user_id``'s profile."""
+    request.profile_loader = ProfileLoader(user_id) if user_id else None
+
+
+def _loader(request):
+    base = getattr(request, '_request', request)      # DRF's Request wraps the HttpRequest
+    user_id = getattr(request, 'user_id', None)
+    loader = getattr(base, 'profile_loader', None)
+    if loader is None or loader.user_id != user_id:
+        loader = ProfileLoader(user_id)
+        base.profile_loader = loader
+    return loader
+
+
+def find_profile(request):
+    """The caller's StudentProfile, or None."""
+    return _loader(request).find()
+
+
+def get_profile(request):
+    """The caller's StudentProfile; raises ``StudentProfile.DoesNotExist`` like ``.get``."""
+    profile = find_profile(request)
+    if profile is None:
+        from apps.courses.models import StudentProfile
+        raise StudentProfile.DoesNotExist('StudentProfile matching query does not exist.')
+    return profile
+
+
+def get_or_create_profile(request):
+    """``(profile, created)`` for the caller, like ``.get_or_create``."""
+    return _loader(request).get_or_create()
+
+
+class _GatePasses:
+    """user id → deadline for users the NRIC gate let through. ``generation`` moves on every
+    profile save or delete in this process, so a pass read before a save is never stored."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def passed(self, user_id):
+        with self._lock:
+            deadline = self._entries.get(user_id)
+            if deadline is None:
+                return False
+            if deadline <= time.monotonic():
+                del self._entries[user_id]
+                return False
+            self._entries.move_to_end(user_id)
+            return True
+
+    def remember(self, user_id, generation):
+        ttl = float(getattr(settings, 'NRIC_GATE_CACHE_SECONDS', _NRIC_GATE_CACHE_SECONDS) or 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return                  # a profile changed while the gate was reading this one
+            self._entries[user_id] = time.monotonic() + ttl
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > _NRIC_GATE_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_gate_passes = _GatePasses()
+
+
+def nric_gate_passes(request):
+    """True when the caller has a profile with an NRIC. Remembered per process for a short
+    while once true (see the module docstring)."""
+    user_id = getattr(request, 'user_id', None)
+    if _gate_passes.passed(user_id):
+        return True
+    generation = _gate_passes.generation
+    profile = find_profile(request)
+    if profile is None or not profile.nric:
+        return False
+    _gate_passes.remember(user_id, generation)
+    return True
+
+
+def forget_nric_gate_passes(*user_ids):
+    """Drop the remembered passes of ``user_ids`` — for a profile write that sends no signals."""
+    for user_id in user_ids:
+        _gate_passes.forget(user_id)
+
+
+def clear_nric_gate_cache():
+    _gate_passes.clear()
+
+
+def _profile_changed(sender, instance, **kwargs):
+    _gate_passes.forget(instance.supabase_user_id)
+
+
+post_save.connect(_profile_changed, sender='courses.StudentProfile',
+                  dispatch_uid='profile_loader.nric_gate.save')
+post_delete.connect(_profile_changed, sender='courses.StudentProfile',
+                    dispatch_uid='profile_loader.nric_gate.delete')
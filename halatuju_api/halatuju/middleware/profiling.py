@@ -0,0 +1,156 @@
+"""Per-request SQL count, duplicate-query fingerprints, DB time and Python time for the admin API.
+
+The admin serializers hide queries in their method fields — ``is_assignable``,
+``is_ready_for_assignment``, ``held_qualification``, the merit score, ``paid_to_date``, the
+reviewer-correction count — so a list page that looks like one query per table can run several
+per ROW, and nothing showed it short of reading SQL logs by hand. This middleware measures it.
+
+A profiled request logs one line on ``halatuju.middleware.profiling``::
+
+    profile GET /api/v1/admin/scholarship/applications/ status=200 queries=214 dup=6
+        db_ms=183.2 py_ms=412.7 total_ms=595.9 top=3f9a1c20e4x50,9b02d7c1aax50
+
+``dup`` is the number of distinct statements that ran more than once; ``top`` lists the worst
+of them as ``<fingerprint>x<times>``. A fingerprint is the SQL with its parameters left as
+placeholders and ``IN (%s, %s, …)`` lists folded, so "the same lookup once per row" collapses to
+one fingerprint with a large count — the shape of an N+1. The same numbers ride on the record as
+``extra={'profile': {...}}`` for a structured log handler. The line is INFO, or WARNING once the
+request passes ``QUERY_PROFILE_WARN_QUERIES`` queries.
+
+Which requests are profiled (admin API paths only — ``/api/v1/admin/``):
+
+- every one, when ``QUERY_PROFILE_ENABLED`` is on (staging, or a production window); or
+- one at a time, when a SUPER admin sends ``X-Profile-Queries: 1``. Their response also carries
+  ``X-Query-Count`` and a ``Server-Timing`` header (``db`` / ``app`` durations), which the
+  browser's network panel shows next to the request. The header from anyone else is ignored —
+  it costs them nothing and tells them nothing.
+
+Off (the default), the middleware is one path check per request. ``QueryProfile`` is the
+measuring block on its own; ``apps/scholarship/tests/query_budgets.py`` uses it to hold each
+admin endpoint to a query budget in CI.
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+ADMIN_PREFIX = '/api/v1/admin/'
+HEADER = 'X-Profile-Queries'
+
+# How many of the most-repeated fingerprints the log line names.
+_TOP = 3
+
+_IN_LIST = re.compile(r'IN \((?:%s(?:, )?)+\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """A short stable id for a statement's SHAPE: parameters are already placeholders, and an
+    ``IN`` list of any length folds to one, so per-row repeats of a lookup share a fingerprint."""
+    shape = _SPACES.sub(' ', _IN_LIST.sub('IN (…)', sql or '')).strip()
+    return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:12]
+
+
+class QueryProfile:
+    """Count and time every statement run on any database connection inside the block.
+
+    ``with QueryProfile() as prof: ...`` then ``prof.count``, ``prof.db_ms``,
+    ``prof.duplicates()``. Uses ``connection.execute_wrapper``, so it sees the real statements
+    (tests, the ORM, raw cursors) without ``DEBUG`` and without keeping query text for anything
+    but the first sample of each fingerprint."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_ms = 0.0
+        self._seen = Counter()
+        self._samples = {}
+        self._stack = None
+
+    def _wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.count += 1
+            fp = fingerprint(sql)
+            self._seen[fp] += 1
+            self._samples.setdefault(fp, sql)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self._wrapper))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+        return False
+
+    def duplicates(self):
+        """``[(fingerprint, times, sample_sql)]`` for every statement run more than once, most
+        repeated first."""
+        return [(fp, n, self._samples[fp]) for fp, n in self._seen.most_common() if n > 1]
+
+
+def _is_super(request):
+    """Whether the caller is an active super admin (the header path only — one indexed lookup,
+    made BEFORE profiling starts so it is not counted against the request)."""
+    user_id = getattr(request, 'user_id', None)
+    if not user_id:
+        return False
+    from apps.courses.models import PartnerAdmin
+    admin = PartnerAdmin.objects.filter(supabase_user_id=user_id, is_active=True).only(
+        'role', 'is_super_admin').first()
+    return bool(admin and admin.is_super)
+
+
+class QueryProfileMiddleware:
+    """Profile admin API requests (see the module docstring). Sits after the auth middleware so
+    ``request.user_id`` is set when the header is checked."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(ADMIN_PREFIX):
+            return self.get_response(request)
+        on_demand = request.headers.get(HEADER) == '1' and _is_super(request)
+        if not (on_demand or getattr(settings, 'QUERY_PROFILE_ENABLED', False)):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with QueryProfile() as prof:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        py_ms = max(total_ms - prof.db_ms, 0.0)
+        dups = prof.duplicates()
+
+        record = {
+            'method': request.method, 'path': request.path,
+            'status': getattr(response, 'status_code', None),
+            'queries': prof.count, 'duplicates': len(dups),
+            'db_ms': round(prof.db_ms, 1), 'py_ms': round(py_ms, 1),
+            'total_ms': round(total_ms, 1),
+            'top': [{'fingerprint': fp, 'times': n, 'sql': sql[:300]} for fp, n, sql in dups[:_TOP]],
+        }
+        level = (logging.WARNING
+                 if prof.count >= getattr(settings, 'QUERY_PROFILE_WARN_QUERIES', 100)
+                 else logging.INFO)
+        logger.log(level, 'profile %s %s status=%s queries=%d dup=%d db_ms=%.1f py_ms=%.1f '
+                   'total_ms=%.1f top=%s', request.method, request.path, record['status'],
+                   prof.count, len(dups), prof.db_ms, py_ms, total_ms,
+                   ','.join(f'{fp}x{n}' for fp, n, _ in dups[:_TOP]) or '-',
+                   extra={'profile': record})
+
+        if on_demand:
+            response['X-Query-Count'] = str(prof.count)
+            response['Server-Timing'] = f'db;dur={prof.db_ms:.1f}, app;dur={py_ms:.1f}'
+        return response
@@ -3,8 +3,29 @@ Supabase JWT Authentication Middleware.
 
 Verifies JWT tokens issued by Supabase Auth and attaches user info to request.
 Supports both HS256 (legacy JWT secret) and ES256 (JWKS-based signing keys).
+
+Verification is cached. The frontend fires a burst of API calls with the same token every
+few seconds, and each one re-verified the signature — for ES256 an elliptic-curve check, and
+on the first request after the JWKS cache lapsed, an HTTP fetch in the request path. So:
+
+- **Verified tokens** are kept in a bounded per-process LRU (``SUPABASE_JWT_CACHE_MAX_ENTRIES``,
+  default 10000) of token digest → claims, for ``SUPABASE_JWT_CACHE_TTL`` seconds (default
+  300; 0 turns it off) and never past the token's own ``exp``. A token without ``exp`` is not
+  cached — there is no telling when it dies. The digest is an HMAC keyed on the JWT secret, so
+  a rotated secret misses. Failures are not cached (they are logged every time, as before).
+- **JWKS keys** are fetched when the middleware loads and refreshed every
+  ``SUPABASE_JWKS_REFRESH_SECONDS`` (default 600; 0 = only on demand, as before) by a daemon
+  thread, so no request waits on the fetch. A failed refresh keeps the keys it had.
+- **Counters.** ``token_cache_stats()`` — hits, misses, hit rate, verifications and their
+  total / average / max ms, for this process. The refresher logs them at INFO each round.
 """
+import hashlib
+import hmac
 import logging
+import threading
+import time
+from collections import OrderedDict
+
 import jwt
 from jwt import PyJWKClient
 from django.conf import settings
@@ -13,10 +34,23 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import NotAuthenticated
 from rest_framework.permissions import BasePermission
 
+from . import profile_loader
+
 logger = logging.getLogger(__name__)
 
 # JWKS client (caches keys automatically)
 _jwks_client = None
+_jwks_refresher = None
+_jwks_lock = threading.Lock()
+
+# Defaults when the settings are absent.
+_TOKEN_CACHE_TTL = 300
+_TOKEN_CACHE_MAX_ENTRIES = 10000
+_JWKS_REFRESH_SECONDS = 600
+
+
+def _jwks_refresh_seconds():
+    return int(getattr(settings, 'SUPABASE_JWKS_REFRESH_SECONDS', _JWKS_REFRESH_SECONDS) or 0)
 
 
 def _get_jwks_client():
@@ -25,10 +59,110 @@ def _get_jwks_client():
     if _jwks_client is None:
         supabase_url = getattr(settings, 'SUPABASE_URL', '')
         if supabase_url:
-            _jwks_client = PyJWKClient(f"{supabase_url}/auth/v1/.well-known/jwks.json")
+            # With the refresher on, the key set must outlive its refresh interval, or a
+            # request would find it expired and fetch it itself.
+            lifespan = max(300, 2 * _jwks_refresh_seconds())
+            _jwks_client = PyJWKClient(f"{supabase_url}/auth/v1/.well-known/jwks.json",
+                                       lifespan=lifespan)
     return _jwks_client
 
 
+def _refresh_jwks(client, interval):
+    while True:
+        try:
+            client.get_jwk_set(refresh=True)
+        except Exception as e:  # noqa: BLE001 — the cached keys stay; try again next round
+            logger.warning("JWKS refresh failed: %s", e)
+        st = token_cache_stats()
+        logger.info('jwt cache entries=%d hits=%d misses=%d hit_rate=%.2f verify_ms_avg=%.1f',
+                    st['entries'], st['hits'], st['misses'], st['hit_rate'], st['verify_ms_avg'])
+        time.sleep(interval)
+
+
+def start_jwks_refresh():
+    """Fetch the JWKS now and keep it fresh in the background. Once per process; a no-op when
+    SUPABASE_URL or SUPABASE_JWKS_REFRESH_SECONDS is unset."""
+    global _jwks_refresher
+    interval = _jwks_refresh_seconds()
+    with _jwks_lock:
+        if _jwks_refresher is not None or interval <= 0:
+            return
+        client = _get_jwks_client()
+        if client is None:
+            return
+        _jwks_refresher = threading.Thread(target=_refresh_jwks, args=(client, interval),
+                                           name='jwks-refresh', daemon=True)
+        _jwks_refresher.start()
+
+
+class VerifiedTokenCache:
+    """Thread-safe LRU of token digest → (claims, wall-clock deadline), with counters."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'verified': 0, 'verify_ms_total': 0.0,
+                       'verify_ms_max': 0.0}
+
+    def get(self, digest):
+        with self._lock:
+            hit = self._entries.get(digest)
+            if hit is not None and hit[1] > time.time():
+                self._entries.move_to_end(digest)
+                self.counts['hits'] += 1
+                return hit[0]
+            if hit is not None:
+                del self._entries[digest]
+            self.counts['misses'] += 1
+            return None
+
+    def put(self, digest, claims, *, ttl, max_entries):
+        exp = claims.get('exp')
+        if ttl <= 0 or max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        deadline = min(time.time() + ttl, exp)
+        if deadline <= time.time():
+            return
+        with self._lock:
+            self._entries[digest] = (claims, deadline)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def observe(self, ms):
+        with self._lock:
+            self.counts['verified'] += 1
+            self.counts['verify_ms_total'] += ms
+            self.counts['verify_ms_max'] = max(self.counts['verify_ms_max'], ms)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for name in self.counts:
+                self.counts[name] = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            c = dict(self.counts)
+            entries = len(self._entries)
+        looked = c['hits'] + c['misses']
+        return {'entries': entries, **c,
+                'hit_rate': c['hits'] / looked if looked else 0.0,
+                'verify_ms_avg': c['verify_ms_total'] / c['verified'] if c['verified'] else 0.0}
+
+
+_verified = VerifiedTokenCache()
+
+
+def token_cache_stats() -> dict:
+    """The verified-token cache's counters for this process."""
+    return _verified.stats()
+
+
+def clear_token_cache():
+    _verified.clear()
+
+
 class SupabaseAuthMiddleware:
     """
     Middleware to verify Supabase JWT tokens.
@@ -42,6 +176,57 @@ class SupabaseAuthMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
         self.jwt_secret = settings.SUPABASE_JWT_SECRET
+        self._digest_key = (self.jwt_secret or '').encode()
+        start_jwks_refresh()
+
+    def _verify(self, token):
+        """The token's claims, verified — or None when it can't be (JWKS unconfigured).
+        Raises jwt's errors for an expired or invalid token."""
+        # Check which algorithm the token uses
+        header = jwt.get_unverified_header(token)
+        alg = header.get('alg', 'HS256')
+
+        if alg == 'HS256':
+            # Legacy: verify with JWT secret
+            return jwt.decode(
+                token,
+                self.jwt_secret,
+                algorithms=['HS256'],
+                audience='authenticated',
+            )
+        # ES256/RS256: verify with JWKS public key
+        jwks_client = _get_jwks_client()
+        if not jwks_client:
+            logger.warning("JWKS client not configured (SUPABASE_URL missing)")
+            return None
+        signing_key = jwks_client.get_signing_key_from_jwt(token)
+        # Pin a fixed asymmetric allowlist rather than echoing the token's own
+        # alg header (TD audit 2026-06-14 — avoids any alg-confusion foot-gun).
+        return jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=['ES256', 'RS256'],
+            audience='authenticated',
+        )
+
+    def _claims(self, token):
+        """``_verify`` through the verified-token cache."""
+        digest = hmac.new(self._digest_key, token.encode(), hashlib.sha256).digest()
+        payload = _verified.get(digest)
+        if payload is not None:
+            return payload
+        start = time.perf_counter()
+        try:
+            payload = self._verify(token)
+        finally:
+            _verified.observe((time.perf_counter() - start) * 1000.0)
+        if payload:
+            _verified.put(
+                digest, payload,
+                ttl=int(getattr(settings, 'SUPABASE_JWT_CACHE_TTL', _TOKEN_CACHE_TTL) or 0),
+                max_entries=int(getattr(settings, 'SUPABASE_JWT_CACHE_MAX_ENTRIES',
+                                        _TOKEN_CACHE_MAX_ENTRIES) or 0))
+        return payload
 
     def __call__(self, request):
         # Initialize as anonymous
@@ -54,34 +239,7 @@ class SupabaseAuthMiddleware:
             token = auth_header[7:]  # Remove 'Bearer ' prefix
 
             try:
-                # Check which algorithm the token uses
-                header = jwt.get_unverified_header(token)
-                alg = header.get('alg', 'HS256')
-
-                if alg == 'HS256':
-                    # Legacy: verify with JWT secret
-                    payload = jwt.decode(
-                        token,
-                        self.jwt_secret,
-                        algorithms=['HS256'],
-                        audience='authenticated',
-                    )
-                else:
-                    # ES256/RS256: verify with JWKS public key
-                    jwks_client = _get_jwks_client()
-                    if not jwks_client:
-                        logger.warning("JWKS client not configured (SUPABASE_URL missing)")
-                        payload = None
-                    else:
-                        signing_key = jwks_client.get_signing_key_from_jwt(token)
-                        # Pin a fixed asymmetric allowlist rather than echoing the token's own
-                        # alg header (TD audit 2026-06-14 — avoids any alg-confusion foot-gun).
-                        payload = jwt.decode(
-                            token,
-                            signing_key.key,
-                            algorithms=['ES256', 'RS256'],
-                            audience='authenticated',
-                        )
+                payload = self._claims(token)
 
                 if payload:
                     # Attach user info to request. email_verified gates admin email-backfill
@@ -107,6 +265,9 @@ class SupabaseAuthMiddleware:
                 logger.warning(f"Invalid JWT token: {e}")
                 # Don't block - let the view decide how to handle
 
+        # The caller's profile, loaded once — by the NRIC gate or the view, whichever asks first.
+        profile_loader.attach(request, request.user_id)
+
         response = self.get_response(request)
         return response
 
@@ -206,18 +367,9 @@ class NricGateMiddleware:
             if path.startswith(allowed):
                 return self.get_response(request)
 
-        # Check if user has NRIC
-        from apps.courses.models import StudentProfile
-        try:
-            profile = StudentProfile.objects.only('nric').get(
-                supabase_user_id=user_id
-            )
-            if not profile.nric:
-                return JsonResponse(
-                    {'error': 'NRIC verification required', 'code': 'nric_required'},
-                    status=403
-                )
-        except StudentProfile.DoesNotExist:
+        # Check if user has NRIC (the profile it loads is the one the view gets — see
+        # profile_loader.py; a recent pass is remembered per process)
+        if not profile_loader.nric_gate_passes(request):
             return JsonResponse(
                 {'error': 'NRIC verification required', 'code': 'nric_required'},
                 status=403
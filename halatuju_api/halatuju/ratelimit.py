@@ -0,0 +1,169 @@
+"""
+One rate-limit engine for every limit HalaTuju enforces: the DRF throttles, the report and
+phone-verify caps and the help coach's Gemini cap.
+
+Each of those kept its own count in the cache, and none of them counted atomically. The DRF
+throttles (``SimpleRateThrottle``) store the whole timestamp history per client and rewrite it
+on every request — a get and a set of a list that grows with the limit. The report, phone-verify
+and coach caps did ``cache.get`` then ``cache.set(n + 1)``. Two instances serving the same user
+at once both read 2 and both wrote 3, so a burst — exactly what a limit is for — got through.
+
+``hit(scope, ident, limit=…, period=…)`` is the replacement. It is a sliding-window counter:
+
+- **Two integers per client**, whatever the limit: the count in the current fixed window
+  (``period`` seconds, aligned to the epoch) and the one before it. The rate is estimated as
+  ``previous × (share of the previous window still inside the sliding one) + current`` — the
+  usual approximation, exact when traffic is even, and never more than one window's worth off.
+- **Atomic.** The current window is counted with ``halatuju.cache.count`` (add-or-increment,
+  atomic on every configured store — see halatuju/cache.py), so concurrent requests each see a
+  distinct count and at most ``limit`` of them get through.
+- **A rejected request does not count.** Both windows are read first (one ``get_many``), and a
+  request they already put over the limit is refused without a write — as the old code never
+  counted a refused request, and so a flood of refusals costs a read each, not a count and a
+  refund. Only a request with room counts, and checks the new total: when concurrent requests
+  took the last slots first, it hands its increment back. For limits that only count SUCCESS (a
+  report that generated, a code that was sent), the caller hands the slot back too:
+  ``decision.refund()``.
+- **Metrics per scope.** Allowed and rejected counts for this process (``stats()``), and a daily
+  rejection count in the shared cache (``rejections()``) so the ops readout sees every
+  instance — one more ``count`` per refusal, a single statement on the database cache. A super
+  admin reads both at ``admin/scholarship/ops/rate-limits/``.
+
+Best-effort like the code it replaces: a cache that is down allows the request (and logs) —
+a limit must never take the site down with it.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Days of shared rejection counts kept for the ops readout.
+_REJECTION_DAYS = 8
+
+# The scopes of the endpoint caps (the DRF throttles' scopes are their
+# DEFAULT_THROTTLE_RATES keys). The shared counts can't be listed, so the readout asks by name.
+CAP_SCOPES = ('report', 'phone_verify', 'guarantor_phone_verify', 'help_coach')
+
+_lock = threading.Lock()
+_counts = {}            # scope → {'allowed': n, 'rejected': n}, this process since start
+
+
+class Decision:
+    """The outcome of one ``hit``: ``allowed``, the estimated ``count`` in the sliding window
+    (this request included) and ``retry_after`` (seconds; 0 when allowed)."""
+    __slots__ = ('allowed', 'count', 'retry_after', '_cache', '_key')
+
+    def __init__(self, allowed, count, retry_after=0.0, cache=None, key=None):
+        self.allowed = allowed
+        self.count = count
+        self.retry_after = retry_after
+        self._cache = cache
+        self._key = key
+
+    def __bool__(self):
+        return self.allowed
+
+    def refund(self):
+        """Hand an allowed request's slot back (the work it guarded did not happen)."""
+        if not self.allowed or self._key is None:
+            return
+        self._key, key = None, self._key
+        _uncount(self._cache, key)
+
+
+def _uncount(cache, key):
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass                    # the window already expired — nothing left to hand back
+    except Exception:  # noqa: BLE001 — best-effort, like the limit itself
+        logger.warning('rate limit refund failed for %s', key, exc_info=True)
+
+
+def _note(scope, outcome, cache):
+    with _lock:
+        counts = _counts.setdefault(scope, {'allowed': 0, 'rejected': 0})
+        counts[outcome] += 1
+    if outcome == 'rejected':
+        from .cache import count
+        try:
+            count(f'rl:rejected:{scope}:{timezone.now():%Y%m%d}',
+                  timeout=_REJECTION_DAYS * 86400, cache=cache)
+        except Exception:  # noqa: BLE001 — a metric never fails the request
+            logger.warning('rate limit metric failed for %s', scope, exc_info=True)
+
+
+def _clock():
+    """Wall-clock seconds: windows are aligned across instances, so not ``monotonic``."""
+    return time.time()
+
+
+def hit(scope, ident, *, limit, period, cache=None):
+    """Count one request by ``ident`` against ``limit`` per ``period`` seconds in ``scope``.
+    Returns a ``Decision`` (truthy when allowed); a rejected request is not counted."""
+    from .cache import count
+    if cache is None:
+        from django.core.cache import cache
+    period = max(int(period), 1)
+    now = _clock()
+    window = int(now // period)
+    base = f'rl:{scope}:{ident}'
+    key, previous_key = f'{base}:{window}', f'{base}:{window - 1}'
+    elapsed = now - window * period
+    weight = 1.0 - elapsed / period
+    try:
+        found = cache.get_many([key, previous_key])
+        admitted, previous = found.get(key, 0), found.get(previous_key, 0)
+        if previous * weight + admitted + 1 <= limit:
+            # Room by the last count: take a slot, and check again in case others took it too.
+            admitted = count(key, timeout=2 * period, cache=cache) - 1   # lives on as "previous"
+            if previous * weight + admitted + 1 > limit:
+                _uncount(cache, key)
+    except Exception:  # noqa: BLE001 — a cache outage must not take the endpoint down
+        logger.warning('rate limit store unavailable for %s; allowing', scope, exc_info=True)
+        return Decision(True, 0)
+    estimate = previous * weight + admitted + 1
+    if estimate <= limit:
+        _note(scope, 'allowed', cache)
+        return Decision(True, estimate, cache=cache, key=key)
+    _note(scope, 'rejected', cache)
+    if admitted + 1 > limit or previous <= 0:
+        # The current window alone is full: wait for it to end.
+        retry_after = period - elapsed
+    else:
+        # Wait until the previous window's weight falls far enough to admit one more.
+        needed = (limit - admitted - 1) / previous
+        retry_after = max((1.0 - needed) * period - elapsed, 0.0)
+    return Decision(False, estimate - 1, retry_after=retry_after)
+
+
+def stats() -> dict:
+    """``{scope: {'allowed': n, 'rejected': n}}`` for this process since it started."""
+    with _lock:
+        return {scope: dict(counts) for scope, counts in _counts.items()}
+
+
+def rejections(scopes, *, days=1, cache=None) -> dict:
+    """``{scope: n}`` — requests rejected in ``scopes`` over the last ``days`` (UTC days, today
+    included), across every instance."""
+    if cache is None:
+        from django.core.cache import cache
+    today = timezone.now()
+    dates = [f'{today - timedelta(days=d):%Y%m%d}'
+             for d in range(max(min(days, _REJECTION_DAYS), 1))]
+    keys = {f'rl:rejected:{scope}:{date}': scope for scope in scopes for date in dates}
+    found = cache.get_many(list(keys))
+    out = {scope: 0 for scope in scopes}
+    for key, n in found.items():
+        out[keys[key]] += n
+    return out
+
+
+def reset():
+    """Forget this process's counts (the shared rejection counts stay)."""
+    with _lock:
+        _counts.clear()
@@ -42,6 +42,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'halatuju.middleware.supabase_auth.SupabaseAuthMiddleware',
     'halatuju.middleware.supabase_auth.NricGateMiddleware',
+    'halatuju.middleware.profiling.QueryProfileMiddleware',
 ]
 
 ROOT_URLCONF = 'halatuju.urls'
@@ -112,10 +113,65 @@ REST_FRAMEWORK = {
     },
 }
 
+# Caches (halatuju/cache.py). `default` is a TieredCache: a per-process LRU for read-mostly keys
+# (LOCAL_KEY_PREFIXES) in front of the `shared` alias, which holds everything else — rate-limit
+# counters and throttle histories above all, so every instance counts in one place.
+# CACHE_SHARED picks the shared store:
+#   locmem   — per process; dev/test default (counts are per worker, as they always were here)
+#   sqlite   — one SQLite file (WAL) shared by every local process: the multi-process stand-in
+#   database — the `django_cache` table, with an atomic incr; production's default
+#   redis    — Django's RedisCache at REDIS_URL (needs the `redis` package)
+# CACHE_TIERED=0 drops the local front (`default` is then the shared store itself).
+CACHE_SHARED = os.environ.get('CACHE_SHARED', 'locmem')
+CACHE_TIERED = os.environ.get('CACHE_TIERED', '1') != '0'
+CACHE_LOCAL_TIMEOUT = int(os.environ.get('CACHE_LOCAL_TIMEOUT', '60'))
+CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', '1000'))
+SHARED_CACHES = {
+    'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+               'LOCATION': 'halatuju-shared'},
+    'sqlite': {'BACKEND': 'halatuju.cache.SQLiteCache',
+               'LOCATION': os.environ.get('CACHE_SQLITE_PATH', str(BASE_DIR / 'cache.sqlite3'))},
+    'database': {'BACKEND': 'halatuju.cache.AtomicDatabaseCache', 'LOCATION': 'django_cache'},
+    'redis': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+              'LOCATION': os.environ.get('REDIS_URL', '')},
+}
+
+
+def build_caches(shared, tiered=True):
+    """The CACHES setting for a shared store from SHARED_CACHES, with or without the local front."""
+    store = dict(SHARED_CACHES[shared])
+    if not tiered:
+        return {'default': store, 'shared': store}
+    return {
+        'default': {
+            'BACKEND': 'halatuju.cache.TieredCache',
+            'OPTIONS': {
+                'SHARED': 'shared',
+                # The verdict case summary: written once per verdict, read on every case view.
+                'LOCAL_KEY_PREFIXES': ['vcs:'],
+                'LOCAL_TIMEOUT': CACHE_LOCAL_TIMEOUT,
+                'LOCAL_MAX_ENTRIES': CACHE_LOCAL_MAX_ENTRIES,
+            },
+        },
+        'shared': store,
+    }
+
+
+CACHES = build_caches(CACHE_SHARED, CACHE_TIERED)
+
 # Supabase Auth settings
 SUPABASE_URL = os.environ.get('SUPABASE_URL', '')
 SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET', '')
 SUPABASE_SERVICE_ROLE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY', '')
+# Verified-token cache in SupabaseAuthMiddleware: claims kept per process for up to the TTL
+# (never past the token's exp; 0 = verify every request), at most MAX_ENTRIES tokens. The JWKS
+# is fetched at startup and refreshed in the background every REFRESH_SECONDS (0 = on demand).
+SUPABASE_JWT_CACHE_TTL = int(os.environ.get('SUPABASE_JWT_CACHE_TTL', '300'))
+SUPABASE_JWT_CACHE_MAX_ENTRIES = int(os.environ.get('SUPABASE_JWT_CACHE_MAX_ENTRIES', '10000'))
+SUPABASE_JWKS_REFRESH_SECONDS = int(os.environ.get('SUPABASE_JWKS_REFRESH_SECONDS', '600'))
+# NricGateMiddleware remembers a user's PASS (profile has an NRIC) per process for this many
+# seconds; a profile save in the process forgets it at once (halatuju/middleware/profile_loader.py).
+NRIC_GATE_CACHE_SECONDS = int(os.environ.get('NRIC_GATE_CACHE_SECONDS', '60'))
 
 # AI APIs for reports
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
@@ -264,9 +320,13 @@ VIRCLE_GUIDE_FOLDER = os.environ.get('VIRCLE_GUIDE_FOLDER', '03 Vircle/05 Studen
 # exact-name match (not "any PDF") picks the right one. Also the name shown to the recipient.
 VIRCLE_GUIDE_FILENAME = os.environ.get(
     'VIRCLE_GUIDE_FILENAME', 'BrightPath Bursary eWallet by Vircle - Installation Guide.pdf')
-# Cache the fetched bytes this long (seconds) so a batch send doesn't re-download per email; an
-# owner edit in Drive reflects within this window. 0 disables caching (always fetch fresh).
+# Serve the fetched bytes this long (seconds) from the worker's memory (asset_cache.py) so a batch
+# send doesn't re-download per email; after that the copy is revalidated against the Drive file's
+# checksum and downloaded again only if the owner changed it. 0 disables caching (always fetch).
 VIRCLE_GUIDE_CACHE_SECONDS = int(os.environ.get('VIRCLE_GUIDE_CACHE_SECONDS', '600'))
+# The per-process asset cache's budget in bytes (asset_cache.py: email attachments and bundled
+# files). Least recently used goes first; an asset larger than the whole budget is not kept.
+ASSET_CACHE_MAX_BYTES = int(os.environ.get('ASSET_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
 # 48h Vircle activation request (cron 'vircle-activation-request'). Reads the relay sheet and emails
 # Vircle the accounts INSTALLED but NOT yet activated (eWallet ID present, the owner's manual
 # 'Activated On' column blank), with a CSV attached; Bcc's a reference mailbox and archives the CSV
@@ -463,6 +523,77 @@ DOC_STAGE_MAX_ATTEMPTS = int(os.environ.get('DOC_STAGE_MAX_ATTEMPTS', '3'))
 # with Gemini. Already self-gated to shaky reads only; set to '0' to disable entirely
 # if cost ever spikes. Default ON.
 IC_GEMINI_FALLBACK_ENABLED = os.environ.get('IC_GEMINI_FALLBACK_ENABLED', '1') != '0'
+# Bulk re-extraction (`reextract_documents`, incl. the argless cron job). WORKERS reads that many
+# docs at once; the two rates pace Vision / Gemini across ALL workers (one shared bucket per
+# service, so widening the pool can never outrun a quota). MAX_CALLS is the per-run ceiling on
+# billable calls — dispatch stops once spent and the next run resumes; 0 = no ceiling.
+REEXTRACT_WORKERS = int(os.environ.get('REEXTRACT_WORKERS', '1'))
+REEXTRACT_VISION_PER_MIN = int(os.environ.get('REEXTRACT_VISION_PER_MIN', '600'))
+REEXTRACT_GEMINI_PER_MIN = int(os.environ.get('REEXTRACT_GEMINI_PER_MIN', '60'))
+REEXTRACT_MAX_CALLS = int(os.environ.get('REEXTRACT_MAX_CALLS', '0'))
+# Docs per batched Cloud Vision request in that pass (`batch_annotate_images`; the service caps
+# a synchronous batch at 16). 1 = one request per doc, as before.
+REEXTRACT_VISION_BATCH = int(os.environ.get('REEXTRACT_VISION_BATCH', '16'))
+# Background jobs (apps/scholarship/jobs.py). With JOB_QUEUE_ENABLED=1 the cron endpoint only
+# ENQUEUES; `manage.py run_jobs` (a worker service, or `--once` on a schedule) leases and runs them.
+# Off by default — the image starts no worker, and a queued job nobody runs never runs — so cron
+# commands run inline as before until one is deployed. A worker pushes its lease forward every
+# HEARTBEAT_SECONDS; a job whose lease lapses for LEASE_SECONDS (dead worker) is re-queued, up to
+# MAX_ATTEMPTS leases.
+JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', '0') == '1'
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', '300'))
+JOB_HEARTBEAT_SECONDS = int(os.environ.get('JOB_HEARTBEAT_SECONDS', '30'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+# Shared Gemini broker (apps/scholarship/llm.py) — every Gemini seam's call goes through it. At most
+# MAX_CONCURRENCY calls in flight per process; SOURCE_CONCURRENCY caps one call-path tag within that
+# ("profile_draft=2,anon_blurb=2" — the usage_context source) so a batch can't starve uploads.
+# TOKENS_PER_MINUTE is a process-wide token budget (0 = off). A 429 is retried RETRY_ON_429 more
+# times on the same model, backing off BASE_S·2^n (jittered, capped at MAX_S) before the seam's
+# cascade moves on — from cron, the job worker and management commands. Inside an HTTP request a
+# person is waiting: REQUEST_RETRY_ON_429 (default 0) goes straight to the next model instead.
+# LLM_BACKEND=fake answers every call from the local stand-in (no network).
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_SOURCE_CONCURRENCY = {
+    k.strip(): int(v) for k, _, v in (
+        part.partition('=') for part in os.environ.get('GEMINI_SOURCE_CONCURRENCY', '').split(','))
+    if k.strip() and v.strip().isdigit()
+}
+GEMINI_TOKENS_PER_MINUTE = int(os.environ.get('GEMINI_TOKENS_PER_MINUTE', '0'))
+GEMINI_RETRY_ON_429 = int(os.environ.get('GEMINI_RETRY_ON_429', '3'))
+GEMINI_REQUEST_RETRY_ON_429 = int(os.environ.get('GEMINI_REQUEST_RETRY_ON_429', '0'))
+GEMINI_BACKOFF_BASE_S = float(os.environ.get('GEMINI_BACKOFF_BASE_S', '1.0'))
+GEMINI_BACKOFF_MAX_S = float(os.environ.get('GEMINI_BACKOFF_MAX_S', '30'))
+LLM_BACKEND = os.environ.get('LLM_BACKEND', '')
+# Mail dispatch (apps/scholarship/mail_dispatch.py): a cron sweep sends every email over one reused
+# SMTP session. WORKERS > 1 runs a sweep's per-recipient steps on that many threads, each with its
+# own session (mind the provider's concurrent-connection limit). 1 = one at a time, as before.
+EMAIL_DISPATCH_WORKERS = int(os.environ.get('EMAIL_DISPATCH_WORKERS', '1'))
+# Email outbox (apps/scholarship/outbox.py): the sponsor digest and the award email are queued with
+# their state change and delivered at once; a failed send is retried by `drain_outbox` (cron job
+# 'email-outbox') after BACKOFF_BASE_S·2^(n-1) seconds, capped at BACKOFF_MAX_S, and goes 'dead'
+# after MAX_ATTEMPTS. BATCH bounds one drain.
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+EMAIL_OUTBOX_BACKOFF_BASE_S = float(os.environ.get('EMAIL_OUTBOX_BACKOFF_BASE_S', '60'))
+EMAIL_OUTBOX_BACKOFF_MAX_S = float(os.environ.get('EMAIL_OUTBOX_BACKOFF_MAX_S', '3600'))
+EMAIL_OUTBOX_BATCH = int(os.environ.get('EMAIL_OUTBOX_BATCH', '200'))
+# Upload-pipeline timing (timing.py): a stage slower than this many ms logs a WARNING span line
+# (faster ones log at DEBUG). Every stage still feeds the super-admin p50/p95 readout.
+UPLOAD_SLOW_STAGE_MS = int(os.environ.get('UPLOAD_SLOW_STAGE_MS', '5000'))
+# Verdict / anomaly snapshots (snapshots.py): build_verdict + detect_anomalies are served from a
+# stored row while the application's inputs stamp is unchanged. ON by default; '0' computes both
+# live on every read (the pre-snapshot behaviour). `check_verdict_snapshots` audits the rows.
+VERDICT_SNAPSHOTS_ENABLED = os.environ.get('VERDICT_SNAPSHOTS_ENABLED', '1') == '1'
+# Admin API profiling (halatuju/middleware/profiling.py): SQL count, repeated-statement
+# fingerprints, DB time and Python time per request, one log line each. OFF by default; '1'
+# profiles every /api/v1/admin/ request. A super admin can profile one request at any time with
+# the `X-Profile-Queries: 1` header. A request past QUERY_PROFILE_WARN_QUERIES logs at WARNING.
+QUERY_PROFILE_ENABLED = os.environ.get('QUERY_PROFILE_ENABLED', '0') == '1'
+QUERY_PROFILE_WARN_QUERIES = int(os.environ.get('QUERY_PROFILE_WARN_QUERIES', '100'))
+# OCR pre-processing (imaging.prepare_for_ocr): every image is oriented, downscaled to a ≈200-DPI
+# long edge and re-encoded as a JPEG before Vision/Gemini read it, and the result is stored beside
+# the original as the document's OCR copy so later reads skip the work. ON by default; '0' sends
+# the original bytes exactly as before (stored copies are then ignored, not deleted).
+OCR_PREPROCESS_ENABLED = os.environ.get('OCR_PREPROCESS_ENABLED', '1') != '0'
 
 # Conditional Bursary Award Agreement (the binding bursary CONTRACT a student + their
 # parent/guardian surety sign in-session when they accept an award). OFF by default —
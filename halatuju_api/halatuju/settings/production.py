@@ -46,12 +46,13 @@ SECURE_HSTS_PRELOAD = False
 # reports/day cap were effectively decorative on Cloud Run autoscale. The database cache
 # is free-tier-friendly; the `django_cache` table is created migrate-first via the
 # Supabase MCP (deploys don't run manage.py). Dev/test keep LocMemCache (no table needed).
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'django_cache',
-    }
-}
+#
+# Tiered since 2026-10-19 (halatuju/cache.py): read-mostly keys are served from a per-process
+# front, counters go straight to the shared store, and `incr` is atomic there — DatabaseCache's
+# own incr was a get and a set, so concurrent instances could lose counts. CACHE_SHARED=redis
+# moves the shared store off Postgres once a Redis exists; CACHE_TIERED=0 is the way back.
+CACHE_SHARED = os.environ.get('CACHE_SHARED', 'database')
+CACHES = build_caches(CACHE_SHARED, CACHE_TIERED)
 
 # Database - Supabase PostgreSQL
 # Supports DATABASE_URL or individual DB_* env vars (avoids URL-encoding issues)
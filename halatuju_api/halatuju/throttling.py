@@ -13,9 +13,16 @@ Rates live in ``settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``.
 Limits are deliberately generous: the goal is to stop runaway scraping/abuse
 and protect the billable Vision-OCR upload path, NOT to police normal use
 (shared school/library NATs put many real students behind one IP).
+
+Counting is ``halatuju.ratelimit`` (an atomic sliding-window counter, two
+integers per client), not DRF's stored timestamp history: the rate string,
+the scope and the key are DRF's as before; only ``allow_request`` and
+``wait`` are ours.
 """
 from rest_framework.throttling import SimpleRateThrottle
 
+from halatuju import ratelimit
+
 
 def client_ip(request):
     """Best-effort real client IP behind the Cloudflare/Cloud Run proxy chain.
@@ -43,7 +50,26 @@ def _ident(request):
     return 'ip:%s' % client_ip(request)
 
 
-class ClientAnonRateThrottle(SimpleRateThrottle):
+class _AtomicRateThrottle(SimpleRateThrottle):
+    """``SimpleRateThrottle`` counted by ``ratelimit.hit`` on the throttle's cache."""
+    _retry_after = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        decision = ratelimit.hit(self.scope, self.key, limit=self.num_requests,
+                                 period=self.duration, cache=self.cache)
+        self._retry_after = None if decision.allowed else decision.retry_after
+        return decision.allowed
+
+    def wait(self):
+        return self._retry_after
+
+
+class ClientAnonRateThrottle(_AtomicRateThrottle):
     """Generous global anti-scrape ceiling for ANONYMOUS traffic, keyed on the
     real client IP (not the shared proxy IP). Authenticated requests are not
     throttled by this class — they're protected per-endpoint where it matters."""
@@ -55,7 +81,7 @@ class ClientAnonRateThrottle(SimpleRateThrottle):
         return self.cache_format % {'scope': self.scope, 'ident': client_ip(request)}
 
 
-class UploadRateThrottle(SimpleRateThrottle):
+class UploadRateThrottle(_AtomicRateThrottle):
     """Caps document uploads — each one triggers a billable Vision-OCR call and
     a storage write. Only mutating requests (POST/PUT) are counted; reading the
     document list (GET) is free. Keyed on the Supabase user id (falls back to
@@ -68,7 +94,7 @@ class UploadRateThrottle(SimpleRateThrottle):
         return self.cache_format % {'scope': self.scope, 'ident': _ident(request)}
 
 
-class PublicCountRateThrottle(SimpleRateThrottle):
+class PublicCountRateThrottle(_AtomicRateThrottle):
     """Modest per-client cap on the public (AllowAny) sponsor-count endpoint."""
     scope = 'public_count'
 